@@ -0,0 +1,52 @@
+"""add background jobs
+
+Revision ID: add_background_jobs
+Revises: add_reindex_previous_collection
+Create Date: 2024-03-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_background_jobs'
+down_revision = 'add_reindex_previous_collection'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Status und Fortschritt von Hintergrundjobs, für alle Worker abrufbar
+    try:
+        op.create_table(
+            'background_jobs',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('kind', sa.String(), nullable=False),
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='running'),
+            sa.Column('progress', sa.JSON(), nullable=False, server_default='{}'),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_background_jobs_tenant_id', 'background_jobs', ['tenant_id'])
+        op.create_index('ix_background_jobs_updated_at', 'background_jobs', ['updated_at'])
+        print("background_jobs-Tabelle erstellt")
+    except ProgrammingError:
+        print("background_jobs-Tabelle existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Tabelle
+    try:
+        op.drop_index('ix_background_jobs_updated_at', table_name='background_jobs')
+        op.drop_index('ix_background_jobs_tenant_id', table_name='background_jobs')
+        op.drop_table('background_jobs')
+    except ProgrammingError:
+        print("background_jobs-Tabelle existiert nicht, überspringe...")
+        pass
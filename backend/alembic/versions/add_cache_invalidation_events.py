@@ -0,0 +1,47 @@
+"""add cache invalidation events
+
+Revision ID: add_cache_invalidation_events
+Revises: add_document_content_hash
+Create Date: 2024-03-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_cache_invalidation_events'
+down_revision = 'add_document_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Erstellen der Ereignistabelle für den Cache-Invalidierungsbus
+    try:
+        op.create_table(
+            'cache_invalidation_events',
+            sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+            sa.Column('event_type', sa.String(), nullable=False),
+            sa.Column('tenant_id', sa.String(), nullable=True),
+            sa.Column('payload', sa.JSON(), nullable=False, server_default='{}'),
+            sa.Column('origin', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_cache_invalidation_events_created_at', 'cache_invalidation_events', ['created_at'])
+        print("cache_invalidation_events-Tabelle erstellt")
+    except ProgrammingError:
+        print("cache_invalidation_events-Tabelle existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Ereignistabelle
+    try:
+        op.drop_index('ix_cache_invalidation_events_created_at', table_name='cache_invalidation_events')
+        op.drop_table('cache_invalidation_events')
+    except ProgrammingError:
+        print("cache_invalidation_events-Tabelle existiert nicht, überspringe...")
+        pass
@@ -0,0 +1,112 @@
+"""add chat log rollups
+
+Revision ID: add_chat_log_rollups
+Revises: add_chat_logs
+Create Date: 2024-03-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_chat_log_rollups'
+down_revision = 'add_chat_logs'
+branch_labels = None
+depends_on = None
+
+# Obergrenzen des Latenz-Histogramms (siehe ChatLogRollupModel)
+LATENCY_BUCKETS = ['250', '500', '1000', '2000', '5000', '10000', 'inf']
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    # Markierung unbeantworteter Anfragen; bei partitionierten Tabellen gilt
+    # ADD COLUMN für alle Partitionen
+    try:
+        op.add_column('chat_logs', sa.Column('unanswered', sa.Boolean(), nullable=False, server_default=sa.false()))
+        print("Spalte unanswered zu chat_logs hinzugefügt")
+    except ProgrammingError:
+        print("Spalte unanswered existiert bereits, überspringe...")
+
+    if connection.dialect.name == 'postgresql':
+        # Volltextsuche über die Fragen (deutsche Wortstämme)
+        try:
+            op.execute(
+                "CREATE INDEX IF NOT EXISTS ix_chat_logs_query_fts "
+                "ON chat_logs USING gin (to_tsvector('german', query))"
+            )
+            print("Volltextindex für chat_logs erstellt")
+        except ProgrammingError:
+            print("Volltextindex für chat_logs existiert bereits, überspringe...")
+
+    try:
+        op.create_table(
+            'chat_log_rollups',
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('granularity', sa.String(), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(), nullable=False),
+            sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('unanswered_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('latency_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('latency_sum_ms', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('latency_max_ms', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('first_token_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('first_token_sum_ms', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('traced_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('retrieval_sum_ms', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('llm_sum_ms', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('prompt_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('completion_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+            *[
+                sa.Column(f'latency_le_{bound}', sa.Integer(), nullable=False, server_default='0')
+                for bound in LATENCY_BUCKETS
+            ],
+            sa.PrimaryKeyConstraint('tenant_id', 'granularity', 'bucket_start')
+        )
+        op.create_index(
+            'ix_chat_log_rollups_granularity_bucket', 'chat_log_rollups', ['granularity', 'bucket_start']
+        )
+        print("chat_log_rollups-Tabelle erstellt")
+    except ProgrammingError:
+        print("chat_log_rollups-Tabelle existiert bereits, überspringe...")
+
+    try:
+        op.create_table(
+            'chat_query_rollups',
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('day', sa.DateTime(), nullable=False),
+            sa.Column('query_hash', sa.String(), nullable=False),
+            sa.Column('query', sa.Text(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('unanswered_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('tenant_id', 'day', 'query_hash')
+        )
+        print("chat_query_rollups-Tabelle erstellt")
+    except ProgrammingError:
+        print("chat_query_rollups-Tabelle existiert bereits, überspringe...")
+
+
+def downgrade():
+    try:
+        op.drop_table('chat_query_rollups')
+    except ProgrammingError:
+        print("chat_query_rollups-Tabelle existiert nicht, überspringe...")
+
+    try:
+        op.drop_index('ix_chat_log_rollups_granularity_bucket', table_name='chat_log_rollups')
+        op.drop_table('chat_log_rollups')
+    except ProgrammingError:
+        print("chat_log_rollups-Tabelle existiert nicht, überspringe...")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_chat_logs_query_fts")
+
+    try:
+        op.drop_column('chat_logs', 'unanswered')
+    except ProgrammingError:
+        print("Spalte unanswered existiert nicht, überspringe...")
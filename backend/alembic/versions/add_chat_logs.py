@@ -0,0 +1,111 @@
+"""add chat logs
+
+Revision ID: add_chat_logs
+Revises: add_rate_limit_buckets
+Create Date: 2024-03-21 09:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_chat_logs'
+down_revision = 'add_rate_limit_buckets'
+branch_labels = None
+depends_on = None
+
+
+def _month_start(year, month):
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return date(year, month, 1)
+
+
+def upgrade():
+    connection = op.get_bind()
+    
+    if connection.dialect.name != 'postgresql':
+        # Ohne Postgres eine gewöhnliche Tabelle anlegen
+        try:
+            op.create_table(
+                'chat_logs',
+                sa.Column('id', sa.String(), nullable=False),
+                sa.Column('created_at', sa.DateTime(), nullable=False),
+                sa.Column('tenant_id', sa.String(), nullable=False),
+                sa.Column('session_id', sa.String(), nullable=True),
+                sa.Column('channel', sa.String(), nullable=False),
+                sa.Column('query', sa.Text(), nullable=False),
+                sa.Column('response', sa.Text(), nullable=True),
+                sa.Column('status', sa.String(), nullable=False),
+                sa.Column('error', sa.Text(), nullable=True),
+                sa.Column('client_info', sa.String(), nullable=True),
+                sa.Column('model', sa.String(), nullable=True),
+                sa.Column('latency_ms', sa.Integer(), nullable=True),
+                sa.Column('first_token_ms', sa.Integer(), nullable=True),
+                sa.Column('retrieval_ms', sa.Integer(), nullable=True),
+                sa.Column('llm_ms', sa.Integer(), nullable=True),
+                sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+                sa.Column('completion_tokens', sa.Integer(), nullable=True),
+                sa.PrimaryKeyConstraint('id', 'created_at')
+            )
+            op.create_index('ix_chat_logs_tenant_created', 'chat_logs', ['tenant_id', 'created_at'])
+            print("chat_logs-Tabelle erstellt")
+        except ProgrammingError:
+            print("chat_logs-Tabelle existiert bereits, überspringe...")
+        return
+    
+    # Monatlich nach created_at partitionierte Tabelle; weitere Partitionen
+    # legt der ChatLogService beim Schreiben an, alte können per DROP entfernt werden
+    try:
+        op.execute("""
+            CREATE TABLE chat_logs (
+                id VARCHAR NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                tenant_id VARCHAR NOT NULL,
+                session_id VARCHAR,
+                channel VARCHAR NOT NULL DEFAULT 'completion',
+                query TEXT NOT NULL,
+                response TEXT,
+                status VARCHAR NOT NULL DEFAULT 'ok',
+                error TEXT,
+                client_info VARCHAR,
+                model VARCHAR,
+                latency_ms INTEGER,
+                first_token_ms INTEGER,
+                retrieval_ms INTEGER,
+                llm_ms INTEGER,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        op.execute("CREATE INDEX ix_chat_logs_tenant_created ON chat_logs (tenant_id, created_at)")
+        # Auffangpartition für Zeitpunkte ohne eigene Partition
+        op.execute("CREATE TABLE chat_logs_default PARTITION OF chat_logs DEFAULT")
+        print("chat_logs-Tabelle (partitioniert) erstellt")
+    except ProgrammingError:
+        print("chat_logs-Tabelle existiert bereits, überspringe...")
+        return
+    
+    # Partitionen für den aktuellen und den nächsten Monat
+    today = date.today()
+    for offset in (0, 1):
+        start = _month_start(today.year, today.month + offset)
+        end = _month_start(start.year, start.month + 1)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS chat_logs_{start:%Y_%m} PARTITION OF chat_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    print("chat_logs-Partitionen erstellt")
+
+
+def downgrade():
+    # Entfernt die Tabelle samt aller Partitionen
+    try:
+        op.execute("DROP TABLE IF EXISTS chat_logs CASCADE")
+    except ProgrammingError:
+        print("chat_logs-Tabelle existiert nicht, überspringe...")
+        pass
@@ -0,0 +1,74 @@
+"""add document content hash
+
+Revision ID: add_document_content_hash
+Revises: add_documents_keyset_index
+Create Date: 2024-03-19 09:00:00.000000
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_document_content_hash'
+down_revision = 'add_documents_keyset_index'
+branch_labels = None
+depends_on = None
+
+# Anzahl der Dokumente pro Block beim Nachberechnen der Hashes
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade():
+    # Hinzufügen der Spalten für die Duplikaterkennung
+    try:
+        op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+        op.add_column('documents', sa.Column('simhash', sa.BigInteger(), nullable=True))
+        print("content_hash- und simhash-Spalten hinzugefügt")
+    except ProgrammingError:
+        print("content_hash- und simhash-Spalten existieren bereits, überspringe...")
+        pass
+    
+    try:
+        op.create_index('ix_documents_tenant_content_hash', 'documents', ['tenant_id', 'content_hash'])
+        print("Index ix_documents_tenant_content_hash erstellt")
+    except ProgrammingError:
+        print("Index ix_documents_tenant_content_hash existiert bereits, überspringe...")
+        pass
+    
+    # Hashes für bestehende Dokumente blockweise nachberechnen
+    # (gleiche Normalisierung wie app.services.dedup_service.content_hash)
+    connection = op.get_bind()
+    updated = 0
+    while True:
+        rows = connection.execute(sa.text(
+            "SELECT id, content FROM documents WHERE content_hash IS NULL LIMIT :limit"
+        ), {"limit": BACKFILL_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            sa.text("UPDATE documents SET content_hash = :content_hash WHERE id = :id"),
+            [
+                {
+                    "id": row.id,
+                    "content_hash": hashlib.sha256(" ".join((row.content or "").split()).encode("utf-8")).hexdigest()
+                }
+                for row in rows
+            ]
+        )
+        updated += len(rows)
+    print(f"content_hash für {updated} Dokumente berechnet")
+
+
+def downgrade():
+    # Entfernen der Spalten für die Duplikaterkennung
+    try:
+        op.drop_index('ix_documents_tenant_content_hash', table_name='documents')
+        op.drop_column('documents', 'simhash')
+        op.drop_column('documents', 'content_hash')
+    except ProgrammingError:
+        print("content_hash- und simhash-Spalten existieren nicht, überspringe...")
+        pass
@@ -0,0 +1,63 @@
+"""add document index outbox
+
+Revision ID: add_document_index_outbox
+Revises: add_agency_tables
+Create Date: 2024-03-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_document_index_outbox'
+down_revision = 'add_agency_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Erstellen der Outbox-Tabelle für die Weaviate-Indizierung
+    try:
+        op.create_table(
+            'document_index_tasks',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('document_id', sa.String(), nullable=False),
+            sa.Column('operation', sa.String(), nullable=False, server_default='upsert'),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint('id')
+        )
+        print("document_index_tasks-Tabelle erstellt")
+    except ProgrammingError:
+        print("document_index_tasks-Tabelle existiert bereits, überspringe...")
+        pass
+    
+    # Index für das Abarbeiten fälliger Aufgaben in Reihenfolge
+    try:
+        op.create_index(
+            'ix_document_index_tasks_status_available',
+            'document_index_tasks',
+            ['status', 'available_at', 'id']
+        )
+        op.create_index('ix_document_index_tasks_tenant_id', 'document_index_tasks', ['tenant_id'])
+        print("Indizes für document_index_tasks erstellt")
+    except ProgrammingError:
+        print("Indizes für document_index_tasks existieren bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Outbox-Tabelle
+    try:
+        op.drop_index('ix_document_index_tasks_tenant_id', table_name='document_index_tasks')
+        op.drop_index('ix_document_index_tasks_status_available', table_name='document_index_tasks')
+        op.drop_table('document_index_tasks')
+    except ProgrammingError:
+        print("document_index_tasks-Tabelle existiert nicht, überspringe...")
+        pass
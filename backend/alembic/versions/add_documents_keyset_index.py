@@ -0,0 +1,43 @@
+"""add documents keyset index
+
+Revision ID: add_documents_keyset_index
+Revises: add_document_index_outbox
+Create Date: 2024-03-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_documents_keyset_index'
+down_revision = 'add_document_index_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fehlende Zeitstempel auffüllen, da die Keyset-Pagination nach created_at sortiert
+    op.execute("UPDATE documents SET created_at = NOW() WHERE created_at IS NULL")
+    
+    # Zusammengesetzter Index für die Pagination pro Tenant
+    try:
+        op.create_index(
+            'ix_documents_tenant_created_id',
+            'documents',
+            ['tenant_id', 'created_at', 'id']
+        )
+        print("Index ix_documents_tenant_created_id erstellt")
+    except ProgrammingError:
+        print("Index ix_documents_tenant_created_id existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen des Pagination-Index
+    try:
+        op.drop_index('ix_documents_tenant_created_id', table_name='documents')
+    except ProgrammingError:
+        print("Index ix_documents_tenant_created_id existiert nicht, überspringe...")
+        pass
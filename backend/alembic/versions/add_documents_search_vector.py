@@ -0,0 +1,61 @@
+"""add documents search vector
+
+Revision ID: add_documents_search_vector
+Revises: add_reindex_jobs
+Create Date: 2024-03-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_documents_search_vector'
+down_revision = 'add_reindex_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Von PostgreSQL bei jedem Schreiben gepflegter tsvector (Titel Gewicht A, Inhalt Gewicht B)
+    try:
+        op.execute("""
+            ALTER TABLE documents ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('german', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('german', coalesce(content, '')), 'B')
+            ) STORED
+        """)
+        print("Spalte search_vector zur documents-Tabelle hinzugefügt")
+    except ProgrammingError:
+        print("Spalte search_vector existiert bereits, überspringe...")
+        pass
+
+    # GIN-Index für die Volltextsuche
+    try:
+        op.create_index(
+            'ix_documents_search_vector',
+            'documents',
+            ['search_vector'],
+            postgresql_using='gin'
+        )
+        print("Index ix_documents_search_vector erstellt")
+    except ProgrammingError:
+        print("Index ix_documents_search_vector existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen von Index und Spalte
+    try:
+        op.drop_index('ix_documents_search_vector', table_name='documents')
+    except ProgrammingError:
+        print("Index ix_documents_search_vector existiert nicht, überspringe...")
+        pass
+
+    try:
+        op.drop_column('documents', 'search_vector')
+    except ProgrammingError:
+        print("Spalte search_vector existiert nicht, überspringe...")
+        pass
@@ -0,0 +1,47 @@
+"""add rate limit buckets
+
+Revision ID: add_rate_limit_buckets
+Revises: add_token_blacklist_jti
+Create Date: 2024-03-20 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rate_limit_buckets'
+down_revision = 'add_token_blacklist_jti'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabelle für das gemeinsame Rate-Limit-Backend (RATE_LIMIT_BACKEND=postgres).
+    # Die Buckets sind kurzlebig und müssen einen Absturz nicht überstehen,
+    # daher UNLOGGED (kein WAL bei jedem Request).
+    prefixes = ['UNLOGGED'] if op.get_bind().dialect.name == 'postgresql' else []
+    try:
+        op.create_table(
+            'rate_limit_buckets',
+            sa.Column('key', sa.String(), nullable=False),
+            sa.Column('tokens', sa.Float(), nullable=False),
+            sa.Column('updated_at', sa.Float(), nullable=False),
+            sa.Column('allowed', sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.PrimaryKeyConstraint('key'),
+            prefixes=prefixes
+        )
+        print("rate_limit_buckets-Tabelle erstellt")
+    except ProgrammingError:
+        print("rate_limit_buckets-Tabelle existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Tabelle
+    try:
+        op.drop_table('rate_limit_buckets')
+    except ProgrammingError:
+        print("rate_limit_buckets-Tabelle existiert nicht, überspringe...")
+        pass
@@ -0,0 +1,97 @@
+"""add reindex jobs and tenant collections
+
+Revision ID: add_reindex_jobs
+Revises: add_chat_log_rollups
+Create Date: 2024-03-23 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reindex_jobs'
+down_revision = 'add_chat_log_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Aktive bzw. im Aufbau befindliche Weaviate-Collection pro Tenant
+    try:
+        op.create_table(
+            'tenant_collections',
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('active_collection', sa.String(), nullable=False),
+            sa.Column('pending_collection', sa.String(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint('tenant_id')
+        )
+        print("tenant_collections-Tabelle erstellt")
+    except ProgrammingError:
+        print("tenant_collections-Tabelle existiert bereits, überspringe...")
+        pass
+    
+    # Reindex-Aufträge
+    try:
+        op.create_table(
+            'reindex_jobs',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('blue_green', sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.Column('batch_size', sa.Integer(), nullable=False),
+            sa.Column('concurrency', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        print("reindex_jobs-Tabelle erstellt")
+    except ProgrammingError:
+        print("reindex_jobs-Tabelle existiert bereits, überspringe...")
+        pass
+    
+    # Fortschritt und Checkpoint pro Tenant
+    try:
+        op.create_table(
+            'reindex_job_tenants',
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('target_collection', sa.String(), nullable=True),
+            sa.Column('last_document_id', sa.String(), nullable=True),
+            sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.ForeignKeyConstraint(['job_id'], ['reindex_jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('job_id', 'tenant_id')
+        )
+        print("reindex_job_tenants-Tabelle erstellt")
+    except ProgrammingError:
+        print("reindex_job_tenants-Tabelle existiert bereits, überspringe...")
+        pass
+    
+    # Index für das Lesen der Dokumente eines Tenants in ID-Reihenfolge
+    try:
+        op.create_index('ix_documents_tenant_id_id', 'documents', ['tenant_id', 'id'])
+        print("Index ix_documents_tenant_id_id erstellt")
+    except ProgrammingError:
+        print("Index ix_documents_tenant_id_id existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Reindex-Tabellen
+    try:
+        op.drop_index('ix_documents_tenant_id_id', table_name='documents')
+        op.drop_table('reindex_job_tenants')
+        op.drop_table('reindex_jobs')
+        op.drop_table('tenant_collections')
+    except ProgrammingError:
+        print("Reindex-Tabellen existieren nicht, überspringe...")
+        pass
@@ -0,0 +1,35 @@
+"""add reindex previous collection
+
+Revision ID: add_reindex_previous_collection
+Revises: add_structured_retention_runs
+Create Date: 2024-03-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reindex_previous_collection'
+down_revision = 'add_structured_retention_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Vor der Umschaltung aktive Collection, damit ein fortgesetzter Auftrag sie noch löschen kann
+    try:
+        op.add_column('reindex_job_tenants', sa.Column('previous_collection', sa.String(), nullable=True))
+        print("previous_collection-Spalte zu reindex_job_tenants hinzugefügt")
+    except ProgrammingError:
+        print("previous_collection-Spalte existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    try:
+        op.drop_column('reindex_job_tenants', 'previous_collection')
+    except ProgrammingError:
+        print("previous_collection-Spalte existiert nicht, überspringe...")
+        pass
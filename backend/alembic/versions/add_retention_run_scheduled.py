@@ -0,0 +1,37 @@
+"""add retention run scheduled
+
+Revision ID: add_retention_run_scheduled
+Revises: add_background_jobs
+Create Date: 2024-03-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_retention_run_scheduled'
+down_revision = 'add_background_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Geplante Läufe kennzeichnen; nur sie bestimmen, wann der nächste fällig ist
+    try:
+        op.add_column('structured_retention_runs', sa.Column(
+            'scheduled', sa.Boolean(), nullable=False, server_default=sa.false()
+        ))
+        print("scheduled-Spalte zu structured_retention_runs hinzugefügt")
+    except ProgrammingError:
+        print("scheduled-Spalte existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    try:
+        op.drop_column('structured_retention_runs', 'scheduled')
+    except ProgrammingError:
+        print("scheduled-Spalte existiert nicht, überspringe...")
+        pass
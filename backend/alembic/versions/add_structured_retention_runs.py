@@ -0,0 +1,50 @@
+"""add structured retention runs
+
+Revision ID: add_structured_retention_runs
+Revises: add_documents_search_vector
+Create Date: 2024-03-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_structured_retention_runs'
+down_revision = 'add_documents_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ergebnisse der Aufbewahrungsläufe pro Tenant
+    try:
+        op.create_table(
+            'structured_retention_runs',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('tenant_id', sa.String(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('reclaimed', sa.JSON(), nullable=False, server_default='{}'),
+            sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_structured_retention_runs_tenant_id', 'structured_retention_runs', ['tenant_id'])
+        op.create_index('ix_structured_retention_runs_started_at', 'structured_retention_runs', ['started_at'])
+        print("structured_retention_runs-Tabelle erstellt")
+    except ProgrammingError:
+        print("structured_retention_runs-Tabelle existiert bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der Tabelle
+    try:
+        op.drop_index('ix_structured_retention_runs_started_at', table_name='structured_retention_runs')
+        op.drop_index('ix_structured_retention_runs_tenant_id', table_name='structured_retention_runs')
+        op.drop_table('structured_retention_runs')
+    except ProgrammingError:
+        print("structured_retention_runs-Tabelle existiert nicht, überspringe...")
+        pass
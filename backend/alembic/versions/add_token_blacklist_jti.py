@@ -0,0 +1,64 @@
+"""add token blacklist jti
+
+Revision ID: add_token_blacklist_jti
+Revises: add_cache_invalidation_events
+Create Date: 2024-03-20 12:00:00.000000
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_token_blacklist_jti'
+down_revision = 'add_cache_invalidation_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Token-Kennung (JTI) statt des vollständigen Tokens speichern
+    try:
+        op.add_column('token_blacklist', sa.Column('jti', sa.String(length=64), nullable=True))
+        op.alter_column('token_blacklist', 'token', existing_type=sa.String(length=255), nullable=True)
+        print("jti-Spalte zu token_blacklist hinzugefügt")
+    except ProgrammingError:
+        print("jti-Spalte existiert bereits, überspringe...")
+        pass
+    
+    # Bestehende Einträge (Tokens ohne jti-Claim) erhalten den SHA-256-Hash des Tokens
+    # (gleiche Berechnung wie app.services.token_blacklist_service.token_identifier)
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT id, token FROM token_blacklist WHERE jti IS NULL AND token IS NOT NULL"
+    )).fetchall()
+    if rows:
+        connection.execute(
+            sa.text("UPDATE token_blacklist SET jti = :jti WHERE id = :id"),
+            [{"id": row.id, "jti": hashlib.sha256(row.token.encode("utf-8")).hexdigest()} for row in rows]
+        )
+    print(f"jti für {len(rows)} Einträge berechnet")
+    
+    try:
+        op.create_index('ix_token_blacklist_jti', 'token_blacklist', ['jti'], unique=True)
+        op.create_index('ix_token_blacklist_expires_at', 'token_blacklist', ['expires_at'])
+        print("Indizes für token_blacklist erstellt")
+    except ProgrammingError:
+        print("Indizes für token_blacklist existieren bereits, überspringe...")
+        pass
+
+
+def downgrade():
+    # Entfernen der jti-Spalte
+    try:
+        op.drop_index('ix_token_blacklist_expires_at', table_name='token_blacklist')
+        op.drop_index('ix_token_blacklist_jti', table_name='token_blacklist')
+        op.execute("DELETE FROM token_blacklist WHERE token IS NULL")
+        op.alter_column('token_blacklist', 'token', existing_type=sa.String(length=255), nullable=False)
+        op.drop_column('token_blacklist', 'jti')
+    except ProgrammingError:
+        print("jti-Spalte existiert nicht, überspringe...")
+        pass
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, users, tenants, documents, chat, embed, structured_data
+from app.api.v1 import auth, users, tenants, documents, chat, chat_logs, embed, reindex, retention, structured_data, system
 
 # Haupt-APIRouter, der alle Subrouter zusammenfasst
 api_router = APIRouter()
@@ -20,8 +20,20 @@ api_router.include_router(documents.router, prefix="/documents", tags=["document
 # Chat
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 
+# Chat-Protokolle und Auswertung (Admin)
+api_router.include_router(chat_logs.router, prefix="/chat-logs", tags=["chat-logs"])
+
 # Embedding-Funktionen
 api_router.include_router(embed.router, prefix="/embed", tags=["embed"])
 
+# Reindex-Aufträge (Admin)
+api_router.include_router(reindex.router, prefix="/reindex-jobs", tags=["reindex"])
+
+# Aufbewahrung strukturierter Daten (Admin)
+api_router.include_router(retention.router, prefix="/retention", tags=["retention"])
+
 # Strukturierte Daten
-api_router.include_router(structured_data.router, prefix="/structured-data", tags=["structured-data"]) 
\ No newline at end of file
+api_router.include_router(structured_data.router, prefix="/structured-data", tags=["structured-data"])
+
+# Laufzeitmetriken (Admin)
+api_router.include_router(system.router, prefix="/system", tags=["system"]) 
\ No newline at end of file
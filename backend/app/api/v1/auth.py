@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 from pydantic import BaseModel, EmailStr
 
 from ...core.deps import get_current_user
+from ...core.security import oauth2_scheme, PasswordHashingBusyError
 from ...db.session import get_db
 from ...models.user import User
 from ...services.auth_service import auth_service
@@ -57,7 +58,14 @@ async def login(
     """
     Authentifiziert einen Benutzer und gibt Access- und Refresh-Tokens zurück
     """
-    auth_result = auth_service.authenticate(db, form_data.username, form_data.password)
+    try:
+        auth_result = await auth_service.authenticate(db, form_data.username, form_data.password)
+    except PasswordHashingBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Zu viele gleichzeitige Anmeldungen, bitte später erneut versuchen",
+            headers={"Retry-After": "1"},
+        )
     if not auth_result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -110,12 +118,20 @@ async def refresh_token(
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(
-    token: str = Depends(get_current_user),
+    token: Optional[str] = Depends(oauth2_scheme),
+    current_user: Optional[User] = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Meldet einen Benutzer ab und invalidiert das Token
     """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Nicht authentifiziert",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     success = auth_service.logout(db, token)
     if not success:
         raise HTTPException(
@@ -169,7 +185,7 @@ async def confirm_password_reset(
     """
     Setzt das Passwort eines Benutzers zurück
     """
-    user = auth_service.reset_password(db, reset_confirm.token, reset_confirm.new_password)
+    user = await auth_service.reset_password(db, reset_confirm.token, reset_confirm.new_password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
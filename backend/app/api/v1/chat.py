@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
 import json
 from ...db.models import SearchQuery, ChatQuery, BotComponentResponse
 from ...services.weaviate_service import weaviate_service
 from ...services.rag_service import rag_service
-from ...services.tenant_service import tenant_service
-from ...core.security import get_tenant_id_from_api_key, get_tenant_id_from_query
+from ...services.lexical_index import lexical_index_service
+from ...services.fulltext_search import fulltext_search_service
+from ...services.weaviate.circuit_breaker import WeaviateUnavailableError
+from ...core.security import get_tenant_id_from_api_key, get_tenant_id_from_query, get_request_tenant
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ...db.session import get_db
+from ...db.session import get_async_db, get_db
+from ...services.chat_log_service import chat_log_service
+from ...core.config import settings
 import re
 import asyncio
 import logging
+import time
 
 # Definiere get_user_id_from_query als einfache Dummy-Funktion
 async def get_user_id_from_query(api_key: str = None):
@@ -24,28 +31,102 @@ async def get_user_id_from_query(api_key: str = None):
 router = APIRouter()
 
 
+def log_chat(
+    request: Request,
+    tenant_id: str,
+    query: ChatQuery,
+    response: Optional[str],
+    channel: str,
+    started: float,
+    trace: Dict[str, Any],
+    first_token_ms: Optional[int] = None,
+    error: Optional[str] = None
+) -> None:
+    """
+    Übergibt einen Chat an die Chat-Protokollierung. Der Eintrag landet nur im
+    Ringpuffer; geschrieben wird gebündelt im Hintergrund.
+    """
+    if not settings.CHAT_LOG_ENABLED:
+        return
+    user_messages = [msg.content for msg in query.messages if msg.role == "user"]
+    error = error or trace.get("error")
+    chat_log_service.record(
+        tenant_id=tenant_id,
+        query=user_messages[-1] if user_messages else "",
+        response=response,
+        channel=channel,
+        session_id=request.headers.get("x-session-id"),
+        client_info=request.headers.get("user-agent"),
+        status="error" if error else "ok",
+        error=error,
+        latency_ms=int((time.perf_counter() - started) * 1000),
+        first_token_ms=first_token_ms,
+        trace=trace
+    )
+
+
 @router.post("/search")
 async def search(
+    request: Request,
     query: SearchQuery,
     tenant_id: str = Depends(get_tenant_id_from_api_key),
     db: Session = Depends(get_db)
 ):
     """
     Führt eine semantische Suche in der Wissensbasis durch.
-    Unterstützt hybride Suche (Vektor + Schlüsselwörter).
+    Unterstützt hybride Suche (Vektor + Schlüsselwörter), mit mode="lexical"
+    eine reine Stichwortsuche im BM25-Index und mit mode="fulltext" die
+    PostgreSQL-Volltextsuche (beide ohne Weaviate). Ist Weaviate nicht
+    erreichbar, antwortet die hybride Suche mit der Volltextsuche.
     """
-    tenant = tenant_service.get_tenant_by_id(db, tenant_id)
+    tenant = get_request_tenant(request, db, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant nicht gefunden"
         )
     
-    results = weaviate_service.search(
-        tenant_id=tenant_id,
-        query=query.query,
-        limit=query.limit
-    )
+    if query.mode == "lexical":
+        if not settings.LEXICAL_INDEX_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Die lexikalische Suche ist nicht aktiviert"
+            )
+        results = await run_in_threadpool(
+            lexical_index_service.search, tenant_id, query.query, query.limit or 5
+        )
+        return {"results": results}
+    
+    if query.mode == "fulltext":
+        if not fulltext_search_service.available:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Die Volltextsuche benötigt PostgreSQL"
+            )
+        results = await run_in_threadpool(
+            fulltext_search_service.search, tenant_id, query.query, query.limit or 5
+        )
+        return {"results": results}
+    
+    try:
+        results = weaviate_service.search(
+            tenant_id=tenant_id,
+            query=query.query,
+            limit=query.limit
+        )
+    except WeaviateUnavailableError as e:
+        if settings.FULLTEXT_FALLBACK_ENABLED and fulltext_search_service.available:
+            results = await run_in_threadpool(
+                fulltext_search_service.safe_search, tenant_id, query.query, query.limit or 5
+            )
+            if results:
+                return {"results": results}
+        # Schnell fehlschlagen statt auf Timeouts zu warten
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Die Suche ist vorübergehend nicht verfügbar",
+            headers={"Retry-After": str(int(e.retry_after or 30))}
+        )
     
     return {"results": results}
 
@@ -123,8 +204,8 @@ async def chat_completion(
     Generiert eine Chat-Antwort basierend auf vorherigen Nachrichten und einer Benutzeranfrage.
     Kann Streaming-Antworten zurückgeben, wenn stream=True gesetzt ist.
     """
-    # Log für Debugging
-    print(f"[chat_completion] Tenant-ID: {tenant_id}")
+    logging.debug(f"[chat_completion] Tenant-ID: {tenant_id}")
+    started = time.perf_counter()
     
     # Wenn streaming angefordert wurde, den streaming Endpunkt aufrufen
     if query.stream:
@@ -134,12 +215,15 @@ async def chat_completion(
     use_mistral = query.use_mistral if hasattr(query, 'use_mistral') else False
     
     full_response = ""
+    trace: Dict[str, Any] = {}
     async for chunk in rag_service.process_chat(
         tenant_id=tenant_id,
         messages=[{"role": msg.role, "content": msg.content} for msg in query.messages],
         system_prompt=query.custom_instructions,
         stream=False,
-        use_mistral=use_mistral
+        use_mistral=use_mistral,
+        tenant=getattr(request.state, "tenant", None),
+        trace=trace
     ):
         # Sicherstellen, dass chunk nicht None ist
         if chunk is None:
@@ -152,39 +236,36 @@ async def chat_completion(
     
     if len(full_response) < 5:
         # Leere oder zu kurze Antwort signalisiert oft ein Problem mit dem LLM
+        log_chat(request, tenant_id, query, full_response, "completion", started, trace,
+                 error="Leere Antwort vom LLM")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Die KI konnte keine Antwort generieren. Bitte versuchen Sie es erneut."
         )
     
-    # Tracking für nicht-Stream-Anfragen - deaktiviert, da chat_log_service fehlt
-    # if user_id:
-    #     chat_log_service.log_chat(
-    #         tenant_id=tenant_id, 
-    #         user_id=user_id, 
-    #         query=query.messages[-1].content if query.messages else "", 
-    #         response=full_response
-    #     )
+    log_chat(request, tenant_id, query, full_response, "completion", started, trace)
     
     return processed_response
 
 
 @router.get("/embed")
 async def get_embed_config(
+    request: Request,
     api_key: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ruft die Konfiguration für ein eingebettetes Widget ab.
     """
-    tenant_id = await get_tenant_id_from_query(api_key, db)
+    tenant_id = await get_tenant_id_from_query(request, api_key, db, async_db)
     if not tenant_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ungültiger API-Key"
         )
     
-    tenant = tenant_service.get_tenant_by_id(db, tenant_id)
+    tenant = get_request_tenant(request, db, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -206,21 +287,26 @@ async def get_embed_config(
 
 @router.post("/embed/chat")
 async def embed_chat(
+    request: Request,
     query: ChatQuery,
     api_key: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpunkt für eingebettete Widgets.
     """
-    tenant_id = await get_tenant_id_from_query(api_key, db)
+    started = time.perf_counter()
+    channel = "embed"
+    trace: Dict[str, Any] = {}
+    tenant_id = await get_tenant_id_from_query(request, api_key, db, async_db)
     if not tenant_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ungültiger API-Key"
         )
     
-    tenant = tenant_service.get_tenant_by_id(db, tenant_id)
+    tenant = get_request_tenant(request, db, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -237,7 +323,9 @@ async def embed_chat(
             messages=[{"role": msg.role, "content": msg.content} for msg in query.messages],
             system_prompt=query.custom_instructions or tenant.custom_instructions,
             stream=False,
-            use_mistral=use_mistral
+            use_mistral=use_mistral,
+            tenant=tenant,
+            trace=trace
         ):
             # Sicherstellen, dass chunk nicht None ist
             if chunk is None:
@@ -245,13 +333,16 @@ async def embed_chat(
                 
             full_response += chunk
         
+        log_chat(request, tenant_id, query, full_response, channel, started, trace)
         return {"response": full_response}
     
     # Bei aktiviertem Streaming
     async def generate():
+        # Buffer für die gesamte Antwort
+        full_response = ""
+        first_token_ms = None
+        error = None
         try:
-            # Buffer für die gesamte Antwort
-            full_response = ""
             
             # Flag, um zu erkennen, ob wir möglicherweise in einem JSON-Block sind
             json_mode = False
@@ -265,13 +356,17 @@ async def embed_chat(
                 messages=[{"role": msg.role, "content": msg.content} for msg in query.messages],
                 system_prompt=query.custom_instructions,
                 stream=True,
-                use_mistral=use_mistral
+                use_mistral=use_mistral,
+                tenant=tenant,
+                trace=trace
             ):
                 # Sicherstellen, dass chunk nicht None ist
                 if chunk is None:
                     continue
                 
                 # Markieren, dass wir Chunks empfangen haben
+                if not received_chunks:
+                    first_token_ms = int((time.perf_counter() - started) * 1000)
                 received_chunks = True
                     
                 # Zum Buffer hinzufügen für spätere Verarbeitung
@@ -345,9 +440,14 @@ async def embed_chat(
             # Sende das DONE-Event als separaten Server-Sent Event, nicht als Teil des Inhalts
             yield "event: done\ndata: \n\n"
         except Exception as e:
+            error = str(e)
             logging.error(f"Fehler in chat_completion_stream: {str(e)}", exc_info=True)
             yield f"data: Error: {str(e)}\n\n"
             yield "event: done\ndata: \n\n"
+        finally:
+            # Auch bei vorzeitigem Ende (UI-Komponente, Verbindungsabbruch) protokollieren
+            log_chat(request, tenant_id, query, full_response, channel, started, trace,
+                     first_token_ms=first_token_ms, error=error)
     
     return StreamingResponse(
         generate(),
@@ -371,16 +471,21 @@ async def chat_completion_stream(
     """
     Generiert eine Chat-Antwort und streamt sie zurück.
     """
-    # Log für Debugging
-    print(f"[chat_completion_stream] Tenant-ID: {tenant_id}")
+    logging.debug(f"[chat_completion_stream] Tenant-ID: {tenant_id}")
     
     use_mistral = query.use_mistral if hasattr(query, 'use_mistral') else False
+    tenant = getattr(request.state, "tenant", None)
+    started = time.perf_counter()
+    channel = "stream"
+    trace: Dict[str, Any] = {}
     
     # Generator-Funktion für die Stream-Antwort
     async def generate():
+        # Buffer für die gesamte Antwort
+        full_response = ""
+        first_token_ms = None
+        error = None
         try:
-            # Buffer für die gesamte Antwort
-            full_response = ""
             
             # Flag, um zu erkennen, ob wir möglicherweise in einem JSON-Block sind
             json_mode = False
@@ -394,13 +499,17 @@ async def chat_completion_stream(
                 messages=[{"role": msg.role, "content": msg.content} for msg in query.messages],
                 system_prompt=query.custom_instructions,
                 stream=True,
-                use_mistral=use_mistral
+                use_mistral=use_mistral,
+                tenant=tenant,
+                trace=trace
             ):
                 # Sicherstellen, dass chunk nicht None ist
                 if chunk is None:
                     continue
                 
                 # Markieren, dass wir Chunks empfangen haben
+                if not received_chunks:
+                    first_token_ms = int((time.perf_counter() - started) * 1000)
                 received_chunks = True
                     
                 # Zum Buffer hinzufügen für spätere Verarbeitung
@@ -474,9 +583,14 @@ async def chat_completion_stream(
             # Sende das DONE-Event als separaten Server-Sent Event, nicht als Teil des Inhalts
             yield "event: done\ndata: \n\n"
         except Exception as e:
+            error = str(e)
             logging.error(f"Fehler in chat_completion_stream: {str(e)}", exc_info=True)
             yield f"data: Error: {str(e)}\n\n"
             yield "event: done\ndata: \n\n"
+        finally:
+            # Auch bei vorzeitigem Ende (UI-Komponente, Verbindungsabbruch) protokollieren
+            log_chat(request, tenant_id, query, full_response, channel, started, trace,
+                     first_token_ms=first_token_ms, error=error)
     
     return StreamingResponse(
         generate(),
@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.security import get_admin_api_key
+from ...db.session import get_async_db
+from ...services.chat_analytics_service import chat_analytics_service
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_chat_logs(
+    tenant_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Volltextfilter auf die Fragen"),
+    log_status: Optional[str] = Query(None, alias="status", pattern="^(ok|error)$"),
+    unanswered: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Dict[str, Any]]:
+    """
+    Ruft die Chat-Protokolle eines Tenants seitenweise ab (neueste zuerst, nur für Admin).
+
+    - cursor: Wert aus dem Header X-Next-Cursor der vorherigen Seite
+    - since/until: Zeitraum (UTC); begrenzt in Postgres auch die gelesenen Partitionen
+    """
+    try:
+        logs, next_cursor = await chat_analytics_service.list_logs(
+            db, tenant_id, limit=limit, cursor=cursor, q=q, status=log_status,
+            unanswered=unanswered, since=since, until=until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+@router.get("/stats")
+async def get_chat_stats(
+    tenant_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Kennzahlen (Anfragen, Fehler, unbeantwortete Fragen, Latenz-Perzentile, Tokens)
+    eines Tenants oder aller Tenants. Standardzeitraum: letzte 24 Stunden.
+    """
+    try:
+        return await chat_analytics_service.get_summary(db, tenant_id, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/stats/tenants")
+async def get_chat_stats_by_tenant(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Dict[str, Any]]:
+    """Kennzahlen pro Tenant, sortiert nach Anzahl der Anfragen (Standard: letzte 24 Stunden)."""
+    try:
+        return await chat_analytics_service.get_tenant_overview(db, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/timeseries")
+async def get_chat_timeseries(
+    tenant_id: Optional[str] = None,
+    granularity: str = Query("hour", pattern="^(hour|day)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Dict[str, Any]]:
+    """
+    Kennzahlen pro Stunde oder Tag (UTC). Standardzeitraum: 24 Stunden bzw. 30 Tage.
+    """
+    try:
+        return await chat_analytics_service.get_timeseries(
+            db, tenant_id, granularity=granularity, since=since, until=until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/top-questions")
+async def get_top_questions(
+    tenant_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=200),
+    unanswered: bool = Query(False, description="Nur Fragen, die unbeantwortet blieben"),
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Dict[str, Any]]:
+    """Häufigste Fragen eines Tenants (Standard: letzte 30 Tage)."""
+    try:
+        return await chat_analytics_service.get_top_questions(
+            db, tenant_id, since=since, until=until, limit=limit, unanswered_only=unanswered
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -1,93 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response, Query, BackgroundTasks
 from typing import List, Optional
-from pydantic import parse_obj_as
-import json
-import pandas as pd
-import io
+import logging
 import uuid
 from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ...db.models import Document, DocumentCreate, DocumentModel
+from starlette.concurrency import run_in_threadpool
+from ...db.models import Document, DocumentCreate, DocumentCreated, DocumentModel
 from ...services.weaviate_service import weaviate_service
 from ...core.security import get_tenant_id_from_api_key
-from ...db.session import get_db
+from ...db.session import get_async_db, get_db
 from ...services import document_service
-from ...schemas.document import WeaviateStatus
+from ...services.document_indexer import document_indexer
+from ...services.bulk_import_service import BulkImportError, bulk_import_service
+from ...services.job_service import JobLimitError, job_service
+from ...services.reindex_service import reindex_service
+from ...services.bulk_delete_service import bulk_delete_service
+from ...services.dedup_service import DuplicateFilter, content_hash, simhash
+from ...schemas.document import WeaviateStatus, BulkDeleteRequest, DocumentListItem
 from ...core.auth import get_api_key
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
-@router.post("/", response_model=Document, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=DocumentCreated, status_code=status.HTTP_201_CREATED)
 async def create_document(
     document: DocumentCreate,
+    response: Response,
     tenant_id: str = Depends(get_tenant_id_from_api_key),
     db: Session = Depends(get_db)
 ):
-    """Fügt ein neues Dokument zur Wissensbasis hinzu."""
-    # Weaviate-Dokument erstellen
-    doc_id = weaviate_service.add_document(
-        tenant_id=tenant_id,
-        title=document.title,
-        content=document.content,
-        metadata=document.doc_metadata,
-        source=document.source
+    """
+    Fügt ein neues Dokument zur Wissensbasis hinzu.
+    
+    Dokument und Index-Aufgabe werden in einer Transaktion gespeichert,
+    die Indizierung in Weaviate erfolgt asynchron durch den Dokument-Indexer.
+    Existiert der Inhalt bereits, wird kein neues Dokument angelegt, sondern das
+    vorhandene mit Status 200 und duplicate="exact" zurückgegeben. Beinahe-Duplikate
+    (falls für den Tenant aktiviert) werden angelegt und mit duplicate="near" markiert.
+    """
+    rows, duplicates = DuplicateFilter.for_tenant(db, tenant_id).filter_rows(
+        [{"title": document.title, "content": document.content}]
     )
+    duplicate = duplicates[0]["reason"] if duplicates else None
+    if duplicate == "exact":
+        existing = db.query(DocumentModel).filter(
+            DocumentModel.tenant_id == tenant_id,
+            DocumentModel.content_hash == content_hash(document.content)
+        ).order_by(DocumentModel.created_at).first()
+        if existing is not None:
+            response.status_code = status.HTTP_200_OK
+            return DocumentCreated.model_validate(existing).model_copy(update={"duplicate": "exact"})
     
-    # Datenbank-Dokument erstellen
     db_document = DocumentModel(
-        id=doc_id,
+        id=str(uuid.uuid4()),
         tenant_id=tenant_id,
         title=document.title,
         content=document.content,
         doc_metadata=document.doc_metadata,
-        source=document.source
+        source=document.source,
+        content_hash=content_hash(document.content),
+        simhash=simhash(document.content)
     )
     
     db.add(db_document)
+    document_indexer.enqueue(db, tenant_id, db_document.id)
     db.commit()
     db.refresh(db_document)
     
-    return Document.model_validate(db_document)
+    return DocumentCreated.model_validate(db_document).model_copy(update={"duplicate": duplicate})
 
 
 @router.options("/", include_in_schema=False)
 @router.options("/{document_id}", include_in_schema=False)
 @router.options("/upload/csv", include_in_schema=False)
+@router.options("/bulk-delete", include_in_schema=False)
 @router.options("/upload/json", include_in_schema=False)
+@router.options("/upload/json/stream", include_in_schema=False)
 async def options_documents():
     """Handler für OPTIONS-Anfragen an Documents-Endpunkte."""
     return {}
 
 
-@router.get("/", response_model=List[Document])
+@router.get("/", response_model=List[DocumentListItem], response_model_exclude_unset=True)
 async def get_documents(
     tenant_id: str,
-    limit: int = 1000,
-    offset: int = 0,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     api_key: str = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Ruft alle Dokumente eines Tenants ab."""
+    """
+    Ruft die Dokumente eines Tenants seitenweise ab (neueste zuerst).
+    
+    - cursor: Wert aus dem Header X-Next-Cursor der vorherigen Seite
+    - fields: kommagetrennte Feldauswahl, z.B. "id,title,source,created_at"
+    
+    Die geschätzte Gesamtanzahl steht im Header X-Total-Count.
+    """
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    
     try:
-        print(f"Suche Dokumente für Tenant: {tenant_id}")
-        # Dokumente aus der Datenbank abrufen
-        db_documents = db.query(DocumentModel).filter(
-            DocumentModel.tenant_id == tenant_id
-        ).offset(offset).limit(limit).all()
-        
-        print(f"Gefundene Dokumente: {len(db_documents)}")
-        for doc in db_documents:
-            print(f"Dokument: ID={doc.id}, Titel={doc.title}, Created={doc.created_at}")
-        
-        result = [Document.model_validate(doc) for doc in db_documents]
-        print(f"Serialisierte Dokumente: {len(result)}")
-        return result
-    except Exception as e:
-        print(f"Fehler beim Abrufen der Dokumente: {e}")
-        import traceback
-        print(traceback.format_exc())
-        return []
+        documents, next_cursor = await document_service.alist_documents_page(
+            db, tenant_id, limit=limit, cursor=cursor, fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if not cursor:
+        response.headers["X-Total-Count"] = str(await document_service.aestimate_document_count(db, tenant_id))
+    
+    logger.debug(f"{len(documents)} Dokumente für Tenant {tenant_id} geladen")
+    return documents
+
+
+@router.get("/{document_id}", response_model=Document)
+async def get_document(
+    document_id: str,
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """Ruft ein einzelnes Dokument mit Inhalt ab (die Liste liefert content nur auf Anfrage)."""
+    db_document = db.query(DocumentModel).filter(
+        DocumentModel.id == document_id,
+        DocumentModel.tenant_id == tenant_id
+    ).first()
+    if not db_document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dokument nicht gefunden"
+        )
+    return db_document
 
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -109,19 +158,42 @@ async def delete_document(
             detail="Dokument nicht gefunden"
         )
     
-    # Aus Weaviate löschen
-    success = weaviate_service.delete_document(
-        tenant_id=tenant_id,
-        doc_id=document_id
-    )
-    
-    if success:
-        db.delete(db_document)
-        db.commit()
+    # Löschung aus Weaviate wird zusammen mit dem Datenbank-Löschvorgang vorgemerkt
+    db.delete(db_document)
+    document_indexer.enqueue(db, tenant_id, document_id, operation="delete")
+    db.commit()
     
     return None
 
 
+@router.post("/bulk-delete", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_delete_documents(
+    request: BulkDeleteRequest,
+    background_tasks: BackgroundTasks,
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """
+    Löscht alle Dokumente eines Tenants, die den Filtern entsprechen.
+    
+    Filter (kombinierbar): ids, source, metadata_key/metadata_value, created_from/created_to.
+    Die Löschung läuft im Hintergrund; der Fortschritt ist über GET /documents/jobs/{job_id} abrufbar.
+    Mit dry_run=true wird nur die Anzahl der betroffenen Dokumente ermittelt.
+    """
+    try:
+        matching = bulk_delete_service.count_matching(db, tenant_id, request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if request.dry_run:
+        return {"matching": matching, "dry_run": True}
+    
+    job_id = await run_in_threadpool(bulk_delete_service.start_job, tenant_id, request)
+    background_tasks.add_task(bulk_delete_service.run_job, job_id, tenant_id, request)
+    
+    return {"job_id": job_id, "matching": matching}
+
+
 @router.post("/upload/csv", status_code=status.HTTP_201_CREATED)
 async def upload_csv(
     file: UploadFile = File(...),
@@ -136,65 +208,26 @@ async def upload_csv(
     
     - Die CSV muss mindestens eine Spalte für Titel und Inhalt haben
     - Optional kann eine Spalte für die Quelle angegeben werden
+    - Die Datei wird blockweise verarbeitet, die Indizierung erfolgt asynchron
     """
     try:
-        # CSV-Datei lesen
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        
-        # Prüfen, ob die erforderlichen Spalten vorhanden sind
-        if title_column not in df.columns or content_column not in df.columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"CSV muss die Spalten '{title_column}' und '{content_column}' enthalten"
-            )
-        
-        # Dokumente hinzufügen
-        added_docs = []
-        for _, row in df.iterrows():
-            title = row[title_column]
-            content = row[content_column]
-            source = row.get(source_column) if source_column and source_column in df.columns else None
-            
-            # Metadaten aus allen anderen Spalten erstellen
-            metadata = {}
-            for col in df.columns:
-                if col not in [title_column, content_column, source_column]:
-                    metadata[col] = row[col]
-            
-            # Dokument in Weaviate hinzufügen
-            doc_id = weaviate_service.add_document(
-                tenant_id=tenant_id,
-                title=title,
-                content=content,
-                metadata=metadata,
-                source=source
-            )
-            
-            # Dokument in der Datenbank speichern
-            db_document = DocumentModel(
-                id=doc_id,
-                tenant_id=tenant_id,
-                title=title,
-                content=content,
-                doc_metadata=metadata,
-                source=source
-            )
-            db.add(db_document)
-            
-            added_docs.append({
-                "id": doc_id,
-                "title": title
-            })
-        
-        # Alle Dokumente in der Datenbank speichern
-        db.commit()
+        stats = await run_in_threadpool(
+            bulk_import_service.import_csv,
+            db,
+            tenant_id,
+            file.file,
+            title_column,
+            content_column,
+            source_column
+        )
         
         return {
-            "message": f"{len(added_docs)} Dokumente erfolgreich hinzugefügt",
-            "documents": added_docs
+            "message": f"{stats['imported']} Dokumente erfolgreich hinzugefügt",
+            **stats
         }
     
+    except BulkImportError as e:
+        raise _bulk_import_error(e, str(e), f"Fehler beim Verarbeiten der CSV-Datei: {str(e)}")
     except Exception as e:
         db.rollback()  # Rollback bei Fehlern
         raise HTTPException(
@@ -203,6 +236,29 @@ async def upload_csv(
         )
 
 
+def _bulk_import_error(error: BulkImportError, invalid_message: str, failed_message: str) -> HTTPException:
+    """
+    Fehlerantwort für einen abgebrochenen Massenimport. Bereits geschriebene
+    Blöcke bleiben erhalten, daher enthält sie die Zähler bis zum Abbruch.
+    """
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST if error.invalid_input else status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail={
+            "message": invalid_message if error.invalid_input else failed_message,
+            **error.stats
+        }
+    )
+
+
+async def _read_upload_file(file: UploadFile, chunk_size: int = 64 * 1024):
+    """Liest eine hochgeladene Datei blockweise."""
+    while True:
+        data = await file.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+
 @router.post("/upload/json", status_code=status.HTTP_201_CREATED)
 async def upload_json(
     file: UploadFile = File(...),
@@ -212,72 +268,20 @@ async def upload_json(
     """
     Lädt eine JSON-Datei hoch und fügt die Daten als Dokumente zur Wissensbasis hinzu.
     
-    Die JSON-Datei sollte ein Array von Objekten mit mindestens "title" und "content" enthalten.
-    Optional können "source" und "metadata" angegeben werden.
+    Die JSON-Datei sollte ein Array von Objekten mit mindestens "title" und "content" enthalten,
+    alternativ NDJSON (ein Objekt pro Zeile). Optional können "source" und "metadata" angegeben werden.
+    Die Datei wird inkrementell geparst und blockweise geschrieben.
     """
     try:
-        # JSON-Datei lesen
-        contents = await file.read()
-        data = json.loads(contents)
-        
-        if not isinstance(data, list):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="JSON muss ein Array von Objekten sein"
-            )
-        
-        # Dokumente hinzufügen
-        added_docs = []
-        for item in data:
-            # Als DocumentCreate parsen
-            try:
-                doc = parse_obj_as(DocumentCreate, item)
-            except Exception:
-                # Überprüfen, ob mindestens Titel und Inhalt vorhanden sind
-                if "title" not in item or "content" not in item:
-                    continue
-                
-                # Manuell ein Dokument erstellen
-                doc = DocumentCreate(
-                    title=item["title"],
-                    content=item["content"],
-                    source=item.get("source"),
-                    doc_metadata=item.get("metadata", {})
-                )
-            
-            # Dokument in Weaviate hinzufügen
-            doc_id = weaviate_service.add_document(
-                tenant_id=tenant_id,
-                title=doc.title,
-                content=doc.content,
-                metadata=doc.doc_metadata,
-                source=doc.source
-            )
-            
-            # Dokument in der Datenbank speichern
-            db_document = DocumentModel(
-                id=doc_id,
-                tenant_id=tenant_id,
-                title=doc.title,
-                content=doc.content,
-                doc_metadata=doc.doc_metadata,
-                source=doc.source
-            )
-            db.add(db_document)
-            
-            added_docs.append({
-                "id": doc_id,
-                "title": doc.title
-            })
-        
-        # Alle Dokumente in der Datenbank speichern
-        db.commit()
+        stats = await bulk_import_service.import_json_stream(db, tenant_id, _read_upload_file(file))
         
         return {
-            "message": f"{len(added_docs)} Dokumente erfolgreich hinzugefügt",
-            "documents": added_docs
+            "message": f"{stats['imported']} Dokumente erfolgreich hinzugefügt",
+            **stats
         }
     
+    except BulkImportError as e:
+        raise _bulk_import_error(e, f"Ungültiges JSON: {str(e)}", f"Fehler beim Verarbeiten der JSON-Datei: {str(e)}")
     except Exception as e:
         db.rollback()  # Rollback bei Fehlern
         raise HTTPException(
@@ -286,6 +290,74 @@ async def upload_json(
         )
 
 
+@router.post("/upload/json/stream/jobs", status_code=status.HTTP_201_CREATED)
+async def create_json_stream_job(
+    tenant_id: str = Depends(get_tenant_id_from_api_key)
+):
+    """
+    Legt vorab einen Job für einen JSON-Stream-Upload an.
+
+    Die zurückgegebene job_id wird an POST /upload/json/stream übergeben; währenddessen
+    ist der Fortschritt über GET /documents/jobs/{job_id} abrufbar. Nicht gestartete Jobs
+    verfallen nach JOB_PENDING_TTL_SECONDS; pro Tenant sind höchstens
+    JOB_MAX_PENDING_PER_TENANT gleichzeitig offen (sonst 429).
+    """
+    try:
+        job_id = await run_in_threadpool(
+            job_service.create_job, "json_upload", tenant_id, status="pending", imported=0, skipped=0
+        )
+    except JobLimitError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return {"job_id": job_id}
+
+
+@router.post("/upload/json/stream", status_code=status.HTTP_201_CREATED)
+async def upload_json_stream(
+    request: Request,
+    job_id: Optional[str] = None,
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """
+    Importiert ein JSON-Array oder NDJSON direkt aus dem Request-Body (ohne Multipart).
+    
+    Die Verarbeitung beginnt bereits während des Uploads. Mit einer über
+    POST /upload/json/stream/jobs angelegten job_id kann der Fortschritt parallel über
+    GET /documents/jobs/{job_id} abgefragt werden.
+    """
+    if job_id is not None and not await run_in_threadpool(job_service.claim_job, job_id, tenant_id, "json_upload"):
+        raise HTTPException(status_code=404, detail="Job nicht gefunden, abgelaufen oder bereits gestartet")
+
+    try:
+        stats = await bulk_import_service.import_json_stream(db, tenant_id, request.stream(), job_id=job_id)
+        
+        return {
+            "message": f"{stats['imported']} Dokumente erfolgreich hinzugefügt",
+            **stats
+        }
+    
+    except BulkImportError as e:
+        raise _bulk_import_error(e, f"Ungültiges JSON: {str(e)}", f"Fehler beim Verarbeiten des JSON-Streams: {str(e)}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Fehler beim Verarbeiten des JSON-Streams: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    tenant_id: str = Depends(get_tenant_id_from_api_key)
+):
+    """Liefert Status und Fortschritt eines Upload- oder Hintergrundjobs."""
+    job = await run_in_threadpool(job_service.get_job, job_id, tenant_id=tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return job
+
+
 @router.post("/upload/markdown", status_code=status.HTTP_201_CREATED)
 async def upload_markdown(
     file: UploadFile = File(...),
@@ -307,25 +379,31 @@ async def upload_markdown(
         if title.lower().endswith('.md'):
             title = title[:-3]
         
-        # Dokument in Weaviate hinzufügen
-        doc_id = weaviate_service.add_document(
-            tenant_id=tenant_id,
-            title=title,
-            content=content,
-            metadata={"file_type": "markdown"},
-            source=source
+        # Duplikate überspringen
+        rows, duplicates = DuplicateFilter.for_tenant(db, tenant_id).filter_rows(
+            [{"title": title, "content": content}]
         )
+        if duplicates:
+            return {
+                "message": "Markdown-Datei übersprungen, Inhalt existiert bereits",
+                "duplicates_skipped": 1,
+                "duplicates": duplicates
+            }
         
-        # Dokument in der Datenbank speichern
+        # Dokument in der Datenbank speichern, die Indizierung erfolgt asynchron
+        doc_id = str(uuid.uuid4())
         db_document = DocumentModel(
             id=doc_id,
             tenant_id=tenant_id,
             title=title,
             content=content,
             doc_metadata={"file_type": "markdown"},
-            source=source
+            source=source,
+            content_hash=rows[0]["content_hash"],
+            simhash=rows[0].get("simhash")
         )
         db.add(db_document)
+        document_indexer.enqueue(db, tenant_id, doc_id)
         db.commit()
         db.refresh(db_document)
         
@@ -345,6 +423,25 @@ async def upload_markdown(
         )
 
 
+@router.get("/indexing/stats")
+async def get_indexing_stats(
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """Liefert Metriken des Dokument-Indexers, u.a. die Indizierungsverzögerung."""
+    return document_indexer.get_stats(db, tenant_id=tenant_id)
+
+
+@router.post("/indexing/retry-failed")
+async def retry_failed_indexing(
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """Plant endgültig fehlgeschlagene Index-Aufgaben eines Tenants erneut ein."""
+    count = document_indexer.retry_failed(db, tenant_id)
+    return {"message": f"{count} Index-Aufgaben erneut eingeplant"}
+
+
 @router.get("/{document_id}/weaviate-status", response_model=WeaviateStatus)
 async def get_document_weaviate_status(
     document_id: str,
@@ -428,23 +525,14 @@ async def reindex_all_documents(
     tenant_id: str = Depends(get_tenant_id_from_api_key),
     db: Session = Depends(get_db)
 ):
-    """Alle Dokumente neu indizieren"""
+    """
+    Alle Dokumente neu indizieren. Startet einen Reindex-Auftrag (Blue/Green),
+    dessen Fortschritt über /documents/reindex-all/{job_id} abgefragt werden kann.
+    """
     try:
-        # Alle Dokumente des Tenants abrufen
-        documents = db.query(DocumentModel).filter(
-            DocumentModel.tenant_id == tenant_id
-        ).all()
-        
-        if not documents:
-            return {"message": "Keine Dokumente zum Neu-Indizieren gefunden"}
-        
-        # Dokumente in Document-Schema konvertieren
-        doc_schemas = [Document.model_validate(doc) for doc in documents]
-        
-        # Alle Dokumente neu indizieren
-        success_count = weaviate_service.reindex_all_documents(tenant_id, doc_schemas)
-        
-        return {"message": f"{success_count} Dokumente erfolgreich neu indiziert"}
+        job = await run_in_threadpool(reindex_service.create_job, db, [tenant_id])
+        await reindex_service.start(job.id)
+        return {"message": "Neuindizierung gestartet", "job_id": job.id}
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -452,6 +540,20 @@ async def reindex_all_documents(
         )
 
 
+@router.get("/reindex-all/{job_id}")
+async def get_reindex_progress(
+    job_id: int,
+    tenant_id: str = Depends(get_tenant_id_from_api_key),
+    db: Session = Depends(get_db)
+):
+    """Fortschritt einer Neuindizierung der eigenen Dokumente."""
+    job = await run_in_threadpool(reindex_service.get_job, db, job_id)
+    tenants = job["tenants"] if job else []
+    if len(tenants) != 1 or tenants[0]["tenant_id"] != tenant_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reindex-Auftrag nicht gefunden")
+    return {key: job[key] for key in ("id", "status", "total", "processed", "progress", "error")}
+
+
 @router.get("/{document_id}/status", response_model=WeaviateStatus)
 async def get_document_status(
     document_id: str,
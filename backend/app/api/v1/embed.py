@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from typing import Optional
-from sqlalchemy.orm import Session
-from ...db.session import get_db
-from ...core.security import get_tenant_id_from_api_key
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...db.session import get_async_db
 from ...services.tenant_service import tenant_service
 from ...core.config import settings
 import os
@@ -13,7 +12,7 @@ router = APIRouter()
 async def get_embed_config(
     x_api_key: Optional[str] = Header(None),
     tenant_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Gibt die Konfiguration für das Embed-Script zurück.
@@ -35,19 +34,16 @@ async def get_embed_config(
             detail="Entweder X-API-Key Header oder tenant_id Parameter muss angegeben werden."
         )
     
-    # Tenant-ID aus API-Key ermitteln, falls nur API-Key gegeben ist
-    resolved_tenant_id = tenant_id
+    # Tenant über den API-Key ermitteln, falls nur der API-Key gegeben ist
     if x_api_key and not tenant_id:
-        try:
-            resolved_tenant_id = await get_tenant_id_from_api_key(db, x_api_key)
-        except:
+        tenant = await tenant_service.aget_tenant_by_api_key(db, x_api_key)
+        if not tenant:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Ungültiger API-Key"
             )
-    
-    # Tenant-Daten laden
-    tenant = tenant_service.get_tenant_by_id(db, resolved_tenant_id)
+    else:
+        tenant = await tenant_service.aget_tenant_by_id(db, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ...core.security import get_admin_api_key
+from ...db.session import get_db
+from ...schemas.document import ReindexJobCreate
+from ...services.reindex_service import reindex_service
+
+router = APIRouter()
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def create_reindex_job(
+    request: ReindexJobCreate,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Legt einen Reindex-Auftrag an und startet ihn im Hintergrund (nur für Admin).
+    Der Fortschritt kann über GET /reindex-jobs/{job_id} abgefragt werden.
+    """
+    try:
+        job = await run_in_threadpool(
+            reindex_service.create_job, db, request.tenant_ids, request.blue_green,
+            request.batch_size, request.concurrency
+        )
+        await reindex_service.start(job.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await run_in_threadpool(reindex_service.get_job, db, job.id)
+
+
+@router.get("/")
+async def list_reindex_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """Listet die neuesten Reindex-Aufträge auf (nur für Admin)."""
+    return await run_in_threadpool(reindex_service.list_jobs, db, limit)
+
+
+@router.get("/{job_id}")
+async def get_reindex_job(
+    job_id: int,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Gibt Status und Fortschritt eines Reindex-Auftrags pro Tenant zurück (nur für Admin)."""
+    job = await run_in_threadpool(reindex_service.get_job, db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reindex-Auftrag nicht gefunden")
+    return job
+
+
+@router.post("/{job_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+async def resume_reindex_job(
+    job_id: int,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Setzt einen abgebrochenen, fehlgeschlagenen oder verwaisten Auftrag ab den
+    gespeicherten Checkpoints fort (nur für Admin).
+    """
+    try:
+        await reindex_service.start(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return await run_in_threadpool(reindex_service.get_job, db, job_id)
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_reindex_job(
+    job_id: int,
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Bricht einen Auftrag nach den laufenden Batches ab; er kann später fortgesetzt werden (nur für Admin)."""
+    if not await run_in_threadpool(reindex_service.cancel, db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Reindex-Auftrag nicht gefunden oder nicht aktiv"
+        )
+    return {"message": f"Reindex-Auftrag {job_id} wird abgebrochen"}
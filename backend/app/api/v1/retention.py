@@ -0,0 +1,41 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ...core.security import get_admin_api_key
+from ...db.session import get_db
+from ...services.retention_service import retention_service
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_retention_runs(
+    tenant_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    admin_api_key: str = Depends(get_admin_api_key),
+    db: Session = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """Listet die neuesten Aufbewahrungsläufe mit den gelöschten Objekten pro Tenant auf (nur für Admin)."""
+    return await run_in_threadpool(retention_service.list_runs, db, tenant_id, limit)
+
+
+@router.post("/run")
+async def run_retention(
+    tenant_id: Optional[str] = None,
+    admin_api_key: str = Depends(get_admin_api_key)
+) -> Dict[str, Any]:
+    """
+    Löscht abgelaufene strukturierte Daten sofort, für alle oder einen Tenant (nur für Admin).
+    Gibt die gelöschten Objekte pro Tenant und Datentyp zurück.
+    """
+    try:
+        reclaimed = await run_in_threadpool(retention_service.run_all, [tenant_id] if tenant_id else None)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {
+        "reclaimed": reclaimed,
+        "total": sum(sum(counts.values()) for counts in reclaimed.values())
+    }
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from ...core.security import get_admin_api_key
+from ...core.startup_profiler import startup_profiler
+from ...db.session import get_pool_stats
+from ...services.cache_bus import cache_bus
+from ...services.chat_log_service import chat_log_service
+from ...services.fulltext_search import fulltext_search_service
+from ...services.interactive.intent_detection import intent_detector
+from ...services.lexical_index import lexical_index_service
+from ...services.rate_limiter import rate_limiter
+from ...services.reindex_service import reindex_service
+from ...services.retention_service import retention_service
+from ...services.retrieval_cache import retrieval_cache
+from ...services.tenant_cache import tenant_cache
+from ...services.token_blacklist_service import token_blacklist_service
+from ...services.weaviate.circuit_breaker import weaviate_breaker
+from ...services.weaviate.schema_validator import schema_validator
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_system_stats(
+    admin_api_key: str = Depends(get_admin_api_key)
+) -> Dict[str, Any]:
+    """
+    Gibt Laufzeitmetriken dieses Worker-Prozesses zurück (nur für Admin):
+    Verbindungspools, Caches, Cache-Invalidierungsbus, Rate-Limiting, Chat-Protokollierung, Intent-Erkennung, Startzeiten, Weaviate-Validierung, Neuindizierung, Circuit Breaker, Rückfall-Cache der Suche und lexikalischer Index.
+    """
+    return {
+        "database_pools": get_pool_stats(),
+        "tenant_cache": tenant_cache.get_stats(),
+        "cache_bus": cache_bus.get_stats(),
+        "token_blacklist": token_blacklist_service.get_stats(),
+        "rate_limiter": rate_limiter.get_stats(),
+        "chat_log": chat_log_service.get_stats(),
+        "intent_detector": intent_detector.get_stats(),
+        "startup": startup_profiler.get_stats(),
+        "weaviate_validation": schema_validator.get_progress(),
+        "reindex": reindex_service.get_stats(),
+        "weaviate_breaker": weaviate_breaker.get_stats(),
+        "retrieval_cache": retrieval_cache.get_stats(),
+        "lexical_index": lexical_index_service.get_stats(),
+        "fulltext_search": fulltext_search_service.get_stats(),
+        "retention": retention_service.get_stats()
+    }
+
+
+@router.get("/ready")
+async def get_readiness() -> Dict[str, Any]:
+    """
+    Readiness-Prüfung (ohne Authentifizierung, z. B. für Load Balancer).
+    Der Prozess ist bereit, sobald er Anfragen annimmt; die Validierung der
+    Weaviate-Klassen läuft im Hintergrund und wird nur als Fortschritt gemeldet.
+    Auch bei offenem Circuit Breaker bleibt der Prozess bereit (Antworten aus dem Cache).
+    """
+    progress = schema_validator.get_progress()
+    return {
+        "status": "ready",
+        "weaviate_circuit": weaviate_breaker.state,
+        "weaviate_validation": {
+            key: progress[key] for key in ("state", "total", "processed", "progress", "failed")
+        }
+    }
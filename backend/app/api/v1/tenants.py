@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ...db.models import (
     Tenant, TenantCreate, TenantUpdate, 
@@ -11,7 +12,7 @@ from ...db.models import (
 from ...services.tenant_service import tenant_service
 from ...services.interactive.factory import interactive_factory
 from ...core.security import get_tenant_id_from_api_key, get_admin_api_key
-from ...db.session import get_db
+from ...db.session import get_async_db, get_db
 from ...core.config import settings
 
 router = APIRouter()
@@ -170,9 +171,9 @@ async def options_tenant():
 
 
 @router.get("/{tenant_id}/ui-components", response_model=UIComponentsConfig)
-def get_ui_components_config(
+async def get_ui_components_config(
     tenant_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_tenant_id: str = Depends(get_tenant_id_from_api_key)
 ):
     """
@@ -185,7 +186,7 @@ def get_ui_components_config(
             detail="Keine Berechtigung für diese Operation"
         )
     
-    config = tenant_service.get_ui_components_config(db, tenant_id)
+    config = await tenant_service.aget_ui_components_config(db, tenant_id)
     
     # Wenn keine Konfiguration gefunden, eine Standardkonfiguration zurückgeben
     if not config:
@@ -38,7 +38,7 @@ async def create_user(
         )
     
     try:
-        user = user_service.create_user(db, user_create, created_by_id=current_user.id)
+        user = await user_service.create_user(db, user_create, created_by_id=current_user.id)
         return user
     except ValueError as e:
         raise HTTPException(
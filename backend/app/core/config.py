@@ -29,6 +29,138 @@ class Settings(BaseSettings):
     # Weaviate
     WEAVIATE_URL: str = os.getenv("WEAVIATE_URL", "http://localhost:8080")
     WEAVIATE_API_KEY: Optional[str] = os.getenv("WEAVIATE_API_KEY")
+    # Validierung der Tenant-Klassen beim Start: im Hintergrund mit begrenzter
+    # Parallelität; fehlgeschlagene Tenants werden frühestens nach RETRY_SECONDS erneut geprüft
+    WEAVIATE_VALIDATION_CONCURRENCY: int = int(os.getenv("WEAVIATE_VALIDATION_CONCURRENCY", "4"))
+    WEAVIATE_VALIDATION_RETRY_SECONDS: float = float(os.getenv("WEAVIATE_VALIDATION_RETRY_SECONDS", "60"))
+    # Timeouts des Weaviate-Clients (Sekunden). Abfragen liegen im Chat-Pfad und
+    # sind daher kurz; Batch-Einfügungen laufen im Hintergrund.
+    WEAVIATE_QUERY_TIMEOUT: float = float(os.getenv("WEAVIATE_QUERY_TIMEOUT", "15"))
+    WEAVIATE_INSERT_TIMEOUT: float = float(os.getenv("WEAVIATE_INSERT_TIMEOUT", "180"))
+    # Circuit Breaker: öffnet, wenn im Fenster der letzten WINDOW Aufrufe (mindestens
+    # MIN_CALLS) der Anteil fehlgeschlagener Aufrufe FAILURE_RATE oder der Anteil der
+    # Abfragen über SLOW_MS SLOW_RATE erreicht. Nach OPEN_SECONDS wird eine Probe durchgelassen.
+    WEAVIATE_BREAKER_WINDOW: int = int(os.getenv("WEAVIATE_BREAKER_WINDOW", "20"))
+    WEAVIATE_BREAKER_MIN_CALLS: int = int(os.getenv("WEAVIATE_BREAKER_MIN_CALLS", "5"))
+    WEAVIATE_BREAKER_FAILURE_RATE: float = float(os.getenv("WEAVIATE_BREAKER_FAILURE_RATE", "0.5"))
+    WEAVIATE_BREAKER_SLOW_MS: float = float(os.getenv("WEAVIATE_BREAKER_SLOW_MS", "3000"))
+    WEAVIATE_BREAKER_SLOW_RATE: float = float(os.getenv("WEAVIATE_BREAKER_SLOW_RATE", "0.8"))
+    WEAVIATE_BREAKER_OPEN_SECONDS: float = float(os.getenv("WEAVIATE_BREAKER_OPEN_SECONDS", "30"))
+    # Zuletzt erfolgreiche Suchergebnisse als Rückfall bei offenem Circuit (Einträge, Gültigkeit in Sekunden)
+    RETRIEVAL_FALLBACK_CACHE_SIZE: int = int(os.getenv("RETRIEVAL_FALLBACK_CACHE_SIZE", "2000"))
+    RETRIEVAL_FALLBACK_TTL: float = float(os.getenv("RETRIEVAL_FALLBACK_TTL", "86400"))
+    # Lexikalischer BM25-Index pro Tenant im Arbeitsspeicher (höchstens MAX_TENANTS Indizes pro Prozess).
+    # Standardmäßig aus: Jeder Index hält die Texte aller Dokumente des Tenants in jedem Worker
+    LEXICAL_INDEX_ENABLED: bool = os.getenv("LEXICAL_INDEX_ENABLED", "False").lower() == "true"
+    LEXICAL_INDEX_MAX_TENANTS: int = int(os.getenv("LEXICAL_INDEX_MAX_TENANTS", "50"))
+    LEXICAL_INDEX_INCLUDE_STRUCTURED: bool = os.getenv("LEXICAL_INDEX_INCLUDE_STRUCTURED", "True").lower() == "true"
+    # Erste Stufe im Chat: Kurze Fragen (höchstens MAX_TERMS Suchbegriffe), deren bester lexikalischer
+    # Treffer mindestens MIN_COVERAGE der Begriffe enthält, werden ohne Weaviate beantwortet
+    LEXICAL_FIRST_STAGE: bool = os.getenv("LEXICAL_FIRST_STAGE", "False").lower() == "true"
+    LEXICAL_FIRST_STAGE_MAX_TERMS: int = int(os.getenv("LEXICAL_FIRST_STAGE_MAX_TERMS", "4"))
+    LEXICAL_FIRST_STAGE_MIN_COVERAGE: float = float(os.getenv("LEXICAL_FIRST_STAGE_MIN_COVERAGE", "1.0"))
+    # Retrieval-Backend für Tenants ohne eigene Einstellung (TenantModel.config["retrieval_backend"]):
+    # "weaviate" (Hybrid-Suche) oder "fulltext" (PostgreSQL-Volltextsuche für die Dokumente;
+    # strukturierte Daten liegen nur in Weaviate und fehlen, wenn es nicht erreichbar ist)
+    RETRIEVAL_BACKEND: str = os.getenv("RETRIEVAL_BACKEND", "weaviate")
+    # PostgreSQL-Volltextsuche als Rückfall, wenn Weaviate nicht erreichbar ist
+    FULLTEXT_FALLBACK_ENABLED: bool = os.getenv("FULLTEXT_FALLBACK_ENABLED", "True").lower() == "true"
+    # Veranstaltungen: Zeitzone der Datumsangaben und relativen Zeitangaben ("morgen", "am Wochenende")
+    # in Fragen; vergangene Veranstaltungen werden bei der Suche ausgeblendet
+    EVENT_TIMEZONE: str = os.getenv("EVENT_TIMEZONE", "Europe/Berlin")
+    EVENTS_EXCLUDE_PAST: bool = os.getenv("EVENTS_EXCLUDE_PAST", "True").lower() == "true"
+    # Aufbewahrung strukturierter Daten: "typ=tage" durch Kommas getrennt. Veranstaltungen werden
+    # so viele Tage nach ihrem Ende gelöscht, andere Typen so viele Tage nach dem letzten Import.
+    # Pro Tenant über config["retention"] überschreibbar ({"event": 7, "webpage": null})
+    RETENTION_ENABLED: bool = os.getenv("RETENTION_ENABLED", "True").lower() == "true"
+    RETENTION_POLICIES: str = os.getenv("RETENTION_POLICIES", "event=30")
+    RETENTION_INTERVAL_SECONDS: int = int(os.getenv("RETENTION_INTERVAL_SECONDS", "86400"))
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "200"))
+    # Durchsuchbare Kopien in der Tenant-Klasse löschen, deren strukturierter Datensatz fehlt
+    RETENTION_SWEEP_ORPHANS: bool = os.getenv("RETENTION_SWEEP_ORPHANS", "True").lower() == "true"
+    # Hintergrundjobs (Uploads, Massenlöschungen): Aufbewahrung ohne Änderung, Gültigkeit vorab
+    # angelegter, nicht gestarteter Jobs (Sekunden) und deren Höchstzahl pro Tenant
+    JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    JOB_PENDING_TTL_SECONDS: int = int(os.getenv("JOB_PENDING_TTL_SECONDS", "600"))
+    JOB_MAX_PENDING_PER_TENANT: int = int(os.getenv("JOB_MAX_PENDING_PER_TENANT", "20"))
+
+    # Clientseitige Embeddings (Vektoren werden im Backend berechnet und an Weaviate übergeben)
+    # Das Modell muss dem Modell des text2vec-transformers-Containers entsprechen,
+    # damit Abfrage- und Dokumentvektoren im selben Vektorraum liegen.
+    CLIENT_SIDE_EMBEDDING: bool = os.getenv("CLIENT_SIDE_EMBEDDING", "False").lower() == "true"
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/multi-qa-MiniLM-L6-cos-v1")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    VECTOR_CACHE_DIR: str = os.getenv(
+        "VECTOR_CACHE_DIR", os.path.join(os.getenv("DATA_DIR", "/app/data"), "vector_cache")
+    )
+
+    # Intent-Erkennung (Sentence-Transformer); das Modell wird bei der ersten Anfrage im
+    # Hintergrund geladen, mit INTENT_WARMUP bereits beim Start. Der Chat-Pfad nutzt die
+    # Intent-Erkennung derzeit nicht, daher ist das Vorladen standardmäßig aus.
+    # Gleichzeitige Anfragen werden bis zu INTENT_BATCH_WAIT_MS gesammelt und gemeinsam kodiert
+    INTENT_MODEL: str = os.getenv("INTENT_MODEL", "paraphrase-multilingual-mpnet-base-v2")
+    INTENT_WARMUP: bool = os.getenv("INTENT_WARMUP", "False").lower() == "true"
+    INTENT_CACHE_DIR: str = os.getenv(
+        "INTENT_CACHE_DIR", os.path.join(os.getenv("DATA_DIR", "/app/data"), "intent_cache")
+    )
+    INTENT_BATCH_SIZE: int = int(os.getenv("INTENT_BATCH_SIZE", "32"))
+    INTENT_BATCH_WAIT_MS: float = float(os.getenv("INTENT_BATCH_WAIT_MS", "5"))
+    INTENT_QUERY_CACHE_SIZE: int = int(os.getenv("INTENT_QUERY_CACHE_SIZE", "4096"))
+
+    # Outbox-Indexer für Dokumente (Postgres -> Weaviate)
+    INDEXER_ENABLED: bool = os.getenv("INDEXER_ENABLED", "True").lower() == "true"
+    INDEXER_BATCH_SIZE: int = int(os.getenv("INDEXER_BATCH_SIZE", "100"))
+    INDEXER_POLL_INTERVAL: float = float(os.getenv("INDEXER_POLL_INTERVAL", "2.0"))
+    INDEXER_MAX_ATTEMPTS: int = int(os.getenv("INDEXER_MAX_ATTEMPTS", "8"))
+
+    # Fortsetzbare Neuindizierung (Reindex-Aufträge)
+    REINDEX_BATCH_SIZE: int = int(os.getenv("REINDEX_BATCH_SIZE", "200"))
+    REINDEX_CONCURRENCY: int = int(os.getenv("REINDEX_CONCURRENCY", "4"))
+    # Ein Auftrag ohne Lebenszeichen seit dieser Zeit gilt als abgebrochen und kann fortgesetzt werden
+    REINDEX_LEASE_SECONDS: int = int(os.getenv("REINDEX_LEASE_SECONDS", "120"))
+    # Alte Collection nach der Blue/Green-Umschaltung behalten (z. B. für ein Zurückschalten)
+    REINDEX_KEEP_OLD_COLLECTION: bool = os.getenv("REINDEX_KEEP_OLD_COLLECTION", "False").lower() == "true"
+
+    # Prozessweiter Cache für Tenants (Auflösung per API-Key und ID)
+    TENANT_CACHE_TTL: float = float(os.getenv("TENANT_CACHE_TTL", "60"))
+    TENANT_CACHE_NEGATIVE_TTL: float = float(os.getenv("TENANT_CACHE_NEGATIVE_TTL", "5"))
+    TENANT_CACHE_MAX_ENTRIES: int = int(os.getenv("TENANT_CACHE_MAX_ENTRIES", "10000"))
+
+    # Cache-Invalidierung zwischen Worker-Prozessen (Postgres LISTEN/NOTIFY, sonst Polling)
+    CACHE_BUS_ENABLED: bool = os.getenv("CACHE_BUS_ENABLED", "True").lower() == "true"
+    CACHE_BUS_MODE: str = os.getenv("CACHE_BUS_MODE", "listen")  # listen oder poll
+    CACHE_BUS_POLL_INTERVAL: float = float(os.getenv("CACHE_BUS_POLL_INTERVAL", "2.0"))
+    CACHE_BUS_RETENTION_SECONDS: int = int(os.getenv("CACHE_BUS_RETENTION_SECONDS", "3600"))
+    # Collection-Zuordnung (Blue/Green-Reindex) unabhängig vom Bus neu laden (Sekunden)
+    COLLECTION_REGISTRY_RESYNC_SECONDS: float = float(os.getenv("COLLECTION_REGISTRY_RESYNC_SECONDS", "30"))
+
+    # Passwort-Hashing (bcrypt): Work-Factor, parallele Berechnungen und maximale Warteschlange
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Token-Blacklist im Speicher (Abgleich mit der Datenbank und Bereinigung in Sekunden)
+    TOKEN_BLACKLIST_REFRESH_INTERVAL: float = float(os.getenv("TOKEN_BLACKLIST_REFRESH_INTERVAL", "60"))
+    TOKEN_BLACKLIST_PRUNE_INTERVAL: float = float(os.getenv("TOKEN_BLACKLIST_PRUNE_INTERVAL", "3600"))
+
+    # Rate-Limiting der Chat- und Embed-Endpunkte (Token-Bucket pro API-Key und pro Client-IP);
+    # Tenants können die Limits in config["rate_limit"] überschreiben
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory oder postgres
+    RATE_LIMIT_REQUESTS_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", "120"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "40"))
+    RATE_LIMIT_CLIENT_REQUESTS_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_CLIENT_REQUESTS_PER_MINUTE", "20"))
+    RATE_LIMIT_CLIENT_BURST: int = int(os.getenv("RATE_LIMIT_CLIENT_BURST", "10"))
+    RATE_LIMIT_PATHS: str = os.getenv("RATE_LIMIT_PATHS", "/api/v1/chat,/api/v1/embed")
+    RATE_LIMIT_MAX_BUCKETS: int = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+    # Nur aktivieren, wenn ein vertrauenswürdiger Proxy X-Forwarded-For setzt
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"
+
+    # Chat-Protokollierung: Ringpuffer im Speicher, gebündeltes Schreiben im Hintergrund
+    CHAT_LOG_ENABLED: bool = os.getenv("CHAT_LOG_ENABLED", "True").lower() == "true"
+    CHAT_LOG_BUFFER_SIZE: int = int(os.getenv("CHAT_LOG_BUFFER_SIZE", "10000"))
+    CHAT_LOG_FLUSH_INTERVAL: float = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "2.0"))
+    CHAT_LOG_BATCH_SIZE: int = int(os.getenv("CHAT_LOG_BATCH_SIZE", "500"))
 
     # LLM Config
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -41,6 +173,13 @@ class Settings(BaseSettings):
     # Datenbank für Kundenverwaltung
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
 
+    # Verbindungspools (gelten jeweils für die synchrone und die asynchrone Engine)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
     # PostgreSQL Einstellungen
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
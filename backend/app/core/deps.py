@@ -7,7 +7,7 @@ from typing import Optional, List
 from .security import oauth2_scheme, JWT_SECRET_KEY, JWT_ALGORITHM, decode_token
 from ..db.session import get_db
 from ..models.user import User, UserRole
-from ..models.token import TokenBlacklist
+from ..services.token_blacklist_service import token_blacklist_service, token_identifier
 from ..services.user_service import user_service
 
 
@@ -36,19 +36,6 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
     
-    # Prüfen, ob das Token auf der Blacklist steht
-    blacklisted = db.query(TokenBlacklist).filter(TokenBlacklist.token == token).first()
-    if blacklisted:
-        if os.getenv("ENV", "dev") == "dev":
-            print("[get_current_user] DEV-MODUS: Token auf Blacklist, überspringe Authentifizierung")
-            return None
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token ist ungültig oder abgelaufen",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    
     try:
         payload = decode_token(token)
         user_id: str = payload.get("sub")
@@ -86,6 +73,18 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
     
+    # Prüfen, ob das Token auf der Blacklist steht (im Speicher, ohne Datenbankabfrage)
+    if token_blacklist_service.is_blacklisted(db, token_identifier(token, payload)):
+        if os.getenv("ENV", "dev") == "dev":
+            print("[get_current_user] DEV-MODUS: Token auf Blacklist, überspringe Authentifizierung")
+            return None
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token ist ungültig oder abgelaufen",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    
     user = user_service.get_user_by_id(db, user_id)
     if not user:
         if os.getenv("ENV", "dev") == "dev":
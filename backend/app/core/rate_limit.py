@@ -0,0 +1,162 @@
+"""
+ASGI-Middleware für das Rate-Limiting der öffentlichen Chat- und Embed-Endpunkte.
+
+Die Prüfung erfolgt vor dem Routing, also vor jedem Datenbankzugriff der
+Endpunkte und vor jedem LLM-Aufruf. Der Tenant wird aus dem Tenant-Cache
+gelesen; nur bei einem unbekannten API-Key wird er einmalig (asynchron)
+geladen und steht danach auch dem Endpunkt aus dem Cache zur Verfügung.
+Vor dieser Abfrage wird der Bucket des Clients für unbekannte Keys belastet;
+ist er leer, wird ohne Datenbankzugriff abgelehnt.
+
+Als reine ASGI-Middleware (statt BaseHTTPMiddleware) bleiben Streaming-
+Antworten unverändert und es entsteht kein zusätzlicher Task pro Anfrage.
+"""
+
+import asyncio
+import json
+import logging
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.models import Tenant
+from ..db.session import AsyncSessionLocal
+from ..services.rate_limiter import RateLimit, RateLimiter, RateLimitResult, rate_limiter
+from ..services.tenant_cache import tenant_cache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Header, die der Browser des Widgets lesen darf
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After"]
+
+
+async def _load_tenant_by_api_key(api_key: str) -> Optional[Tenant]:
+    """Lädt einen Tenant über den Tenant-Service (füllt dabei den Tenant-Cache)."""
+    from ..services.tenant_service import tenant_service
+
+    async with AsyncSessionLocal() as db:
+        return await tenant_service.aget_tenant_by_api_key(db, api_key)
+
+
+class RateLimitMiddleware:
+    """Begrenzt Anfragen mit API-Key pro Tenant und pro (Tenant, Client-IP)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter = rate_limiter,
+        paths: Optional[List[str]] = None,
+        trust_forwarded_for: bool = settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+    ):
+        self.app = app
+        self.limiter = limiter
+        if paths is None:
+            paths = [path.strip() for path in settings.RATE_LIMIT_PATHS.split(",") if path.strip()]
+        # Präfixe gelten nur bis zur Segmentgrenze (/api/v1/chat, aber nicht /api/v1/chat-logs)
+        self.paths = tuple(path.rstrip("/") for path in paths)
+        self._path_prefixes = tuple(f"{path}/" for path in self.paths)
+        self.trust_forwarded_for = trust_forwarded_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] == "OPTIONS"
+                or not self._applies_to(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        api_key = self._get_api_key(scope)
+        if not api_key:
+            # Ohne API-Key lehnt der Endpunkt die Anfrage ohnehin ab
+            await self.app(scope, receive, send)
+            return
+
+        result = await self._check(api_key, self._get_client_ip(scope))
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+        if not result.allowed:
+            await self._reject(send, result)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in result.headers()
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _applies_to(self, path: str) -> bool:
+        return path in self.paths or path.startswith(self._path_prefixes)
+
+    @staticmethod
+    def _get_api_key(scope: Scope) -> Optional[str]:
+        api_key = Headers(scope=scope).get("x-api-key")
+        if not api_key:
+            api_key = QueryParams(scope.get("query_string", b"")).get("api_key")
+        return api_key
+
+    def _get_client_ip(self, scope: Scope) -> str:
+        if self.trust_forwarded_for:
+            forwarded_for = Headers(scope=scope).get("x-forwarded-for")
+            if forwarded_for:
+                return forwarded_for.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _check(self, api_key: str, client_ip: str) -> Optional[RateLimitResult]:
+        found, tenant = tenant_cache.peek_api_key(api_key)
+        if not found:
+            # Nicht zwischengespeicherte Keys kosten eine Datenbankabfrage: zuerst den
+            # Bucket des Clients für unbekannte Keys belasten, damit zufällige Schlüssel
+            # die Datenbank nicht unbegrenzt abfragen können
+            _, unknown_limit = self.limiter.limits_for_tenant(None)
+            unknown_result = await self._consume([(f"client:unknown:{client_ip}", unknown_limit)])
+            if not unknown_result.allowed:
+                return unknown_result
+            try:
+                tenant = await _load_tenant_by_api_key(api_key)
+            except Exception as e:
+                logger.error(f"Tenant für Rate-Limiting konnte nicht geladen werden: {e}")
+                tenant = None
+            if tenant is None:
+                return unknown_result
+
+        limits = self.limiter.limits_for_tenant(tenant)
+        if limits is None:
+            return None
+        limit, client_limit = limits
+
+        if tenant is not None:
+            tenant_id = str(tenant.id)
+            keys: List[Tuple[str, RateLimit]] = [
+                (f"tenant:{tenant_id}", limit),
+                (f"client:{tenant_id}:{client_ip}", client_limit)
+            ]
+        else:
+            # Ungültige API-Keys werden nur pro Client begrenzt, damit zufällige
+            # Schlüssel keine neuen Buckets erzeugen
+            keys = [(f"client:unknown:{client_ip}", client_limit)]
+
+        return await self._consume(keys)
+
+    async def _consume(self, keys: List[Tuple[str, RateLimit]]) -> RateLimitResult:
+        if self.limiter.needs_io:
+            return await asyncio.to_thread(self.limiter.check, keys)
+        return self.limiter.check(keys)
+
+    @staticmethod
+    async def _reject(send: Send, result: RateLimitResult) -> None:
+        body = json.dumps({"detail": "Zu viele Anfragen. Bitte versuchen Sie es später erneut."}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1"))
+        ] + [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in result.headers()
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -1,13 +1,20 @@
 from fastapi import Depends, HTTPException, Security, status, Request
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from ..core.config import settings
-from ..db.session import get_db
+from ..db.session import get_async_db, get_db
+import asyncio
+import logging
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
 
 # Header für API-Key
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -15,8 +22,16 @@ API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 # OAuth2-Schema für JWT-Token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
-# Password-Hashing-Kontext
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password-Hashing-Kontext; Hashes mit abweichendem Work-Factor werden beim Login neu berechnet
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# Eigener, begrenzter Thread-Pool für bcrypt, damit Logins den Event-Loop nicht blockieren
+# und nicht alle Threads des Standard-Pools belegen
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="password-hash"
+)
+_password_tasks_in_flight = 0
 
 # JWT-Konfiguration
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "temporaerer_geheimer_schluessel")  # In der Produktion durch sichere Umgebungsvariable ersetzen
@@ -40,6 +55,42 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashingBusyError(Exception):
+    """Wird ausgelöst, wenn zu viele Passwort-Prüfungen auf den Thread-Pool warten."""
+
+
+async def _run_password_task(func, *args):
+    """
+    Führt eine bcrypt-Operation im Passwort-Thread-Pool aus.
+    Ist die Warteschlange voll, wird sofort abgelehnt statt den Rückstau zu vergrößern.
+    """
+    global _password_tasks_in_flight
+    if _password_tasks_in_flight >= settings.PASSWORD_HASH_CONCURRENCY + settings.PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHashingBusyError("Zu viele gleichzeitige Anmeldungen")
+    _password_tasks_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+    finally:
+        _password_tasks_in_flight -= 1
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Überprüft ein Passwort im Passwort-Thread-Pool.
+    Gibt zusätzlich einen neuen Hash zurück, wenn der gespeicherte Hash nicht dem
+    konfigurierten Work-Factor (BCRYPT_ROUNDS) entspricht, sonst None.
+    """
+    return await _run_password_task(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Erstellt einen Passwort-Hash im Passwort-Thread-Pool.
+    """
+    return await _run_password_task(pwd_context.hash, password)
+
+
 # JWT-Token-Funktionen
 def create_jwt_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -52,7 +103,8 @@ def create_jwt_token(data: Dict[str, Any], expires_delta: Optional[timedelta] =
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti: eindeutige Kennung, über die das Token auf die Blacklist gesetzt werden kann
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
@@ -124,151 +176,139 @@ async def get_current_user(
 
 
 # API-Key-Funktionen
+def _tenant_id_segment_from_path(request: Request) -> Optional[str]:
+    """Gibt die Tenant-ID aus einem Pfad der Form .../tenants/<id>/... zurück."""
+    path_parts = str(request.url.path).split('/')
+    for i, part in enumerate(path_parts):
+        if part == 'tenants' and i+1 < len(path_parts):
+            tenant_id_from_path = path_parts[i+1]
+            if tenant_id_from_path and tenant_id_from_path not in ("current", "ui-components-definitions"):
+                return tenant_id_from_path
+    return None
+
+
+def _remember_tenant(request: Request, tenant: Any) -> str:
+    """
+    Legt den aufgelösten Tenant im Request-State ab, damit Endpunkte und
+    Services ihn nicht erneut laden müssen, und gibt seine ID zurück.
+    """
+    request.state.tenant = tenant
+    return str(tenant.id)
+
+
+def _resolve_tenant_from_path(request: Request, db: Session) -> Optional[str]:
+    """Löst den Tenant aus dem Pfad auf, sofern er existiert."""
+    from ..services.tenant_service import tenant_service
+
+    tenant_id_from_path = _tenant_id_segment_from_path(request)
+    if not tenant_id_from_path:
+        return None
+    tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
+    if not tenant:
+        logger.debug(f"Tenant mit ID {tenant_id_from_path} aus dem Pfad existiert nicht")
+        return None
+    return _remember_tenant(request, tenant)
+
+
+def _resolve_first_tenant(request: Request, db: Session) -> Optional[str]:
+    """Verwendet den ersten verfügbaren Tenant (Admin-Key bzw. Entwicklungsmodus)."""
+    from ..services.tenant_service import tenant_service
+
+    tenants = tenant_service.get_all_tenants(db)
+    if not tenants:
+        return None
+    logger.debug(f"Verwende ersten Tenant: {tenants[0].id}")
+    return _remember_tenant(request, tenants[0])
+
+
+def get_request_tenant(request: Request, db: Session, tenant_id: str) -> Any:
+    """
+    Gibt den von den API-Key-Abhängigkeiten aufgelösten Tenant zurück und
+    lädt ihn nur dann (über den Tenant-Cache), wenn er im Request fehlt.
+    """
+    from ..services.tenant_service import tenant_service
+
+    tenant = getattr(request.state, "tenant", None)
+    if tenant is not None and str(tenant.id) == str(tenant_id):
+        return tenant
+    return tenant_service.get_tenant_by_id(db, tenant_id)
+
+
 async def get_tenant_id_from_api_key(
     request: Request,
     api_key_header: Optional[str] = Security(API_KEY_HEADER),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db)
 ) -> str:
     """
     Überprüft den API-Key und gibt die entsprechende Tenant-ID zurück.
     Prüft zuerst den Header, dann den Query-Parameter.
+    Der aufgelöste Tenant wird in request.state.tenant abgelegt.
     Wirft eine HTTPException, wenn der API-Key ungültig ist.
     """
     # Import innerhalb der Funktion, um zirkuläre Importe zu vermeiden
     from ..services.tenant_service import tenant_service
     
     try:
-        # DEBUG-Informationen drucken
-        print(f"[get_tenant_id_from_api_key] Request-Methode: {request.method}")
-        print(f"[get_tenant_id_from_api_key] Request-URL: {request.url}")
-        print(f"[get_tenant_id_from_api_key] API-Key-Header: {api_key_header}")
-        print(f"[get_tenant_id_from_api_key] ENV: {settings.ENV}")
-        
-        # Zuerst Header-API-Key prüfen
-        api_key = api_key_header
-        
-        # Wenn kein Header-API-Key, dann Query-Parameter prüfen
-        if not api_key:
-            api_key = request.query_params.get("api_key")
-            print(f"[get_tenant_id_from_api_key] API-Key aus Query: {api_key}")
+        # Zuerst Header-API-Key prüfen, dann Query-Parameter
+        api_key = api_key_header or request.query_params.get("api_key")
         
-        # Direkte Überprüfung auf Admin-API-Key - wichtig, um den Admin-API-Key zu erkennen, bevor tenant_service.verify_api_key aufgerufen wird
+        # Direkte Überprüfung auf Admin-API-Key - wichtig, um den Admin-API-Key zu erkennen, bevor der Tenant-Lookup erfolgt
         if api_key and api_key == settings.ADMIN_API_KEY:
-            print(f"[get_tenant_id_from_api_key] Admin-API-Key erkannt: {api_key == settings.ADMIN_API_KEY}")
-            
-            # Extrahiere tenant_id aus dem Pfad für Admin-API-Key
-            path_parts = str(request.url.path).split('/')
-            for i, part in enumerate(path_parts):
-                if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                    tenant_id_from_path = path_parts[i+1]
-                    if tenant_id_from_path and tenant_id_from_path != "current" and tenant_id_from_path != "ui-components-definitions":
-                        # Prüfen, ob dieser Tenant existiert
-                        tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                        if tenant:
-                            print(f"[get_tenant_id_from_api_key] Admin-API-Key verwendet für Tenant-ID {tenant_id_from_path}")
-                            return tenant_id_from_path
-                        else:
-                            print(f"[get_tenant_id_from_api_key] Tenant mit ID {tenant_id_from_path} existiert nicht")
-            
-            # Wenn keine Tenant-ID im Pfad gefunden, verwenden wir einen Standard-Tenant
-            # oder den ersten verfügbaren Tenant aus der Datenbank
-            tenants = tenant_service.get_all_tenants(db)
-            if tenants and len(tenants) > 0:
-                print(f"[get_tenant_id_from_api_key] Admin-API-Key: Verwende ersten Tenant: {tenants[0].id}")
-                return tenants[0].id
+            # Tenant-ID aus dem Pfad, sonst den ersten verfügbaren Tenant verwenden
+            tenant_id = _resolve_tenant_from_path(request, db) or _resolve_first_tenant(request, db)
+            if tenant_id:
+                logger.debug(f"Admin-API-Key verwendet für Tenant-ID {tenant_id}")
+                return tenant_id
             
-            print(f"[get_tenant_id_from_api_key] WARNUNG: Keine Tenants in der Datenbank gefunden!")
+            logger.warning("Admin-API-Key: Keine Tenants in der Datenbank gefunden")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Keine Tenants verfügbar"
             )
 
-        # Fallback für Entwicklungsumgebung - extrahiere tenant_id aus dem Pfad
+        # Fallback für Entwicklungsumgebung - Tenant-ID aus dem Pfad
         if settings.ENV == "dev":
-            print(f"[get_tenant_id_from_api_key] ENTWICKLUNGSMODUS: Tenant-ID aus Pfad extrahieren")
-            # Extrahiere tenant_id aus dem Pfad
-            path_parts = str(request.url.path).split('/')
-            for i, part in enumerate(path_parts):
-                if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                    tenant_id_from_path = path_parts[i+1]
-                    print(f"[get_tenant_id_from_api_key] ENTWICKLUNGSMODUS - Tenant-ID aus Pfad: {tenant_id_from_path}")
-                    if tenant_id_from_path and tenant_id_from_path != "current" and tenant_id_from_path != "ui-components-definitions":
-                        # Prüfen, ob dieser Tenant existiert
-                        tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                        if tenant:
-                            print(f"[get_tenant_id_from_api_key] Development-Bypass: Verwende Tenant-ID {tenant_id_from_path}")
-                            return tenant_id_from_path
-                        else:
-                            print(f"[get_tenant_id_from_api_key] Tenant mit ID {tenant_id_from_path} existiert nicht in der Datenbank")
+            tenant_id = _resolve_tenant_from_path(request, db)
+            if tenant_id:
+                logger.debug(f"Development-Bypass: Verwende Tenant-ID {tenant_id}")
+                return tenant_id
         
         if not api_key:
-            print("[get_tenant_id_from_api_key] Kein API-Key gefunden.")
-            # Im Entwicklungsmodus, einen Dummy-Tenant verwenden
+            # Im Entwicklungsmodus den ersten Tenant verwenden
             if settings.ENV == "dev":
-                print("[get_tenant_id_from_api_key] DEV-MODE: Dummy-Tenant für Entwicklung verwenden")
-                
-                # Extrahiere tenant_id aus dem Pfad
-                path_parts = str(request.url.path).split('/')
-                for i, part in enumerate(path_parts):
-                    if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                        tenant_id_from_path = path_parts[i+1]
-                        if tenant_id_from_path and tenant_id_from_path != "current" and tenant_id_from_path != "ui-components-definitions":
-                            tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                            if tenant:
-                                print(f"[get_tenant_id_from_api_key] DEV-MODE: Verwendung von Tenant-ID {tenant_id_from_path} ohne API-Key")
-                                return tenant_id_from_path
-                
-                # Wenn keine Tenant-ID im Pfad oder die Tenant-ID existiert nicht, verwenden wir alle Tenants
-                tenants = tenant_service.get_all_tenants(db)
-                if tenants and len(tenants) > 0:
-                    print(f"[get_tenant_id_from_api_key] DEV-MODE: Verwende ersten Tenant: {tenants[0].id}")
-                    return tenants[0].id
+                tenant_id = _resolve_first_tenant(request, db)
+                if tenant_id:
+                    logger.debug(f"DEV-MODE: Verwende Tenant-ID {tenant_id} ohne API-Key")
+                    return tenant_id
             
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="API-Key nicht angegeben"
             )
         
-        # Verifizieren des API-Keys über den tenant_service
-        tenant_id = tenant_service.verify_api_key(db, api_key)
-        print(f"[get_tenant_id_from_api_key] Verifizierter Tenant: {tenant_id}")
+        # Verifizieren des API-Keys über den (gecachten) tenant_service
+        tenant = await tenant_service.aget_tenant_by_api_key(async_db, api_key)
         
-        if not tenant_id:
-            print("[get_tenant_id_from_api_key] Ungültiger API-Key.")
-            # Im Entwicklungsmodus, einen Dummy-Tenant verwenden
+        if not tenant:
+            # Im Entwicklungsmodus den ersten Tenant verwenden
             if settings.ENV == "dev":
-                print("[get_tenant_id_from_api_key] DEV-MODE: Dummy-Tenant für Entwicklung verwenden")
-                
-                # Extrahiere tenant_id aus dem Pfad
-                path_parts = str(request.url.path).split('/')
-                for i, part in enumerate(path_parts):
-                    if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                        tenant_id_from_path = path_parts[i+1]
-                        if tenant_id_from_path and tenant_id_from_path != "current" and tenant_id_from_path != "ui-components-definitions":
-                            tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                            if tenant:
-                                print(f"[get_tenant_id_from_api_key] DEV-MODE: Verwendung von Tenant-ID {tenant_id_from_path} trotz ungültigem API-Key")
-                                return tenant_id_from_path
-                
-                # Wenn keine Tenant-ID im Pfad oder die Tenant-ID existiert nicht, verwenden wir alle Tenants
-                tenants = tenant_service.get_all_tenants(db)
-                if tenants and len(tenants) > 0:
-                    print(f"[get_tenant_id_from_api_key] DEV-MODE: Verwende ersten Tenant: {tenants[0].id}")
-                    return tenants[0].id
+                tenant_id = _resolve_first_tenant(request, db)
+                if tenant_id:
+                    logger.debug(f"DEV-MODE: Verwende Tenant-ID {tenant_id} trotz ungültigem API-Key")
+                    return tenant_id
             
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Ungültiger API-Key"
             )
-        return tenant_id
+        return _remember_tenant(request, tenant)
     except HTTPException as he:
         # HTTPException direkt weiterleiten
         raise he
     except Exception as e:
         error_msg = f"Unerwarteter Fehler bei der API-Key-Authentifizierung: {str(e)}"
-        print(f"[get_tenant_id_from_api_key] FEHLER: {error_msg}")
-        import traceback
-        print(f"[get_tenant_id_from_api_key] Stacktrace: {traceback.format_exc()}")
+        logger.error(error_msg, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=error_msg
@@ -279,74 +319,46 @@ async def get_tenant_id_from_api_key(
 async def get_tenant_id_from_query(
     request: Request,
     api_key_header: Optional[str] = Security(API_KEY_HEADER),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db)
 ) -> Optional[str]:
     """
     Überprüft den API-Key aus einem Query-Parameter und gibt die entsprechende Tenant-ID zurück.
+    Der aufgelöste Tenant wird in request.state.tenant abgelegt.
     Gibt None zurück, wenn kein API-Key angegeben wurde oder der API-Key ungültig ist.
     """
     # Import innerhalb der Funktion, um zirkuläre Importe zu vermeiden
     from ..services.tenant_service import tenant_service
     
     try:
-        print(f"[get_tenant_id_from_query] API-Key-Header: {api_key_header}")
+        # Tenant-ID aus dem Pfad hat Vorrang
+        tenant_id = _resolve_tenant_from_path(request, db)
+        if tenant_id:
+            logger.debug(f"Verwende Tenant-ID {tenant_id} aus dem Pfad")
+            return tenant_id
         
-        # Extrahiere tenant_id aus dem Pfad
-        path_parts = str(request.url.path).split('/')
-        for i, part in enumerate(path_parts):
-            if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                tenant_id_from_path = path_parts[i+1]
-                print(f"[get_tenant_id_from_query] ENTWICKLUNGSMODUS - Tenant-ID aus Pfad: {tenant_id_from_path}")
-                if tenant_id_from_path and tenant_id_from_path != "current" and tenant_id_from_path != "ui-components-definitions":
-                    # Prüfen, ob dieser Tenant existiert
-                    tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                    if tenant:
-                        print(f"[get_tenant_id_from_query] Development-Bypass: Verwende Tenant-ID {tenant_id_from_path}")
-                        return tenant_id_from_path
-        
-        # Zuerst den API-Key aus dem Header verwenden
-        api_key = api_key_header
+        # Zuerst den API-Key aus dem Header verwenden, dann aus Query-Parametern
+        api_key = api_key_header or request.query_params.get("api_key")
         
-        # Wenn kein Header-API-Key, dann aus Query-Parametern holen
         if not api_key:
-            api_key = request.query_params.get("api_key")
-            print(f"[get_tenant_id_from_query] API-Key aus Query: {api_key}")
-        
-        if not api_key:
-            print("[get_tenant_id_from_query] Kein API-Key gefunden.")
+            logger.debug("Kein API-Key gefunden")
             return None
         
-        # Direkter Check auf Admin-API-Key
+        # Direkter Check auf Admin-API-Key: ersten verfügbaren Tenant verwenden
         if api_key == settings.ADMIN_API_KEY:
-            print("[get_tenant_id_from_query] Admin-API-Key erkannt")
-            
-            # Extrahiere tenant_id aus dem Pfad für Admin-API-Key
-            path_parts = str(request.url.path).split('/')
-            for i, part in enumerate(path_parts):
-                if part == 'tenants' and i+1 < len(path_parts) and path_parts[i+1] != 'current':
-                    tenant_id_from_path = path_parts[i+1]
-                    if tenant_id_from_path and tenant_id_from_path != "current":
-                        # Prüfen, ob dieser Tenant existiert
-                        tenant = tenant_service.get_tenant_by_id(db, tenant_id_from_path)
-                        if tenant:
-                            print(f"[get_tenant_id_from_query] Admin-API-Key verwendet für Tenant-ID {tenant_id_from_path}")
-                            return tenant_id_from_path
-            
-            # Wenn keine Tenant-ID im Pfad, ersten verfügbaren Tenant verwenden
-            tenants = tenant_service.get_all_tenants(db)
-            if tenants and len(tenants) > 0:
-                print(f"[get_tenant_id_from_query] Admin-API-Key: Verwende ersten Tenant: {tenants[0].id}")
-                return tenants[0].id
+            tenant_id = _resolve_first_tenant(request, db)
+            if tenant_id:
+                return tenant_id
         
-        # Reguläre API-Key-Verifizierung
-        tenant_id = tenant_service.verify_api_key(db, api_key)
-        print(f"[get_tenant_id_from_query] Verifizierter Tenant: {tenant_id}")
-        return tenant_id
+        # Reguläre API-Key-Verifizierung über den (gecachten) tenant_service
+        tenant = await tenant_service.aget_tenant_by_api_key(async_db, api_key)
+        if not tenant:
+            logger.debug("Ungültiger API-Key")
+            return None
+        return _remember_tenant(request, tenant)
         
     except Exception as e:
-        import traceback
-        print(f"[get_tenant_id_from_query] Fehler: {str(e)}")
-        print(f"[get_tenant_id_from_query] Stacktrace: {traceback.format_exc()}")
+        logger.error(f"Fehler bei der API-Key-Authentifizierung: {str(e)}", exc_info=True)
         return None
 
 
@@ -0,0 +1,147 @@
+"""
+Messung der Startzeit des API-Prozesses.
+
+Zwei Teile:
+
+- StartupProfiler misst im laufenden Prozess die Dauer der Start-Schritte
+  (Importe von app.main, Startup-Events, Hintergrund-Aufgaben wie die
+  Weaviate-Validierung) und stellt sie über /api/v1/system/stats bereit.
+- profile_imports() startet einen frischen Interpreter mit `-X importtime`
+  und liefert die Importzeit pro Modul. scripts/profile_startup.py nutzt das,
+  um Regressionen (z. B. ein wieder eingeschleppter pandas-Import) in der CI
+  sichtbar zu machen.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Schwere Abhängigkeiten, die der Chat-Pfad nicht braucht und die erst bei
+# Bedarf geladen werden; der Import von app.main darf sie nicht laden
+LAZY_MODULES = ["pandas", "sklearn", "sentence_transformers", "openai", "numpy"]
+
+
+class StartupProfiler:
+    """Sammelt die Dauer der Start-Schritte dieses Worker-Prozesses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._steps: List[Dict[str, Any]] = []
+        self._running: Dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str, background: bool = False) -> Iterator[None]:
+        """
+        Misst einen Start-Schritt; Fehler werden vermerkt und weitergereicht.
+
+        :param name: Name des Schritts
+        :param background: True, wenn der Schritt nicht auf dem kritischen Pfad liegt
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._running[name] = started
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._running.pop(name, None)
+                self._steps.append({
+                    "name": name,
+                    "duration_ms": round(duration_ms, 1),
+                    "background": background,
+                    "status": status
+                })
+            logger.info(f"Start-Schritt '{name}' in {duration_ms:.0f} ms ({status})")
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Vermerkt einen bereits gemessenen Schritt (z. B. die Importe von app.main)."""
+        with self._lock:
+            self._steps.append({
+                "name": name,
+                "duration_ms": round(duration_ms, 1),
+                "background": False,
+                "status": "ok"
+            })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt die gemessenen Schritte, die Summe des kritischen Pfads und laufende Schritte zurück."""
+        now = time.perf_counter()
+        with self._lock:
+            steps = list(self._steps)
+            running = {name: round((now - started) * 1000, 1) for name, started in self._running.items()}
+        return {
+            "critical_path_ms": round(sum(s["duration_ms"] for s in steps if not s["background"]), 1),
+            "steps": steps,
+            "running": running
+        }
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Wertet die Ausgabe von `python -X importtime` aus.
+
+    :return: Liste mit module, self_us, cumulative_us und depth (Verschachtelung)
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # Kopfzeile "self [us] | cumulative | imported package"
+            continue
+        name = parts[2].rstrip()
+        module = name.lstrip()
+        entries.append({
+            "module": module,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(module)) // 2
+        })
+    return entries
+
+
+def profile_imports(module: str = "app.main", cwd: Optional[str] = None, timeout: float = 120.0) -> List[Dict[str, Any]]:
+    """
+    Importiert ein Modul in einem frischen Interpreter und misst die Importzeit pro Modul.
+
+    :param module: Zu importierendes Modul
+    :param cwd: Arbeitsverzeichnis (Standard: Backend-Verzeichnis)
+    :param timeout: Maximale Laufzeit in Sekunden
+    :return: Einträge wie bei parse_importtime
+    """
+    backend_dir = cwd or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "profiling")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def top_level_import_times(entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Summiert die Importzeit (Mikrosekunden) pro Top-Level-Paket."""
+    totals: Dict[str, int] = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + entry["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+# Singleton-Instanz
+startup_profiler = StartupProfiler()
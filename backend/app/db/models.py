@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Literal, Union
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer, Boolean, Text
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer, BigInteger, Boolean, Text, Index, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from pydantic.types import UUID4
@@ -64,9 +64,232 @@ class DocumentModel(Base):
     source = Column(String, nullable=True)
     doc_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 des normalisierten Inhalts
+    simhash = Column(BigInteger, nullable=True)  # Für die Beinahe-Duplikaterkennung (immer gespeichert)
+    # Die Spalte search_vector (tsvector, von PostgreSQL gepflegt, GIN-Index) wird bewusst nicht
+    # gemappt, damit sie nicht mit jedem Dokument geladen wird; siehe services/fulltext_search.py
     
     # Beziehungen
     tenant = relationship("TenantModel", back_populates="documents")
+    
+    # Index für die Keyset-Pagination pro Tenant (neueste zuerst)
+    __table_args__ = (
+        Index("ix_documents_tenant_created_id", "tenant_id", "created_at", "id"),
+        Index("ix_documents_tenant_content_hash", "tenant_id", "content_hash"),
+        # Lesen in ID-Reihenfolge pro Tenant (Checkpoints der Neuindizierung)
+        Index("ix_documents_tenant_id_id", "tenant_id", "id"),
+    )
+
+class DocumentIndexTaskModel(Base):
+    """
+    Outbox-Eintrag für die Indizierung eines Dokuments in Weaviate.
+    Wird in derselben Transaktion wie das Dokument geschrieben und vom
+    DocumentIndexer asynchron abgearbeitet.
+    """
+    __tablename__ = "document_index_tasks"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    document_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False, default="upsert")  # upsert oder delete
+    status = Column(String, nullable=False, default="pending")  # pending oder failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class CacheInvalidationEventModel(Base):
+    """
+    Ereignis des Cache-Invalidierungsbusses. Alle Worker wenden die Ereignisse
+    auf ihre prozesslokalen Caches an (per LISTEN/NOTIFY oder Polling).
+    """
+    __tablename__ = "cache_invalidation_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = Column(String, nullable=False)
+    tenant_id = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    origin = Column(String, nullable=True)  # Prozess, der das Ereignis veröffentlicht hat
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class RateLimitBucketModel(Base):
+    """
+    Token-Bucket des gemeinsamen Rate-Limit-Backends. Wird nur verwendet, wenn
+    mehrere Worker sich die Limits teilen (RATE_LIMIT_BACKEND=postgres); in
+    Postgres wird die Tabelle als UNLOGGED angelegt.
+    """
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # Unix-Zeitstempel der letzten Anfrage
+    allowed = Column(Boolean, nullable=False, default=True)  # Ergebnis der letzten Anfrage
+
+class ChatLogModel(Base):
+    """
+    Protokoll einer Chat-Anfrage (Frage, Antwort, Latenzen, Tokens).
+    In Postgres ist die Tabelle nach created_at monatlich partitioniert,
+    daher gehört created_at zum Primärschlüssel.
+    """
+    __tablename__ = "chat_logs"
+    __table_args__ = (
+        Index("ix_chat_logs_tenant_created", "tenant_id", "created_at"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    tenant_id = Column(String, nullable=False)
+    session_id = Column(String, nullable=True)
+    channel = Column(String, nullable=False, default="completion")  # completion, stream, embed
+    query = Column(Text, nullable=False)
+    response = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="ok")  # ok oder error
+    unanswered = Column(Boolean, nullable=False, default=False)  # Fehler oder "keine Informationen"
+    error = Column(Text, nullable=True)
+    client_info = Column(String, nullable=True)  # User-Agent
+    model = Column(String, nullable=True)
+    # Latenzen in Millisekunden
+    latency_ms = Column(Integer, nullable=True)  # Gesamtdauer bis zur letzten Antwort
+    first_token_ms = Column(Integer, nullable=True)  # Dauer bis zum ersten Chunk (Streaming)
+    retrieval_ms = Column(Integer, nullable=True)  # Vektor- und Strukturdatensuche
+    llm_ms = Column(Integer, nullable=True)  # LLM-Aufruf
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+
+class ChatLogRollupModel(Base):
+    """
+    Voraggregierte Chat-Kennzahlen pro Tenant und Zeitfenster (Stunde/Tag, UTC).
+    Wird beim Schreiben der Chat-Protokolle inkrementell fortgeschrieben.
+    Die latency_le_*-Spalten bilden ein Histogramm der Gesamtlatenz
+    (Anzahl der Anfragen bis zur jeweiligen Grenze in ms, ab der vorherigen).
+    """
+    __tablename__ = "chat_log_rollups"
+    __table_args__ = (
+        Index("ix_chat_log_rollups_granularity_bucket", "granularity", "bucket_start"),
+    )
+    
+    tenant_id = Column(String, primary_key=True)
+    granularity = Column(String, primary_key=True)  # hour oder day
+    bucket_start = Column(DateTime, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    unanswered_count = Column(Integer, nullable=False, default=0)
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(BigInteger, nullable=False, default=0)
+    latency_max_ms = Column(Integer, nullable=False, default=0)
+    first_token_count = Column(Integer, nullable=False, default=0)
+    first_token_sum_ms = Column(BigInteger, nullable=False, default=0)
+    traced_count = Column(Integer, nullable=False, default=0)  # Anfragen mit Retrieval-/LLM-Messung
+    retrieval_sum_ms = Column(BigInteger, nullable=False, default=0)
+    llm_sum_ms = Column(BigInteger, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    latency_le_250 = Column(Integer, nullable=False, default=0)
+    latency_le_500 = Column(Integer, nullable=False, default=0)
+    latency_le_1000 = Column(Integer, nullable=False, default=0)
+    latency_le_2000 = Column(Integer, nullable=False, default=0)
+    latency_le_5000 = Column(Integer, nullable=False, default=0)
+    latency_le_10000 = Column(Integer, nullable=False, default=0)
+    latency_le_inf = Column(Integer, nullable=False, default=0)
+
+class ChatQueryRollupModel(Base):
+    """
+    Häufigkeit normalisierter Fragen pro Tenant und Tag (UTC), für die
+    Auswertung der häufigsten bzw. unbeantworteten Fragen.
+    """
+    __tablename__ = "chat_query_rollups"
+    
+    tenant_id = Column(String, primary_key=True)
+    day = Column(DateTime, primary_key=True)
+    query_hash = Column(String, primary_key=True)  # MD5 der normalisierten Frage
+    query = Column(Text, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    unanswered_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime, nullable=False)
+
+class TenantCollectionModel(Base):
+    """
+    Aktive Weaviate-Collection eines Tenants (Blue/Green-Umschaltung bei der
+    Neuindizierung). Ohne Eintrag gilt der Standardname aus
+    SchemaManager.get_base_class_name. Solange pending_collection gesetzt ist,
+    werden Änderungen in beide Collections geschrieben.
+    """
+    __tablename__ = "tenant_collections"
+    
+    tenant_id = Column(String, primary_key=True)
+    active_collection = Column(String, nullable=False)
+    pending_collection = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+class ReindexJobModel(Base):
+    """Auftrag zur Neuindizierung eines oder mehrerer Tenants in Weaviate."""
+    __tablename__ = "reindex_jobs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed, cancelled
+    blue_green = Column(Boolean, nullable=False, default=True)  # in neue Collection schreiben und umschalten
+    batch_size = Column(Integer, nullable=False)
+    concurrency = Column(Integer, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Lebenszeichen des ausführenden Prozesses
+
+class ReindexJobTenantModel(Base):
+    """
+    Fortschritt eines Tenants innerhalb eines Reindex-Auftrags. last_document_id
+    ist der Checkpoint: Dokumente werden in ID-Reihenfolge gelesen, nach einem
+    Abbruch wird ab dieser ID fortgesetzt.
+    """
+    __tablename__ = "reindex_job_tenants"
+    
+    job_id = Column(Integer, ForeignKey("reindex_jobs.id", ondelete="CASCADE"), primary_key=True)
+    tenant_id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    target_collection = Column(String, nullable=True)
+    # Bei Blue/Green die vor der Neuindizierung aktive Collection (wird nach der Umschaltung gelöscht)
+    previous_collection = Column(String, nullable=True)
+    last_document_id = Column(String, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+class BackgroundJobModel(Base):
+    """
+    Status und Fortschritt eines Hintergrundjobs (JSON-Upload, Massenlöschung),
+    abrufbar aus jedem Worker. progress enthält die Zähler der jeweiligen Jobart.
+    """
+    __tablename__ = "background_jobs"
+    
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    tenant_id = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, default="running")  # pending, running, completed, failed
+    progress = Column(JSON, nullable=False, default=dict)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class StructuredRetentionRunModel(Base):
+    """
+    Ergebnis eines Aufbewahrungslaufs für einen Tenant: gelöschte strukturierte
+    Datensätze pro Datentyp (reclaimed, z. B. {"event": 12, "orphans": 3}).
+    """
+    __tablename__ = "structured_retention_runs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    reclaimed = Column(JSON, nullable=False, default=dict)
+    total = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    # Vom Zeitplan gestartet (nicht manuell); nur diese Läufe bestimmen, wann der nächste fällig ist
+    scheduled = Column(Boolean, nullable=False, default=False)
 
 class InteractiveConfigModel(Base):
     __tablename__ = "interactive_configs"
@@ -136,6 +359,8 @@ class TenantUpdate(BaseModel):
     user_message_text_color: Optional[str] = None
     # Renderer-Typ für tenant-spezifische Darstellung
     renderer_type: Optional[str] = None
+    # Weitere Einstellungen (z. B. xml_url, rate_limit)
+    config: Optional[Dict[str, Any]] = None
 
 
 class Tenant(TenantBase):
@@ -145,6 +370,7 @@ class Tenant(TenantBase):
     created_at: datetime
     updated_at: datetime
     renderer_type: str = "default"  # Mögliche Werte: 'default', 'brandenburg', etc.
+    config: Optional[Dict[str, Any]] = None
     
     class Config:
         from_attributes = True
@@ -178,10 +404,18 @@ class Document(DocumentBase):
         populate_by_name = True
 
 
+class DocumentCreated(Document):
+    """Antwort beim Anlegen eines Dokuments; duplicate nennt ggf. die Art des erkannten Duplikats."""
+    duplicate: Optional[Literal["exact", "near"]] = None
+
+
 class SearchQuery(BaseModel):
     """Modell für Suchanfragen."""
     query: str
     limit: Optional[int] = 5
+    # hybrid: Weaviate (Vektor + Schlüsselwörter); lexical: BM25-Index im Arbeitsspeicher;
+    # fulltext: PostgreSQL-Volltextsuche
+    mode: Literal["hybrid", "lexical", "fulltext"] = "hybrid"
 
 
 class ChatMessage(BaseModel):
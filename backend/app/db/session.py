@@ -1,17 +1,222 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+"""
+Datenbank-Engines und Sessions.
+
+- Synchron (psycopg2): Engine `engine`, Sessions über `SessionLocal` bzw. die
+  Dependency `get_db`. Außerhalb von Requests `session_scope()` verwenden,
+  damit jede Session wieder geschlossen wird.
+- Asynchron (asyncpg): Engine über `get_async_engine()`, Sessions über die
+  Dependency `get_async_db`. Für die häufigen Lesezugriffe (Tenant-Auflösung,
+  UI-Konfiguration, Dokumentlisten), damit diese keinen Thread belegen.
+
+Beide Pools sind über DB_POOL_* konfigurierbar und zählen Checkouts und
+Wartezeiten (siehe get_pool_stats()).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
 from ..core.config import settings
 
+
+class PoolMetrics:
+    """Zähler für Checkouts und Wartezeiten eines Verbindungspools."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "connects": self.connects,
+                "invalidations": self.invalidations
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Misst, wie lange ein Checkout auf eine freie Verbindung wartet."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+# Die Metriken hängen an der Klasse, da engine.dispose() den Pool neu erzeugt
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = PoolMetrics("sync")
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics("async")
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+
+def _track_connections(target_engine, metrics: PoolMetrics) -> None:
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(target_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+
+def to_async_database_url(url: str) -> str:
+    """
+    Wandelt eine synchrone Datenbank-URL in die URL des passenden Async-Treibers um
+    (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite).
+    asyncpg kennt den Parameter sslmode nicht; er wird in ssl übersetzt.
+    """
+    scheme, _, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver in ("postgres", "postgresql"):
+        parts = urlsplit(f"postgresql+asyncpg://{rest}")
+        query = [
+            ("ssl", value) if key == "sslmode" else (key, value)
+            for key, value in parse_qsl(parts.query)
+        ]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
 # Datenbankverbindung erstellen
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool, **_pool_options())
+    _track_connections(engine, InstrumentedQueuePool.metrics)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async-Engine wird erst bei der ersten Verwendung erstellt
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Gibt die Async-Engine zurück und erstellt sie beim ersten Aufruf."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                url = to_async_database_url(SQLALCHEMY_DATABASE_URL)
+                if url.startswith("sqlite"):
+                    async_engine = create_async_engine(url)
+                else:
+                    async_engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **_pool_options())
+                    _track_connections(async_engine.sync_engine, InstrumentedAsyncQueuePool.metrics)
+                _async_session_factory = async_sessionmaker(
+                    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+                )
+                _async_engine = async_engine
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Erstellt eine neue AsyncSession (analog zu SessionLocal)."""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def dispose_async_engine() -> None:
+    """Schließt alle Verbindungen der Async-Engine, falls sie erstellt wurde."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
 # Dependency für FastAPI
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+# Async-Dependency für FastAPI; die Verbindung wird erst bei der ersten Abfrage belegt
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Session für Code außerhalb von Requests; wird am Ende immer geschlossen."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _pool_status(pool, metrics: Optional[PoolMetrics]) -> Dict[str, Any]:
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow()
+        })
+    if metrics is not None and isinstance(pool, _InstrumentedPoolMixin):
+        status.update(metrics.as_dict())
+    return status
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Gibt Auslastung und Wartezeiten der Verbindungspools zurück."""
+    stats = {"sync": _pool_status(engine.pool, InstrumentedQueuePool.metrics)}
+    if _async_engine is not None:
+        stats["async"] = _pool_status(_async_engine.sync_engine.pool, InstrumentedAsyncQueuePool.metrics)
+    return stats
@@ -1,4 +1,11 @@
+import asyncio
 import logging
+import time
+from typing import Set
+
+# Beginn der Importe (für den Start-Profiler)
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -7,22 +14,41 @@ from sqlalchemy import text
 # Importiere den API-Router direkt aus dem v1-Modul
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.startup_profiler import startup_profiler
+from app.core.rate_limit import RATE_LIMIT_HEADERS, RateLimitMiddleware
 from app.utils.init_superuser import create_initial_superuser
-from app.db.session import SessionLocal, engine
+from app.db.session import SessionLocal, dispose_async_engine, engine
 from app.services.weaviate.schema_manager import SchemaManager
-from app.services.weaviate.health_manager import HealthManager
+from app.services.weaviate.schema_validator import schema_validator
 from app.services.weaviate.client import close_client
+from app.services.document_indexer import document_indexer
+from app.services.cache_bus import cache_bus
+from app.services.token_blacklist_service import token_blacklist_service
+from app.services.chat_log_service import chat_log_service
+from app.services.reindex_service import reindex_service
+from app.services.retention_service import retention_service
+from app.services.interactive.intent_detection import intent_detector
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+startup_profiler.record("import app.main", (time.perf_counter() - _import_started) * 1000)
+
+# Laufende Start-Aufgaben im Hintergrund (Referenzen, damit sie nicht eingesammelt werden)
+_background_startup_tasks: Set[asyncio.Task] = set()
+
 # FastAPI-App initialisieren
 app = FastAPI(
     title=settings.PROJECT_NAME, 
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Rate-Limiting für Chat und Embed; wird vor CORS registriert, damit auch
+# abgelehnte Anfragen (429) die CORS-Header erhalten
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS-Middleware für Cross-Origin-Anfragen
 # In der Produktionsumgebung sollten die Ursprünge eingeschränkt werden
 app.add_middleware(
@@ -31,37 +57,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"] + RATE_LIMIT_HEADERS,
 )
 
 # API-Router für Version 1 einbinden
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Startup-Event zur Validierung der Weaviate-Klassen
+# Beginn der Startup-Events (erstes registriertes Event)
 @app.on_event("startup")
-async def validate_weaviate_classes():
+async def begin_startup_profile():
+    """Merkt sich den Beginn der Startup-Events für den Start-Profiler."""
+    app.state.startup_started = time.perf_counter()
+
+def _create_standard_schema():
     """
-    Überprüft und validiert alle Weaviate-Klassen beim Anwendungsstart.
+    Erstellt das Standard-Schema, falls nicht vorhanden (blockierend, läuft im Hintergrund).
+    Die Tenant-Klassen prüft der schema_validator parallel bzw. beim ersten Zugriff.
     """
     try:
-        logger.info("Validiere Weaviate-Klassen beim Anwendungsstart...")
-        # Standard-Schema erstellen, falls nicht vorhanden
-        try:
-            SchemaManager.create_standard_schema()
-            # Tenant-Klassen validieren
-            health_manager = HealthManager()
-            checked, repaired = health_manager.validate_all_tenant_classes()
-            logger.info(f"Weaviate-Klassen validiert: {checked} überprüft, {repaired} repariert")
-        except Exception as schema_error:
-            logger.warning(f"Weaviate-Schema-Erstellung/-Validierung fehlgeschlagen: {schema_error}")
-            logger.warning("Weaviate-Funktionalität könnte eingeschränkt sein, aber die App wird trotzdem gestartet.")
-    except Exception as e:
-        logger.error(f"Fehler bei der Validierung des Weaviate-Schemas: {str(e)}")
-        logger.warning("Die Anwendung wird trotz Fehler bei der Schema-Validierung gestartet.")
+        logger.info("Prüfe Weaviate-Standard-Schema beim Anwendungsstart...")
+        SchemaManager.create_standard_schema()
+    except Exception as schema_error:
+        logger.warning(f"Weaviate-Schema-Erstellung fehlgeschlagen: {schema_error}")
+        logger.warning("Weaviate-Funktionalität könnte eingeschränkt sein, aber die App wird trotzdem gestartet.")
 
-# Startup-Event zur Erstellung des Superusers
-@app.on_event("startup")
-async def create_first_superuser():
-    """Erstellt einen Superuser beim Start der Anwendung, falls noch keiner existiert."""
+def _create_first_superuser():
+    """Erstellt einen Superuser, falls noch keiner existiert (blockierend, läuft im Hintergrund)."""
     try:
         logger.info("Überprüfe, ob ein Admin-Benutzer existiert...")
         db = SessionLocal()
@@ -80,6 +101,92 @@ async def create_first_superuser():
     except Exception as e:
         logger.error(f"Fehler bei der Erstellung des Superusers: {e}")
 
+def _warm_llm_client():
+    """Importiert das openai-Paket und erstellt den Client, bevor die erste Chat-Anfrage kommt."""
+    from app.services.llm_service import llm_service
+    llm_service.client
+
+def _run_in_background(name: str, func) -> None:
+    """Führt einen blockierenden Start-Schritt in einem Thread aus, ohne den Start zu verzögern."""
+    async def run():
+        try:
+            with startup_profiler.step(name, background=True):
+                await asyncio.to_thread(func)
+        except Exception as e:
+            logger.error(f"Start-Schritt '{name}' fehlgeschlagen: {e}")
+    
+    task = asyncio.create_task(run(), name=f"startup-{name}")
+    _background_startup_tasks.add(task)
+    task.add_done_callback(_background_startup_tasks.discard)
+
+# Startup-Event für Aufgaben außerhalb des kritischen Pfads: Der Prozess nimmt
+# Anfragen an, während Weaviate validiert und der Superuser angelegt wird
+@app.on_event("startup")
+async def start_background_startup_tasks():
+    """Startet Weaviate-Validierung, Superuser-Erstellung und das Vorladen des LLM-Clients im Hintergrund."""
+    _run_in_background("weaviate_standard_schema", _create_standard_schema)
+    schema_validator.start()
+    _run_in_background("initial_superuser", _create_first_superuser)
+    _run_in_background("llm_client", _warm_llm_client)
+
+# Startup-Event für den Outbox-Indexer der Dokumente
+@app.on_event("startup")
+async def start_document_indexer():
+    """Startet den Hintergrund-Indexer, der neue Dokumente nach Weaviate schreibt."""
+    if settings.INDEXER_ENABLED:
+        document_indexer.start()
+    else:
+        logger.info("Dokument-Indexer ist deaktiviert (INDEXER_ENABLED=false)")
+
+# Startup-Event für die Cache-Invalidierung zwischen Worker-Prozessen
+@app.on_event("startup")
+async def start_cache_bus():
+    """Startet den Listener, der Cache-Änderungen anderer Worker übernimmt."""
+    if settings.CACHE_BUS_ENABLED:
+        cache_bus.start()
+    else:
+        logger.info("Cache-Invalidierungsbus ist deaktiviert (CACHE_BUS_ENABLED=false)")
+
+# Startup-Event für die Token-Blacklist
+@app.on_event("startup")
+async def start_token_blacklist():
+    """Lädt die Token-Blacklist in den Speicher und startet den regelmäßigen Abgleich."""
+    token_blacklist_service.start()
+
+# Startup-Event für die Chat-Protokollierung
+@app.on_event("startup")
+async def start_chat_log_service():
+    """Startet den Hintergrund-Task, der Chat-Protokolle gebündelt speichert."""
+    if settings.CHAT_LOG_ENABLED:
+        chat_log_service.start()
+    else:
+        logger.info("Chat-Protokollierung ist deaktiviert (CHAT_LOG_ENABLED=false)")
+
+# Startup-Event für die Aufbewahrung strukturierter Daten
+@app.on_event("startup")
+async def start_retention_service():
+    """Startet die regelmäßige Löschung abgelaufener Veranstaltungen und veralteter strukturierter Daten."""
+    if settings.RETENTION_ENABLED:
+        retention_service.start()
+    else:
+        logger.info("Aufbewahrung strukturierter Daten ist deaktiviert (RETENTION_ENABLED=false)")
+
+# Startup-Event für die Intent-Erkennung
+@app.on_event("startup")
+async def start_intent_detector():
+    """Lädt das Intent-Modell im Hintergrund; bis dahin gilt die Keyword-Erkennung."""
+    if settings.INTENT_WARMUP:
+        intent_detector.start()
+    else:
+        logger.info("Intent-Modell wird erst bei Bedarf geladen (INTENT_WARMUP=false)")
+
+# Ende der Startup-Events (letztes registriertes Event)
+@app.on_event("startup")
+async def finish_startup_profile():
+    """Vermerkt die Dauer der Startup-Events; Hintergrund-Aufgaben laufen weiter."""
+    startup_profiler.record("startup events", (time.perf_counter() - app.state.startup_started) * 1000)
+    logger.info(f"Start abgeschlossen, kritischer Pfad: {startup_profiler.get_stats()['critical_path_ms']:.0f} ms")
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """
@@ -88,6 +195,54 @@ async def shutdown_event():
     """
     logger.info("Anwendung wird heruntergefahren, Ressourcen werden freigegeben...")
     
+    # Stoppe Dokument-Indexer
+    try:
+        await document_indexer.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen des Dokument-Indexers: {str(e)}")
+    
+    # Stoppe Validierung der Weaviate-Klassen
+    try:
+        await schema_validator.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen der Weaviate-Validierung: {str(e)}")
+    
+    # Breche laufende Neuindizierungen ab (fortsetzbar ab dem letzten Checkpoint)
+    try:
+        await reindex_service.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen der Neuindizierung: {str(e)}")
+    
+    # Stoppe Aufbewahrung strukturierter Daten
+    try:
+        await retention_service.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen der Aufbewahrung: {str(e)}")
+    
+    # Schreibe verbleibende Chat-Protokolle
+    try:
+        await chat_log_service.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen der Chat-Protokollierung: {str(e)}")
+    
+    # Stoppe Intent-Erkennung
+    try:
+        intent_detector.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen der Intent-Erkennung: {str(e)}")
+    
+    # Stoppe Abgleich der Token-Blacklist
+    try:
+        await token_blacklist_service.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen des Token-Blacklist-Abgleichs: {str(e)}")
+    
+    # Stoppe Cache-Invalidierungsbus
+    try:
+        cache_bus.stop()
+    except Exception as e:
+        logger.error(f"Fehler beim Stoppen des Cache-Invalidierungsbusses: {str(e)}")
+    
     # Schließe Weaviate-Client
     try:
         close_client()
@@ -99,7 +254,8 @@ async def shutdown_event():
         if engine:
             logger.info("Schließe Datenbankverbindungen...")
             engine.dispose()
-            logger.info("Datenbankverbindungen erfolgreich geschlossen")
+        await dispose_async_engine()
+        logger.info("Datenbankverbindungen erfolgreich geschlossen")
     except Exception as e:
         logger.error(f"Fehler beim Schließen der Datenbankverbindungen: {str(e)}")
     
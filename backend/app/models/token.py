@@ -12,8 +12,10 @@ class TokenBlacklist(Base):
     __tablename__ = "token_blacklist"
 
     id = Column(String(36), primary_key=True, index=True, default=lambda: str(uuid4()))
-    token = Column(String(255), unique=True, index=True, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    # Vollständiges Token nur bei Altdaten; neue Einträge speichern nur die Kennung (jti)
+    token = Column(String(255), unique=True, index=True, nullable=True)
+    jti = Column(String(64), unique=True, index=True, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
     blacklisted_at = Column(DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from app.models.weaviate_status import IndexStatus
 
@@ -24,8 +24,36 @@ class Document(DocumentBase):
         from_attributes = True
         populate_by_name = True
 
+class DocumentListItem(BaseModel):
+    """Schema für Einträge der Dokumentenliste; nicht über fields angeforderte Felder fehlen"""
+    id: str
+    tenant_id: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    source: Optional[str] = None
+    doc_metadata: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
 class WeaviateStatus(BaseModel):
     """Schema für den Weaviate-Status eines Dokuments"""
     status: IndexStatus
     lastUpdated: Optional[str] = None
-    error: Optional[str] = None  # Fehlerinformationen, falls vorhanden 
\ No newline at end of file
+    error: Optional[str] = None  # Fehlerinformationen, falls vorhanden 
+
+class BulkDeleteRequest(BaseModel):
+    """Schema für das Löschen mehrerer Dokumente anhand von Filtern"""
+    ids: Optional[List[str]] = None
+    source: Optional[str] = None
+    metadata_key: Optional[str] = None
+    metadata_value: Optional[str] = None  # Nur zusammen mit metadata_key
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    dry_run: bool = False  # Nur zählen, nichts löschen
+
+
+class ReindexJobCreate(BaseModel):
+    """Schema für das Anlegen eines Reindex-Auftrags"""
+    tenant_ids: Optional[List[str]] = None  # None = alle Tenants
+    blue_green: bool = True  # In neue Collection schreiben und am Ende umschalten
+    batch_size: Optional[int] = Field(None, ge=1, le=1000)
+    concurrency: Optional[int] = Field(None, ge=1, le=32)
@@ -4,17 +4,14 @@ from datetime import datetime, timedelta
 from pydantic import EmailStr
 import secrets
 import string
-from uuid import uuid4
 
 from ..models.user import User
-from ..models.token import TokenBlacklist
+from .token_blacklist_service import token_blacklist_service, token_identifier
 from ..core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    get_password_hash,
-    verify_password,
-    REFRESH_TOKEN_EXPIRE_DAYS
+    get_password_hash_async
 )
 from .user_service import user_service
 
@@ -24,13 +21,13 @@ class AuthService:
     Service-Klasse für die Authentifizierung und Token-Verwaltung
     """
 
-    def authenticate(
+    async def authenticate(
         self, db: Session, username: str, password: str
     ) -> Optional[Tuple[User, str, str]]:
         """
         Authentifiziert einen Benutzer und gibt den Benutzer sowie Access- und Refresh-Tokens zurück
         """
-        user = user_service.authenticate_user(db, username, password)
+        user = await user_service.authenticate_user(db, username, password)
         if not user:
             return None
         
@@ -58,8 +55,7 @@ class AuthService:
                 return None
             
             # Prüfen, ob das Token auf der Blacklist steht
-            blacklisted = db.query(TokenBlacklist).filter(TokenBlacklist.token == refresh_token).first()
-            if blacklisted:
+            if token_blacklist_service.is_blacklisted(db, token_identifier(refresh_token, payload)):
                 return None
             
             # Benutzer in der Datenbank suchen
@@ -72,39 +68,24 @@ class AuthService:
             new_refresh_token = create_refresh_token(user.id)
             
             # Altes Refresh-Token auf die Blacklist setzen
-            self.blacklist_token(db, refresh_token, payload.get("exp"))
+            token_blacklist_service.revoke(db, refresh_token, payload)
             
             return new_access_token, new_refresh_token
         
         except Exception:
             return None
     
-    def blacklist_token(
-        self, db: Session, token: str, expires_at: Optional[datetime] = None
-    ) -> TokenBlacklist:
+    def blacklist_token(self, db: Session, token: str) -> str:
         """
-        Setzt ein Token auf die Blacklist
+        Setzt ein Token auf die Blacklist und gibt seine Kennung (jti) zurück
         """
-        if expires_at is None:
-            try:
-                payload = decode_token(token)
-                expires_at = datetime.fromtimestamp(payload.get("exp"))
-            except Exception:
-                # Wenn das Token nicht decodiert werden kann, setzen wir ein Ablaufdatum in der Zukunft
-                expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-        
-        token_blacklist = TokenBlacklist(
-            id=str(uuid4()),
-            token=token,
-            expires_at=expires_at,
-            blacklisted_at=datetime.utcnow()
-        )
-        
-        db.add(token_blacklist)
-        db.commit()
-        db.refresh(token_blacklist)
+        try:
+            payload = decode_token(token)
+        except Exception:
+            # Wenn das Token nicht decodiert werden kann, gilt die Standard-Ablaufzeit eines Refresh-Tokens
+            payload = None
         
-        return token_blacklist
+        return token_blacklist_service.revoke(db, token, payload)
     
     def logout(self, db: Session, token: str) -> bool:
         """
@@ -135,7 +116,7 @@ class AuthService:
         
         return reset_token
     
-    def reset_password(
+    async def reset_password(
         self, db: Session, reset_token: str, new_password: str
     ) -> Optional[User]:
         """
@@ -151,7 +132,7 @@ class AuthService:
             return None
         
         # Passwort aktualisieren
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
         user.password_reset_token = None
         user.password_reset_expires = None
         db.commit()
@@ -0,0 +1,163 @@
+"""
+Service für das Löschen mehrerer Dokumente anhand von Filtern.
+
+Die Dokumente werden mit einem einzigen DELETE in Postgres entfernt; in
+derselben Transaktion werden Lösch-Aufgaben in der Outbox angelegt. Danach
+werden die Objekte gebündelt per delete_many aus Weaviate gelöscht. Schlägt
+das fehl, übernimmt der Dokument-Indexer die verbliebenen Aufgaben, sodass
+beide Speicher konsistent bleiben. Der Fortschritt steht wie bei Uploads in
+der Jobtabelle (job_service) und ist damit in jedem Worker abrufbar.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..db.models import DocumentIndexTaskModel, DocumentModel
+from ..db.session import SessionLocal
+from ..schemas.document import BulkDeleteRequest
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .job_service import job_service
+from .weaviate_service import weaviate_service
+
+logger = logging.getLogger(__name__)
+
+# Anzahl der IDs pro delete_many-Aufruf in Weaviate
+WEAVIATE_DELETE_BATCH_SIZE = 500
+
+
+class BulkDeleteService:
+    """Löscht Dokumente eines Tenants anhand von Filtern in Postgres und Weaviate."""
+
+    @staticmethod
+    def build_conditions(tenant_id: str, request: BulkDeleteRequest) -> List[ColumnElement]:
+        """
+        Übersetzt die Filter in SQL-Bedingungen.
+
+        :raises ValueError: wenn kein Filter angegeben ist oder die Filter widersprüchlich sind
+        """
+        if request.metadata_value is not None and not request.metadata_key:
+            raise ValueError("metadata_value ist nur zusammen mit metadata_key zulässig")
+        if request.source is not None and not request.source.strip():
+            raise ValueError("source darf nicht leer sein")
+        if request.created_from is not None and request.created_to is not None \
+                and request.created_from >= request.created_to:
+            raise ValueError("created_from muss vor created_to liegen")
+
+        conditions: List[ColumnElement] = []
+        if request.ids is not None:
+            conditions.append(DocumentModel.id.in_(request.ids))
+        if request.source is not None:
+            conditions.append(DocumentModel.source == request.source)
+        if request.metadata_key:
+            value = DocumentModel.doc_metadata[request.metadata_key].as_string()
+            if request.metadata_value is not None:
+                conditions.append(value == request.metadata_value)
+            else:
+                conditions.append(value.isnot(None))
+        if request.created_from is not None:
+            conditions.append(DocumentModel.created_at >= request.created_from)
+        if request.created_to is not None:
+            conditions.append(DocumentModel.created_at < request.created_to)
+
+        if not conditions:
+            raise ValueError("Mindestens ein Filter (ids, source, metadata_key, created_from, created_to) ist erforderlich")
+
+        return [DocumentModel.tenant_id == tenant_id, *conditions]
+
+    def count_matching(self, db: Session, tenant_id: str, request: BulkDeleteRequest) -> int:
+        """Zählt die Dokumente, die von den Filtern erfasst würden."""
+        conditions = self.build_conditions(tenant_id, request)
+        return db.query(DocumentModel.id).filter(*conditions).count()
+
+    def delete_from_database(self, db: Session, tenant_id: str, request: BulkDeleteRequest) -> List[str]:
+        """
+        Löscht die passenden Dokumente mit einem DELETE und legt in derselben
+        Transaktion die Lösch-Aufgaben für Weaviate an.
+
+        :return: IDs der gelöschten Dokumente
+        """
+        conditions = self.build_conditions(tenant_id, request)
+        deleted_ids = [
+            row[0] for row in db.execute(
+                delete(DocumentModel).where(*conditions).returning(DocumentModel.id)
+            )
+        ]
+        if deleted_ids:
+            db.execute(insert(DocumentIndexTaskModel), [
+                {"tenant_id": tenant_id, "document_id": doc_id, "operation": "delete"}
+                for doc_id in deleted_ids
+            ])
+        db.commit()
+        return deleted_ids
+
+    def run_job(self, job_id: str, tenant_id: str, request: BulkDeleteRequest) -> None:
+        """Führt eine Massenlöschung aus und meldet den Fortschritt im job_service."""
+        db = SessionLocal()
+        try:
+            deleted_ids = self.delete_from_database(db, tenant_id, request)
+            job_service.update_job(job_id, deleted_database=len(deleted_ids), total=len(deleted_ids))
+            logger.info(f"Massenlöschung {job_id}: {len(deleted_ids)} Dokumente aus der Datenbank gelöscht")
+
+            deleted_weaviate = 0
+            completed_ids: List[str] = []
+            for start in range(0, len(deleted_ids), WEAVIATE_DELETE_BATCH_SIZE):
+                batch = deleted_ids[start:start + WEAVIATE_DELETE_BATCH_SIZE]
+                try:
+                    deleted_weaviate += weaviate_service.delete_documents(tenant_id, batch)
+                    completed_ids.extend(batch)
+                except Exception as e:
+                    # Die Outbox-Aufgaben bleiben bestehen, der Indexer versucht es erneut
+                    logger.warning(f"Massenlöschung {job_id}: Weaviate-Batch fehlgeschlagen, Indexer übernimmt: {e}")
+                job_service.update_job(
+                    job_id,
+                    processed=min(start + WEAVIATE_DELETE_BATCH_SIZE, len(deleted_ids)),
+                    deleted_weaviate=deleted_weaviate
+                )
+
+            # Erledigte Lösch-Aufgaben aus der Outbox entfernen
+            for start in range(0, len(completed_ids), WEAVIATE_DELETE_BATCH_SIZE):
+                batch = completed_ids[start:start + WEAVIATE_DELETE_BATCH_SIZE]
+                db.execute(delete(DocumentIndexTaskModel).where(
+                    DocumentIndexTaskModel.tenant_id == tenant_id,
+                    DocumentIndexTaskModel.operation == "delete",
+                    DocumentIndexTaskModel.document_id.in_(batch)
+                ))
+            db.commit()
+
+            if deleted_ids:
+                # Bei großen Löschungen ohne ID-Liste melden: die Wissensbasis gilt als komplett geändert
+                if len(deleted_ids) <= WEAVIATE_DELETE_BATCH_SIZE:
+                    cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id, operation="delete", document_ids=deleted_ids)
+                else:
+                    cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id, operation="delete")
+
+            job_service.finish_job(
+                job_id,
+                deleted_weaviate=deleted_weaviate,
+                pending_weaviate=len(deleted_ids) - len(completed_ids)
+            )
+        except Exception as e:
+            db.rollback()
+            job_service.fail_job(job_id, str(e))
+        finally:
+            db.close()
+
+    def start_job(self, tenant_id: str, request: BulkDeleteRequest) -> str:
+        """Legt einen Job für die Massenlöschung an (Datenbankzugriff); ausgeführt wird er über run_job."""
+        return job_service.create_job(
+            "bulk_delete",
+            tenant_id,
+            filters=request.model_dump(exclude_none=True, mode="json"),
+            total=None,
+            processed=0,
+            deleted_database=0,
+            deleted_weaviate=0
+        )
+
+
+# Singleton-Instanz
+bulk_delete_service = BulkDeleteService()
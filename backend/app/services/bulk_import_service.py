@@ -0,0 +1,339 @@
+"""
+Service für den Massenimport von Dokumenten.
+
+Große Dateien werden in Blöcken gelesen, die Dokumente pro Block gebündelt
+per Bulk-INSERT in Postgres geschrieben und zusammen mit ihren Index-Aufgaben
+committet. Die Indizierung in Weaviate übernimmt der Dokument-Indexer in Batches.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..db.models import DocumentIndexTaskModel, DocumentModel
+from ..utils.json_stream import JSONStreamParser
+from .dedup_service import DuplicateFilter
+from .job_service import job_service
+
+logger = logging.getLogger(__name__)
+
+# Anzahl der Zeilen pro Block beim Einlesen und Schreiben
+DEFAULT_CHUNK_SIZE = 2000
+
+# Maximale Anzahl an Dokumenten, die in der Antwort einzeln aufgeführt werden
+DOCUMENTS_PREVIEW_LIMIT = 1000
+
+
+class BulkImportError(Exception):
+    """
+    Abbruch eines Massenimports. Die bis dahin geschriebenen Blöcke sind
+    committet und bleiben erhalten; stats enthält die Zähler bis zum Abbruch.
+    """
+
+    def __init__(self, message: str, stats: Dict[str, Any], invalid_input: bool = False):
+        super().__init__(message)
+        self.stats = stats
+        # Ungültige Eingabe (fehlende Spalten, fehlerhaftes CSV/JSON) statt interner Fehler
+        self.invalid_input = invalid_input
+
+
+class BulkImportResult:
+    """Sammelt Zähler und Laufzeit eines Massenimports."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.imported = 0
+        self.skipped = 0
+        self.duplicates: List[Dict[str, str]] = []
+        self.duplicate_count = 0
+        self.chunks = 0
+        self.bytes_received = 0
+        self.documents: List[Dict[str, str]] = []
+
+    def add_documents(self, rows: List[Dict[str, Any]]) -> None:
+        self.imported += len(rows)
+        self.chunks += 1
+        free = DOCUMENTS_PREVIEW_LIMIT - len(self.documents)
+        if free > 0:
+            self.documents.extend({"id": row["id"], "title": row["title"]} for row in rows[:free])
+
+    def add_duplicates(self, duplicates: List[Dict[str, str]]) -> None:
+        self.duplicate_count += len(duplicates)
+        free = DOCUMENTS_PREVIEW_LIMIT - len(self.duplicates)
+        if free > 0:
+            self.duplicates.extend(duplicates[:free])
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = time.perf_counter() - self.started_at
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "duplicates_skipped": self.duplicate_count,
+            "chunks": self.chunks,
+            "bytes_received": self.bytes_received,
+            "duration_seconds": round(duration, 3),
+            "rows_per_second": round(self.imported / duration, 1) if duration > 0 else 0.0,
+            "documents": self.documents,
+            "duplicates": self.duplicates
+        }
+
+
+class BulkImportService:
+    """Importiert Dokumente blockweise in Postgres und die Indizierungs-Outbox."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def write_chunk(db: Session, tenant_id: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Schreibt einen Block von Dokumenten samt Index-Aufgaben in einer Transaktion.
+
+        :param rows: Dicts mit title, content, source und doc_metadata
+        """
+        if not rows:
+            return
+
+        now = datetime.utcnow()
+        for row in rows:
+            row.setdefault("id", str(uuid.uuid4()))
+            row["tenant_id"] = tenant_id
+            row["created_at"] = now
+
+        # executemany-Form: SQLAlchemy bündelt die Zeilen zu mehrzeiligen INSERTs (insertmanyvalues)
+        db.execute(insert(DocumentModel), rows)
+        db.execute(insert(DocumentIndexTaskModel), [
+            {
+                "tenant_id": tenant_id,
+                "document_id": row["id"],
+                "operation": "upsert",
+                "status": "pending",
+                "attempts": 0,
+                "created_at": now,
+                "available_at": now
+            }
+            for row in rows
+        ])
+        db.commit()
+
+    def write_unique(
+        self,
+        db: Session,
+        tenant_id: str,
+        rows: List[Dict[str, Any]],
+        duplicate_filter: DuplicateFilter,
+        result: BulkImportResult
+    ) -> None:
+        """Filtert Duplikate aus einem Block und schreibt die übrigen Dokumente."""
+        rows, duplicates = duplicate_filter.filter_rows(rows)
+        result.add_duplicates(duplicates)
+        if rows:
+            self.write_chunk(db, tenant_id, rows)
+            result.add_documents(rows)
+
+    def import_csv(
+        self,
+        db: Session,
+        tenant_id: str,
+        file: BinaryIO,
+        title_column: str,
+        content_column: str,
+        source_column: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Importiert eine CSV-Datei blockweise.
+
+        Alle Spalten außer Titel, Inhalt und Quelle werden spaltenweise in die
+        Metadaten übernommen, leere Zellen werden dabei ausgelassen.
+
+        :raises BulkImportError: wenn Titel- oder Inhaltsspalte fehlen oder der Import
+            abbricht; enthält die Anzahl der bereits importierten Zeilen
+        """
+        result = BulkImportResult()
+        try:
+            self._import_csv_chunks(db, tenant_id, file, title_column, content_column, source_column, result)
+        except Exception as e:
+            db.rollback()
+            stats = result.to_dict()
+            logger.error(
+                f"CSV-Import für Tenant {tenant_id} abgebrochen, {stats['imported']} Zeilen "
+                f"wurden bereits importiert: {e}"
+            )
+            # pandas.errors.ParserError ist ein ValueError
+            raise BulkImportError(str(e), stats, invalid_input=isinstance(e, ValueError)) from e
+
+        stats = result.to_dict()
+        logger.info(
+            f"CSV-Import für Tenant {tenant_id} abgeschlossen: {stats['imported']} Zeilen "
+            f"in {stats['duration_seconds']}s ({stats['rows_per_second']} Zeilen/s)"
+        )
+        return stats
+
+    def _import_csv_chunks(
+        self,
+        db: Session,
+        tenant_id: str,
+        file: BinaryIO,
+        title_column: str,
+        content_column: str,
+        source_column: Optional[str],
+        result: BulkImportResult
+    ) -> None:
+        """Liest die CSV-Datei blockweise und schreibt jeden Block in einer eigenen Transaktion."""
+        import pandas as pd
+
+        duplicate_filter = DuplicateFilter.for_tenant(db, tenant_id)
+        reader = pd.read_csv(file, chunksize=self.chunk_size)
+
+        for chunk in reader:
+            if title_column not in chunk.columns or content_column not in chunk.columns:
+                raise ValueError(
+                    f"CSV muss die Spalten '{title_column}' und '{content_column}' enthalten"
+                )
+
+            # Zeilen ohne Titel oder Inhalt überspringen
+            valid = chunk[title_column].notna() & chunk[content_column].notna()
+            result.skipped += int((~valid).sum())
+            chunk = chunk[valid]
+            if chunk.empty:
+                continue
+
+            titles = chunk[title_column].astype(str).tolist()
+            contents = chunk[content_column].astype(str).tolist()
+            if source_column and source_column in chunk.columns:
+                sources = chunk[source_column].astype(object).where(chunk[source_column].notna(), None).tolist()
+            else:
+                sources = [None] * len(chunk)
+
+            # Metadaten spaltenweise aufbauen, NaN-Werte entfernen
+            meta_columns = [c for c in chunk.columns if c not in (title_column, content_column, source_column)]
+            if meta_columns:
+                meta_frame = chunk[meta_columns].astype(object)
+                meta_frame = meta_frame.where(meta_frame.notna(), None)
+                metadata = [
+                    {key: value for key, value in record.items() if value is not None}
+                    for record in meta_frame.to_dict(orient="records")
+                ]
+            else:
+                metadata = [{} for _ in range(len(chunk))]
+
+            rows = [
+                {"title": t, "content": c, "source": s, "doc_metadata": m}
+                for t, c, s, m in zip(titles, contents, sources, metadata)
+            ]
+            self.write_unique(db, tenant_id, rows, duplicate_filter, result)
+            logger.debug(f"CSV-Import Tenant {tenant_id}: {result.imported} Zeilen geschrieben")
+
+    @staticmethod
+    def rows_from_items(items: List[Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Wandelt JSON-Objekte in Dokumentzeilen um.
+        Objekte ohne title oder content werden übersprungen.
+
+        :return: Tupel aus Zeilen und Anzahl übersprungener Objekte
+        """
+        rows = []
+        skipped = 0
+        for item in items:
+            if not isinstance(item, dict) or not item.get("title") or not item.get("content"):
+                skipped += 1
+                continue
+            metadata = item.get("doc_metadata") or item.get("metadata") or {}
+            rows.append({
+                "title": str(item["title"]),
+                "content": str(item["content"]),
+                "source": item.get("source"),
+                "doc_metadata": metadata if isinstance(metadata, dict) else {"value": metadata}
+            })
+        return rows, skipped
+
+    async def import_json_stream(
+        self,
+        db: Session,
+        tenant_id: str,
+        chunks: AsyncIterator[bytes],
+        job_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Importiert ein JSON-Array oder NDJSON aus einem Byte-Strom.
+
+        Die Objekte werden beim Eintreffen geparst und blockweise geschrieben,
+        sodass der Speicherbedarf nicht von der Größe der Eingabe abhängt.
+        Der Fortschritt wird im job_service veröffentlicht, unter job_id, falls ein
+        zuvor angelegter Job übergeben wird (siehe job_service.claim_job).
+
+        :raises BulkImportError: bei ungültigem JSON oder einem Abbruch; enthält die
+            Anzahl der bereits importierten Dokumente
+        """
+        result = BulkImportResult()
+        parser = JSONStreamParser()
+        duplicate_filter = await run_in_threadpool(DuplicateFilter.for_tenant, db, tenant_id)
+        if job_id is None:
+            job_id = await run_in_threadpool(job_service.create_job, "json_upload", tenant_id, imported=0, skipped=0)
+        pending: List[Any] = []
+
+        async def flush(items: List[Any]) -> None:
+            rows, skipped = self.rows_from_items(items)
+            result.skipped += skipped
+            if rows:
+                await run_in_threadpool(self.write_unique, db, tenant_id, rows, duplicate_filter, result)
+            await run_in_threadpool(
+                job_service.update_job,
+                job_id,
+                imported=result.imported,
+                skipped=result.skipped,
+                duplicates_skipped=result.duplicate_count,
+                bytes_received=result.bytes_received
+            )
+
+        try:
+            async for data in chunks:
+                result.bytes_received += len(data)
+                pending.extend(parser.feed(data))
+                while len(pending) >= self.chunk_size:
+                    await flush(pending[:self.chunk_size])
+                    pending = pending[self.chunk_size:]
+
+            pending.extend(parser.close())
+            await flush(pending)
+        except Exception as e:
+            await run_in_threadpool(db.rollback)
+            stats = result.to_dict()
+            stats["job_id"] = job_id
+            await run_in_threadpool(
+                job_service.fail_job,
+                job_id,
+                str(e),
+                imported=stats["imported"],
+                skipped=stats["skipped"],
+                duplicates_skipped=stats["duplicates_skipped"],
+                bytes_received=stats["bytes_received"]
+            )
+            raise BulkImportError(str(e), stats, invalid_input=isinstance(e, ValueError)) from e
+
+        stats = result.to_dict()
+        stats["job_id"] = job_id
+        await run_in_threadpool(
+            job_service.finish_job,
+            job_id,
+            imported=stats["imported"],
+            skipped=stats["skipped"],
+            duplicates_skipped=stats["duplicates_skipped"],
+            bytes_received=stats["bytes_received"],
+            rows_per_second=stats["rows_per_second"]
+        )
+        logger.info(
+            f"JSON-Import für Tenant {tenant_id} abgeschlossen: {stats['imported']} Dokumente "
+            f"in {stats['duration_seconds']}s ({stats['rows_per_second']} Dokumente/s)"
+        )
+        return stats
+
+
+# Singleton-Instanz
+bulk_import_service = BulkImportService()
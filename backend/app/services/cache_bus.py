@@ -0,0 +1,311 @@
+"""
+Cache-Invalidierungsbus über Postgres LISTEN/NOTIFY.
+
+Jeder Worker-Prozess hält eigene Caches (Tenants, UI-Komponenten-Konfigurationen,
+Extraktoren für interaktive Elemente, ...). Ändert ein Admin-Request einen
+Tenant, wird ein Ereignis in der Tabelle cache_invalidation_events gespeichert
+und per NOTIFY signalisiert. Alle Worker lauschen auf dem Kanal, lesen die
+neuen Ereignisse und rufen die registrierten Handler auf.
+
+Ist LISTEN nicht verfügbar (z. B. hinter PgBouncer im Transaktionsmodus oder
+ohne Postgres), fragt der Bus die Tabelle im Abstand von CACHE_BUS_POLL_INTERVAL
+ab. Auch im LISTEN-Modus wird in diesem Abstand nachgelesen, sodass verlorene
+Benachrichtigungen spätestens dann angewendet werden.
+
+Die IDs der Ereignisse werden beim Einfügen vergeben, aber nicht in dieser
+Reihenfolge committet. Damit ein später committetes Ereignis mit kleinerer ID
+nicht übersprungen wird, liest der Bus jeweils auch die letzten LOOKBACK_EVENTS
+IDs unterhalb der höchsten gelesenen erneut und überspringt bereits gesehene.
+"""
+
+import logging
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, select as sql_select, text
+
+from ..core.config import settings
+from ..db.models import CacheInvalidationEventModel
+from ..db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Name des NOTIFY-Kanals
+CHANNEL = "cache_invalidation"
+
+# Maximale Anzahl Ereignisse, die pro Abfrage gelesen werden
+FETCH_BATCH_SIZE = 500
+
+# Anzahl IDs unterhalb der höchsten gelesenen, die erneut gelesen werden
+# (Ereignisse, deren Transaktion nach einer mit höherer ID committet wurde)
+LOOKBACK_EVENTS = 100
+
+# Abstand zwischen Versuchen, die LISTEN-Verbindung wiederherzustellen (Sekunden)
+RECONNECT_INTERVAL = 30
+
+# Abstand zwischen zwei Bereinigungen der Ereignistabelle (Sekunden)
+PRUNE_INTERVAL = 600
+
+# Ereignistypen
+TENANT_CHANGED = "tenant"  # payload: api_keys
+INTERACTIVE_CONFIG_CHANGED = "interactive_config"
+UI_COMPONENTS_CHANGED = "ui_components"
+# payload: operation (upsert/delete), document_ids; ohne document_ids gilt die
+# gesamte Wissensbasis des Tenants als geändert
+KNOWLEDGE_CHANGED = "knowledge"
+TOKEN_REVOKED = "token_revoked"  # payload: jti, expires_at (Unix-Zeitstempel)
+# Aktive/neue Weaviate-Collection eines Tenants hat sich geändert (Blue/Green-Reindex)
+COLLECTIONS_CHANGED = "collections"
+
+Handler = Callable[[Optional[str], Dict[str, Any]], None]
+
+
+class CacheInvalidationBus:
+    """Verteilt Invalidierungsereignisse an die Caches aller Worker-Prozesse."""
+
+    def __init__(self, mode: str = "listen", poll_interval: float = 2.0, retention_seconds: int = 3600):
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        # Kennung dieses Prozesses, um eigene Ereignisse nicht doppelt anzuwenden
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._last_id = 0
+        # Bereits gelesene IDs im Rückblickfenster
+        self._seen_ids: Set[int] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._listen_connection = None
+        self._last_reconnect_attempt = 0.0
+        self._last_prune = 0.0
+
+        # Zähler für Metriken
+        self.published_count = 0
+        self.applied_count = 0
+        self.error_count = 0
+        self.last_applied_at: Optional[datetime] = None
+
+    def subscribe(self, event_type: str, handler: Handler) -> None:
+        """Registriert einen Handler, der mit (tenant_id, payload) aufgerufen wird."""
+        self._handlers[event_type].append(handler)
+
+    def _dispatch(self, event_type: str, tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(event_type, ()):
+            try:
+                handler(tenant_id, payload)
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Fehler im Cache-Handler für Ereignis {event_type}: {e}")
+
+    def publish(self, event_type: str, tenant_id: Optional[str] = None, **payload: Any) -> None:
+        """
+        Wendet ein Ereignis sofort im eigenen Prozess an und veröffentlicht es
+        für alle anderen Worker. Sollte erst nach dem Commit der Änderung
+        aufgerufen werden, damit andere Worker den neuen Stand lesen.
+        """
+        self._dispatch(event_type, tenant_id, payload)
+        if not settings.CACHE_BUS_ENABLED:
+            return
+        try:
+            with engine.begin() as connection:
+                event_id = connection.execute(
+                    insert(CacheInvalidationEventModel).values(
+                        event_type=event_type,
+                        tenant_id=tenant_id,
+                        payload=payload,
+                        origin=self.origin,
+                        created_at=datetime.utcnow()
+                    ).returning(CacheInvalidationEventModel.id)
+                ).scalar()
+                if engine.dialect.name == "postgresql":
+                    # Die Benachrichtigung wird beim Commit zugestellt
+                    connection.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                        "channel": CHANNEL,
+                        "payload": str(event_id)
+                    })
+            self.published_count += 1
+        except Exception as e:
+            # Die anderen Worker erhalten die Änderung dann erst nach Ablauf der Cache-TTL
+            # bzw. beim periodischen Neuladen (z. B. der Collection-Zuordnung)
+            self.error_count += 1
+            logger.error(f"Cache-Ereignis {event_type} konnte nicht veröffentlicht werden: {e}")
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Thread, der auf Ereignisse anderer Worker wartet."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-bus", daemon=True)
+        self._thread.start()
+        logger.info(f"Cache-Invalidierungsbus gestartet (Modus: {self.mode})")
+
+    def stop(self) -> None:
+        """Beendet den Hintergrund-Thread und schließt die LISTEN-Verbindung."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+        self._close_listen_connection()
+        logger.info("Cache-Invalidierungsbus gestoppt")
+
+    @property
+    def listening(self) -> bool:
+        return self._listen_connection is not None
+
+    def _open_listen_connection(self) -> None:
+        """Öffnet eine eigene Verbindung (außerhalb des Pools) und abonniert den Kanal."""
+        self._last_reconnect_attempt = time.monotonic()
+        if engine.dialect.name != "postgresql":
+            logger.info("LISTEN/NOTIFY nicht verfügbar, Cache-Invalidierung per Polling")
+            self.mode = "poll"
+            return
+        try:
+            pooled = engine.raw_connection()
+            pooled.detach()
+            connection = pooled.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            self._listen_connection = connection
+            logger.info(f"Lausche auf Kanal {CHANNEL}")
+        except Exception as e:
+            logger.warning(f"LISTEN fehlgeschlagen, Cache-Invalidierung per Polling: {e}")
+            self._listen_connection = None
+
+    def _close_listen_connection(self) -> None:
+        if self._listen_connection is not None:
+            try:
+                self._listen_connection.close()
+            except Exception:
+                pass
+            self._listen_connection = None
+
+    def _wait_for_notification(self) -> None:
+        """Wartet auf eine Benachrichtigung oder höchstens poll_interval Sekunden."""
+        if self._listen_connection is None:
+            self._stop_event.wait(self.poll_interval)
+            return
+        try:
+            readable, _, _ = select.select([self._listen_connection], [], [], self.poll_interval)
+            if readable:
+                self._listen_connection.poll()
+                # Die Benachrichtigungen dienen nur als Weckruf, gelesen wird aus der Tabelle
+                self._listen_connection.notifies.clear()
+        except Exception as e:
+            logger.warning(f"LISTEN-Verbindung unterbrochen, wechsle auf Polling: {e}")
+            self._close_listen_connection()
+
+    def _run(self) -> None:
+        try:
+            # Ereignisse vor dem Start gelten als gesehen, die Caches sind noch leer
+            self._seen_ids = set(self._recent_ids())
+            self._last_id = max(self._seen_ids, default=0)
+        except Exception as e:
+            logger.warning(f"Cache-Ereignisse konnten nicht gelesen werden: {e}")
+        if self.mode == "listen":
+            self._open_listen_connection()
+
+        while not self._stop_event.is_set():
+            self._wait_for_notification()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.apply_pending_events()
+                self._prune_if_due()
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Fehler beim Anwenden der Cache-Ereignisse: {e}")
+            if (self.mode == "listen" and self._listen_connection is None
+                    and time.monotonic() - self._last_reconnect_attempt > RECONNECT_INTERVAL):
+                self._open_listen_connection()
+
+    @staticmethod
+    def _recent_ids() -> List[int]:
+        """IDs der letzten LOOKBACK_EVENTS Ereignisse."""
+        with engine.connect() as connection:
+            max_id = connection.execute(sql_select(func.max(CacheInvalidationEventModel.id))).scalar() or 0
+            return list(connection.execute(
+                sql_select(CacheInvalidationEventModel.id).where(CacheInvalidationEventModel.id > max_id - LOOKBACK_EVENTS)
+            ).scalars())
+
+    def apply_pending_events(self) -> int:
+        """
+        Liest alle neuen Ereignisse und wendet die Ereignisse anderer Worker an.
+        Ereignisse im Rückblickfenster werden nur einmal angewendet.
+
+        :return: Anzahl der angewendeten Ereignisse
+        """
+        applied = 0
+        cursor = max(0, self._last_id - LOOKBACK_EVENTS)
+        while True:
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    sql_select(
+                        CacheInvalidationEventModel.id,
+                        CacheInvalidationEventModel.event_type,
+                        CacheInvalidationEventModel.tenant_id,
+                        CacheInvalidationEventModel.payload,
+                        CacheInvalidationEventModel.origin
+                    ).where(
+                        CacheInvalidationEventModel.id > cursor
+                    ).order_by(CacheInvalidationEventModel.id).limit(FETCH_BATCH_SIZE)
+                ).all()
+
+            for row in rows:
+                cursor = row.id
+                if row.id in self._seen_ids:
+                    continue
+                self._seen_ids.add(row.id)
+                self._last_id = max(self._last_id, row.id)
+                if row.origin == self.origin:
+                    continue
+                self._dispatch(row.event_type, row.tenant_id, row.payload or {})
+                applied += 1
+
+            if len(rows) < FETCH_BATCH_SIZE:
+                break
+
+        floor = self._last_id - LOOKBACK_EVENTS
+        self._seen_ids = {event_id for event_id in self._seen_ids if event_id > floor}
+        if applied:
+            self.applied_count += applied
+            self.last_applied_at = datetime.utcnow()
+            logger.debug(f"{applied} Cache-Ereignisse anderer Worker angewendet")
+        return applied
+
+    def _prune_if_due(self) -> None:
+        """Entfernt Ereignisse, die älter als die Aufbewahrungszeit sind."""
+        now = time.monotonic()
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        with engine.begin() as connection:
+            connection.execute(delete(CacheInvalidationEventModel).where(
+                CacheInvalidationEventModel.created_at < cutoff
+            ))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Zustand und Zähler des Busses zurück."""
+        return {
+            "mode": "listen" if self.listening else "poll",
+            "running": self._thread is not None,
+            "last_event_id": self._last_id,
+            "published": self.published_count,
+            "applied": self.applied_count,
+            "errors": self.error_count,
+            "last_applied_at": self.last_applied_at.isoformat() if self.last_applied_at else None
+        }
+
+
+# Singleton-Instanz
+cache_bus = CacheInvalidationBus(
+    mode=settings.CACHE_BUS_MODE,
+    poll_interval=settings.CACHE_BUS_POLL_INTERVAL,
+    retention_seconds=settings.CACHE_BUS_RETENTION_SECONDS
+)
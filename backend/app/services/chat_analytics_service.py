@@ -0,0 +1,499 @@
+"""
+Auswertung der Chat-Protokolle für das Admin-Dashboard.
+
+Lesezugriffe auf chat_logs selbst gibt es nur für die Protokollliste
+(Keyset-Pagination über den Index (tenant_id, created_at), optional mit
+Volltextfilter auf die Fragen). Kennzahlen, Zeitreihen und häufige Fragen
+werden aus voraggregierten Tabellen gelesen:
+
+- chat_log_rollups: Zähler, Latenzsummen, Latenz-Histogramm und Tokens pro
+  Tenant und Stunde bzw. Tag (UTC)
+- chat_query_rollups: Anzahl normalisierter Fragen pro Tenant und Tag
+
+Beide werden vom ChatLogService in derselben Transaktion wie die Protokolle
+fortgeschrieben (apply_rollups), sodass Protokolle und Aggregate nicht
+auseinanderlaufen. Perzentile werden aus dem Histogramm interpoliert und
+sind daher Näherungswerte.
+"""
+
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, and_, func, literal_column, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import ChatLogModel, ChatLogRollupModel, ChatQueryRollupModel
+from .document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+# Obergrenzen des Latenz-Histogramms in ms (None = ohne Obergrenze)
+LATENCY_BUCKETS_MS: Tuple[Optional[int], ...] = (250, 500, 1000, 2000, 5000, 10000, None)
+HISTOGRAM_COLUMNS = [f"latency_le_{bound if bound is not None else 'inf'}" for bound in LATENCY_BUCKETS_MS]
+
+# Spalten der Rollups, die beim Fortschreiben addiert werden
+SUM_COLUMNS = [
+    "request_count", "error_count", "unanswered_count",
+    "latency_count", "latency_sum_ms", "first_token_count", "first_token_sum_ms",
+    "traced_count", "retrieval_sum_ms", "llm_sum_ms", "prompt_tokens", "completion_tokens",
+    *HISTOGRAM_COLUMNS
+]
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Standardzeiträume, wenn kein since angegeben ist
+DEFAULT_RANGES = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+
+# Ab dieser Zeitraumlänge werden Kennzahlen aus den Tages-Rollups gelesen
+DAILY_ROLLUP_THRESHOLD = timedelta(days=7)
+
+# Maximale Anzahl von Punkten einer Zeitreihe
+MAX_TIMESERIES_POINTS = 1000
+
+# Normalisierte Fragen werden für die Auswertung auf diese Länge gekürzt
+MAX_QUERY_LENGTH = 500
+
+# Textbausteine, an denen eine nicht beantwortete Frage erkannt wird
+# (Ausweichantwort aus dem System-Prompt und Fehlermeldungen der Chat-Endpunkte)
+UNANSWERED_MARKERS = (
+    "liegen mir keine informationen vor",
+    "es konnten keine informationen generiert werden",
+    "keine antwort generiert",
+    "es ist ein fehler bei der beantwortung aufgetreten",
+    "bei der verarbeitung ihrer anfrage ist ein fehler aufgetreten",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def is_unanswered(status: str, response: Optional[str]) -> bool:
+    """Erkennt Anfragen, die mit einem Fehler oder ohne inhaltliche Antwort endeten."""
+    if status != "ok" or not response or not response.strip():
+        return True
+    text = response.lower()
+    return any(marker in text for marker in UNANSWERED_MARKERS)
+
+
+def normalize_query(query: str) -> str:
+    """Vereinheitlicht eine Frage für die Zählung (Kleinschreibung, Leerzeichen, Satzzeichen am Ende)."""
+    return _WHITESPACE.sub(" ", query or "").strip().rstrip("?!. ").lower()[:MAX_QUERY_LENGTH]
+
+
+def truncate_bucket(value: datetime, granularity: str) -> datetime:
+    """Gibt den Beginn des Zeitfensters (Stunde oder Tag) zurück."""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def approximate_percentile(histogram: List[int], max_ms: int, percentile: float) -> Optional[int]:
+    """
+    Interpoliert ein Perzentil aus dem Latenz-Histogramm (linear innerhalb
+    des Buckets; der offene Bucket endet bei der gemessenen Höchstlatenz).
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+    target = percentile * total
+    cumulative = 0
+    lower = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+        upper = bound if bound is not None else max(max_ms, lower)
+        if count and cumulative + count >= target:
+            value = lower + (upper - lower) * (target - cumulative) / count
+            return int(round(min(value, max_ms) if max_ms else value))
+        cumulative += count
+        lower = upper
+    return max_ms
+
+
+class ChatAnalyticsService:
+    """Fortschreiben der Rollups und Lesezugriffe für die Chat-Auswertung."""
+
+    # Schreiben
+
+    @staticmethod
+    def build_rollups(rows: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fasst Protokolleinträge zu Rollup-Zeilen zusammen (je Schlüssel genau eine Zeile).
+
+        :return: Tupel aus Zeitfenster-Rollups und Fragen-Rollups
+        """
+        buckets: Dict[Tuple[str, str, datetime], Dict[str, Any]] = {}
+        queries: Dict[Tuple[str, datetime, str], Dict[str, Any]] = {}
+
+        for row in rows:
+            created_at = row["created_at"]
+            unanswered = row.get("unanswered", False)
+            latency = row.get("latency_ms")
+
+            for granularity in GRANULARITIES:
+                key = (row["tenant_id"], granularity, truncate_bucket(created_at, granularity))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = {
+                        "tenant_id": key[0], "granularity": key[1], "bucket_start": key[2],
+                        "latency_max_ms": 0, **{column: 0 for column in SUM_COLUMNS}
+                    }
+                bucket["request_count"] += 1
+                bucket["error_count"] += row.get("status") != "ok"
+                bucket["unanswered_count"] += unanswered
+                if latency is not None:
+                    bucket["latency_count"] += 1
+                    bucket["latency_sum_ms"] += latency
+                    bucket["latency_max_ms"] = max(bucket["latency_max_ms"], latency)
+                    for bound, column in zip(LATENCY_BUCKETS_MS, HISTOGRAM_COLUMNS):
+                        if bound is None or latency <= bound:
+                            bucket[column] += 1
+                            break
+                if row.get("first_token_ms") is not None:
+                    bucket["first_token_count"] += 1
+                    bucket["first_token_sum_ms"] += row["first_token_ms"]
+                if row.get("llm_ms") is not None:
+                    bucket["traced_count"] += 1
+                    bucket["retrieval_sum_ms"] += row.get("retrieval_ms") or 0
+                    bucket["llm_sum_ms"] += row["llm_ms"]
+                bucket["prompt_tokens"] += row.get("prompt_tokens") or 0
+                bucket["completion_tokens"] += row.get("completion_tokens") or 0
+
+            normalized = normalize_query(row.get("query", ""))
+            if not normalized:
+                continue
+            query_hash = hashlib.md5(normalized.encode("utf-8")).hexdigest()
+            key = (row["tenant_id"], truncate_bucket(created_at, "day"), query_hash)
+            entry = queries.get(key)
+            if entry is None:
+                entry = queries[key] = {
+                    "tenant_id": key[0], "day": key[1], "query_hash": query_hash, "query": normalized,
+                    "count": 0, "unanswered_count": 0, "last_seen_at": created_at
+                }
+            entry["count"] += 1
+            entry["unanswered_count"] += unanswered
+            entry["last_seen_at"] = max(entry["last_seen_at"], created_at)
+
+        return list(buckets.values()), list(queries.values())
+
+    def apply_rollups(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        """Schreibt die Rollups eines Batches per UPSERT fort (in der Transaktion des Aufrufers)."""
+        buckets, queries = self.build_rollups(rows)
+        if buckets:
+            self._upsert(
+                connection, ChatLogRollupModel.__table__, buckets,
+                key_columns=["tenant_id", "granularity", "bucket_start"],
+                sum_columns=SUM_COLUMNS, max_columns=["latency_max_ms"]
+            )
+        if queries:
+            self._upsert(
+                connection, ChatQueryRollupModel.__table__, queries,
+                key_columns=["tenant_id", "day", "query_hash"],
+                sum_columns=["count", "unanswered_count"], max_columns=["last_seen_at"]
+            )
+
+    @staticmethod
+    def _upsert(
+        connection: Connection,
+        table,
+        rows: List[Dict[str, Any]],
+        key_columns: List[str],
+        sum_columns: List[str],
+        max_columns: List[str]
+    ) -> None:
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(table).values(rows)
+            greatest = func.greatest
+        elif dialect == "sqlite":
+            statement = sqlite.insert(table).values(rows)
+            greatest = func.max
+        else:
+            logger.warning(f"Chat-Rollups werden für die Datenbank '{dialect}' nicht unterstützt")
+            return
+        excluded = statement.excluded
+        updates = {column: table.c[column] + excluded[column] for column in sum_columns}
+        updates.update({column: greatest(table.c[column], excluded[column]) for column in max_columns})
+        connection.execute(statement.on_conflict_do_update(index_elements=key_columns, set_=updates))
+
+    # Lesen
+
+    @staticmethod
+    def _dialect(db: AsyncSession) -> str:
+        return db.bind.dialect.name if db.bind is not None else ""
+
+    @staticmethod
+    def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+        """Rechnet Zeitpunkte mit Zeitzone (z. B. "...Z") in naive UTC-Zeitpunkte um, wie sie gespeichert sind."""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def _resolve_range(
+        cls,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        default: timedelta
+    ) -> Tuple[datetime, datetime]:
+        since, until = cls._to_utc(since), cls._to_utc(until)
+        until = until or datetime.utcnow()
+        since = since or until - default
+        if since >= until:
+            raise ValueError("since muss vor until liegen")
+        return since, until
+
+    def _logs_statement(
+        self,
+        dialect: str,
+        tenant_id: str,
+        limit: int,
+        cursor: Optional[str],
+        q: Optional[str],
+        status: Optional[str],
+        unanswered: Optional[bool],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> Select:
+        table = ChatLogModel.__table__
+        statement = select(table).where(table.c.tenant_id == tenant_id)
+
+        # Zeitgrenzen schränken in Postgres auch die gelesenen Partitionen ein
+        if since is not None:
+            statement = statement.where(table.c.created_at >= since)
+        if until is not None:
+            statement = statement.where(table.c.created_at < until)
+        if status:
+            statement = statement.where(table.c.status == status)
+        if unanswered is not None:
+            statement = statement.where(table.c.unanswered == unanswered)
+        if q:
+            if dialect == "postgresql":
+                # Gleicher Ausdruck wie im Index ix_chat_logs_query_fts
+                statement = statement.where(
+                    func.to_tsvector(literal_column("'german'"), table.c.query)
+                    .op("@@")(func.websearch_to_tsquery(literal_column("'german'"), q))
+                )
+            else:
+                statement = statement.where(table.c.query.ilike(f"%{q}%"))
+
+        if cursor:
+            created_at, log_id = DocumentService.decode_cursor(cursor)
+            statement = statement.where(or_(
+                table.c.created_at < created_at,
+                and_(table.c.created_at == created_at, table.c.id < log_id)
+            ))
+
+        return statement.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit + 1)
+
+    async def list_logs(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        status: Optional[str] = None,
+        unanswered: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Liefert Chat-Protokolle eines Tenants per Keyset-Pagination (neueste zuerst).
+
+        :param q: Volltextfilter auf die Fragen (Postgres: websearch-Syntax, deutsche Wortstämme)
+        :return: Tupel aus Einträgen und Cursor für die nächste Seite (oder None)
+        :raises ValueError: bei ungültigem Cursor
+        """
+        statement = self._logs_statement(
+            self._dialect(db), tenant_id, limit, cursor, q, status, unanswered,
+            self._to_utc(since), self._to_utc(until)
+        )
+        rows = (await db.execute(statement)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = DocumentService.encode_cursor(rows[-1].created_at, rows[-1].id)
+        return [dict(row._mapping) for row in rows], next_cursor
+
+    @staticmethod
+    def _summary_columns() -> List[Any]:
+        table = ChatLogRollupModel.__table__
+        return [
+            *[func.coalesce(func.sum(table.c[column]), 0).label(column) for column in SUM_COLUMNS],
+            func.coalesce(func.max(table.c.latency_max_ms), 0).label("latency_max_ms")
+        ]
+
+    @staticmethod
+    def _format_summary(row: Any) -> Dict[str, Any]:
+        values = row._mapping
+        histogram = [int(values[column]) for column in HISTOGRAM_COLUMNS]
+        requests = int(values["request_count"])
+        latency_count = int(values["latency_count"])
+        traced_count = int(values["traced_count"])
+        first_token_count = int(values["first_token_count"])
+        latency_max = int(values["latency_max_ms"])
+        return {
+            "requests": requests,
+            "errors": int(values["error_count"]),
+            "unanswered": int(values["unanswered_count"]),
+            "unanswered_rate": round(values["unanswered_count"] / requests, 4) if requests else 0.0,
+            "latency_avg_ms": int(values["latency_sum_ms"] / latency_count) if latency_count else None,
+            "latency_p50_ms": approximate_percentile(histogram, latency_max, 0.50),
+            "latency_p95_ms": approximate_percentile(histogram, latency_max, 0.95),
+            "latency_p99_ms": approximate_percentile(histogram, latency_max, 0.99),
+            "latency_max_ms": latency_max if latency_count else None,
+            "first_token_avg_ms": int(values["first_token_sum_ms"] / first_token_count) if first_token_count else None,
+            "retrieval_avg_ms": int(values["retrieval_sum_ms"] / traced_count) if traced_count else None,
+            "llm_avg_ms": int(values["llm_sum_ms"] / traced_count) if traced_count else None,
+            "prompt_tokens": int(values["prompt_tokens"]),
+            "completion_tokens": int(values["completion_tokens"])
+        }
+
+    def _rollup_range(self, since: datetime, until: datetime) -> Tuple[str, datetime, datetime]:
+        """Wählt die Rollup-Stufe für einen Zeitraum; die Grenzen werden auf deren Fenster gerundet."""
+        granularity = "day" if until - since > DAILY_ROLLUP_THRESHOLD else "hour"
+        return granularity, truncate_bucket(since, granularity), until
+
+    async def get_summary(
+        self,
+        db: AsyncSession,
+        tenant_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Kennzahlen eines Tenants (oder aller Tenants) für einen Zeitraum
+        (Standard: letzte 24 Stunden), gelesen aus den Rollups.
+        """
+        since, until = self._resolve_range(since, until, DEFAULT_RANGES["hour"])
+        granularity, start, end = self._rollup_range(since, until)
+        table = ChatLogRollupModel.__table__
+        statement = select(*self._summary_columns()).where(
+            table.c.granularity == granularity,
+            table.c.bucket_start >= start,
+            table.c.bucket_start < end
+        )
+        if tenant_id:
+            statement = statement.where(table.c.tenant_id == tenant_id)
+        row = (await db.execute(statement)).one()
+        return {"since": start, "until": until, "granularity": granularity, **self._format_summary(row)}
+
+    async def get_tenant_overview(
+        self,
+        db: AsyncSession,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Kennzahlen aller Tenants mit Anfragen im Zeitraum, nach Anzahl der Anfragen sortiert."""
+        since, until = self._resolve_range(since, until, DEFAULT_RANGES["hour"])
+        granularity, start, end = self._rollup_range(since, until)
+        table = ChatLogRollupModel.__table__
+        statement = select(table.c.tenant_id, *self._summary_columns()).where(
+            table.c.granularity == granularity,
+            table.c.bucket_start >= start,
+            table.c.bucket_start < end
+        ).group_by(table.c.tenant_id)
+        rows = (await db.execute(statement)).all()
+        overview = [{"tenant_id": row.tenant_id, **self._format_summary(row)} for row in rows]
+        return sorted(overview, key=lambda item: item["requests"], reverse=True)
+
+    async def get_timeseries(
+        self,
+        db: AsyncSession,
+        tenant_id: Optional[str] = None,
+        granularity: str = "hour",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Zeitreihe pro Stunde oder Tag; Zeitfenster ohne Anfragen sind mit 0 enthalten.
+
+        :raises ValueError: bei unbekannter Granularität oder zu langem Zeitraum
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unbekannte Granularität: {granularity}")
+        since, until = self._resolve_range(since, until, DEFAULT_RANGES[granularity])
+        step = GRANULARITIES[granularity]
+        start = truncate_bucket(since, granularity)
+        if (until - start) / step > MAX_TIMESERIES_POINTS:
+            raise ValueError(f"Zeitraum zu lang (maximal {MAX_TIMESERIES_POINTS} Zeitfenster)")
+
+        table = ChatLogRollupModel.__table__
+        statement = select(table.c.bucket_start, *self._summary_columns()).where(
+            table.c.granularity == granularity,
+            table.c.bucket_start >= start,
+            table.c.bucket_start < until
+        )
+        if tenant_id:
+            statement = statement.where(table.c.tenant_id == tenant_id)
+        statement = statement.group_by(table.c.bucket_start)
+        rows = {row.bucket_start: row for row in (await db.execute(statement)).all()}
+
+        empty = self._format_summary(_EmptyRow())
+        series = []
+        bucket = start
+        while bucket < until:
+            row = rows.get(bucket)
+            series.append({"bucket_start": bucket, **(self._format_summary(row) if row is not None else empty)})
+            bucket += step
+        return series
+
+    async def get_top_questions(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        unanswered_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Häufigste (bzw. am häufigsten unbeantwortete) Fragen eines Tenants im
+        Zeitraum (Standard: letzte 30 Tage, tagesgenau).
+        """
+        since, until = self._resolve_range(since, until, DEFAULT_RANGES["day"])
+        table = ChatQueryRollupModel.__table__
+        count = func.sum(table.c.count).label("count")
+        unanswered = func.sum(table.c.unanswered_count).label("unanswered")
+        statement = select(
+            table.c.query_hash,
+            func.max(table.c.query).label("query"),
+            count,
+            unanswered,
+            func.max(table.c.last_seen_at).label("last_seen_at")
+        ).where(
+            table.c.tenant_id == tenant_id,
+            table.c.day >= truncate_bucket(since, "day"),
+            table.c.day < until
+        ).group_by(table.c.query_hash)
+
+        if unanswered_only:
+            statement = statement.having(func.sum(table.c.unanswered_count) > 0).order_by(unanswered.desc(), count.desc())
+        else:
+            statement = statement.order_by(count.desc(), unanswered.desc())
+
+        rows = (await db.execute(statement.limit(limit))).all()
+        return [
+            {
+                "query": row.query,
+                "count": int(row.count),
+                "unanswered": int(row.unanswered),
+                "last_seen_at": row.last_seen_at
+            }
+            for row in rows
+        ]
+
+
+class _EmptyRow:
+    """Platzhalter für Zeitfenster ohne Rollup-Zeile."""
+
+    _mapping = {column: 0 for column in [*SUM_COLUMNS, "latency_max_ms"]}
+
+
+# Singleton-Instanz
+chat_analytics_service = ChatAnalyticsService()
@@ -0,0 +1,287 @@
+"""
+Chat-Protokollierung mit gebündelten Schreibzugriffen.
+
+Jede Chat-Anfrage wird mit Frage, Antwort, Tenant, Latenzen und Tokenzahlen
+protokolliert. Der Chat-Pfad legt den Eintrag nur in einem Ringpuffer im
+Speicher ab und wartet nie auf die Datenbank. Ein Hintergrund-Task schreibt
+den Puffer regelmäßig bzw. bei Erreichen der Batch-Größe gebündelt weg
+(Postgres: COPY, sonst INSERT mit mehreren Zeilen) und schreibt in derselben
+Transaktion die Rollups für die Auswertung fort (siehe chat_analytics_service).
+
+In Postgres ist chat_logs monatlich nach created_at partitioniert. Fehlende
+Partitionen für den aktuellen und den nächsten Monat werden beim Start und
+beim Schreiben angelegt; alte Monate lassen sich per DROP TABLE entfernen.
+
+Ist der Puffer voll (z. B. bei nicht erreichbarer Datenbank), werden die
+ältesten Einträge verworfen und gezählt.
+"""
+
+import asyncio
+import io
+import logging
+import uuid
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+from ..db.models import ChatLogModel
+from ..db.session import engine
+from .chat_analytics_service import chat_analytics_service, is_unanswered
+
+logger = logging.getLogger(__name__)
+
+# Spalten in der Reihenfolge des COPY-Befehls
+CHAT_LOG_COLUMNS = [column.name for column in ChatLogModel.__table__.columns]
+
+# Obergrenze für die Wartezeit nach fehlgeschlagenen Schreibversuchen (Sekunden)
+MAX_BACKOFF_SECONDS = 60
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _csv_field(value: Any) -> str:
+    """
+    Formatiert einen Wert für COPY ... (FORMAT csv): Ein leeres, nicht
+    quotiertes Feld ist NULL, Texte werden immer quotiert (auch leere).
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class ChatLogService:
+    """Puffert Chat-Protokolle im Speicher und schreibt sie gebündelt in die Datenbank."""
+
+    def __init__(self, buffer_size: int = 10000, flush_interval: float = 2.0, batch_size: int = 500):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        # Monate, für die bereits eine Partition existiert
+        self._partitions: Set[date] = set()
+
+        # Zähler für Metriken
+        self.recorded_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+        self.last_flush_at: Optional[datetime] = None
+
+    def record(
+        self,
+        tenant_id: str,
+        query: str,
+        response: Optional[str],
+        channel: str = "completion",
+        session_id: Optional[str] = None,
+        client_info: Optional[str] = None,
+        status: str = "ok",
+        error: Optional[str] = None,
+        latency_ms: Optional[int] = None,
+        first_token_ms: Optional[int] = None,
+        trace: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Nimmt einen Protokolleintrag in den Puffer auf (ohne Datenbankzugriff).
+
+        :param trace: Vom RAG-Service gesammelte Messwerte (retrieval_ms, llm_ms,
+                      prompt_tokens, completion_tokens, model)
+        """
+        trace = trace or {}
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped_count += 1
+        self._buffer.append({
+            "id": str(uuid.uuid4()),
+            "created_at": datetime.utcnow(),
+            "tenant_id": str(tenant_id),
+            "session_id": session_id,
+            "channel": channel,
+            "query": query,
+            "response": response,
+            "status": status,
+            "unanswered": is_unanswered(status, response),
+            "error": error,
+            "client_info": client_info[:255] if client_info else None,
+            "model": trace.get("model"),
+            "latency_ms": latency_ms,
+            "first_token_ms": first_token_ms,
+            "retrieval_ms": trace.get("retrieval_ms"),
+            "llm_ms": trace.get("llm_ms"),
+            "prompt_tokens": trace.get("prompt_tokens"),
+            "completion_tokens": trace.get("completion_tokens")
+        })
+        self.recorded_count += 1
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Task im laufenden Event-Loop."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Chat-Protokollierung gestartet")
+
+    async def stop(self) -> None:
+        """Beendet den Hintergrund-Task und schreibt den restlichen Puffer."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Chat-Protokolle konnten beim Beenden nicht geschrieben werden: {e}")
+        logger.info("Chat-Protokollierung gestoppt")
+
+    async def _run(self) -> None:
+        try:
+            await asyncio.to_thread(self.ensure_partitions, [date.today()])
+        except Exception as e:
+            logger.warning(f"Partitionen für chat_logs konnten nicht angelegt werden: {e}")
+
+        backoff = self.flush_interval
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                backoff = self.flush_interval
+            except Exception as e:
+                self.error_count += 1
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                logger.error(f"Fehler beim Schreiben der Chat-Protokolle (nächster Versuch in {backoff:.0f}s): {e}")
+
+    async def flush(self) -> int:
+        """
+        Schreibt den Puffer in Batches. Schlägt ein Batch fehl, kommt er zurück
+        in den Puffer und der Fehler wird weitergereicht.
+
+        :return: Anzahl der geschriebenen Einträge
+        """
+        written = 0
+        while self._buffer:
+            batch = self._take_batch()
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+            except Exception:
+                self._requeue(batch)
+                raise
+            written += len(batch)
+        if written:
+            self.last_flush_at = datetime.utcnow()
+        return written
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        """Stellt einen Batch wieder an den Anfang des Puffers, soweit Platz ist."""
+        free = self.buffer_size - len(self._buffer)
+        keep = batch[-free:] if free > 0 else []
+        self.dropped_count += len(batch) - len(keep)
+        self._buffer.extendleft(reversed(keep))
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """Schreibt einen Batch in einer Transaktion (läuft im Thread)."""
+        if not rows:
+            return
+        if engine.dialect.name == "postgresql":
+            self.ensure_partitions(row["created_at"].date() for row in rows)
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                self._copy_rows(connection, rows)
+            else:
+                connection.execute(insert(ChatLogModel.__table__), rows)
+            chat_analytics_service.apply_rollups(connection, rows)
+        self.written_count += len(rows)
+
+    @staticmethod
+    def _copy_rows(connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        """Schreibt die Zeilen per COPY im CSV-Format."""
+        data = io.StringIO()
+        for row in rows:
+            data.write(",".join(_csv_field(row[column]) for column in CHAT_LOG_COLUMNS))
+            data.write("\n")
+        data.seek(0)
+
+        # COPY über die DBAPI-Verbindung, innerhalb der Transaktion von `connection`
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY chat_logs ({', '.join(CHAT_LOG_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                data
+            )
+        finally:
+            cursor.close()
+
+    def ensure_partitions(self, days: Iterable[date]) -> None:
+        """Legt die Monatspartitionen für die angegebenen Tage und jeweils den Folgemonat an."""
+        if engine.dialect.name != "postgresql":
+            return
+        months = set()
+        for day in days:
+            months.add(_month_start(day))
+            months.add(_next_month(day))
+        missing = sorted(months - self._partitions)
+        if not missing:
+            return
+        with engine.begin() as connection:
+            for start in missing:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS chat_logs_{start:%Y_%m} PARTITION OF chat_logs "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')"
+                ))
+        self._partitions.update(missing)
+        logger.info(f"Partitionen für chat_logs angelegt: {', '.join(f'{m:%Y-%m}' for m in missing)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Füllstand und Zähler der Chat-Protokollierung zurück."""
+        return {
+            "running": self._running,
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "recorded": self.recorded_count,
+            "written": self.written_count,
+            "dropped": self.dropped_count,
+            "errors": self.error_count,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None
+        }
+
+
+# Singleton-Instanz
+chat_log_service = ChatLogService(
+    buffer_size=settings.CHAT_LOG_BUFFER_SIZE,
+    flush_interval=settings.CHAT_LOG_FLUSH_INTERVAL,
+    batch_size=settings.CHAT_LOG_BATCH_SIZE
+)
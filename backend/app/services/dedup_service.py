@@ -0,0 +1,284 @@
+"""
+Service zur Erkennung doppelter Dokumente beim Import.
+
+Exakte Duplikate werden über einen Hash des normalisierten Inhalts erkannt,
+der in DocumentModel.content_hash gespeichert wird. Optional (pro Tenant über
+TenantModel.config aktivierbar) werden Beinahe-Duplikate per SimHash erkannt.
+Der SimHash wird immer gespeichert, damit die Erkennung auch nachträglich
+aktiviert werden kann.
+
+Die SimHashes eines Tenants liegen je Worker in einem Bandindex, der nur um
+neu angelegte Dokumente ergänzt wird (über created_at und den Index
+ix_documents_tenant_created_id) statt bei jedem Import komplett geladen zu
+werden. Löschungen verwerfen den Index des Tenants.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..db.models import DocumentModel, TenantModel
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+
+logger = logging.getLogger(__name__)
+
+# Standard-Hamming-Abstand, bis zu dem zwei SimHashes als Beinahe-Duplikat gelten
+DEFAULT_MAX_DISTANCE = 6
+
+# Anzahl der Wörter pro Shingle für den SimHash
+SHINGLE_SIZE = 3
+
+# Die 64 Bit werden für die Kandidatensuche in 8 Bänder à 8 Bit zerlegt.
+# Bei höchstens 7 abweichenden Bits stimmt mindestens ein Band exakt überein.
+BAND_BITS = 8
+BAND_COUNT = 8
+
+# Beim Nachladen wird dieser Zeitraum vor dem letzten created_at erneut gelesen, damit
+# Dokumente aus länger laufenden Transaktionen oder anderer Worker nicht fehlen
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+# Anzahl der Dokumente pro Block beim Nachberechnen fehlender SimHashes
+BACKFILL_BATCH_SIZE = 1000
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Vereinheitlicht Leerraum, damit Formatierungsunterschiede keine neuen Hashes erzeugen."""
+    return " ".join((text or "").split())
+
+
+def content_hash(content: str) -> str:
+    """Berechnet den Hash für die exakte Duplikaterkennung."""
+    return hashlib.sha256(normalize_text(content).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """
+    Berechnet einen 64-Bit-SimHash über Wort-Shingles.
+    Ähnliche Texte ergeben Hashes mit geringem Hamming-Abstand.
+    """
+    import numpy as np
+
+    words = _WORD_PATTERN.findall((text or "").lower())
+    if len(words) >= SHINGLE_SIZE:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    else:
+        shingles = [" ".join(words)] if words else [""]
+
+    features = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles],
+        dtype=np.uint64
+    )
+    bits = (features[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    weights = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    result = 0
+    for position in np.nonzero(weights > 0)[0]:
+        result |= 1 << int(position)
+    return to_signed(result)
+
+
+def to_signed(value: int) -> int:
+    """Wandelt einen vorzeichenlosen 64-Bit-Wert für BigInteger-Spalten um."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Anzahl der unterschiedlichen Bits zweier 64-Bit-Hashes."""
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def band_keys(value: int) -> List[int]:
+    """Zerlegt einen SimHash in die Schlüssel der BAND_COUNT Bänder."""
+    unsigned = value & 0xFFFFFFFFFFFFFFFF
+    mask = (1 << BAND_BITS) - 1
+    return [(unsigned >> (band * BAND_BITS)) & mask for band in range(BAND_COUNT)]
+
+
+class SimhashBands:
+    """Bandindex für die Kandidatensuche unter SimHashes."""
+
+    def __init__(self):
+        self._bands: List[Dict[int, Set[int]]] = [{} for _ in range(BAND_COUNT)]
+        self.size = 0
+
+    def add(self, value: int) -> None:
+        added = False
+        for band, key in enumerate(band_keys(value)):
+            bucket = self._bands[band].setdefault(key, set())
+            if value not in bucket:
+                bucket.add(value)
+                added = True
+        self.size += added
+
+    def contains_near(self, value: int, max_distance: int) -> bool:
+        for band, key in enumerate(band_keys(value)):
+            for candidate in self._bands[band].get(key, ()):
+                if hamming_distance(value, candidate) <= max_distance:
+                    return True
+        return False
+
+
+class TenantSimhashIndex:
+    """SimHashes der gespeicherten Dokumente eines Tenants, inkrementell nachgeladen."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.bands = SimhashBands()
+        self._loaded_until: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def contains_near(self, value: int, max_distance: int) -> bool:
+        with self._lock:
+            return self.bands.contains_near(value, max_distance)
+
+    def refresh(self, db: Session) -> None:
+        """Übernimmt die seit dem letzten Laden angelegten Dokumente."""
+        with self._lock:
+            if self._loaded_until is None:
+                self._backfill(db)
+            query = db.query(DocumentModel.simhash, DocumentModel.created_at).filter(
+                DocumentModel.tenant_id == self.tenant_id,
+                DocumentModel.simhash.isnot(None)
+            )
+            if self._loaded_until is not None:
+                query = query.filter(DocumentModel.created_at >= self._loaded_until - REFRESH_OVERLAP)
+            for value, created_at in query.yield_per(BACKFILL_BATCH_SIZE):
+                self.bands.add(value)
+                if created_at and (self._loaded_until is None or created_at > self._loaded_until):
+                    self._loaded_until = created_at
+            if self._loaded_until is None:
+                self._loaded_until = datetime.min + REFRESH_OVERLAP
+
+    def _backfill(self, db: Session) -> None:
+        """Berechnet fehlende SimHashes (Dokumente aus der Zeit, bevor sie immer gespeichert wurden)."""
+        updated = 0
+        while True:
+            rows = db.query(DocumentModel.id, DocumentModel.content).filter(
+                DocumentModel.tenant_id == self.tenant_id,
+                DocumentModel.simhash.is_(None)
+            ).limit(BACKFILL_BATCH_SIZE).all()
+            if not rows:
+                break
+            db.execute(update(DocumentModel), [{"id": row.id, "simhash": simhash(row.content)} for row in rows])
+            db.commit()
+            updated += len(rows)
+        if updated:
+            logger.info(f"SimHash für {updated} Dokumente des Tenants {self.tenant_id} nachberechnet")
+
+
+class SimhashIndexCache:
+    """Hält je Tenant einen TenantSimhashIndex im Worker-Prozess."""
+
+    def __init__(self):
+        self._indexes: Dict[str, TenantSimhashIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, tenant_id: str) -> TenantSimhashIndex:
+        """Gibt den aktuellen Index des Tenants zurück und lädt neue Dokumente nach."""
+        with self._lock:
+            index = self._indexes.get(tenant_id)
+            if index is None:
+                index = self._indexes[tenant_id] = TenantSimhashIndex(tenant_id)
+        index.refresh(db)
+        return index
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Verwirft den Index eines Tenants (oder aller Tenants)."""
+        with self._lock:
+            if tenant_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(tenant_id, None)
+
+
+class DuplicateFilter:
+    """
+    Filtert Duplikate aus den Dokumenten eines Imports.
+
+    Berücksichtigt sowohl bereits gespeicherte Dokumente des Tenants als auch
+    Duplikate innerhalb desselben Imports.
+    """
+
+    def __init__(self, db: Session, tenant_id: str, near_duplicates: bool = False, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.near_duplicates = near_duplicates
+        self.max_distance = min(max_distance, BAND_COUNT - 1)
+        self._seen_hashes: Set[str] = set()
+        # SimHashes dieses Imports; erst nach dem Commit über den Tenant-Index sichtbar
+        self._seen_simhashes = SimhashBands()
+
+    @classmethod
+    def for_tenant(cls, db: Session, tenant_id: str) -> "DuplicateFilter":
+        """Erzeugt einen Filter mit den Einstellungen aus der Tenant-Konfiguration."""
+        tenant = db.query(TenantModel.config).filter(TenantModel.id == tenant_id).first()
+        config = (tenant.config if tenant else None) or {}
+        return cls(
+            db,
+            tenant_id,
+            near_duplicates=bool(config.get("near_duplicate_detection", False)),
+            max_distance=int(config.get("near_duplicate_max_distance", DEFAULT_MAX_DISTANCE))
+        )
+
+    def filter_rows(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Trennt neue Dokumente von Duplikaten und ergänzt content_hash und simhash.
+
+        :param rows: Dicts mit mindestens title und content
+        :return: Tupel aus (neue Zeilen, Duplikate mit title und Grund)
+        """
+        for row in rows:
+            row["content_hash"] = content_hash(row["content"])
+
+        hashes = list({row["content_hash"] for row in rows})
+        existing = {
+            value for (value,) in self.db.query(DocumentModel.content_hash).filter(
+                DocumentModel.tenant_id == self.tenant_id,
+                DocumentModel.content_hash.in_(hashes)
+            ).all()
+        } if hashes else set()
+
+        tenant_index = simhash_index_cache.get(self.db, self.tenant_id) if self.near_duplicates else None
+
+        accepted: List[Dict[str, Any]] = []
+        duplicates: List[Dict[str, Any]] = []
+        for row in rows:
+            digest = row["content_hash"]
+            if digest in existing or digest in self._seen_hashes:
+                duplicates.append({"title": row["title"], "reason": "exact"})
+                continue
+
+            value = simhash(row["content"])
+            if tenant_index is not None and (
+                self._seen_simhashes.contains_near(value, self.max_distance)
+                or tenant_index.contains_near(value, self.max_distance)
+            ):
+                duplicates.append({"title": row["title"], "reason": "near"})
+                continue
+
+            row["simhash"] = value
+            self._seen_simhashes.add(value)
+            self._seen_hashes.add(digest)
+            accepted.append(row)
+
+        if duplicates:
+            logger.info(f"{len(duplicates)} doppelte Dokumente für Tenant {self.tenant_id} übersprungen")
+        return accepted, duplicates
+
+
+def _on_knowledge_changed(tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+    # Neue Dokumente werden über created_at nachgeladen, nur Löschungen erfordern einen Neuaufbau
+    if payload.get("operation", "delete") == "delete":
+        simhash_index_cache.invalidate(tenant_id)
+
+
+# Singleton-Instanz
+simhash_index_cache = SimhashIndexCache()
+cache_bus.subscribe(KNOWLEDGE_CHANGED, _on_knowledge_changed)
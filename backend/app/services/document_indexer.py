@@ -0,0 +1,278 @@
+"""
+Outbox-Indexer für Dokumente.
+
+Dokumente werden zusammen mit einer Index-Aufgabe in einer Transaktion in
+Postgres gespeichert. Der Indexer arbeitet die Aufgaben im Hintergrund in
+Batches ab und schreibt sie nach Weaviate. Fehlgeschlagene Aufgaben werden
+mit exponentiellem Backoff erneut versucht.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import DocumentIndexTaskModel, DocumentModel
+from ..db.session import SessionLocal
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .weaviate_service import weaviate_service
+
+logger = logging.getLogger(__name__)
+
+# Obergrenze für die Wartezeit zwischen zwei Versuchen (Sekunden)
+MAX_BACKOFF_SECONDS = 600
+
+
+class DocumentIndexer:
+    """
+    Arbeitet die Outbox-Tabelle document_index_tasks ab.
+
+    Mehrere Worker-Prozesse können parallel laufen, da die Aufgaben mit
+    FOR UPDATE SKIP LOCKED gesperrt werden.
+    """
+
+    def __init__(self, batch_size: int = 100, poll_interval: float = 2.0, max_attempts: int = 8):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Zähler für Metriken
+        self.indexed_count = 0
+        self.deleted_count = 0
+        self.retry_count = 0
+        self.failed_count = 0
+        self.last_run_at: Optional[datetime] = None
+
+    @staticmethod
+    def enqueue(db: Session, tenant_id: str, document_id: str, operation: str = "upsert") -> None:
+        """
+        Legt eine Index-Aufgabe in der aktuellen Session an.
+        Der Commit erfolgt durch den Aufrufer zusammen mit der Dokumentänderung.
+        """
+        db.add(DocumentIndexTaskModel(
+            tenant_id=tenant_id,
+            document_id=document_id,
+            operation=operation
+        ))
+
+    @staticmethod
+    def enqueue_many(db: Session, tenant_id: str, document_ids: List[str], operation: str = "upsert") -> None:
+        """Legt Index-Aufgaben für mehrere Dokumente in der aktuellen Session an."""
+        db.add_all([
+            DocumentIndexTaskModel(tenant_id=tenant_id, document_id=document_id, operation=operation)
+            for document_id in document_ids
+        ])
+
+    def start(self) -> None:
+        """Startet die Hintergrundschleife im laufenden Event-Loop."""
+        if self._task is not None:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Dokument-Indexer gestartet")
+
+    async def stop(self) -> None:
+        """Beendet die Hintergrundschleife."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Dokument-Indexer gestoppt")
+
+    async def _run(self) -> None:
+        """Arbeitet die Outbox ab, solange Aufgaben vorhanden sind, und wartet sonst."""
+        while self._running:
+            try:
+                processed = await asyncio.to_thread(self.process_batch)
+            except Exception as e:
+                logger.error(f"Fehler im Dokument-Indexer: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def process_batch(self) -> int:
+        """
+        Verarbeitet einen Batch fälliger Aufgaben.
+
+        :return: Anzahl der verarbeiteten Aufgaben
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            tasks = db.query(DocumentIndexTaskModel).filter(
+                DocumentIndexTaskModel.status == "pending",
+                DocumentIndexTaskModel.available_at <= now
+            ).order_by(
+                DocumentIndexTaskModel.id
+            ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            self.last_run_at = now
+            if not tasks:
+                db.commit()
+                return 0
+
+            # Nach Tenant und Operation gruppieren, damit pro Gruppe ein Weaviate-Aufruf reicht
+            groups: Dict[tuple, List[DocumentIndexTaskModel]] = defaultdict(list)
+            for task in tasks:
+                groups[(task.tenant_id, task.operation)].append(task)
+
+            completed: Dict[tuple, List[str]] = {}
+            for (tenant_id, operation), group in groups.items():
+                if operation == "delete":
+                    completed[(tenant_id, operation)] = self._process_deletes(tenant_id, group, db)
+                else:
+                    completed[(tenant_id, operation)] = self._process_upserts(tenant_id, group, db)
+
+            db.commit()
+
+            # Geänderte Wissensbasen an die Caches aller Worker melden
+            for (tenant_id, operation), document_ids in completed.items():
+                if document_ids:
+                    cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id, operation=operation, document_ids=document_ids)
+            return len(tasks)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _process_upserts(self, tenant_id: str, tasks: List[DocumentIndexTaskModel], db: Session) -> List[str]:
+        """
+        Schreibt die Dokumente einer Gruppe gebündelt nach Weaviate.
+
+        :return: IDs der erfolgreich indizierten Dokumente
+        """
+        document_ids = list(dict.fromkeys(task.document_id for task in tasks))
+        documents = db.query(DocumentModel).filter(
+            DocumentModel.tenant_id == tenant_id,
+            DocumentModel.id.in_(document_ids)
+        ).all()
+        by_id = {doc.id: doc for doc in documents}
+
+        payload = [
+            {
+                "id": doc.id,
+                "title": doc.title,
+                "content": doc.content,
+                "metadata": doc.doc_metadata or {},
+                "source": doc.source
+            }
+            for doc in by_id.values()
+        ]
+
+        try:
+            result = weaviate_service.add_documents(tenant_id, payload)
+        except Exception as e:
+            for task in tasks:
+                self._schedule_retry(task, str(e))
+            return []
+
+        failed = result.get("failed", {})
+        for task in tasks:
+            if task.document_id in failed:
+                self._schedule_retry(task, str(failed[task.document_id]))
+            else:
+                # Dokument indiziert oder inzwischen gelöscht: Aufgabe erledigt
+                db.delete(task)
+        self.indexed_count += len(result.get("inserted", []))
+        return list(result.get("inserted", []))
+
+    def _process_deletes(self, tenant_id: str, tasks: List[DocumentIndexTaskModel], db: Session) -> List[str]:
+        """
+        Löscht die Dokumente einer Gruppe mit einer Anfrage aus Weaviate.
+
+        :return: IDs der gelöschten Dokumente
+        """
+        document_ids = list(dict.fromkeys(task.document_id for task in tasks))
+        try:
+            self.deleted_count += weaviate_service.delete_documents(tenant_id, document_ids)
+        except Exception as e:
+            for task in tasks:
+                self._schedule_retry(task, str(e))
+            return []
+
+        for task in tasks:
+            db.delete(task)
+        return document_ids
+
+    def _schedule_retry(self, task: DocumentIndexTaskModel, error: str) -> None:
+        """Plant einen erneuten Versuch mit exponentiellem Backoff oder markiert die Aufgabe als fehlgeschlagen."""
+        task.attempts += 1
+        task.last_error = error[:2000]
+        if task.attempts >= self.max_attempts:
+            task.status = "failed"
+            self.failed_count += 1
+            logger.error(
+                f"Indizierung von Dokument {task.document_id} (Tenant {task.tenant_id}) "
+                f"nach {task.attempts} Versuchen aufgegeben: {error}"
+            )
+            return
+
+        delay = min(2 ** task.attempts, MAX_BACKOFF_SECONDS)
+        task.available_at = datetime.utcnow() + timedelta(seconds=delay)
+        self.retry_count += 1
+        logger.warning(
+            f"Indizierung von Dokument {task.document_id} fehlgeschlagen, "
+            f"neuer Versuch in {delay}s: {error}"
+        )
+
+    def get_stats(self, db: Session, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Gibt Metriken zur Outbox zurück, insbesondere die Indizierungsverzögerung
+        (Alter der ältesten offenen Aufgabe in Sekunden).
+        """
+        query = db.query(
+            DocumentIndexTaskModel.status,
+            func.count(DocumentIndexTaskModel.id),
+            func.min(DocumentIndexTaskModel.created_at)
+        )
+        if tenant_id:
+            query = query.filter(DocumentIndexTaskModel.tenant_id == tenant_id)
+        rows = query.group_by(DocumentIndexTaskModel.status).all()
+
+        counts = {status: count for status, count, _ in rows}
+        oldest_pending = next((oldest for status, _, oldest in rows if status == "pending"), None)
+        lag_seconds = (datetime.utcnow() - oldest_pending).total_seconds() if oldest_pending else 0.0
+
+        return {
+            "pending": counts.get("pending", 0),
+            "failed": counts.get("failed", 0),
+            "indexing_lag_seconds": round(max(lag_seconds, 0.0), 1),
+            "indexed": self.indexed_count,
+            "deleted": self.deleted_count,
+            "retries": self.retry_count,
+            "running": self._running,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None
+        }
+
+    def retry_failed(self, db: Session, tenant_id: str) -> int:
+        """Setzt fehlgeschlagene Aufgaben eines Tenants zurück, damit sie erneut versucht werden."""
+        updated = db.query(DocumentIndexTaskModel).filter(
+            DocumentIndexTaskModel.tenant_id == tenant_id,
+            DocumentIndexTaskModel.status == "failed"
+        ).update({
+            DocumentIndexTaskModel.status: "pending",
+            DocumentIndexTaskModel.attempts: 0,
+            DocumentIndexTaskModel.available_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return updated
+
+
+# Singleton-Instanz
+document_indexer = DocumentIndexer(
+    batch_size=settings.INDEXER_BATCH_SIZE,
+    poll_interval=settings.INDEXER_POLL_INTERVAL,
+    max_attempts=settings.INDEXER_MAX_ATTEMPTS
+)
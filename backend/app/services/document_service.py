@@ -1,8 +1,24 @@
-from typing import List, Optional
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Select, and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..db.models import DocumentModel
 from ..schemas.document import Document, DocumentCreate
 
+logger = logging.getLogger(__name__)
+
+# Felder, die über den fields-Parameter ausgewählt werden können
+DOCUMENT_FIELDS = ("id", "tenant_id", "title", "content", "source", "doc_metadata", "created_at")
+
+# Unterhalb dieser geschätzten Anzahl wird exakt gezählt (über den Index günstig)
+EXACT_COUNT_THRESHOLD = 10000
+
+_ESTIMATE_SQL = text("EXPLAIN (FORMAT JSON) SELECT 1 FROM documents WHERE tenant_id = :tenant_id")
+
 class DocumentService:
     def get_document(self, db: Session, document_id: str) -> Optional[Document]:
         """Ein einzelnes Dokument abrufen"""
@@ -34,6 +50,153 @@ class DocumentService:
             db.commit()
             return True
         return False
+    @staticmethod
+    def encode_cursor(created_at: datetime, document_id: str) -> str:
+        """Erzeugt einen Cursor aus der Sortierposition des letzten Dokuments."""
+        raw = json.dumps([created_at.isoformat() if created_at else None, document_id])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+        """
+        Liest die Sortierposition aus einem Cursor.
+
+        :raises ValueError: bei ungültigem Cursor
+        """
+        try:
+            created_at, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return (datetime.fromisoformat(created_at) if created_at else None), str(document_id)
+        except Exception as e:
+            raise ValueError(f"Ungültiger Cursor: {e}")
+
+    def _page_statement(
+        self,
+        tenant_id: str,
+        limit: int,
+        cursor: Optional[str],
+        fields: Optional[List[str]]
+    ) -> Tuple[Select, set]:
+        """
+        Baut die Abfrage für eine Seite (synchron und asynchron verwendet).
+
+        :return: Tupel aus SELECT-Statement und angeforderten Feldern
+        :raises ValueError: bei unbekannten Feldern oder ungültigem Cursor
+        """
+        selected = list(DOCUMENT_FIELDS)
+        if fields:
+            unknown = [f for f in fields if f not in DOCUMENT_FIELDS]
+            if unknown:
+                raise ValueError(f"Unbekannte Felder: {', '.join(unknown)}")
+            # id und created_at werden für den Cursor immer benötigt
+            selected = list(dict.fromkeys(["id", "created_at", *fields]))
+
+        columns = [getattr(DocumentModel, f) for f in selected]
+        statement = select(*columns).where(DocumentModel.tenant_id == tenant_id)
+
+        if cursor:
+            created_at, document_id = self.decode_cursor(cursor)
+            statement = statement.where(or_(
+                DocumentModel.created_at < created_at,
+                and_(DocumentModel.created_at == created_at, DocumentModel.id < document_id)
+            ))
+
+        statement = statement.order_by(
+            DocumentModel.created_at.desc(),
+            DocumentModel.id.desc()
+        ).limit(limit + 1)
+
+        requested = set(fields) if fields else set(DOCUMENT_FIELDS)
+        return statement, requested
+
+    def _page_result(self, rows: List[Any], limit: int, requested: set) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self.encode_cursor(last.created_at, last.id)
+
+        documents = [
+            {key: value for key, value in row._mapping.items() if key in requested or key == "id"}
+            for row in rows
+        ]
+        return documents, next_cursor
+
+    def list_documents_page(
+        self,
+        db: Session,
+        tenant_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Liefert eine Seite von Dokumenten eines Tenants per Keyset-Pagination.
+
+        Sortiert wird absteigend nach (created_at, id), passend zum Index
+        ix_documents_tenant_created_id. Über fields können Spalten ausgewählt
+        werden, z.B. um content in Listenansichten auszulassen.
+
+        :return: Tupel aus Dokumenten und Cursor für die nächste Seite (oder None)
+        :raises ValueError: bei unbekannten Feldern oder ungültigem Cursor
+        """
+        statement, requested = self._page_statement(tenant_id, limit, cursor, fields)
+        rows = db.execute(statement).all()
+        return self._page_result(rows, limit, requested)
+
+    async def alist_documents_page(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Wie list_documents_page, mit AsyncSession."""
+        statement, requested = self._page_statement(tenant_id, limit, cursor, fields)
+        rows = (await db.execute(statement)).all()
+        return self._page_result(rows, limit, requested)
+
+    def estimate_document_count(self, db: Session, tenant_id: str) -> int:
+        """
+        Schätzt die Anzahl der Dokumente eines Tenants.
+
+        Auf PostgreSQL wird die Schätzung des Query-Planers verwendet; nur bei
+        kleinen Mengen wird exakt gezählt. Andere Datenbanken zählen exakt.
+        """
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            try:
+                estimate = self._planner_estimate(db.execute(_ESTIMATE_SQL, {"tenant_id": tenant_id}).scalar())
+                if estimate >= EXACT_COUNT_THRESHOLD:
+                    return estimate
+            except Exception as e:
+                logger.warning(f"Fehler bei der Schätzung der Dokumentanzahl: {e}")
+
+        return db.execute(self._count_statement(tenant_id)).scalar()
+
+    async def aestimate_document_count(self, db: AsyncSession, tenant_id: str) -> int:
+        """Wie estimate_document_count, mit AsyncSession."""
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            try:
+                estimate = self._planner_estimate(
+                    (await db.execute(_ESTIMATE_SQL, {"tenant_id": tenant_id})).scalar()
+                )
+                if estimate >= EXACT_COUNT_THRESHOLD:
+                    return estimate
+            except Exception as e:
+                logger.warning(f"Fehler bei der Schätzung der Dokumentanzahl: {e}")
+
+        return (await db.execute(self._count_statement(tenant_id))).scalar()
+
+    @staticmethod
+    def _planner_estimate(plan: Any) -> int:
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def _count_statement(tenant_id: str) -> Select:
+        return select(func.count(DocumentModel.id)).where(DocumentModel.tenant_id == tenant_id)
+
 
 # Singleton-Instanz
 document_service = DocumentService() 
\ No newline at end of file
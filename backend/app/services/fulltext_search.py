@@ -0,0 +1,166 @@
+"""
+Volltextsuche in PostgreSQL als Retrieval-Backend.
+
+Die Spalte documents.search_vector ist eine von PostgreSQL gepflegte
+(GENERATED ... STORED) tsvector-Spalte mit deutscher Textsuchkonfiguration:
+Titel mit Gewicht A, Inhalt mit Gewicht B. Sie wird bei jedem Schreiben des
+Dokuments aktualisiert und ist per GIN-Index durchsuchbar (Migration
+add_documents_search_vector).
+
+Verwendung:
+- pro Tenant statt Weaviate: TenantModel.config["retrieval_backend"] = "fulltext"
+  (bzw. global über RETRIEVAL_BACKEND), z. B. für kleine Tenants
+- automatisch als Rückfall, wenn Weaviate nicht erreichbar ist
+- über /api/v1/search mit mode="fulltext"
+
+Strukturierte Daten (Schulen, Ämter, Veranstaltungen, ...) liegen nur in
+Weaviate. Der Chat sucht sie auch für Volltext-Tenants dort, solange Weaviate
+erreichbar ist; bei gestörtem Weaviate fehlen sie in der Antwort.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..db.models import Tenant
+from ..db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Gültige Werte für TenantModel.config["retrieval_backend"] bzw. RETRIEVAL_BACKEND
+RETRIEVAL_BACKENDS = ("weaviate", "fulltext")
+
+# Textsuchkonfiguration; muss der Konfiguration der Spalte search_vector entsprechen
+TEXT_SEARCH_CONFIG = "german"
+
+
+def any_term_query(query: str) -> str:
+    """
+    Verknüpft die Wörter einer Frage für websearch_to_tsquery mit "or". Anführungszeichen,
+    führende Minuszeichen und das Wort "or" selbst haben in dieser Syntax eine eigene
+    Bedeutung (Phrase, Ausschluss, Operator) und werden entfernt.
+    """
+    words = (word.lstrip("-") for word in query.replace('"', " ").split())
+    return " or ".join(word for word in words if word and word.lower() != "or")
+
+
+class FullTextSearchService:
+    """
+    Sucht Dokumente eines Tenants über den tsvector-Index und rankt mit ts_rank_cd.
+
+    Die Suchbegriffe werden von PostgreSQL normalisiert (Stoppwörter,
+    Stammformen) und ODER-verknüpft (websearch_to_tsquery mit "or" zwischen den
+    Wörtern, siehe any_term_query), damit natürlichsprachliche Fragen auch
+    Dokumente finden, die nicht jeden Begriff enthalten. Dokumente mit allen
+    Begriffen (plainto_tsquery) werden vorangestellt, innerhalb der Gruppen
+    entscheidet ts_rank_cd (Normalisierung 32: rank / (rank + 1), also 0..1).
+    """
+
+    _SEARCH_SQL = text("""
+        WITH q AS (
+            SELECT plainto_tsquery(CAST(:config AS regconfig), :query) AS all_terms,
+                   websearch_to_tsquery(CAST(:config AS regconfig), :any_query) AS any_term
+        )
+        SELECT d.id, d.title, d.content, d.source, d.doc_metadata,
+               ts_rank_cd(d.search_vector, q.any_term, 32) AS score,
+               d.search_vector @@ q.all_terms AS all_terms
+        FROM documents d, q
+        WHERE d.tenant_id = :tenant_id
+          AND d.search_vector @@ q.any_term
+        ORDER BY all_terms DESC, score DESC, d.id
+        LIMIT :limit
+    """)
+
+    def __init__(self, config: str = TEXT_SEARCH_CONFIG):
+        self.config = config
+        self._lock = threading.Lock()
+
+        # Zähler für Metriken
+        self.searches = 0
+        self.errors = 0
+        self.search_ms_total = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Die Volltextsuche benötigt PostgreSQL (nicht z. B. SQLite in der Entwicklung)."""
+        return engine.dialect.name == "postgresql"
+
+    def search(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Volltextsuche in den Dokumenten des Tenants. Die Treffer haben das
+        Format von SearchManager.search, ergänzt um `all_terms`.
+        """
+        if not self.available:
+            raise RuntimeError("Volltextsuche benötigt PostgreSQL")
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            rows = connection.execute(self._SEARCH_SQL, {
+                "config": self.config,
+                "query": query,
+                "any_query": any_term_query(query),
+                "tenant_id": tenant_id,
+                "limit": limit
+            }).all()
+        with self._lock:
+            self.searches += 1
+            self.search_ms_total += (time.perf_counter() - started) * 1000
+        return [self._to_result(row) for row in rows]
+
+    def safe_search(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Wie search, gibt bei Fehlern (z. B. Datenbank nicht erreichbar) aber eine leere Liste zurück."""
+        try:
+            return self.search(tenant_id, query, limit)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.error(f"Fehler bei der Volltextsuche für Tenant {tenant_id}: {e}")
+            return []
+
+    @staticmethod
+    def _to_result(row: Any) -> Dict[str, Any]:
+        return {
+            "class": "fulltext",
+            "id": row.id,
+            "score": float(row.score),
+            "all_terms": bool(row.all_terms),
+            "properties": {
+                "title": row.title,
+                "content": row.content,
+                "document_id": row.id,
+                "source": row.source,
+                "metadata": row.doc_metadata
+            }
+        }
+
+    def backend_for_tenant(self, tenant: Optional[Tenant]) -> str:
+        """
+        Gibt das Retrieval-Backend eines Tenants zurück ("weaviate" oder "fulltext").
+        Ohne PostgreSQL wird immer Weaviate verwendet.
+        """
+        config = (tenant.config if tenant is not None else None) or {}
+        backend = config.get("retrieval_backend") or settings.RETRIEVAL_BACKEND
+        if backend not in RETRIEVAL_BACKENDS:
+            logger.warning(f"Unbekanntes Retrieval-Backend '{backend}', verwende Weaviate")
+            return "weaviate"
+        if backend == "fulltext" and not self.available:
+            return "weaviate"
+        return backend
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Anzahl, Fehler und mittlere Latenz der Suchen zurück."""
+        with self._lock:
+            return {
+                "available": self.available,
+                "config": self.config,
+                "searches": self.searches,
+                "errors": self.errors,
+                "avg_search_ms": round(self.search_ms_total / self.searches, 3) if self.searches else None
+            }
+
+
+# Singleton-Instanz
+fulltext_search_service = FullTextSearchService()
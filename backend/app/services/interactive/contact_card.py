@@ -7,6 +7,7 @@ from typing import Dict, List, Any, Optional
 import re
 import logging
 from . import InteractiveElement
+from ...utils.aho_corasick import AhoCorasick
 
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
@@ -23,8 +24,35 @@ class ContactElement(InteractiveElement):
         """
         super().__init__("contact_card", contact_data, tenant_id)
 
+# Muster für explizite Hinweise auf Kontaktanfragen (einmal kompiliert)
+CONTACT_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'kontakt\w*', r'telefon\w*', r'nummer\w*', r'anruf\w*',
+        r'email\w*', r'mail\w*', r'adresse\w*', r'standort\w*',
+        r'öffnungszeit\w*', r'sprechstunde\w*', r'info\w*',
+        r'erreichbar\w*', r'verbind\w*'
+    )
+]
+
+# Art eines Treffers im Automaten
+_NAME = "name"
+_KEYWORD = "keyword"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
 class ContactExtractor:
-    """Extrahiert Kontaktinformationen aus Dokumenten."""
+    """
+    Extrahiert Kontaktinformationen aus Dokumenten.
+
+    Beim Erstellen wird die Kontaktkonfiguration einmal kompiliert: ein Index
+    ID -> Kontakt und ein Aho-Corasick-Automat über alle Kontaktnamen und
+    Keywords. Eine Extraktion liest Anfrage und Dokumente dadurch je einmal,
+    unabhängig von der Anzahl der Kontakte. Die Factory hält den Extraktor pro
+    Tenant, bis sich die Konfiguration ändert.
+    """
     
     def __init__(self, tenant_config: Dict[str, Any]):
         """
@@ -35,7 +63,12 @@ class ContactExtractor:
         self.tenant_config = tenant_config
         # Kontaktentitäten aus der Konfiguration laden
         self.contacts = tenant_config.get("contacts", [])
+        # Bei doppelten IDs gilt (wie bisher) der erste Kontakt
+        self.contacts_by_id: Dict[Any, Dict[str, Any]] = {}
+        for contact in self.contacts:
+            self.contacts_by_id.setdefault(contact.get("id"), contact)
         self.keywords = self._build_keyword_index()
+        self._automaton = self._build_automaton()
         
         logger.info(f"ContactExtractor initialisiert mit {len(self.contacts)} Kontakten")
         logger.info(f"Keyword-Index erstellt mit {len(self.keywords)} Schlüsselwörtern")
@@ -45,94 +78,84 @@ class ContactExtractor:
         keyword_index = {}
         for contact in self.contacts:
             contact_id = contact.get("id")
-            logger.debug(f"Verarbeite Kontakt: {contact.get('name')} (ID: {contact_id})")
-            
             for keyword in contact.get("keywords", []):
                 keyword = keyword.lower()
                 if keyword not in keyword_index:
                     keyword_index[keyword] = []
                 keyword_index[keyword].append(contact_id)
-                logger.debug(f"  Keyword '{keyword}' -> Kontakt-ID {contact_id}")
         
         return keyword_index
     
+    def _build_automaton(self) -> AhoCorasick:
+        """Baut den Automaten über alle Kontaktnamen und Keywords."""
+        automaton: AhoCorasick = AhoCorasick()
+        for contact in self.contacts:
+            name = contact.get("name", "").lower()
+            if name:
+                automaton.add(name, (_NAME, contact.get("id")))
+        for keyword, contact_ids in self.keywords.items():
+            automaton.add(keyword, (_KEYWORD, contact_ids))
+        automaton.build()
+        return automaton
+    
     def extract_contacts(self, query: str, doc_texts: List[str]) -> List[Dict[str, Any]]:
         """
         Extrahiert relevante Kontakte basierend auf der Anfrage und gefundenen Dokumenten.
         
+        Keywords zählen pro Vorkommen als ganzes Wort in der Anfrage (+1),
+        Kontaktnamen einmal pro Dokument, in dem sie vorkommen (+2).
+        
         :param query: Die Benutzeranfrage
         :param doc_texts: Texte der relevanten Dokumente
         :return: Liste der gefundenen Kontakte in absteigender Relevanz
         """
         logger.info(f"Kontaktsuche für Anfrage: '{query}'")
-        
-        # Relevante Keywords aus der Anfrage extrahieren
-        keywords = self._extract_keywords(query.lower())
-        logger.info(f"Extrahierte Keywords: {keywords}")
+        query_lower = query.lower()
         
         # Relevante Kontakt-IDs sammeln
-        contact_scores = {}
-        
-        # Durch Keywords iterieren und Scores berechnen
-        for keyword in keywords:
-            if keyword in self.keywords:
-                for contact_id in self.keywords[keyword]:
-                    if contact_id not in contact_scores:
-                        contact_scores[contact_id] = 0
-                    contact_scores[contact_id] += 1
-                    logger.debug(f"Keyword-Match: '{keyword}' -> Kontakt {contact_id}, Score +1")
-        
-        # Kontextuelles Scoring basierend auf Dokumenten
-        for i, doc_text in enumerate(doc_texts):
-            doc_lower = doc_text.lower()
-            for contact in self.contacts:
-                contact_id = contact.get("id")
-                name = contact.get("name", "").lower()
-                
-                # Wenn der Kontaktname im Dokument erwähnt wird
-                if name and name in doc_lower:
-                    if contact_id not in contact_scores:
-                        contact_scores[contact_id] = 0
-                    contact_scores[contact_id] += 2  # Höhere Gewichtung für direkte Erwähnungen
-                    logger.debug(f"Name-Match: '{name}' in Dokument {i}, Kontakt {contact_id}, Score +2")
-        
-        logger.info(f"Kontakt-Scores: {contact_scores}")
+        contact_scores: Dict[Any, int] = {}
+        
+        # Keywords der Anfrage (nur ganze Wörter)
+        for end, keyword, (kind, contact_ids) in self._automaton.iter(query_lower):
+            if kind != _KEYWORD or not self._is_whole_word(query_lower, end - len(keyword), end):
+                continue
+            for contact_id in contact_ids:
+                contact_scores[contact_id] = contact_scores.get(contact_id, 0) + 1
+        
+        # Explizite Hinweise auf Kontaktanfragen zählen für das Keyword "kontakt"
+        contact_hints = sum(1 for pattern in CONTACT_PATTERNS if pattern.search(query_lower))
+        if contact_hints:
+            for contact_id in self.keywords.get("kontakt", []):
+                contact_scores[contact_id] = contact_scores.get(contact_id, 0) + contact_hints
+        
+        # Kontextuelles Scoring: Kontaktnamen, die in den Dokumenten erwähnt werden
+        for doc_text in doc_texts:
+            mentioned = {
+                contact_id
+                for _, _, (kind, contact_id) in self._automaton.iter(doc_text.lower())
+                if kind == _NAME
+            }
+            for contact_id in mentioned:
+                # Höhere Gewichtung für direkte Erwähnungen
+                contact_scores[contact_id] = contact_scores.get(contact_id, 0) + 2
+        
+        logger.debug(f"Kontakt-Scores: {contact_scores}")
         
         # Sortierte Liste der relevanten Kontakte erstellen
         relevant_contacts = []
         for contact_id, score in sorted(contact_scores.items(), key=lambda x: x[1], reverse=True):
-            # Kontakt mit dieser ID finden
-            for contact in self.contacts:
-                if contact.get("id") == contact_id:
-                    contact_with_score = contact.copy()
-                    contact_with_score["relevance_score"] = score
-                    relevant_contacts.append(contact_with_score)
-                    logger.info(f"Relevanter Kontakt: {contact.get('name')}, Score: {score}")
-                    break
+            contact = self.contacts_by_id.get(contact_id)
+            if contact is None:
+                continue
+            contact_with_score = contact.copy()
+            contact_with_score["relevance_score"] = score
+            relevant_contacts.append(contact_with_score)
         
         logger.info(f"Gefunden: {len(relevant_contacts)} relevante Kontakte")
         return relevant_contacts
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extrahiert relevante Keywords aus dem Text."""
-        # Verbesserte Methode mit kontextsensitiver Erkennung
-        keywords = []
-        
-        # Einfache Wörter mit mindestens 4 Buchstaben
-        simple_words = re.findall(r'\b\w{4,}\b', text)
-        keywords.extend(simple_words)
-        
-        # Suche nach expliziten Hinweisen auf Kontakte
-        contact_patterns = [
-            r'kontakt\w*', r'telefon\w*', r'nummer\w*', r'anruf\w*', 
-            r'email\w*', r'mail\w*', r'adresse\w*', r'standort\w*', 
-            r'öffnungszeit\w*', r'sprechstunde\w*', r'info\w*', 
-            r'erreichbar\w*', r'verbind\w*'
-        ]
-        
-        for pattern in contact_patterns:
-            if re.search(pattern, text):
-                logger.debug(f"Kontakt-Pattern gefunden: '{pattern}' in '{text}'")
-                keywords.append('kontakt')  # Spezialschlüssel für Kontakt-bezogene Anfragen
-        
-        return keywords 
\ No newline at end of file
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        """Prüft, ob text[start:end] an Wortgrenzen beginnt und endet."""
+        return ((start == 0 or not _is_word_char(text[start - 1]))
+                and (end == len(text) or not _is_word_char(text[end])))
@@ -3,11 +3,14 @@ Factory-Modul für interaktive Elemente.
 Stellt eine zentrale Schnittstelle zur Erzeugung von interaktiven Elementen bereit.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import json
 import re
 from . import InteractiveElement, InteractiveResponse
 from .contact_card import ContactElement, ContactExtractor
-from .intent_detection import IntentDetector
+from .intent_detection import intent_detector
+from ..cache_bus import INTERACTIVE_CONFIG_CHANGED, cache_bus
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,11 +20,14 @@ class InteractiveElementFactory:
     
     def __init__(self):
         self._element_extractors = {}
+        # Kompilierte Kontaktextraktoren mit Fingerprint der Kontaktkonfiguration;
+        # bleiben über invalidate_tenant hinaus erhalten, solange sich die Kontakte nicht ändern
+        self._contact_extractors: Dict[str, Tuple[str, ContactExtractor]] = {}
         self._element_creators = {
             "contact_card": self._create_contact_card
         }
-        # Intent-Detektor initialisieren
-        self._intent_detector = IntentDetector()
+        # Gemeinsamer Intent-Detektor (Modell, Worker und Cache nur einmal pro Prozess)
+        self._intent_detector = intent_detector
         
         # Kontakt-bezogene Muster für einfache Pattern-basierte Intent-Erkennung (Fallback)
         self._contact_patterns = [
@@ -42,9 +48,56 @@ class InteractiveElementFactory:
         """
         if "contacts" in config:
             self._element_extractors[tenant_id] = {
-                "contact_card": ContactExtractor(config)
+                "contact_card": self._get_contact_extractor(tenant_id, config)
             }
             logger.info(f"Registered contact extractor for tenant {tenant_id} with {len(config.get('contacts', []))} contacts")
+        else:
+            self._contact_extractors.pop(tenant_id, None)
+            self._element_extractors[tenant_id] = {}
+    
+    def _get_contact_extractor(self, tenant_id: str, config: Dict[str, Any]) -> ContactExtractor:
+        """Gibt den kompilierten Kontaktextraktor zurück; neu gebaut wird nur bei geänderten Kontakten."""
+        fingerprint = hashlib.sha1(
+            json.dumps(config.get("contacts", []), sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        cached = self._contact_extractors.get(tenant_id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        extractor = ContactExtractor(config)
+        self._contact_extractors[tenant_id] = (fingerprint, extractor)
+        return extractor
+    
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        """
+        Verwirft die Extraktoren eines Mandanten; sie werden bei der nächsten
+        Anfrage mit der aktuellen Konfiguration aus der Datenbank neu erstellt.
+        """
+        self._element_extractors.pop(tenant_id, None)
+    
+    def _get_extractors(self, tenant_id: str) -> Dict[str, Any]:
+        """Gibt die Extraktoren eines Mandanten zurück und lädt sie bei Bedarf aus der Datenbank."""
+        extractors = self._element_extractors.get(tenant_id)
+        if extractors is not None:
+            return extractors
+        
+        # Import innerhalb der Funktion, um zirkuläre Importe zu vermeiden
+        from ...db.models import InteractiveConfigModel
+        from ...db.session import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            db_config = db.query(InteractiveConfigModel).filter(
+                InteractiveConfigModel.tenant_id == tenant_id
+            ).first()
+            config = db_config.config if db_config and db_config.config else {}
+        except Exception as e:
+            logger.error(f"Interaktive Konfiguration für Tenant {tenant_id} konnte nicht geladen werden: {e}")
+            return {}
+        finally:
+            db.close()
+        
+        self.register_tenant_config(tenant_id, config)
+        return self._element_extractors[tenant_id]
     
     def extract_interactive_elements(
         self, 
@@ -60,10 +113,33 @@ class InteractiveElementFactory:
         :param doc_texts: Texte der gefundenen Dokumente
         :return: Liste der extrahierten interaktiven Elemente
         """
-        elements = []
-        
         # Intent-Erkennung durchführen
         is_contact_intent, confidence = self._detect_contact_intent(query)
+        return self._extract_for_intent(tenant_id, query, doc_texts, is_contact_intent, confidence)
+    
+    async def aextract_interactive_elements(
+        self, 
+        tenant_id: str, 
+        query: str, 
+        doc_texts: List[str]
+    ) -> List[InteractiveElement]:
+        """
+        Wie extract_interactive_elements, wartet aber auf das Embedding der
+        Anfrage, ohne den Event-Loop zu blockieren.
+        """
+        is_contact_intent, confidence = await self._intent_detector.adetect_contact_intent(query)
+        return self._extract_for_intent(tenant_id, query, doc_texts, is_contact_intent, confidence)
+    
+    def _extract_for_intent(
+        self,
+        tenant_id: str,
+        query: str,
+        doc_texts: List[str],
+        is_contact_intent: bool,
+        confidence: float
+    ) -> List[InteractiveElement]:
+        """Extrahiert die Elemente für ein bereits ermitteltes Intent-Ergebnis."""
+        elements = []
         logger.info(f"Kontakt-Intent erkannt: {is_contact_intent}, Konfidenz: {confidence:.2f}")
         
         # Wenn kein starker Kontakt-Intent, früh beenden
@@ -71,14 +147,15 @@ class InteractiveElementFactory:
             logger.debug(f"Kein Kontakt-Intent erkannt in: '{query}'")
             return elements
         
-        # Prüfen, ob der Tenant registriert ist
-        if tenant_id not in self._element_extractors:
-            logger.warning(f"No extractors registered for tenant {tenant_id}")
+        # Extraktoren des Tenants (bei Bedarf aus der Datenbank geladen)
+        extractors = self._get_extractors(tenant_id)
+        if not extractors:
+            logger.debug(f"No extractors registered for tenant {tenant_id}")
             return elements
         
         # Kontaktkarten extrahieren
-        if "contact_card" in self._element_extractors[tenant_id]:
-            contact_extractor = self._element_extractors[tenant_id]["contact_card"]
+        if "contact_card" in extractors:
+            contact_extractor = extractors["contact_card"]
             contacts = contact_extractor.extract_contacts(query, doc_texts)
             
             # Nur die besten Kontakte verwenden (max. 2)
@@ -111,4 +188,10 @@ class InteractiveElementFactory:
         return ContactElement(data, tenant_id)
 
 # Singleton-Instanz
-interactive_factory = InteractiveElementFactory() 
\ No newline at end of file
+interactive_factory = InteractiveElementFactory()
+
+# Konfigurationsänderungen (auch aus anderen Workern) verwerfen die Extraktoren
+cache_bus.subscribe(
+    INTERACTIVE_CONFIG_CHANGED,
+    lambda tenant_id, payload: interactive_factory.invalidate_tenant(tenant_id) if tenant_id else None
+) 
\ No newline at end of file
@@ -1,21 +1,81 @@
 """
 Intent-Erkennung für interaktive Elemente.
 Verwendet Embedding-Modelle zur semantischen Analyse von Benutzeranfragen.
+
+Das Modell wird beim Start im Hintergrund geladen (start()); die Embeddings
+der Beispielsätze liegen im persistenten VectorCache und müssen nach dem
+ersten Start nicht erneut berechnet werden. Bis das Modell bereit ist (oder
+falls es nicht verfügbar ist), wird die Keyword-basierte Erkennung verwendet,
+statt die Anfrage warten zu lassen.
+
+Anfragen werden nicht einzeln kodiert: Ein Worker-Thread sammelt gleichzeitig
+eintreffende Anfragen einige Millisekunden lang und kodiert sie in einem
+Modellaufruf. Bereits gesehene Anfragen kommen aus einem LRU-Cache. Die
+Ähnlichkeit ist das Skalarprodukt normalisierter Vektoren (NumPy).
+
+NumPy und der VectorCache werden erst beim Laden des Modells importiert, damit
+der Import dieses Moduls den Start des API-Prozesses nicht verlangsamt.
 """
 
-from typing import List, Tuple, Dict, Any
-import numpy as np
+import asyncio
 import logging
-from sklearn.metrics.pairwise import cosine_similarity
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ...core.config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Ab dieser Ähnlichkeit gilt eine Anfrage als Kontaktanfrage
+CONTACT_INTENT_THRESHOLD = 0.6
+
+# Maximale Wartezeit eines synchronen Aufrufs auf sein Embedding (Sekunden)
+ENCODE_TIMEOUT = 10.0
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    """Normalisiert Vektoren auf Länge 1, damit das Skalarprodukt der Kosinus-Ähnlichkeit entspricht."""
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
 class IntentDetector:
     """Erkennt die Absicht (Intent) in Benutzeranfragen mit Embedding-Modellen."""
-    
-    def __init__(self):
-        """Initialisiert den Intent-Detektor mit einem Embedding-Modell."""
-        # Lazy-Loading des Modells, um Ressourcen zu sparen
+
+    def __init__(
+        self,
+        model_name: str = "paraphrase-multilingual-mpnet-base-v2",
+        cache_dir: Optional[str] = None,
+        batch_size: int = 32,
+        batch_wait: float = 0.005,
+        query_cache_size: int = 4096
+    ):
+        """
+        Initialisiert den Intent-Detektor (ohne das Modell zu laden).
+
+        :param model_name: Name des Sentence-Transformer-Modells
+        :param cache_dir: Verzeichnis für die persistierten Beispiel-Embeddings (None = nicht persistieren)
+        :param batch_size: Maximale Anzahl von Anfragen pro Modellaufruf
+        :param batch_wait: Wartezeit in Sekunden, in der weitere Anfragen gesammelt werden
+        :param query_cache_size: Anzahl der Anfrage-Embeddings im LRU-Cache
+        """
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.query_cache_size = query_cache_size
+
+        # None = nicht geladen, False = nicht verfügbar
         self._model = None
         self._contact_examples = [
             # Allgemeine Kontaktfragen
@@ -23,91 +83,270 @@ class IntentDetector:
             "An wen kann ich mich wenden?",
             "Wie erreiche ich euch?",
             "Wer ist zuständig?",
-            
+
             # Umgangssprachliche Formulierungen
             "Wo finde ich jemanden der mir helfen kann?",
             "Ich will wissen wo die sind",
             "Habt ihr eine Telefonnummer?",
             "Kann man da anrufen?",
-            
+
             # Spezifische Kontaktanfragen
             "Telefonnummer bitte",
             "Email Adresse",
             "Öffnungszeiten",
             "Wann haben die auf?",
-            
+
             # Implizite Kontaktsuche
             "Ich brauche Hilfe bei...",
             "Wo muss ich hin für...?",
             "Wer kann mir helfen mit...?",
             "Wie komme ich dahin?",
-            
+
             # Branchenspezifische Formulierungen
             "Zuständige Behörde für...",
             "Sprechstunden",
             "Amt für...",
             "Welche Dienststelle...?"
         ]
-        self._contact_embeddings = None
-        
+        # Normalisierte Embeddings der Beispielsätze (Zeilen)
+        self._contact_embeddings: Optional["np.ndarray"] = None
+
         # Fallback-Methoden, falls Embedding-Modell nicht verfügbar
         self._contact_keywords = [
-            'kontakt', 'anruf', 'telefon', 'mail', 'email', 'adresse', 
+            'kontakt', 'anruf', 'telefon', 'mail', 'email', 'adresse',
             'öffnungszeit', 'erreichen', 'finden', 'wo', 'wann', 'zuständig',
             'behörde', 'amt', 'dienststelle', 'hilfe', 'unterstützung',
             'beratung', 'service'
         ]
-    
+
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Zähler für Metriken
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batch_count = 0
+        self.encoded_count = 0
+        self.fallback_count = 0
+
     @property
-    def model(self):
-        """Lazy-Loading des Embedding-Modells."""
-        if self._model is None:
+    def ready(self) -> bool:
+        """True, sobald Modell und Beispiel-Embeddings geladen sind."""
+        return bool(self._model) and self._contact_embeddings is not None
+
+    def start(self) -> None:
+        """Lädt das Modell in einem Hintergrund-Thread, ohne den Start zu blockieren."""
+        with self._lock:
+            if self._model is not None or self._warmup_thread is not None:
+                return
+            self._warmup_thread = threading.Thread(target=self.warm_up, name="intent-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def stop(self) -> None:
+        """Beendet den Worker-Thread; offene Anfragen werden vorher noch bearbeitet."""
+        worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join(timeout=5)
+            self._worker = None
+
+    def _load_model(self):
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(self.model_name)
+
+    def warm_up(self) -> bool:
+        """
+        Lädt Modell und Beispiel-Embeddings und startet den Worker (blockierend).
+
+        :return: True, wenn das Modell verfügbar ist
+        """
+        if self._model is not None:
+            return bool(self._model)
+        started = time.perf_counter()
+        try:
+            logger.info(f"Lade Sentence-Transformer-Modell {self.model_name}...")
+            model = self._load_model()
+            self._contact_embeddings = self._load_example_embeddings(model)
+            self._model = model
+            self._worker = threading.Thread(target=self._run_worker, name="intent-encoder", daemon=True)
+            self._worker.start()
+            logger.info(f"Intent-Modell in {time.perf_counter() - started:.1f}s geladen")
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Embedding-Modells: {e}")
+            logger.warning("Fallback auf Keyword-basierte Intent-Erkennung")
+            self._model = False
+            return False
+
+    def _load_example_embeddings(self, model) -> "np.ndarray":
+        """Liest die Beispiel-Embeddings aus dem VectorCache; fehlende werden berechnet und gespeichert."""
+        import numpy as np
+
+        from ..weaviate.vector_cache import VectorCache
+
+        examples = self._contact_examples
+        hashes = [VectorCache.content_hash(text, self.model_name) for text in examples]
+        cache = None
+        cached: Dict[str, "np.ndarray"] = {}
+        if self.cache_dir:
             try:
-                logger.info("Lade Sentence-Transformer-Modell...")
-                from sentence_transformers import SentenceTransformer
-                self._model = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
-                # Embeddings vorberechnen
-                self._contact_embeddings = self._model.encode(self._contact_examples)
-                logger.info("Modell erfolgreich geladen und Beispiel-Embeddings berechnet")
+                cache = VectorCache(self.cache_dir, initial_capacity=64)
+                cached = cache.get_many(hashes)
             except Exception as e:
-                logger.error(f"Fehler beim Laden des Embedding-Modells: {e}")
-                logger.warning("Fallback auf Keyword-basierte Intent-Erkennung")
-                self._model = False  # False als Marker, dass das Modell nicht verfügbar ist
-        return self._model
-    
+                logger.warning(f"Cache der Intent-Beispiele nicht verfügbar: {e}")
+
+        missing = [(content_hash, text) for content_hash, text in zip(hashes, examples) if content_hash not in cached]
+        if missing:
+            vectors = model.encode([text for _, text in missing], show_progress_bar=False)
+            computed = {content_hash: np.asarray(vector) for (content_hash, _), vector in zip(missing, vectors)}
+            cached.update(computed)
+            if cache is not None:
+                try:
+                    cache.put_many(computed)
+                except Exception as e:
+                    logger.warning(f"Intent-Beispiele konnten nicht gespeichert werden: {e}")
+        logger.info(f"Intent-Beispiele: {len(examples) - len(missing)} aus dem Cache, {len(missing)} berechnet")
+        return _normalize(np.vstack([cached[content_hash] for content_hash in hashes]))
+
+    def _run_worker(self) -> None:
+        """Sammelt gleichzeitige Anfragen und kodiert sie gemeinsam."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = _normalize(self._model.encode(texts, batch_size=len(texts), show_progress_bar=False))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        by_text = dict(zip(texts, vectors))
+        self.batch_count += 1
+        self.encoded_count += len(texts)
+        with self._cache_lock:
+            for text, vector in by_text.items():
+                self._query_cache[text] = vector
+                self._query_cache.move_to_end(text)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        for text, future in batch:
+            future.set_result(by_text[text])
+
+    def _embed(self, text: str) -> Future:
+        """Gibt ein Future mit dem normalisierten Embedding zurück (aus dem Cache oder vom Worker)."""
+        with self._cache_lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+        future: Future = Future()
+        if vector is not None:
+            self.cache_hits += 1
+            future.set_result(vector)
+        else:
+            self.cache_misses += 1
+            self._queue.put((text, future))
+        return future
+
+    def _embedding_result(self, vector: "np.ndarray") -> Tuple[bool, float]:
+        max_similarity = float((self._contact_embeddings @ vector).max())
+        is_contact = max_similarity > CONTACT_INTENT_THRESHOLD
+        logger.debug(f"Embedding-basierte Intent-Erkennung: {is_contact}, Score: {max_similarity:.4f}")
+        return is_contact, max_similarity
+
     def detect_contact_intent(self, query: str) -> Tuple[bool, float]:
         """
         Erkennt, ob die Anfrage wahrscheinlich nach Kontaktinformationen fragt.
-        
+        Blockiert den aufrufenden Thread bis zum Ergebnis; im Event-Loop
+        adetect_contact_intent verwenden.
+
         :param query: Die Benutzeranfrage
         :return: Tuple aus (ist_kontakt_intent, konfidenz)
         """
         logger.debug(f"Intent-Erkennung für: '{query}'")
-        
-        # Versuche, das Embedding-Modell zu verwenden
-        if self.model and self.model is not False:
+        if self.ready:
             try:
-                query_embedding = self.model.encode(query)
-                # Berechne Ähnlichkeit mit allen Beispielen
-                similarities = cosine_similarity(
-                    query_embedding.reshape(1, -1), 
-                    self._contact_embeddings
-                )[0]
-                max_similarity = np.max(similarities)
-                is_contact = max_similarity > 0.6
-                
-                logger.debug(f"Embedding-basierte Intent-Erkennung: {is_contact}, Score: {max_similarity:.4f}")
-                return is_contact, float(max_similarity)
+                return self._embedding_result(self._embed(query.strip()).result(timeout=ENCODE_TIMEOUT))
             except Exception as e:
                 logger.error(f"Fehler bei Embedding-basierter Intent-Erkennung: {e}")
-                # Fallback auf Keyword-Methode
-        
-        # Keyword-basierte Methode (Fallback)
+        else:
+            self.start()
+        return self._detect_by_keywords(query)
+
+    async def adetect_contact_intent(self, query: str) -> Tuple[bool, float]:
+        """Wie detect_contact_intent, ohne den Event-Loop zu blockieren."""
+        logger.debug(f"Intent-Erkennung für: '{query}'")
+        if self.ready:
+            try:
+                vector = await asyncio.wait_for(asyncio.wrap_future(self._embed(query.strip())), ENCODE_TIMEOUT)
+                return self._embedding_result(vector)
+            except Exception as e:
+                logger.error(f"Fehler bei Embedding-basierter Intent-Erkennung: {e}")
+        else:
+            self.start()
+        return self._detect_by_keywords(query)
+
+    def _detect_by_keywords(self, query: str) -> Tuple[bool, float]:
+        """Keyword-basierte Methode (Fallback)."""
+        self.fallback_count += 1
         query_lower = query.lower()
         word_count = sum(1 for word in self._contact_keywords if word in query_lower)
         confidence = min(0.9, word_count * 0.15)  # Max 0.9 Konfidenz bei 6+ Wörtern
-        
+
         is_contact = confidence > 0.3
         logger.debug(f"Keyword-basierte Intent-Erkennung: {is_contact}, Score: {confidence:.4f}")
-        
-        return is_contact, confidence 
\ No newline at end of file
+
+        return is_contact, confidence
+
+    def _state(self) -> str:
+        if self.ready:
+            return "ready"
+        if self._model is False:
+            return "unavailable"
+        return "loading" if self._warmup_thread is not None else "idle"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Zustand, Cache-Trefferquote und Batch-Größen der Intent-Erkennung zurück."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "model": self.model_name,
+            "state": self._state(),
+            "cached_queries": len(self._query_cache),
+            "cache_hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            "batches": self.batch_count,
+            "avg_batch_size": round(self.encoded_count / self.batch_count, 2) if self.batch_count else 0.0,
+            "queued": self._queue.qsize(),
+            "keyword_fallbacks": self.fallback_count
+        }
+
+
+# Singleton-Instanz
+intent_detector = IntentDetector(
+    model_name=settings.INTENT_MODEL,
+    cache_dir=settings.INTENT_CACHE_DIR,
+    batch_size=settings.INTENT_BATCH_SIZE,
+    batch_wait=settings.INTENT_BATCH_WAIT_MS / 1000.0,
+    query_cache_size=settings.INTENT_QUERY_CACHE_SIZE
+)
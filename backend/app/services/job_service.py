@@ -0,0 +1,187 @@
+"""
+Service zur Verfolgung länger laufender Hintergrundaufgaben (Uploads, Massenlöschungen usw.).
+
+Jobs stehen in der Tabelle background_jobs, damit Status und Fortschritt in
+jedem Worker-Prozess abrufbar sind, nicht nur in dem, der den Job ausführt.
+Jobs ohne Änderung seit JOB_RETENTION_SECONDS (abgeschlossen oder mit ihrem
+Prozess abgebrochen) werden gelöscht, vorab angelegte und nie gestartete Jobs
+(status="pending") schon nach JOB_PENDING_TTL_SECONDS.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, or_
+
+from ..core.config import settings
+from ..db.models import BackgroundJobModel
+from ..db.session import session_scope
+
+logger = logging.getLogger(__name__)
+
+# Felder, die als Spalten gespeichert werden; alle übrigen sind Fortschrittsfelder (progress)
+JOB_COLUMNS = ("status", "error", "finished_at")
+
+# Abstand zwischen zwei Bereinigungen der Jobtabelle (Sekunden)
+PRUNE_INTERVAL = 60
+
+
+class JobLimitError(Exception):
+    """Ein Tenant hat bereits zu viele vorab angelegte, noch nicht gestartete Jobs."""
+
+
+class JobService:
+    """Registry für Jobs mit Status und Fortschrittszählern."""
+
+    def __init__(
+        self,
+        retention_seconds: int = settings.JOB_RETENTION_SECONDS,
+        pending_ttl_seconds: int = settings.JOB_PENDING_TTL_SECONDS,
+        max_pending_per_tenant: int = settings.JOB_MAX_PENDING_PER_TENANT
+    ):
+        self.retention_seconds = retention_seconds
+        self.pending_ttl_seconds = pending_ttl_seconds
+        self.max_pending_per_tenant = max_pending_per_tenant
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def create_job(self, kind: str, tenant_id: str, **fields: Any) -> str:
+        """
+        Legt einen neuen Job an und gibt seine ID zurück.
+
+        Die ID wird immer serverseitig vergeben, damit kein Client einen fremden
+        Job überschreiben oder dessen Fortschritt übernehmen kann.
+
+        :raises JobLimitError: Wenn ein vorab angelegter Job (status="pending") das
+            Limit offener Jobs des Tenants überschreiten würde
+        """
+        self._prune_if_due()
+        job_id = str(uuid.uuid4())
+        status = fields.pop("status", "running")
+        now = datetime.utcnow()
+        with session_scope() as db:
+            if status == "pending":
+                open_jobs = db.query(func.count(BackgroundJobModel.id)).filter(
+                    BackgroundJobModel.tenant_id == tenant_id,
+                    BackgroundJobModel.status == "pending",
+                    BackgroundJobModel.created_at >= self._pending_cutoff()
+                ).scalar()
+                if open_jobs >= self.max_pending_per_tenant:
+                    raise JobLimitError(
+                        f"Zu viele nicht gestartete Jobs ({open_jobs}); bitte bestehende Jobs starten oder ablaufen lassen"
+                    )
+            db.add(BackgroundJobModel(
+                id=job_id,
+                kind=kind,
+                tenant_id=tenant_id,
+                status=status,
+                progress=fields,
+                created_at=now,
+                updated_at=now
+            ))
+            db.commit()
+        return job_id
+
+    def claim_job(self, job_id: str, tenant_id: str, kind: str) -> bool:
+        """
+        Startet einen vorab mit status="pending" angelegten Job.
+
+        :return: False, wenn der Job nicht existiert, einem anderen Tenant gehört,
+            eine andere Art hat, bereits gestartet wurde oder abgelaufen ist
+        """
+        with session_scope() as db:
+            # Bedingtes UPDATE, damit ein Job auch bei parallelen Anfragen nur einmal startet
+            claimed = db.query(BackgroundJobModel).filter(
+                BackgroundJobModel.id == job_id,
+                BackgroundJobModel.tenant_id == tenant_id,
+                BackgroundJobModel.kind == kind,
+                BackgroundJobModel.status == "pending",
+                BackgroundJobModel.created_at >= self._pending_cutoff()
+            ).update({"status": "running", "updated_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        return claimed == 1
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        """Aktualisiert Status- und Fortschrittsfelder eines Jobs."""
+        with session_scope() as db:
+            job = db.get(BackgroundJobModel, job_id)
+            if job is None:
+                return
+            progress = dict(job.progress or {})
+            for key, value in fields.items():
+                if key in JOB_COLUMNS:
+                    setattr(job, key, value)
+                else:
+                    progress[key] = value
+            job.progress = progress
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+    def finish_job(self, job_id: str, **fields: Any) -> None:
+        """Markiert einen Job als erfolgreich abgeschlossen."""
+        self.update_job(job_id, status="completed", finished_at=datetime.utcnow(), **fields)
+
+    def fail_job(self, job_id: str, error: str, **fields: Any) -> None:
+        """Markiert einen Job als fehlgeschlagen."""
+        logger.error(f"Job {job_id} fehlgeschlagen: {error}")
+        self.update_job(job_id, status="failed", finished_at=datetime.utcnow(), error=error, **fields)
+
+    def get_job(self, job_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Gibt den Job mit seinen Fortschrittsfeldern zurück, optional nur für den angegebenen Tenant."""
+        with session_scope() as db:
+            job = db.get(BackgroundJobModel, job_id)
+            if job is None or (tenant_id and job.tenant_id != tenant_id):
+                return None
+            status = job.status
+            # Nicht gestartete Jobs gelten nach Ablauf als verfallen, auch bevor sie gelöscht sind
+            if status == "pending" and job.created_at < self._pending_cutoff():
+                status = "expired"
+            return {
+                **(job.progress or {}),
+                "id": job.id,
+                "kind": job.kind,
+                "tenant_id": job.tenant_id,
+                "status": status,
+                "created_at": job.created_at,
+                "updated_at": job.updated_at,
+                "finished_at": job.finished_at,
+                "error": job.error
+            }
+
+    def _pending_cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.pending_ttl_seconds)
+
+    def _prune_if_due(self) -> None:
+        """Entfernt abgelaufene Jobs (höchstens alle PRUNE_INTERVAL Sekunden)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_prune < PRUNE_INTERVAL:
+                return
+            self._last_prune = now
+        try:
+            self.prune()
+        except Exception as e:
+            logger.warning(f"Abgelaufene Jobs konnten nicht entfernt werden: {e}")
+
+    def prune(self) -> int:
+        """
+        Entfernt Jobs ohne Änderung seit der Aufbewahrungszeit und nie gestartete nach ihrer TTL.
+
+        :return: Anzahl der entfernten Jobs
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        with session_scope() as db:
+            removed = db.query(BackgroundJobModel).filter(or_(
+                BackgroundJobModel.updated_at < cutoff,
+                (BackgroundJobModel.status == "pending") & (BackgroundJobModel.created_at < self._pending_cutoff())
+            )).delete(synchronize_session=False)
+            db.commit()
+        return removed
+
+
+# Singleton-Instanz
+job_service = JobService()
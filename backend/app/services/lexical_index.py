@@ -0,0 +1,562 @@
+"""
+Lexikalischer Index (BM25) pro Tenant im Arbeitsspeicher.
+
+Viele Fragen an Kommunen enthalten exakte Begriffe (Amtsbezeichnungen,
+Straßennamen). Dafür ist eine Hybrid-Suche in Weaviate unnötig teuer. Der
+Index wird pro Tenant beim ersten Zugriff aus den Dokumenten in Postgres und
+den strukturierten Daten aufgebaut und danach inkrementell gepflegt:
+
+- Deutsche Tokenisierung: Umlaute/ß werden gefaltet ("Straße" = "Strasse"),
+  "Hauptstr." wird zu "Hauptstrasse", Stoppwörter entfallen, Endungen werden
+  leicht gekürzt ("Schulen" = "Schule").
+- Komposita werden anhand des Vokabulars zerlegt ("Bürgeramt" findet auch
+  "Amt"); Fugenelemente (s, es, n, en) werden berücksichtigt.
+- Die Postings bilden spaltenweise eine dünnbesetzte Term-Dokument-Matrix;
+  die BM25-Bewertung läuft vektorisiert mit NumPy.
+- Änderungen kommen über den Cache-Invalidierungsbus (KNOWLEDGE_CHANGED):
+  Einzelne Dokumente werden beim nächsten Zugriff nachgeladen, ohne
+  Dokument-IDs wird der Index des Tenants neu aufgebaut. Gelöschte Dokumente
+  bleiben bis zur Verdichtung als ungültig markiert in der Matrix.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BM25-Parameter
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Titel zählen wie mehrfaches Vorkommen im Text
+TITLE_WEIGHT = 3
+
+# Mindestlänge eines Teilworts bei der Zerlegung von Komposita
+MIN_COMPOUND_PART = 3
+
+# Längere Wörter (z. B. Kennungen, URLs) werden nicht zerlegt
+MAX_COMPOUND_LENGTH = 40
+
+# Zwischengespeicherte Zerlegungen pro Index; Suchanfragen bringen beliebig viele neue Wörter mit
+MAX_CACHED_SPLITS = 50000
+
+# Anteil ungültiger Einträge, ab dem die Matrix verdichtet wird
+COMPACT_RATIO = 0.25
+
+GERMAN_STOPWORDS = frozenset("""
+aber alle allem allen aller alles als also am an ander andere anderem anderen anderer anderes auch auf aus
+bei bin bis bist da damit dann das dass dein deine dem den der des dessen dich die dies diese diesem diesen
+dieser dieses dir doch dort du durch ein eine einem einen einer eines einige er es etwas euch euer eure fuer
+gibt hab habe haben hat hatte ich ihm ihn ihnen ihr ihre im in ist ja jede jedem jeden jeder jedes kann kein
+keine keinem keinen koennen kann man manche mein meine mich mir mit muss nach nicht nichts noch nun nur ob oder
+ohne sehr sein seine sich sie sind so soll sollte sondern um und uns unser unter vom von vor war waren was
+weil welche welchem welchen welcher welches wenn wer werde werden wie wieder will wir wird wo wurde zu zum zur
+ueber bitte gerne hallo wann wo wohin woher warum wieso welche
+""".split())
+
+# Häufige Grundwörter kommunaler Komposita, die nicht allein im Text stehen müssen
+COMPOUND_HEADS = frozenset("""
+amt aemter stelle behoerde buero dienst service verwaltung rathaus strasse weg platz allee ring gasse damm ufer
+schule kita kindergarten halle haus zentrum hof markt park bad bibliothek feuerwehr polizei gericht kasse
+antrag ausweis pass gebuehr gebuehren termin sprechzeit sprechzeiten beratung versicherung steuer abfall muell
+tonne sammlung kalender hilfe geld karte schein genehmigung anmeldung abmeldung ummeldung
+""".split())
+
+FUGEN_ELEMENTS = ("es", "s", "en", "n")
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STREET_ABBREVIATION = re.compile(r"str\.", re.IGNORECASE)
+_SUFFIXES = ("ern", "em", "er", "en", "es", "e", "n", "s")
+
+
+def fold(text: str) -> str:
+    """Kleinschreibung, Umlaute und ß falten, Straßenabkürzungen ausschreiben."""
+    text = _STREET_ABBREVIATION.sub("strasse ", text or "")
+    return text.lower().translate(_UMLAUTS)
+
+
+def stem(word: str) -> str:
+    """Leichte Reduktion deutscher Flexionsendungen (Schulen/Schule -> schul)."""
+    if word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def split_compound(word: str, vocabulary: Set[str]) -> List[str]:
+    """
+    Zerlegt ein Kompositum in bekannte Wörter ("buergeramt" -> ["buerger", "amt"]).
+    Bevorzugt das längste bekannte Grundwort am Wortende.
+
+    :return: Teilwörter oder eine leere Liste, wenn das Wort nicht zerlegbar ist
+    """
+    if len(word) < 2 * MIN_COMPOUND_PART or len(word) > MAX_COMPOUND_LENGTH or word.isdigit():
+        return []
+    for i in range(MIN_COMPOUND_PART, len(word) - MIN_COMPOUND_PART + 1):
+        head = word[i:]
+        if head not in vocabulary and head not in COMPOUND_HEADS:
+            continue
+        modifier = word[:i]
+        candidates = [modifier] + [
+            modifier[:-len(fuge)] for fuge in FUGEN_ELEMENTS
+            if modifier.endswith(fuge) and len(modifier) - len(fuge) >= MIN_COMPOUND_PART
+        ]
+        for candidate in candidates:
+            if candidate in vocabulary or candidate in COMPOUND_HEADS:
+                return [candidate, head]
+            parts = split_compound(candidate, vocabulary)
+            if parts:
+                return parts + [head]
+        # Unbekanntes, aber langes Bestimmungswort trotzdem als eigenen Term aufnehmen
+        if len(modifier) >= 4:
+            return [modifier, head]
+    return []
+
+
+def tokenize(text: str) -> List[str]:
+    """Zerlegt einen Text in gefaltete Wörter ohne Stoppwörter."""
+    return [token for token in _TOKEN.findall(fold(text)) if token not in GERMAN_STOPWORDS and len(token) > 1]
+
+
+class LexicalIndex:
+    """BM25-Index der Dokumente eines Tenants (nicht thread-sicher; siehe LexicalIndexService)."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.built_at = time.monotonic()
+        self.vocabulary: Set[str] = set()
+        self._splits: "OrderedDict[str, List[str]]" = OrderedDict()
+        # Slots der Matrix: Dokument-ID, Länge, Termfrequenzen, gespeicherte Felder
+        self._doc_ids: List[str] = []
+        self._slot_of: Dict[str, int] = {}
+        self._alive: List[bool] = []
+        self._lengths: List[float] = []
+        self._terms: List[Optional[Dict[str, int]]] = []
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._alive_count = 0
+        self._total_length = 0.0
+        # Spalten der Term-Dokument-Matrix: Term -> (Slots, Termfrequenzen)
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._df: Counter = Counter()
+        self._arrays: Dict[str, Tuple["np.ndarray", "np.ndarray"]] = {}
+        self._lengths_array: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return self._alive_count
+
+    def _analyze(self, words: Iterable[str]) -> List[str]:
+        """Wandelt gefaltete Wörter in Terme um (Stamm des Worts und seiner Teilwörter)."""
+        terms = []
+        for word in words:
+            terms.append(stem(word))
+            parts = self._splits.get(word)
+            if parts is None:
+                parts = self._splits[word] = split_compound(word, self.vocabulary)
+                if len(self._splits) > MAX_CACHED_SPLITS:
+                    self._splits.popitem(last=False)
+            else:
+                self._splits.move_to_end(word)
+            terms.extend(stem(part) for part in parts)
+        return terms
+
+    def analyze_query(self, query: str) -> List[str]:
+        """Terme einer Suchanfrage (ohne Duplikate, in Reihenfolge)."""
+        return list(dict.fromkeys(self._analyze(tokenize(query))))
+
+    def learn_vocabulary(self, texts: Iterable[str]) -> None:
+        """Nimmt eigenständig vorkommende Wörter als Teilwörter für die Kompositazerlegung auf."""
+        for text in texts:
+            self.vocabulary.update(word for word in tokenize(text) if len(word) >= 4)
+
+    def upsert(self, doc_id: str, title: str, content: str, **fields: Any) -> None:
+        """Fügt ein Dokument hinzu bzw. ersetzt es."""
+        self.remove(doc_id)
+        counts = Counter(self._analyze(tokenize(content)))
+        for term in self._analyze(tokenize(title)):
+            counts[term] += TITLE_WEIGHT
+
+        slot = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._slot_of[doc_id] = slot
+        self._alive.append(True)
+        length = float(sum(counts.values()))
+        self._lengths.append(length)
+        self._terms.append(dict(counts))
+        self._docs.append({"title": title, "content": content, **fields})
+        self._alive_count += 1
+        self._total_length += length
+        for term, tf in counts.items():
+            slots, tfs = self._postings.setdefault(term, ([], []))
+            slots.append(slot)
+            tfs.append(tf)
+            self._df[term] += 1
+            self._arrays.pop(term, None)
+        self._lengths_array = None
+
+    def remove(self, doc_id: str) -> bool:
+        """Markiert ein Dokument als gelöscht; die Postings bleiben bis zur Verdichtung."""
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = False
+        self._alive_count -= 1
+        self._total_length -= self._lengths[slot]
+        for term in self._terms[slot]:
+            self._df[term] -= 1
+            if self._df[term] <= 0:
+                del self._df[term]
+        self._terms[slot] = None
+        self._docs[slot] = None
+        self._lengths_array = None
+        if len(self._doc_ids) > 100 and len(self._doc_ids) - self._alive_count > COMPACT_RATIO * len(self._doc_ids):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Baut die Matrix ohne gelöschte Dokumente neu auf (ohne erneute Tokenisierung)."""
+        doc_ids, terms, docs, lengths = [], [], [], []
+        for slot, doc_id in enumerate(self._doc_ids):
+            if self._alive[slot]:
+                doc_ids.append(doc_id)
+                terms.append(self._terms[slot])
+                docs.append(self._docs[slot])
+                lengths.append(self._lengths[slot])
+        self._doc_ids, self._terms, self._docs, self._lengths = doc_ids, terms, docs, lengths
+        self._alive = [True] * len(doc_ids)
+        self._slot_of = {doc_id: slot for slot, doc_id in enumerate(doc_ids)}
+        self._postings = {}
+        for slot, counts in enumerate(terms):
+            for term, tf in counts.items():
+                slots, tfs = self._postings.setdefault(term, ([], []))
+                slots.append(slot)
+                tfs.append(tf)
+        self._arrays = {}
+        self._lengths_array = None
+
+    def _column(self, term: str) -> Optional[Tuple["np.ndarray", "np.ndarray"]]:
+        import numpy as np
+
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self._postings.get(term)
+            if posting is None:
+                return None
+            arrays = self._arrays[term] = (
+                np.asarray(posting[0], dtype=np.int32),
+                np.asarray(posting[1], dtype=np.float32)
+            )
+        return arrays
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        BM25-Suche. Jeder Treffer enthält zusätzlich `coverage`, den Anteil der
+        Suchbegriffe, die im Dokument vorkommen.
+        """
+        import numpy as np
+
+        terms = self.analyze_query(query)
+        limit = max(1, limit)
+        if not terms or not self._alive_count:
+            return []
+        if self._lengths_array is None:
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            lengths[~np.asarray(self._alive, dtype=bool)] = 0.0
+            self._lengths_array = lengths
+        lengths = self._lengths_array
+        avg_length = self._total_length / self._alive_count or 1.0
+        scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+        matched = np.zeros(len(self._doc_ids), dtype=np.int16)
+        for term in terms:
+            column = self._column(term)
+            df = self._df.get(term, 0)
+            if column is None or df == 0:
+                continue
+            slots, tfs = column
+            idf = math.log(1.0 + (self._alive_count - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[slots] / avg_length)
+            scores[slots] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+            matched[slots] += 1
+        # Gelöschte Dokumente (Länge 0) nicht zurückgeben
+        scores[lengths == 0] = 0.0
+        candidates = np.flatnonzero(scores)
+        if not len(candidates):
+            return []
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            {
+                "id": self._doc_ids[slot],
+                "score": float(scores[slot]),
+                "coverage": round(float(matched[slot]) / len(terms), 4),
+                "doc": self._docs[slot]
+            }
+            for slot in candidates
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self._alive_count,
+            "slots": len(self._doc_ids),
+            "terms": len(self._df),
+            "age_seconds": round(time.monotonic() - self.built_at, 1)
+        }
+
+
+class LexicalIndexService:
+    """Verwaltet die Indizes der Tenants (LRU) und hält sie über den Cache-Invalidierungsbus aktuell."""
+
+    def __init__(self, max_tenants: int = 50, include_structured: bool = True):
+        self.max_tenants = max_tenants
+        self.include_structured = include_structured
+        self._indexes: "OrderedDict[str, LexicalIndex]" = OrderedDict()
+        # Tenant-ID -> nachzuladende Dokument-IDs (None = Index neu aufbauen)
+        self._pending: Dict[str, Optional[Set[str]]] = {}
+        self._building: Set[str] = set()
+        self._locks: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+        # Zähler für Metriken
+        self.builds = 0
+        self.build_ms_total = 0.0
+        self.incremental_updates = 0
+        self.searches = 0
+        self.search_ms_total = 0.0
+
+    def _lock_for(self, tenant_id: str) -> threading.RLock:
+        # Pro Tenant werden Aufbau, Aktualisierung und Suche serialisiert
+        with self._guard:
+            lock = self._locks.get(tenant_id)
+            if lock is None:
+                lock = self._locks[tenant_id] = threading.RLock()
+            return lock
+
+    def invalidate(self, tenant_id: str, document_ids: Optional[List[str]] = None) -> None:
+        """
+        Vermerkt Änderungen; sie werden beim nächsten Zugriff übernommen.
+
+        :param document_ids: Geänderte oder gelöschte Dokumente (None = gesamte Wissensbasis)
+        """
+        with self._guard:
+            # Nicht geladene Tenants werden beim ersten Zugriff ohnehin vollständig aufgebaut
+            if tenant_id not in self._indexes and tenant_id not in self._building:
+                return
+            if document_ids is None:
+                self._pending[tenant_id] = None
+            elif tenant_id not in self._pending:
+                self._pending[tenant_id] = set(document_ids)
+            elif self._pending[tenant_id] is not None:
+                self._pending[tenant_id].update(document_ids)
+
+    def get_index(self, tenant_id: str) -> LexicalIndex:
+        """Gibt den aktuellen Index des Tenants zurück und baut ihn bei Bedarf auf."""
+        with self._lock_for(tenant_id):
+            with self._guard:
+                index = self._indexes.get(tenant_id)
+                pending = self._pending.pop(tenant_id, set()) if tenant_id in self._pending else set()
+                if index is not None:
+                    self._indexes.move_to_end(tenant_id)
+            if index is None or pending is None:
+                index = self._build(tenant_id)
+            elif pending:
+                self._apply(index, pending)
+            return index
+
+    def _build(self, tenant_id: str) -> LexicalIndex:
+        from ..db.models import DocumentModel
+        from ..db.session import session_scope
+
+        started = time.perf_counter()
+        # Während des Aufbaus eintreffende Änderungen werden beim nächsten Zugriff übernommen
+        with self._guard:
+            self._building.add(tenant_id)
+        try:
+            with session_scope() as db:
+                rows = db.query(
+                    DocumentModel.id, DocumentModel.title, DocumentModel.content,
+                    DocumentModel.source, DocumentModel.doc_metadata
+                ).filter(DocumentModel.tenant_id == tenant_id).all()
+        except Exception:
+            with self._guard:
+                self._building.discard(tenant_id)
+            raise
+        records = [
+            {"id": row.id, "title": row.title or "", "content": row.content or "",
+             "source": row.source, "metadata": row.doc_metadata or {}}
+            for row in rows
+        ]
+        if self.include_structured:
+            records.extend(self._load_structured_records(tenant_id))
+
+        index = LexicalIndex(tenant_id)
+        index.learn_vocabulary(record["title"] + " " + record["content"] for record in records)
+        for record in records:
+            index.upsert(record.pop("id"), record.pop("title"), record.pop("content"), **record)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._guard:
+            self._building.discard(tenant_id)
+            self._indexes[tenant_id] = index
+            self._indexes.move_to_end(tenant_id)
+            while len(self._indexes) > self.max_tenants:
+                evicted, _ = self._indexes.popitem(last=False)
+                self._pending.pop(evicted, None)
+        self.builds += 1
+        self.build_ms_total += elapsed_ms
+        logger.info(f"Lexikalischer Index für Tenant {tenant_id} aufgebaut: {len(index)} Dokumente in {elapsed_ms:.0f} ms")
+        return index
+
+    def _apply(self, index: LexicalIndex, document_ids: Set[str]) -> None:
+        """Lädt geänderte Dokumente aus Postgres nach; nicht mehr vorhandene werden entfernt."""
+        from ..db.models import DocumentModel
+        from ..db.session import session_scope
+
+        with session_scope() as db:
+            rows = db.query(
+                DocumentModel.id, DocumentModel.title, DocumentModel.content,
+                DocumentModel.source, DocumentModel.doc_metadata
+            ).filter(DocumentModel.tenant_id == index.tenant_id, DocumentModel.id.in_(document_ids)).all()
+        found = set()
+        for row in rows:
+            found.add(row.id)
+            index.learn_vocabulary([f"{row.title or ''} {row.content or ''}"])
+            index.upsert(row.id, row.title or "", row.content or "", source=row.source, metadata=row.doc_metadata or {})
+        for doc_id in document_ids - found:
+            index.remove(doc_id)
+        self.incremental_updates += len(document_ids)
+
+    def _load_structured_records(self, tenant_id: str) -> List[Dict[str, Any]]:
+        """Liest die strukturierten Daten des Tenants aus Weaviate (ohne Vektoren)."""
+        from .structured_data_service import StructuredDataService
+        from .weaviate.circuit_breaker import weaviate_breaker
+        from .weaviate.client import get_client
+        from .weaviate.schema_manager import SchemaManager
+
+        records = []
+        client = get_client()
+        if not client:
+            return records
+        for data_type in StructuredDataService.SUPPORTED_TYPES:
+            class_name = StructuredDataService.get_class_name(tenant_id, data_type)
+            try:
+                if not SchemaManager.class_exists(class_name):
+                    continue
+                with weaviate_breaker.guard(track_latency=False):
+                    for obj in client.collections.get(class_name).iterator():
+                        properties = obj.properties or {}
+                        title = properties.get("name") or properties.get("title") or ""
+                        content = properties.get("fullTextSearch") or " ".join(
+                            str(value) for value in properties.values() if isinstance(value, str)
+                        )
+                        records.append({
+                            "id": f"structured:{obj.uuid}",
+                            "title": str(title),
+                            "content": content,
+                            "source": f"Structured Data ({data_type})",
+                            "metadata": {"type": data_type}
+                        })
+            except Exception as e:
+                logger.warning(f"Strukturierte Daten ({data_type}) für den lexikalischen Index nicht verfügbar: {e}")
+        return records
+
+    def search(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        BM25-Suche im Index des Tenants. Die Treffer haben das Format von
+        SearchManager.search, ergänzt um `coverage`.
+        """
+        with self._lock_for(tenant_id):
+            index = self.get_index(tenant_id)
+            started = time.perf_counter()
+            hits = index.search(query, limit)
+        self.searches += 1
+        self.search_ms_total += (time.perf_counter() - started) * 1000
+        return [
+            {
+                "class": "lexical",
+                "id": hit["id"],
+                "score": hit["score"],
+                "coverage": hit["coverage"],
+                "properties": {
+                    "title": hit["doc"]["title"],
+                    "content": hit["doc"]["content"],
+                    "document_id": hit["id"],
+                    "source": hit["doc"].get("source"),
+                    "metadata": hit["doc"].get("metadata")
+                }
+            }
+            for hit in hits
+        ]
+
+    def safe_search(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Wie search, gibt bei Fehlern (z. B. Datenbank nicht erreichbar) aber eine leere Liste zurück."""
+        try:
+            return self.search(tenant_id, query, limit)
+        except Exception as e:
+            logger.error(f"Fehler bei der lexikalischen Suche für Tenant {tenant_id}: {e}")
+            return []
+
+    def first_stage(
+        self,
+        tenant_id: str,
+        query: str,
+        limit: int = 10,
+        max_terms: int = 4,
+        min_coverage: float = 1.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Erste Stufe vor der Hybrid-Suche: Treffer nur für kurze Stichwortfragen,
+        deren bester Treffer mindestens `min_coverage` der Suchbegriffe enthält.
+
+        :return: Treffer oder eine leere Liste, wenn die Hybrid-Suche nötig ist
+        """
+        words = tokenize(query)
+        if not words or len(words) > max_terms:
+            return []
+        hits = self.safe_search(tenant_id, query, limit)
+        if not hits or hits[0]["coverage"] < min_coverage:
+            return []
+        return hits
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Größe, Aufbauzeiten und Suchlatenz der Indizes zurück."""
+        with self._guard:
+            indexes = {tenant_id: index.get_stats() for tenant_id, index in self._indexes.items()}
+            pending = len(self._pending)
+        return {
+            "tenants": len(indexes),
+            "max_tenants": self.max_tenants,
+            "documents": sum(stats["documents"] for stats in indexes.values()),
+            "pending_updates": pending,
+            "builds": self.builds,
+            "avg_build_ms": round(self.build_ms_total / self.builds, 1) if self.builds else None,
+            "incremental_updates": self.incremental_updates,
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_ms_total / self.searches, 3) if self.searches else None
+        }
+
+
+def _on_knowledge_changed(tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+    if tenant_id:
+        lexical_index_service.invalidate(tenant_id, payload.get("document_ids"))
+
+
+# Singleton-Instanz
+lexical_index_service = LexicalIndexService(
+    max_tenants=settings.LEXICAL_INDEX_MAX_TENANTS,
+    include_structured=settings.LEXICAL_INDEX_INCLUDE_STRUCTURED
+)
+cache_bus.subscribe(KNOWLEDGE_CHANGED, _on_knowledge_changed)
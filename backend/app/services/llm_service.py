@@ -1,4 +1,3 @@
-import openai
 import json
 import httpx
 import asyncio
@@ -19,8 +18,9 @@ class LLMService:
         self.openai_api_key = settings.OPENAI_API_KEY
         self.openai_model = settings.OPENAI_MODEL
         
-        # OpenAI-Client initialisieren
-        self.client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+        # OpenAI-Client wird beim ersten Zugriff erstellt (das openai-Paket
+        # braucht allein über eine Sekunde zum Importieren)
+        self._client = None
         
         # Mistral-Setup (optional)
         self.mistral_api_key = settings.MISTRAL_API_KEY
@@ -35,6 +35,14 @@ class LLMService:
         Vermeide Halluzinationen und erfundene Antworten.
         """
     
+    @property
+    def client(self):
+        """Gibt den OpenAI-Client zurück und erstellt ihn beim ersten Zugriff."""
+        if self._client is None:
+            import openai
+            self._client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+        return self._client
+    
     def format_retrieved_documents(self, documents: List[Dict[str, Any]]) -> str:
         """Formatiert abgerufene Dokumente als Kontext für das LLM."""
         formatted_context = ""
@@ -368,14 +376,11 @@ class LLMService:
         
         try:
             from ..services.tenant_service import tenant_service
-            from sqlalchemy.orm import Session
-            from ..db.session import get_db
-            
-            # DB-Session holen
-            db = next(get_db())
+            from ..db.session import session_scope
             
-            # UI-Komponenten-Konfiguration abrufen
-            ui_config = tenant_service.get_ui_components_config(db, tenant_id)
+            # UI-Komponenten-Konfiguration abrufen (über den Tenant-Cache)
+            with session_scope() as db:
+                ui_config = tenant_service.get_ui_components_config(db, tenant_id)
             
             # Wenn UI-Komponenten-Konfiguration vorhanden, dem System-Prompt hinzufügen
             if ui_config and ui_config.prompt:
@@ -391,7 +396,13 @@ class LLMService:
         
         return system_prompt
 
-    async def generate_text(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1000) -> str:
+    async def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 1000,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Generiert einen Text basierend auf einem Prompt mithilfe des konfigurierten LLM.
         
@@ -399,6 +410,7 @@ class LLMService:
             prompt: Der zu verwendende Prompt
             temperature: Kreativitätsfaktor (höher = kreativer, niedriger = deterministischer)
             max_tokens: Maximale Anzahl der zu generierenden Tokens
+            usage: Optionales Dict, in das Modell und Tokenzahlen geschrieben werden
             
         Returns:
             str: Der generierte Text
@@ -412,6 +424,12 @@ class LLMService:
                 stream=False
             )
             
+            if usage is not None:
+                usage["model"] = getattr(response, "model", None) or self.openai_model
+                if getattr(response, "usage", None) is not None:
+                    usage["prompt_tokens"] = response.usage.prompt_tokens
+                    usage["completion_tokens"] = response.usage.completion_tokens
+            
             if response.choices and len(response.choices) > 0:
                 return response.choices[0].message.content
             else:
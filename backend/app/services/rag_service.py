@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, AsyncGenerator, Optional, Union
+from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple, Union
 from ..services.weaviate_service import weaviate_service
 from ..services.llm_service import llm_service
 from ..services.interactive.factory import interactive_factory
@@ -6,12 +6,17 @@ from ..services.structured_data_service import structured_data_service
 from ..db.models import Tenant, TenantModel
 from ..services.tenant_service import tenant_service
 from ..services.weaviate.search_manager import SearchManager
+from ..services.weaviate.circuit_breaker import WeaviateUnavailableError, weaviate_breaker
+from ..services.retrieval_cache import retrieval_cache
+from ..services.lexical_index import lexical_index_service
+from ..services.fulltext_search import fulltext_search_service
 from sqlalchemy.orm import Session
-from app.db.session import get_db, SessionLocal
+from app.db.session import session_scope
 from app.core.config import settings
 import json
 import re
 import logging
+import time
 from datetime import datetime
 
 # Logger konfigurieren
@@ -74,16 +79,14 @@ class RAGService:
         instructions += "Verwende für deine Antwort die folgenden spezifischen Layoutvorgaben:\n"
         
         # Standard-Komponenten und Beispielformate laden
-        from ..db.session import get_db
         from ..db.models import UIComponentDefinition
-        from sqlalchemy.orm import Session
         
         # Komponenten-Definitionen aus der Datenbank laden
-        db = next(get_db())
+        with session_scope() as db:
+            component_definitions = db.query(UIComponentDefinition).all()
         
         # Dictionary mit verfügbaren Komponenten und deren Beispielformaten erstellen
         components_examples = {}
-        component_definitions = db.query(UIComponentDefinition).all()
         
         # Standardbeispiele sammeln
         for comp_def in component_definitions:
@@ -305,9 +308,11 @@ class RAGService:
         self, 
         query: str, 
         tenant_id: str,
-        db: Session,
+        db: Optional[Session] = None,
         top_k: int = 5,
-        use_structured_data: bool = True
+        use_structured_data: bool = True,
+        tenant: Optional[Tenant] = None,
+        trace: Optional[Dict[str, Any]] = None
     ):
         """
         Generiert eine Antwort auf eine Frage basierend auf den abgerufenen Dokumenten und ggf. strukturierten Daten.
@@ -315,16 +320,20 @@ class RAGService:
         Args:
             query: Die Frage des Benutzers
             tenant_id: Die ID des Tenants
-            db: Die Datenbankverbindung
+            db: Die Datenbankverbindung (nur nötig, wenn tenant nicht übergeben wird)
             top_k: Anzahl der Dokumente, die abgerufen werden sollen
             use_structured_data: Ob strukturierte Daten für die Antwort verwendet werden sollen
+            tenant: Der bereits aufgelöste Tenant, um ein erneutes Laden zu vermeiden
+            trace: Optionales Dict für Messwerte der Chat-Protokollierung
+                   (retrieval_ms, llm_ms, model, prompt_tokens, completion_tokens)
             
         Returns:
             str: Die generierte Antwort
         """
         try:
-            # Tenant-Informationen abrufen
-            tenant = tenant_service.get_tenant_by_id(db, tenant_id)
+            # Tenant-Informationen abrufen, falls sie nicht übergeben wurden
+            if tenant is None:
+                tenant = self._load_tenant(tenant_id, db)
             if not tenant:
                 logger.error(f"Tenant mit ID {tenant_id} nicht gefunden")
                 return "Fehler: Tenant nicht gefunden"
@@ -334,50 +343,45 @@ class RAGService:
             
             # Dokumente basierend auf der Frage abrufen
             logger.info(f"Suche Dokumente für Query: '{query}', Tenant: {tenant_id}")
-            docs = self.search_manager.search(tenant_id, query, limit=top_k)
+            retrieval_started = time.perf_counter()
+            docs, retrieval_source = self._retrieve(
+                tenant_id, query, top_k, backend=fulltext_search_service.backend_for_tenant(tenant)
+            )
+            if trace is not None:
+                trace["retrieval_source"] = retrieval_source
             
             if docs:
                 logger.info(f"{len(docs)} Dokumente gefunden")
-                logger.info(f"Top-Dokument: {docs[0].get('title', 'Kein Titel')}")
+                logger.info(f"Top-Dokument: {(docs[0].get('properties') or docs[0]).get('title', 'Kein Titel')}")
             else:
                 logger.info("Keine Dokumente gefunden")
                 
-            # Prüfen, ob strukturierte Daten verwendet werden sollen
+            # Strukturierte Daten (Weaviate) auch für Volltext-Tenants und lexikalische Treffer abfragen
             structured_data_results = []
             if use_structured_data:
-                # Strukturierte Daten für verschiedene Datentypen abfragen
-                data_types = ["school", "office", "event", "service", "local_law", "kindergarten", "webpage", "waste_management"]
-                
-                # Für jeden Datentyp nach strukturierten Daten suchen
-                for data_type in data_types:
-                    try:
-                        type_results = structured_data_service.search_structured_data(
-                            tenant_id=tenant_id,
-                            query=query,
-                            data_type=data_type,
-                            limit=3  # Begrenzt auf 3 Ergebnisse pro Typ
-                        )
-                        
-                        if type_results:
-                            logger.info(f"{len(type_results)} strukturierte Daten vom Typ '{data_type}' gefunden")
-                            structured_data_results.extend(type_results)
-                    except Exception as e:
-                        logger.error(f"Fehler beim Abrufen von strukturierten Daten vom Typ '{data_type}': {e}")
-                
-                if structured_data_results:
-                    logger.info(f"Insgesamt {len(structured_data_results)} strukturierte Daten gefunden")
-                else:
-                    logger.info("Keine strukturierten Daten gefunden")
+                structured_data_results = self._search_structured(tenant_id, query, retrieval_source, tenant)
+            
+            if trace is not None:
+                trace["retrieval_ms"] = int((time.perf_counter() - retrieval_started) * 1000)
             
             # Kontext für die Antwort erstellen
             context = ""
             
+            if retrieval_source == "unavailable":
+                context += (
+                    "HINWEIS: Die Wissensdatenbank ist vorübergehend nicht erreichbar. "
+                    "Beantworte die Frage allgemein und weise darauf hin, dass konkrete Angaben "
+                    "(z. B. Öffnungszeiten, Termine, Kontaktdaten) gerade nicht geprüft werden können.\n\n"
+                )
+            
             # Dokumente zum Kontext hinzufügen
             if docs:
                 context += "===== DOKUMENTE =====\n\n"
                 for i, doc in enumerate(docs):
-                    title = doc.get("title", "Kein Titel")
-                    content = doc.get("content", "Kein Inhalt").strip()
+                    # Suchtreffer liefern die Felder unter "properties"
+                    fields = doc.get("properties") or doc
+                    title = fields.get("title") or "Kein Titel"
+                    content = (fields.get("content") or "Kein Inhalt").strip()
                     context += f"DOKUMENT {i+1}: {title}\n{content}\n\n"
             
             # Strukturierte Daten zum Kontext hinzufügen
@@ -428,6 +432,8 @@ class RAGService:
                     elif data_type == "event":
                         context += f"Titel: {data.get('title', '')}\n"
                         context += f"Datum: {data.get('date', '')}\n"
+                        if data.get('startDate'):
+                            context += f"Beginn (normalisiert): {data['startDate']}\n"
                         context += f"Uhrzeit: {data.get('time', '')}\n"
                         context += f"Ort: {data.get('location', '')}\n"
                         context += f"Veranstalter: {data.get('organizer', '')}\n"
@@ -483,11 +489,15 @@ ANTWORT:
             # Antwort generieren
             temperature = 0.2  # Niedrige Temperatur für faktenbasierte Antworten
             
+            llm_started = time.perf_counter()
             response = await llm_service.generate_text(
                 prompt=prompt,
                 temperature=temperature,
-                max_tokens=1000
+                max_tokens=1000,
+                usage=trace
             )
+            if trace is not None:
+                trace["llm_ms"] = int((time.perf_counter() - llm_started) * 1000)
             
             return response.strip()
             
@@ -495,17 +505,115 @@ ANTWORT:
             logger.error(f"Fehler beim Erstellen der Antwort: {e}")
             return f"Es ist ein Fehler bei der Beantwortung aufgetreten: {str(e)}"
     
+    def _retrieve(
+        self, tenant_id: str, query: str, top_k: int, backend: str = "weaviate"
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Sucht Dokumente in Weaviate bzw. bei backend="fulltext" ausschließlich
+        über die PostgreSQL-Volltextsuche. Mit LEXICAL_FIRST_STAGE werden kurze,
+        eindeutig lexikalisch beantwortbare Fragen vorher aus dem BM25-Index
+        bedient. Ist Weaviate nicht erreichbar oder der Circuit Breaker offen,
+        werden die zuletzt für diese Frage gefundenen Dokumente, die
+        Volltextsuche bzw. der BM25-Index verwendet; gibt es keine Treffer,
+        wird ohne Kontext geantwortet.
+
+        :return: Tuple aus (Dokumente, Quelle: fulltext, lexical, weaviate, cache oder unavailable)
+        """
+        if backend == "fulltext":
+            return fulltext_search_service.safe_search(tenant_id, query, top_k), "fulltext"
+        if settings.LEXICAL_INDEX_ENABLED and settings.LEXICAL_FIRST_STAGE:
+            docs = lexical_index_service.first_stage(
+                tenant_id, query, top_k,
+                max_terms=settings.LEXICAL_FIRST_STAGE_MAX_TERMS,
+                min_coverage=settings.LEXICAL_FIRST_STAGE_MIN_COVERAGE
+            )
+            if docs:
+                return docs, "lexical"
+        try:
+            docs = self.search_manager.search(tenant_id, query, limit=top_k)
+        except WeaviateUnavailableError as e:
+            cached = retrieval_cache.get(tenant_id, query)
+            if cached:
+                logger.warning(f"Weaviate nicht verfügbar ({e}), antworte mit gecachten Suchergebnissen")
+                return cached, "cache"
+            if settings.FULLTEXT_FALLBACK_ENABLED and fulltext_search_service.available:
+                docs = fulltext_search_service.safe_search(tenant_id, query, top_k)
+                if docs:
+                    logger.warning(f"Weaviate nicht verfügbar ({e}), antworte mit der Volltextsuche")
+                    return docs, "fulltext"
+            if settings.LEXICAL_INDEX_ENABLED:
+                docs = lexical_index_service.safe_search(tenant_id, query, top_k)
+                if docs:
+                    logger.warning(f"Weaviate nicht verfügbar ({e}), antworte mit dem lexikalischen Index")
+                    return docs, "lexical"
+            logger.warning(f"Weaviate nicht verfügbar ({e}), antworte ohne Wissensdatenbank")
+            return [], "unavailable"
+        retrieval_cache.store(tenant_id, query, docs)
+        return docs, "weaviate"
+    
+    @staticmethod
+    def _search_structured(
+        tenant_id: str, query: str, retrieval_source: str, tenant: Optional[Tenant] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Sucht strukturierte Daten aller Datentypen (höchstens 3 Ergebnisse pro Typ).
+        Füllwörter für Veranstaltungsfragen (z. B. der Ortsname) stammen aus dem Tenant.
+        Nur wenn Weaviate tatsächlich gestört ist (Rückfall auf Cache bzw. ohne
+        Wissensdatenbank oder offener Circuit Breaker), wird die Suche übersprungen,
+        da die Abfragen ohnehin sofort abgewiesen würden.
+        """
+        if retrieval_source in ("cache", "unavailable") or weaviate_breaker.state == "open":
+            return []
+        
+        filler_words = structured_data_service.get_event_query_filler(tenant)
+        results = []
+        data_types = ["school", "office", "event", "service", "local_law", "kindergarten", "webpage", "waste_management"]
+        for data_type in data_types:
+            # Öffnet sich der Breaker während der Suche, die übrigen Typen nicht mehr abfragen
+            if weaviate_breaker.state == "open":
+                break
+            try:
+                type_results = structured_data_service.search_structured_data(
+                    tenant_id=tenant_id,
+                    query=query,
+                    data_type=data_type,
+                    limit=3,
+                    filler_words=filler_words
+                )
+                if type_results:
+                    logger.info(f"{len(type_results)} strukturierte Daten vom Typ '{data_type}' gefunden")
+                    results.extend(type_results)
+            except Exception as e:
+                logger.error(f"Fehler beim Abrufen von strukturierten Daten vom Typ '{data_type}': {e}")
+        
+        if results:
+            logger.info(f"Insgesamt {len(results)} strukturierte Daten gefunden")
+        else:
+            logger.info("Keine strukturierten Daten gefunden")
+        return results
+    
+    def _load_tenant(self, tenant_id: str, db: Optional[Session] = None) -> Optional[Tenant]:
+        """Lädt einen Tenant über den gecachten tenant_service; öffnet bei Bedarf eine eigene Session."""
+        if db is not None:
+            return tenant_service.get_tenant_by_id(db, tenant_id)
+        with session_scope() as session:
+            return tenant_service.get_tenant_by_id(session, tenant_id)
+    
     async def process_chat(
         self,
         tenant_id: str,
         messages: List[Dict[str, str]],
         system_prompt: Optional[str] = None,
         stream: bool = True,
-        use_mistral: bool = False
+        use_mistral: bool = False,
+        tenant: Optional[Tenant] = None,
+        trace: Optional[Dict[str, Any]] = None
     ) -> AsyncGenerator[str, None]:
         """
         Verarbeitet eine Chat-Konversation mit mehreren Nachrichten.
         Die letzte Benutzernachricht wird für die Suche verwendet.
+        Ein bereits aufgelöster Tenant kann übergeben werden und wird nicht erneut geladen.
+        In `trace` werden Latenzen und Tokenzahlen für die Chat-Protokollierung gesammelt.
         """
         # Finde die letzte Benutzernachricht
         query = ""
@@ -523,9 +631,10 @@ ANTWORT:
             response = await self.get_answer(
                 query=query,
                 tenant_id=tenant_id,
-                db=SessionLocal(),
                 top_k=5,
-                use_structured_data=True
+                use_structured_data=True,
+                tenant=tenant,
+                trace=trace
             )
             
             if response:
@@ -534,6 +643,8 @@ ANTWORT:
             # Verbesserte Fehlerbehandlung
             error_msg = str(e)
             logging.error(f"Fehler bei der Chat-Verarbeitung: {error_msg}", exc_info=True)
+            if trace is not None:
+                trace["error"] = error_msg
             yield f"Es tut mir leid, bei der Verarbeitung Ihrer Anfrage ist ein Fehler aufgetreten: {error_msg}"
 
 
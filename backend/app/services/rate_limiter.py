@@ -0,0 +1,306 @@
+"""
+Rate-Limiting für die öffentlichen Chat- und Embed-Endpunkte (Token-Bucket).
+
+Der Embed-API-Key ist öffentlich (er steht im embed.js des Widgets). Damit
+niemand über einen Tenant das LLM-Budget verbrauchen kann, werden Anfragen
+pro API-Key und pro (API-Key, Client-IP) begrenzt. Jeder Bucket fasst
+`burst` Anfragen und füllt sich mit `requests_per_minute` wieder auf.
+
+Die Limits können pro Tenant in TenantModel.config["rate_limit"] überschrieben
+werden, z. B.:
+
+    {"rate_limit": {"requests_per_minute": 300, "burst": 60,
+                    "client_requests_per_minute": 30, "client_burst": 10}}
+
+Backends:
+- "memory": Buckets im Speicher des Worker-Prozesses (Standard)
+- "postgres": gemeinsame Buckets aller Worker in der Tabelle rate_limit_buckets.
+  Der lokale Bucket wird trotzdem zuerst geprüft: Ein Worker sieht nur einen
+  Teil der Anfragen, ist sein Bucket leer, ist es der gemeinsame erst recht.
+  Solche Anfragen werden ohne Datenbankzugriff abgelehnt.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..db.models import Tenant
+from ..db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Abstand zwischen zwei Bereinigungen der gemeinsamen Buckets (Sekunden)
+PRUNE_INTERVAL = 600
+
+
+class RateLimit:
+    """Limit eines Buckets: Kapazität (burst) und Nachfüllrate pro Minute."""
+
+    __slots__ = ("requests_per_minute", "burst")
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.requests_per_minute = max(float(requests_per_minute), 0.001)
+        self.burst = max(int(burst), 1)
+
+    @property
+    def rate(self) -> float:
+        """Nachfüllrate in Anfragen pro Sekunde."""
+        return self.requests_per_minute / 60.0
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, RateLimit)
+                and other.requests_per_minute == self.requests_per_minute
+                and other.burst == self.burst)
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self.requests_per_minute}/min, burst={self.burst})"
+
+
+class RateLimitResult:
+    """Ergebnis einer Prüfung; liefert die RateLimit-*-Header."""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset_after", "retry_after")
+
+    def __init__(self, allowed: bool, limit: int, remaining: float, reset_after: float, retry_after: float = 0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_bucket(cls, allowed: bool, tokens: float, limit: RateLimit, cost: float = 1.0) -> "RateLimitResult":
+        tokens = max(tokens, 0.0)
+        return cls(
+            allowed=allowed,
+            limit=limit.burst,
+            remaining=tokens,
+            reset_after=(limit.burst - tokens) / limit.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / limit.rate
+        )
+
+    def headers(self) -> List[Tuple[str, str]]:
+        headers = [
+            ("RateLimit-Limit", str(self.limit)),
+            ("RateLimit-Remaining", str(int(math.floor(self.remaining)))),
+            ("RateLimit-Reset", str(int(math.ceil(self.reset_after)))),
+        ]
+        if not self.allowed:
+            headers.append(("Retry-After", str(max(1, int(math.ceil(self.retry_after))))))
+        return headers
+
+
+class InMemoryRateLimitBackend:
+    """Token-Buckets im Speicher des Worker-Prozesses."""
+
+    name = "memory"
+
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        # Schlüssel -> [Füllstand, Zeitpunkt der letzten Aktualisierung (monotonic)]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(limit.burst)
+                bucket = self._buckets[key] = [tokens, now]
+                if len(self._buckets) > self.max_buckets:
+                    self._evict()
+            else:
+                tokens = min(float(limit.burst), bucket[0] + (now - bucket[1]) * limit.rate)
+                self._buckets.move_to_end(key)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            bucket[0] = tokens
+            bucket[1] = now
+        return RateLimitResult.from_bucket(allowed, tokens, limit, cost)
+
+    def refund(self, key: str, limit: RateLimit, cost: float = 1.0) -> None:
+        """Gibt verbrauchte Tokens zurück (wenn das gemeinsame Backend die Anfrage abgelehnt hat)."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(float(limit.burst), bucket[0] + cost)
+
+    def _evict(self) -> None:
+        """Entfernt die am längsten unbenutzten Buckets; sie hätten sich ohnehin wieder aufgefüllt."""
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class PostgresRateLimitBackend:
+    """
+    Gemeinsame Token-Buckets aller Worker in der Tabelle rate_limit_buckets.
+    Jede Prüfung ist ein einzelnes atomares UPSERT.
+    """
+
+    name = "postgres"
+
+    _CONSUME_SQL = text("""
+        INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at, allowed)
+        VALUES (:key, :burst - :cost, :now, TRUE)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE
+                WHEN LEAST(:burst, b.tokens + GREATEST(:now - b.updated_at, 0) * :rate) >= :cost
+                THEN LEAST(:burst, b.tokens + GREATEST(:now - b.updated_at, 0) * :rate) - :cost
+                ELSE LEAST(:burst, b.tokens + GREATEST(:now - b.updated_at, 0) * :rate)
+            END,
+            allowed = LEAST(:burst, b.tokens + GREATEST(:now - b.updated_at, 0) * :rate) >= :cost,
+            updated_at = :now
+        RETURNING tokens, allowed
+    """)
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        with engine.begin() as connection:
+            row = connection.execute(self._CONSUME_SQL, {
+                "key": key,
+                "burst": float(limit.burst),
+                "rate": limit.rate,
+                "cost": float(cost),
+                "now": time.time()
+            }).one()
+        return RateLimitResult.from_bucket(bool(row.allowed), float(row.tokens), limit, cost)
+
+    def prune(self, max_idle_seconds: float = 3600) -> int:
+        """Entfernt Buckets, die länger nicht benutzt wurden (sie wären ohnehin voll)."""
+        with engine.begin() as connection:
+            result = connection.execute(
+                text("DELETE FROM rate_limit_buckets WHERE updated_at < :cutoff"),
+                {"cutoff": time.time() - max_idle_seconds}
+            )
+        return result.rowcount or 0
+
+
+class RateLimiter:
+    """Prüft Anfragen gegen die Buckets pro API-Key und pro (API-Key, Client-IP)."""
+
+    def __init__(
+        self,
+        default_limit: RateLimit,
+        default_client_limit: RateLimit,
+        backend: str = "memory",
+        max_buckets: int = 100000
+    ):
+        self.default_limit = default_limit
+        self.default_client_limit = default_client_limit
+        self.local = InMemoryRateLimitBackend(max_buckets=max_buckets)
+        self.shared: Optional[PostgresRateLimitBackend] = None
+        if backend == "postgres":
+            if engine.dialect.name == "postgresql":
+                self.shared = PostgresRateLimitBackend()
+            else:
+                logger.warning("Rate-Limit-Backend 'postgres' benötigt PostgreSQL, verwende Speicher-Backend")
+
+        self._last_prune = time.monotonic()
+
+        # Zähler für Metriken
+        self.allowed_count = 0
+        self.rejected_count = 0
+        self.rejected_locally_count = 0
+        self.backend_error_count = 0
+
+    def limits_for_tenant(self, tenant: Optional[Tenant]) -> Optional[Tuple[RateLimit, RateLimit]]:
+        """
+        Gibt die Limits (API-Key, Client) eines Tenants zurück.
+        None bedeutet, dass das Rate-Limiting für den Tenant abgeschaltet ist.
+        """
+        config = ((tenant.config or {}).get("rate_limit") if tenant is not None else None) or {}
+        if config.get("enabled") is False:
+            return None
+        return (
+            RateLimit(
+                config.get("requests_per_minute", self.default_limit.requests_per_minute),
+                config.get("burst", self.default_limit.burst)
+            ),
+            RateLimit(
+                config.get("client_requests_per_minute", self.default_client_limit.requests_per_minute),
+                config.get("client_burst", self.default_client_limit.burst)
+            )
+        )
+
+    def check(self, keys: List[Tuple[str, RateLimit]], cost: float = 1.0) -> RateLimitResult:
+        """
+        Prüft eine Anfrage gegen mehrere Buckets (z. B. API-Key und Client).
+        Zurückgegeben wird das Ergebnis des knappsten Buckets.
+
+        Läuft bei gemeinsamem Backend synchron gegen die Datenbank und sollte
+        dann außerhalb des Event-Loops aufgerufen werden.
+        """
+        results = [self.local.consume(key, limit, cost) for key, limit in keys]
+        rejected = [result for result in results if not result.allowed]
+        if rejected:
+            self.rejected_count += 1
+            self.rejected_locally_count += 1
+            return max(rejected, key=lambda result: result.retry_after)
+
+        if self.shared is not None:
+            try:
+                results = [self.shared.consume(key, limit, cost) for key, limit in keys]
+                self._prune_if_due()
+            except Exception as e:
+                # Bei Ausfall des gemeinsamen Backends gelten die lokalen Limits weiter
+                self.backend_error_count += 1
+                logger.error(f"Gemeinsames Rate-Limit-Backend nicht erreichbar: {e}")
+            rejected = [result for result in results if not result.allowed]
+            if rejected:
+                # Abgelehnte Anfragen zählen auch lokal nicht, sonst lehnt der Worker zu früh ab
+                for key, limit in keys:
+                    self.local.refund(key, limit, cost)
+                self.rejected_count += 1
+                return max(rejected, key=lambda result: result.retry_after)
+
+        self.allowed_count += 1
+        return min(results, key=lambda result: result.remaining)
+
+    def _prune_if_due(self) -> None:
+        now = time.monotonic()
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        pruned = self.shared.prune()
+        if pruned:
+            logger.debug(f"{pruned} ungenutzte Rate-Limit-Buckets entfernt")
+
+    @property
+    def needs_io(self) -> bool:
+        """True, wenn eine Prüfung die Datenbank abfragen kann."""
+        return self.shared is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Backend und Zähler des Rate-Limiters zurück."""
+        return {
+            "backend": self.shared.name if self.shared is not None else self.local.name,
+            "local_buckets": len(self.local),
+            "allowed": self.allowed_count,
+            "rejected": self.rejected_count,
+            "rejected_locally": self.rejected_locally_count,
+            "backend_errors": self.backend_error_count
+        }
+
+
+# Singleton-Instanz
+rate_limiter = RateLimiter(
+    default_limit=RateLimit(settings.RATE_LIMIT_REQUESTS_PER_MINUTE, settings.RATE_LIMIT_BURST),
+    default_client_limit=RateLimit(settings.RATE_LIMIT_CLIENT_REQUESTS_PER_MINUTE, settings.RATE_LIMIT_CLIENT_BURST),
+    backend=settings.RATE_LIMIT_BACKEND,
+    max_buckets=settings.RATE_LIMIT_MAX_BUCKETS
+)
@@ -0,0 +1,549 @@
+"""
+Fortsetzbare Neuindizierung der Wissensbasis in Weaviate.
+
+Ein Reindex-Auftrag umfasst einen oder mehrere Tenants:
+
+- Quelle ist Postgres: Die Dokumente eines Tenants werden in ID-Reihenfolge
+  in Batches gelesen (Keyset-Pagination), nie vollständig in den Speicher.
+- Batches werden mit insert_many geschrieben; pro Auftrag laufen höchstens
+  `concurrency` Batches gleichzeitig (über alle Tenants des Auftrags).
+- Nach jedem geschriebenen Batch wird der Checkpoint (letzte Dokument-ID) in
+  reindex_job_tenants gespeichert. Bricht der Prozess ab, setzt ein erneuter
+  Start des Auftrags dort fort, statt von vorn zu beginnen.
+- Blue/Green: Die Dokumente werden in eine neue Collection geschrieben,
+  während Suchen weiter die aktive Collection lesen. Laufende Änderungen
+  (Outbox-Indexer) werden in dieser Zeit in beide Collections geschrieben.
+  Vor dem Umschalten werden die durchsuchbaren Kopien strukturierter Daten,
+  die nur in Weaviate stehen, aus der alten Collection übernommen.
+  Am Ende wird umgeschaltet und die alte Collection gelöscht. Schlägt ein
+  Tenant fehl, wird die begonnene Collection verworfen, da sie ab dann keine
+  laufenden Änderungen mehr erhält.
+
+Der ausführende Prozess aktualisiert regelmäßig heartbeat_at und leert es,
+wenn er den Auftrag beendet. Ein Auftrag ohne Lebenszeichen seit
+REINDEX_LEASE_SECONDS gilt als abgebrochen und kann von jedem Prozess
+fortgesetzt werden. Das gilt unabhängig vom Status: Ein abgebrochener Auftrag
+läuft bis zum nächsten Lebenszeichen weiter und darf bis dahin nicht erneut starten.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import DocumentModel, ReindexJobModel, ReindexJobTenantModel, TenantModel
+from ..db.session import session_scope
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .structured_data_service import StructuredDataService
+from .weaviate.collection_registry import collection_registry
+from .weaviate.schema_manager import SchemaManager
+from .weaviate_service import weaviate_service
+
+logger = logging.getLogger(__name__)
+
+# Versuche pro Batch, bevor der Tenant als fehlgeschlagen gilt
+MAX_BATCH_ATTEMPTS = 3
+
+# Wartezeit vor dem Löschen der alten Collection, damit alle Worker die
+# Umschaltung übernommen haben: über den Cache-Invalidierungsbus oder
+# spätestens beim periodischen Neuladen der Zuordnung (Sekunden)
+OLD_COLLECTION_DROP_DELAY = settings.COLLECTION_REGISTRY_RESYNC_SECONDS + 10.0
+
+
+class ReindexService:
+    """Legt Reindex-Aufträge an und führt sie mit Checkpoints aus."""
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        concurrency: int = 4,
+        lease_seconds: int = 120,
+        keep_old_collection: bool = False
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.keep_old_collection = keep_old_collection
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._cancelled: Set[int] = set()
+
+        # Zähler für Metriken
+        self.documents_written = 0
+        self.documents_failed = 0
+        self.batch_count = 0
+        self.batch_retries = 0
+
+    # Aufträge anlegen und abfragen
+
+    def create_job(
+        self,
+        db: Session,
+        tenant_ids: Optional[List[str]] = None,
+        blue_green: bool = True,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> ReindexJobModel:
+        """
+        Legt einen Auftrag an (ohne ihn zu starten).
+
+        :param tenant_ids: Tenants des Auftrags (None = alle Tenants)
+        :param blue_green: In eine neue Collection schreiben und am Ende umschalten
+        """
+        if tenant_ids is None:
+            tenant_ids = [tenant_id for (tenant_id,) in db.query(TenantModel.id).order_by(TenantModel.id)]
+        tenant_ids = list(dict.fromkeys(tenant_ids))
+        if not tenant_ids:
+            raise ValueError("Keine Tenants für die Neuindizierung angegeben")
+
+        job = ReindexJobModel(
+            status="pending",
+            blue_green=blue_green,
+            batch_size=batch_size or self.batch_size,
+            concurrency=concurrency or self.concurrency
+        )
+        db.add(job)
+        db.flush()
+        for tenant_id in tenant_ids:
+            db.add(ReindexJobTenantModel(job_id=job.id, tenant_id=tenant_id, status="pending"))
+        db.commit()
+        db.refresh(job)
+        logger.info(f"Reindex-Auftrag {job.id} für {len(tenant_ids)} Tenants angelegt")
+        return job
+
+    def get_job(self, db: Session, job_id: int) -> Optional[Dict[str, Any]]:
+        """Gibt einen Auftrag mit dem Fortschritt pro Tenant zurück."""
+        job = db.get(ReindexJobModel, job_id)
+        if job is None:
+            return None
+        tenants = db.query(ReindexJobTenantModel).filter(
+            ReindexJobTenantModel.job_id == job_id
+        ).order_by(ReindexJobTenantModel.tenant_id).all()
+        return self._job_to_dict(job, tenants)
+
+    def list_jobs(self, db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+        """Gibt die neuesten Aufträge zurück (ohne Details pro Tenant)."""
+        jobs = db.query(ReindexJobModel).order_by(ReindexJobModel.id.desc()).limit(limit).all()
+        return [self._job_to_dict(job) for job in jobs]
+
+    def _job_to_dict(self, job: ReindexJobModel, tenants: Optional[List[ReindexJobTenantModel]] = None) -> Dict[str, Any]:
+        result = {
+            "id": job.id,
+            "status": job.status,
+            "blue_green": job.blue_green,
+            "batch_size": job.batch_size,
+            "concurrency": job.concurrency,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "heartbeat_at": job.heartbeat_at,
+            "running_here": job.id in self._tasks
+        }
+        if tenants is not None:
+            total = sum(t.total for t in tenants)
+            processed = sum(t.processed for t in tenants)
+            result["total"] = total
+            result["processed"] = processed
+            result["progress"] = round(processed / total, 4) if total else (1.0 if job.status == "completed" else 0.0)
+            result["tenants"] = [
+                {
+                    "tenant_id": t.tenant_id,
+                    "status": t.status,
+                    "target_collection": t.target_collection,
+                    "previous_collection": t.previous_collection,
+                    "total": t.total,
+                    "processed": t.processed,
+                    "failed": t.failed,
+                    "checkpoint": t.last_document_id,
+                    "error": t.error
+                }
+                for t in tenants
+            ]
+        return result
+
+    # Ausführung
+
+    async def start(self, job_id: int) -> None:
+        """
+        Übernimmt einen Auftrag und führt ihn im Hintergrund dieses Prozesses aus.
+
+        :raises ValueError: Wenn der Auftrag nicht existiert, abgeschlossen ist oder bereits läuft
+        """
+        if job_id in self._tasks:
+            raise ValueError(f"Reindex-Auftrag {job_id} läuft bereits")
+        job = await asyncio.to_thread(self._claim, job_id)
+        task = asyncio.create_task(self._execute(job), name=f"reindex-{job_id}")
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        Bricht die lokal laufenden Aufträge nach den laufenden Batches ab (beim
+        Herunterfahren). Sie enden als "cancelled" und können fortgesetzt werden.
+        """
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        self._cancelled.update(self._tasks)
+        await asyncio.wait(tasks, timeout=timeout)
+
+    def cancel(self, db: Session, job_id: int) -> bool:
+        """
+        Bricht einen Auftrag nach den laufenden Batches ab. Läuft er in einem
+        anderen Prozess, bemerkt dieser den Abbruch beim nächsten Lebenszeichen.
+        Ein abgebrochener Auftrag kann fortgesetzt werden, sobald dieser Prozess ihn beendet hat.
+        """
+        job = db.get(ReindexJobModel, job_id)
+        if job is None or job.status not in ("pending", "running"):
+            return False
+        self._cancelled.add(job_id)
+        job.status = "cancelled"
+        db.commit()
+        return True
+
+    def _claim(self, job_id: int) -> Dict[str, Any]:
+        """Übernimmt einen Auftrag zur Ausführung, sofern er nicht anderswo aktiv läuft."""
+        with session_scope() as db:
+            job = db.query(ReindexJobModel).filter(ReindexJobModel.id == job_id).with_for_update().first()
+            if job is None:
+                raise ValueError(f"Reindex-Auftrag {job_id} nicht gefunden")
+            if job.status == "completed":
+                raise ValueError(f"Reindex-Auftrag {job_id} ist bereits abgeschlossen")
+            now = datetime.utcnow()
+            # Auch nach einem Abbruch, bis der ausführende Prozess ihn bemerkt und beendet hat
+            if job.heartbeat_at and now - job.heartbeat_at < timedelta(seconds=self.lease_seconds):
+                if job.status == "cancelled":
+                    raise ValueError(f"Reindex-Auftrag {job_id} wird noch beendet, bitte später fortsetzen")
+                raise ValueError(f"Reindex-Auftrag {job_id} läuft bereits in einem anderen Prozess")
+            resumed = job.started_at is not None
+            job.status = "running"
+            job.error = None
+            job.started_at = job.started_at or now
+            job.finished_at = None
+            job.heartbeat_at = now
+            # Fehlgeschlagene Tenants werden beim Fortsetzen erneut versucht
+            db.query(ReindexJobTenantModel).filter(
+                ReindexJobTenantModel.job_id == job_id,
+                ReindexJobTenantModel.status != "completed"
+            ).update({"status": "pending", "error": None}, synchronize_session=False)
+            tenant_ids = [
+                tenant_id for (tenant_id,) in db.query(ReindexJobTenantModel.tenant_id).filter(
+                    ReindexJobTenantModel.job_id == job_id,
+                    ReindexJobTenantModel.status != "completed"
+                ).order_by(ReindexJobTenantModel.tenant_id)
+            ]
+            db.commit()
+            return {
+                "id": job.id,
+                "blue_green": job.blue_green,
+                "batch_size": job.batch_size,
+                "concurrency": job.concurrency,
+                "tenant_ids": tenant_ids,
+                "resumed": resumed
+            }
+
+    async def run_job(self, job_id: int) -> str:
+        """
+        Führt einen Auftrag aus bzw. setzt ihn ab den gespeicherten Checkpoints fort.
+
+        :return: Endstatus (completed, failed oder cancelled)
+        """
+        job = await asyncio.to_thread(self._claim, job_id)
+        return await self._execute(job)
+
+    async def _execute(self, job: Dict[str, Any]) -> str:
+        job_id = job["id"]
+        self._cancelled.discard(job_id)
+        logger.info(
+            f"Reindex-Auftrag {job_id} {'fortgesetzt' if job['resumed'] else 'gestartet'}: "
+            f"{len(job['tenant_ids'])} Tenants, Batchgröße {job['batch_size']}, Parallelität {job['concurrency']}"
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        semaphore = asyncio.Semaphore(job["concurrency"])
+        status = "failed"
+        error = None
+        try:
+            results = await asyncio.gather(
+                *(self._run_tenant(job, tenant_id, semaphore) for tenant_id in job["tenant_ids"])
+            )
+            if job_id in self._cancelled:
+                status = "cancelled"
+            elif all(results):
+                status = "completed"
+            else:
+                error = f"{results.count(False)} Tenants fehlgeschlagen"
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Reindex-Auftrag {job_id} fehlgeschlagen: {e}")
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._finish_job, job_id, status, error)
+            self._cancelled.discard(job_id)
+            logger.info(f"Reindex-Auftrag {job_id} beendet: {status}")
+        return status
+
+    def _finish_job(self, job_id: int, status: str, error: Optional[str]) -> None:
+        with session_scope() as db:
+            job = db.get(ReindexJobModel, job_id)
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            # Kein Prozess führt den Auftrag mehr aus; er kann sofort fortgesetzt werden
+            job.heartbeat_at = None
+            db.commit()
+
+    async def _heartbeat(self, job_id: int) -> None:
+        """Aktualisiert das Lebenszeichen und übernimmt Abbrüche aus anderen Prozessen."""
+        interval = max(1.0, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                status = await asyncio.to_thread(self._touch, job_id)
+                if status == "cancelled":
+                    self._cancelled.add(job_id)
+            except Exception as e:
+                logger.warning(f"Lebenszeichen für Reindex-Auftrag {job_id} fehlgeschlagen: {e}")
+
+    def _touch(self, job_id: int) -> str:
+        with session_scope() as db:
+            job = db.get(ReindexJobModel, job_id)
+            if job.status == "running":
+                job.heartbeat_at = datetime.utcnow()
+                db.commit()
+            return job.status
+
+    async def _run_tenant(self, job: Dict[str, Any], tenant_id: str, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Indiziert einen Tenant ab seinem Checkpoint neu.
+
+        :return: False, wenn der Tenant fehlgeschlagen ist
+        """
+        job_id = job["id"]
+        try:
+            state = await asyncio.to_thread(self._prepare_tenant, job, tenant_id)
+        except Exception as e:
+            logger.error(f"Reindex-Auftrag {job_id}: Tenant {tenant_id} konnte nicht vorbereitet werden: {e}")
+            await self._fail_tenant(job, tenant_id, str(e))
+            return False
+
+        target = state["target"]
+        cursor = state["checkpoint"]
+        in_flight: deque = deque()
+        error = None
+        try:
+            while job_id not in self._cancelled:
+                documents = await asyncio.to_thread(self._read_batch, tenant_id, cursor, job["batch_size"])
+                if not documents:
+                    break
+                cursor = documents[-1]["id"]
+                await semaphore.acquire()
+                task = asyncio.create_task(self._write_batch(tenant_id, target, documents, semaphore))
+                in_flight.append((cursor, len(documents), task))
+                # Checkpoint nur bis zum ersten noch offenen Batch fortschreiben
+                while in_flight and (in_flight[0][2].done() or len(in_flight) >= job["concurrency"]):
+                    await self._commit_head(job_id, tenant_id, in_flight)
+        except Exception as e:
+            error = str(e)
+        # Bereits gestartete Batches abschließen (auch bei Fehlern, für einen genauen Checkpoint)
+        while in_flight:
+            try:
+                await self._commit_head(job_id, tenant_id, in_flight)
+            except Exception as e:
+                error = error or str(e)
+                for _, _, task in in_flight:
+                    await asyncio.gather(task, return_exceptions=True)
+                in_flight.clear()
+
+        if error:
+            logger.error(f"Reindex-Auftrag {job_id}: Tenant {tenant_id} fehlgeschlagen: {error}")
+            await self._fail_tenant(job, tenant_id, error)
+            return False
+        if job_id in self._cancelled:
+            await asyncio.to_thread(self._set_tenant_status, job_id, tenant_id, "pending", None)
+            return True
+
+        if job["blue_green"] and target != state["previous"]:
+            # Nach einem Abbruch zwischen Umschaltung und Abschluss ist bereits umgeschaltet
+            if state["active"] != target:
+                try:
+                    copied = await asyncio.to_thread(
+                        StructuredDataService.copy_mirrors, state["previous"], target, job["batch_size"]
+                    )
+                except Exception as e:
+                    logger.error(f"Reindex-Auftrag {job_id}: Tenant {tenant_id} fehlgeschlagen: {e}")
+                    await self._fail_tenant(job, tenant_id, str(e))
+                    return False
+                if copied:
+                    logger.info(f"Reindex-Auftrag {job_id}: {copied} strukturierte Datensätze nach {target} übernommen")
+                await asyncio.to_thread(collection_registry.complete_swap, tenant_id, target)
+            if not self.keep_old_collection:
+                await asyncio.sleep(OLD_COLLECTION_DROP_DELAY)
+                await asyncio.to_thread(SchemaManager.delete_collection, state["previous"])
+        await asyncio.to_thread(self._set_tenant_status, job_id, tenant_id, "completed", None)
+        cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id)
+        return True
+
+    async def _fail_tenant(self, job: Dict[str, Any], tenant_id: str, error: str) -> None:
+        """
+        Markiert einen Tenant als fehlgeschlagen. Bei Blue/Green wird die begonnene
+        Collection verworfen: Sie erhält danach keine laufenden Änderungen mehr und
+        wäre bei einem Neustart veraltet, daher beginnt dieser mit einer neuen.
+        """
+        abandoned = await asyncio.to_thread(self._release_target, job, tenant_id, error)
+        if abandoned:
+            await asyncio.sleep(OLD_COLLECTION_DROP_DELAY)
+            await asyncio.to_thread(SchemaManager.delete_collection, abandoned)
+
+    def _release_target(self, job: Dict[str, Any], tenant_id: str, error: str) -> Optional[str]:
+        """Setzt den Tenant auf "failed" und meldet die begonnene Collection ab; gibt deren Namen zurück."""
+        active = SchemaManager.get_tenant_class_name(tenant_id)
+        abandoned = None
+        with session_scope() as db:
+            row = db.get(ReindexJobTenantModel, (job["id"], tenant_id))
+            row.status = "failed"
+            row.error = error[:2000] if error else None
+            if job["blue_green"] and row.target_collection not in (None, active, row.previous_collection):
+                abandoned = row.target_collection
+                row.target_collection = None
+                row.previous_collection = None
+                row.last_document_id = None
+                row.processed = 0
+                row.failed = 0
+            db.commit()
+        if abandoned and collection_registry.pending(tenant_id) == abandoned:
+            collection_registry.abort_swap(tenant_id, active)
+        return abandoned
+
+    async def _commit_head(self, job_id: int, tenant_id: str, in_flight: deque) -> None:
+        """Wartet auf den ältesten Batch und speichert danach den Checkpoint."""
+        last_id, count, task = in_flight[0]
+        failed = await task
+        in_flight.popleft()
+        await asyncio.to_thread(self._save_checkpoint, job_id, tenant_id, last_id, count, failed)
+
+    async def _write_batch(
+        self,
+        tenant_id: str,
+        target: str,
+        documents: List[Dict[str, Any]],
+        semaphore: asyncio.Semaphore
+    ) -> int:
+        """
+        Schreibt einen Batch (mit Wiederholungen) und gibt die Anzahl der
+        einzeln abgelehnten Dokumente zurück.
+        """
+        try:
+            for attempt in range(1, MAX_BATCH_ATTEMPTS + 1):
+                try:
+                    result = await asyncio.to_thread(
+                        weaviate_service.add_documents, tenant_id, documents, target
+                    )
+                    break
+                except Exception as e:
+                    if attempt == MAX_BATCH_ATTEMPTS:
+                        raise
+                    self.batch_retries += 1
+                    logger.warning(f"Reindex-Batch für Tenant {tenant_id} fehlgeschlagen, neuer Versuch: {e}")
+                    await asyncio.sleep(2 ** attempt)
+        finally:
+            semaphore.release()
+        failed = len(result.get("failed", {}))
+        self.batch_count += 1
+        self.documents_written += len(documents) - failed
+        self.documents_failed += failed
+        return failed
+
+    def _prepare_tenant(self, job: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        """
+        Zählt die Dokumente, legt bei Blue/Green die neue Collection an und liest den Checkpoint.
+        Die vorherige Collection wird beim ersten Start gespeichert, da nach der Umschaltung
+        die neue Collection aktiv ist und die alte sonst nicht mehr bekannt wäre.
+        """
+        active = SchemaManager.get_tenant_class_name(tenant_id)
+        with session_scope() as db:
+            row = db.get(ReindexJobTenantModel, (job["id"], tenant_id))
+            if row.target_collection is None:
+                row.previous_collection = active
+                row.target_collection = active
+                if job["blue_green"]:
+                    target = f"{SchemaManager.get_base_class_name(tenant_id)}R{job['id']}"
+                    pending = collection_registry.pending(tenant_id)
+                    if pending and pending != target:
+                        raise ValueError(f"Für Tenant {tenant_id} wird bereits die Collection {pending} aufgebaut")
+                    row.target_collection = target
+            target = row.target_collection
+            # Aufträge von vor der Spalte previous_collection: die aktive gilt als vorherige
+            previous = row.previous_collection or active
+            row.status = "running"
+            row.total = db.query(func.count(DocumentModel.id)).filter(DocumentModel.tenant_id == tenant_id).scalar()
+            checkpoint = row.last_document_id
+            db.commit()
+
+        # Die Registry schreibt in einer eigenen Session, daher erst nach dem Commit;
+        # ist bereits umgeschaltet, fehlt nur noch das Löschen der alten Collection
+        if job["blue_green"] and target not in (previous, active):
+            if not SchemaManager.create_tenant_schema(tenant_id, class_name=target):
+                raise RuntimeError(f"Collection {target} konnte nicht angelegt werden")
+            if collection_registry.pending(tenant_id) != target:
+                collection_registry.begin_swap(tenant_id, active, target)
+        return {"target": target, "previous": previous, "active": active, "checkpoint": checkpoint}
+
+    def _read_batch(self, tenant_id: str, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Liest die nächsten Dokumente eines Tenants in ID-Reihenfolge (Keyset)."""
+        with session_scope() as db:
+            query = db.query(
+                DocumentModel.id, DocumentModel.title, DocumentModel.content,
+                DocumentModel.doc_metadata, DocumentModel.source
+            ).filter(DocumentModel.tenant_id == tenant_id)
+            if after_id is not None:
+                query = query.filter(DocumentModel.id > after_id)
+            rows = query.order_by(DocumentModel.id).limit(limit).all()
+        return [
+            {"id": row.id, "title": row.title, "content": row.content,
+             "metadata": row.doc_metadata or {}, "source": row.source}
+            for row in rows
+        ]
+
+    def _save_checkpoint(self, job_id: int, tenant_id: str, last_id: str, processed: int, failed: int) -> None:
+        with session_scope() as db:
+            db.query(ReindexJobTenantModel).filter(
+                ReindexJobTenantModel.job_id == job_id,
+                ReindexJobTenantModel.tenant_id == tenant_id
+            ).update({
+                "last_document_id": last_id,
+                "processed": ReindexJobTenantModel.processed + processed,
+                "failed": ReindexJobTenantModel.failed + failed,
+                "updated_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+    def _set_tenant_status(self, job_id: int, tenant_id: str, status: str, error: Optional[str]) -> None:
+        with session_scope() as db:
+            row = db.get(ReindexJobTenantModel, (job_id, tenant_id))
+            row.status = status
+            row.error = error[:2000] if error else None
+            db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Metriken der in diesem Prozess laufenden Neuindizierungen zurück."""
+        return {
+            "running_jobs": sorted(self._tasks),
+            "documents_written": self.documents_written,
+            "documents_failed": self.documents_failed,
+            "batches": self.batch_count,
+            "batch_retries": self.batch_retries
+        }
+
+
+# Singleton-Instanz
+reindex_service = ReindexService(
+    batch_size=settings.REINDEX_BATCH_SIZE,
+    concurrency=settings.REINDEX_CONCURRENCY,
+    lease_seconds=settings.REINDEX_LEASE_SECONDS,
+    keep_old_collection=settings.REINDEX_KEEP_OLD_COLLECTION
+)
@@ -0,0 +1,440 @@
+"""
+Aufbewahrung strukturierter Daten.
+
+Strukturierte Datensätze (StructuredData{Tenant}{Typ}) und ihre durchsuchbaren
+Kopien in der Tenant-Klasse werden bei jedem Import ergänzt, aber nie
+entfernt. Dieser Service löscht sie planmäßig nach Aufbewahrungsfristen pro
+Datentyp:
+
+- Veranstaltungen N Tage nach ihrem Ende (endDate), Veranstaltungen ohne
+  erkanntes Datum bleiben erhalten.
+- Andere Typen N Tage nach dem letzten Import (importedAt), also Datensätze,
+  die kein neuerer Import ersetzt hat.
+
+Die Fristen kommen aus RETENTION_POLICIES ("event=30,webpage=90") und können
+pro Tenant über TenantModel.config["retention"] überschrieben werden
+({"event": 7, "webpage": null}; null schaltet die Löschung für den Typ ab).
+
+Gelöscht wird in Batches: IDs abgelaufener Datensätze lesen, per ID löschen
+und die Kopien in der Tenant-Klasse (UUID aus der ID des Datensatzes
+abgeleitet) mitlöschen. Kopien, deren Datensatz fehlt (z. B. aus Importen vor
+den abgeleiteten UUIDs), entfernt ein Abgleich. Jeder Lauf wird pro Tenant
+mit der Anzahl gelöschter Objekte in structured_retention_runs gespeichert.
+Alle Worker prüfen regelmäßig, ob ein Lauf fällig ist; ein Advisory Lock in
+PostgreSQL sorgt dafür, dass nur einer ihn ausführt. Fällig ist ein Lauf
+interval_seconds nach dem letzten geplanten Lauf; manuelle Läufe (auch für
+einzelne Tenants) verschieben den Zeitplan nicht.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from weaviate.classes.query import Filter
+
+from ..core.config import settings
+from ..db.models import StructuredRetentionRunModel, TenantModel
+from ..db.session import engine, session_scope
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .structured_data_service import StructuredDataService
+from .weaviate.circuit_breaker import weaviate_breaker
+from .weaviate.client import get_client
+from .weaviate.schema_manager import SchemaManager
+
+logger = logging.getLogger(__name__)
+
+# Schlüssel des PostgreSQL-Advisory-Locks für Aufbewahrungsläufe
+ADVISORY_LOCK_KEY = 730_512_001
+
+# Quelle der durchsuchbaren Kopien in der Tenant-Klasse (siehe store_structured_data)
+STRUCTURED_SOURCE_PREFIX = "Structured Data ("
+
+# Wartezeit nach dem Start, bevor erstmals geprüft wird, ob ein Lauf fällig ist (Sekunden)
+STARTUP_DELAY = 60.0
+
+# Tenant-ID im Protokoll eines geplanten Laufs ohne Tenants; ohne diesen Eintrag wäre
+# jeder Lauf fällig und liefe in jedem Worker bei jeder Prüfung erneut
+EMPTY_RUN_TENANT_ID = "*"
+
+# Protokolle der Läufe werden so lange aufbewahrt (Tage)
+RUN_HISTORY_DAYS = 90
+
+
+class RetentionService:
+    """Löscht abgelaufene strukturierte Datensätze nach Fristen pro Datentyp."""
+
+    def __init__(
+        self,
+        policies: str = "event=30",
+        interval_seconds: int = 86400,
+        batch_size: int = 200,
+        sweep_orphans: bool = True
+    ):
+        self.policies = self.parse_policies(policies)
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.sweep_orphans = sweep_orphans
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+        # Zähler für Metriken
+        self.run_count = 0
+        self.reclaimed_count = 0
+        self.error_count = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_reclaimed: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def parse_policies(value: Optional[str]) -> Dict[str, int]:
+        """
+        Liest Fristen im Format "event=30,webpage=90". Unbekannte Datentypen und
+        ungültige Angaben werden mit einer Warnung übergangen.
+        """
+        policies: Dict[str, int] = {}
+        for part in (value or "").split(","):
+            if not part.strip():
+                continue
+            data_type, _, days = part.partition("=")
+            data_type = data_type.strip()
+            try:
+                days_value = int(days)
+            except ValueError:
+                days_value = -1
+            if data_type not in StructuredDataService.SUPPORTED_TYPES or days_value < 0:
+                logger.warning(f"Ungültige Aufbewahrungsfrist übergangen: {part.strip()!r}")
+                continue
+            policies[data_type] = days_value
+        return policies
+
+    def policies_for_tenant(self, tenant_config: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """Fristen eines Tenants: Standardfristen, ergänzt bzw. ersetzt durch config["retention"]."""
+        policies = dict(self.policies)
+        overrides = (tenant_config or {}).get("retention")
+        if not isinstance(overrides, dict):
+            return policies
+        for data_type, days in overrides.items():
+            if data_type not in StructuredDataService.SUPPORTED_TYPES:
+                continue
+            if days is None:
+                policies.pop(data_type, None)
+            elif isinstance(days, int) and not isinstance(days, bool) and days >= 0:
+                policies[data_type] = days
+            else:
+                logger.warning(f"Ungültige Aufbewahrungsfrist für {data_type} übergangen: {days!r}")
+        return policies
+
+    # Hintergrundschleife
+
+    def start(self) -> None:
+        """Startet die regelmäßige Prüfung im laufenden Event-Loop."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Aufbewahrung strukturierter Daten gestartet")
+
+    async def stop(self) -> None:
+        """Beendet die Hintergrundschleife."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Aufbewahrung strukturierter Daten gestoppt")
+
+    async def _run(self) -> None:
+        """Prüft regelmäßig, ob ein Lauf fällig ist, und führt ihn aus."""
+        await asyncio.sleep(STARTUP_DELAY)
+        while True:
+            try:
+                await asyncio.to_thread(self.run_scheduled)
+            except Exception as e:
+                logger.error(f"Fehler bei der Aufbewahrung strukturierter Daten: {e}")
+            await asyncio.sleep(min(self.interval_seconds, 3600))
+
+    # Läufe
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[bool]:
+        """Sperrt Läufe prozess- und (mit PostgreSQL) workerübergreifend; liefert False, wenn bereits einer läuft."""
+        if not self._lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if engine.dialect.name != "postgresql":
+                yield True
+                return
+            with engine.connect() as connection:
+                acquired = bool(connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+                ).scalar())
+                # Der Lock gilt für die Sitzung; die Transaktion nicht während des ganzen Laufs offen halten
+                connection.commit()
+                try:
+                    yield acquired
+                finally:
+                    if acquired:
+                        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                        connection.commit()
+        finally:
+            self._lock.release()
+
+    def run_scheduled(self) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Führt einen Lauf für alle Tenants aus, wenn seit dem letzten geplanten Lauf
+        (in irgendeinem Worker) mindestens interval_seconds vergangen sind.
+
+        :return: Gelöschte Objekte pro Tenant oder None, wenn kein Lauf fällig war
+        """
+        with self._exclusive() as acquired:
+            if not acquired:
+                return None
+            with session_scope() as db:
+                last_started = db.query(func.max(StructuredRetentionRunModel.started_at)).filter(
+                    StructuredRetentionRunModel.scheduled.is_(True)
+                ).scalar()
+            if last_started and datetime.utcnow() - last_started < timedelta(seconds=self.interval_seconds):
+                return None
+            return self._run_all(None, scheduled=True)
+
+    def run_all(self, tenant_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Führt sofort einen Lauf für alle bzw. die angegebenen Tenants aus.
+
+        :return: Gelöschte Objekte pro Tenant und Datentyp
+        :raises ValueError: Wenn bereits ein Lauf ausgeführt wird
+        """
+        with self._exclusive() as acquired:
+            if not acquired:
+                raise ValueError("Es wird bereits ein Aufbewahrungslauf ausgeführt")
+            return self._run_all(tenant_ids)
+
+    def _run_all(self, tenant_ids: Optional[List[str]], scheduled: bool = False) -> Dict[str, Dict[str, int]]:
+        with session_scope() as db:
+            query = db.query(TenantModel.id, TenantModel.config)
+            if tenant_ids:
+                query = query.filter(TenantModel.id.in_(tenant_ids))
+            tenants = query.order_by(TenantModel.id).all()
+            if not tenants and scheduled:
+                started_at = datetime.utcnow()
+                db.add(StructuredRetentionRunModel(
+                    tenant_id=EMPTY_RUN_TENANT_ID, started_at=started_at, finished_at=started_at,
+                    reclaimed={}, total=0, scheduled=True
+                ))
+                db.commit()
+
+        results: Dict[str, Dict[str, int]] = {}
+        for tenant_id, config in tenants:
+            policies = self.policies_for_tenant(config)
+            started_at = datetime.utcnow()
+            reclaimed: Dict[str, int] = {}
+            error = None
+            try:
+                self.purge_tenant(tenant_id, policies, reclaimed=reclaimed)
+            except Exception as e:
+                error = str(e)[:500]
+                self.error_count += 1
+                logger.error(f"Aufbewahrungslauf für Tenant {tenant_id} fehlgeschlagen: {e}")
+
+            total = sum(reclaimed.values())
+            with session_scope() as db:
+                db.add(StructuredRetentionRunModel(
+                    tenant_id=tenant_id,
+                    started_at=started_at,
+                    finished_at=datetime.utcnow(),
+                    reclaimed=reclaimed,
+                    total=total,
+                    error=error,
+                    scheduled=scheduled
+                ))
+                db.commit()
+
+            # Lexikalische Indizes und Suchcaches des Tenants in allen Workern neu aufbauen
+            if total:
+                cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id)
+                logger.info(f"Aufbewahrung: {total} Objekte für Tenant {tenant_id} gelöscht ({reclaimed})")
+            self.reclaimed_count += total
+            results[tenant_id] = reclaimed
+
+        self._prune_history()
+        self.run_count += 1
+        self.last_run_at = datetime.utcnow()
+        self.last_reclaimed = results
+        return results
+
+    def _prune_history(self) -> None:
+        """Entfernt Protokolle von Läufen, die älter als RUN_HISTORY_DAYS sind."""
+        cutoff = datetime.utcnow() - timedelta(days=RUN_HISTORY_DAYS)
+        with session_scope() as db:
+            db.query(StructuredRetentionRunModel).filter(
+                StructuredRetentionRunModel.started_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    # Löschen in Weaviate
+
+    def purge_tenant(
+        self,
+        tenant_id: str,
+        policies: Dict[str, int],
+        now: Optional[datetime] = None,
+        reclaimed: Optional[Dict[str, int]] = None
+    ) -> Dict[str, int]:
+        """
+        Löscht die abgelaufenen Datensätze eines Tenants samt ihren Kopien in der Tenant-Klasse.
+
+        :param reclaimed: Wird laufend ergänzt, damit bei einem Abbruch die bis dahin gelöschten Objekte zählen
+        :return: Gelöschte Datensätze pro Datentyp, verwaiste Kopien unter "orphans"
+        :raises WeaviateUnavailableError: Wenn Weaviate nicht erreichbar ist
+        """
+        now = now or datetime.now(timezone.utc)
+        reclaimed = reclaimed if reclaimed is not None else {}
+        client = get_client()
+        tenant_class = SchemaManager.get_tenant_class_name(tenant_id)
+        with weaviate_breaker.guard():
+            mirrors = client.collections.get(tenant_class) if client.collections.exists(tenant_class) else None
+
+        for data_type, days in policies.items():
+            class_name = StructuredDataService.get_class_name(tenant_id, data_type)
+            with weaviate_breaker.guard():
+                if not client.collections.exists(class_name):
+                    continue
+            # Veranstaltungen ab ihrem Ende, andere Typen ab dem letzten Import
+            date_property = "endDate" if data_type == "event" else "importedAt"
+            filters = Filter.by_property(date_property).less_than(now - timedelta(days=days))
+            deleted = self._delete_batched(client.collections.get(class_name), filters, mirrors)
+            if deleted:
+                reclaimed[data_type] = deleted
+
+        if self.sweep_orphans and mirrors is not None:
+            orphans = self._sweep_orphans(client, tenant_id, mirrors)
+            if orphans:
+                reclaimed["orphans"] = orphans
+        return reclaimed
+
+    def _delete_batched(self, collection, filters, mirrors=None) -> int:
+        """Löscht die Treffer des Filters in Batches per ID, jeweils mit den zugehörigen Kopien."""
+        deleted = 0
+        while True:
+            with weaviate_breaker.guard():
+                objects = collection.query.fetch_objects(
+                    filters=filters, limit=self.batch_size, return_properties=[]
+                ).objects
+            ids = [str(obj.uuid) for obj in objects]
+            if not ids:
+                break
+            with weaviate_breaker.guard(track_latency=False):
+                result = collection.data.delete_many(where=Filter.by_id().contains_any(ids))
+                if mirrors is not None:
+                    mirrors.data.delete_many(where=Filter.by_id().contains_any(
+                        [StructuredDataService.get_mirror_uuid(doc_id) for doc_id in ids]
+                    ))
+            deleted += result.successful
+            # Ein unvollständiger Batch war der letzte; ohne Fortschritt nicht endlos wiederholen
+            if len(ids) < self.batch_size or not result.successful:
+                break
+        return deleted
+
+    def _sweep_orphans(self, client, tenant_id: str, mirrors) -> int:
+        """Löscht Kopien in der Tenant-Klasse, deren strukturierter Datensatz nicht mehr existiert."""
+        entries: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        with weaviate_breaker.guard(track_latency=False):
+            for obj in mirrors.iterator(return_properties=["source", "metadata"]):
+                if not str(obj.properties.get("source") or "").startswith(STRUCTURED_SOURCE_PREFIX):
+                    continue
+                metadata = obj.properties.get("metadata")
+                if isinstance(metadata, str):
+                    try:
+                        metadata = json.loads(metadata)
+                    except ValueError:
+                        continue
+                if not isinstance(metadata, dict) or not metadata.get("type"):
+                    continue
+                try:
+                    original_id = str(uuid.UUID(str(metadata.get("original_id"))))
+                except ValueError:
+                    continue
+                entries[metadata["type"]].append((str(obj.uuid), original_id))
+
+        orphaned: List[str] = []
+        for data_type, pairs in entries.items():
+            class_name = StructuredDataService.get_class_name(tenant_id, data_type)
+            with weaviate_breaker.guard():
+                exists = client.collections.exists(class_name)
+            if not exists:
+                orphaned.extend(mirror_id for mirror_id, _ in pairs)
+                continue
+            collection = client.collections.get(class_name)
+            for start in range(0, len(pairs), self.batch_size):
+                chunk = pairs[start:start + self.batch_size]
+                with weaviate_breaker.guard():
+                    found = {str(obj.uuid) for obj in collection.query.fetch_objects(
+                        filters=Filter.by_id().contains_any([original_id for _, original_id in chunk]),
+                        limit=len(chunk),
+                        return_properties=[]
+                    ).objects}
+                orphaned.extend(mirror_id for mirror_id, original_id in chunk if original_id not in found)
+
+        deleted = 0
+        for start in range(0, len(orphaned), self.batch_size):
+            with weaviate_breaker.guard(track_latency=False):
+                result = mirrors.data.delete_many(
+                    where=Filter.by_id().contains_any(orphaned[start:start + self.batch_size])
+                )
+            deleted += result.successful
+        return deleted
+
+    # Abfragen
+
+    def list_runs(self, db: Session, tenant_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Gibt die neuesten Läufe zurück, optional für einen Tenant (Läufe ohne Tenants mit tenant_id "*")."""
+        query = db.query(StructuredRetentionRunModel)
+        if tenant_id:
+            query = query.filter(StructuredRetentionRunModel.tenant_id == tenant_id)
+        runs = query.order_by(StructuredRetentionRunModel.id.desc()).limit(limit).all()
+        return [
+            {
+                "id": run.id,
+                "tenant_id": run.tenant_id,
+                "started_at": run.started_at,
+                "finished_at": run.finished_at,
+                "reclaimed": run.reclaimed or {},
+                "total": run.total,
+                "error": run.error,
+                "scheduled": run.scheduled
+            }
+            for run in runs
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Metriken der in diesem Prozess ausgeführten Läufe zurück."""
+        return {
+            "policies": self.policies,
+            "interval_seconds": self.interval_seconds,
+            "running": self._lock.locked(),
+            "runs": self.run_count,
+            "reclaimed": self.reclaimed_count,
+            "errors": self.error_count,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_reclaimed": {
+                tenant_id: reclaimed for tenant_id, reclaimed in self.last_reclaimed.items() if reclaimed
+            }
+        }
+
+
+# Singleton-Instanz
+retention_service = RetentionService(
+    policies=settings.RETENTION_POLICIES,
+    interval_seconds=settings.RETENTION_INTERVAL_SECONDS,
+    batch_size=settings.RETENTION_BATCH_SIZE,
+    sweep_orphans=settings.RETENTION_SWEEP_ORPHANS
+)
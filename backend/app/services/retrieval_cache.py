@@ -0,0 +1,89 @@
+"""
+Rückfall-Cache für Suchergebnisse des Chats.
+
+Jede erfolgreiche Suche in Weaviate wird pro Tenant und normalisierter Frage
+gespeichert. Ist Weaviate nicht erreichbar (Circuit Breaker offen), antwortet
+der Chat mit den zuletzt gefundenen Dokumenten statt ohne Kontext. Geänderte
+Wissensbasen verwerfen die Einträge des Tenants über den Cache-Invalidierungsbus.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .chat_analytics_service import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """Thread-sicherer LRU-Cache für Suchergebnisse mit Ablaufzeit."""
+
+    def __init__(self, max_entries: int = 2000, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (Tenant-ID, normalisierte Frage) -> (Dokumente, Zeitpunkt)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, tenant_id: str, query: str, documents: List[Dict[str, Any]]) -> None:
+        """Speichert die Ergebnisse einer erfolgreichen Suche (leere Ergebnisse nicht)."""
+        if self.max_entries <= 0 or not documents:
+            return
+        key = (tenant_id, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (documents, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, tenant_id: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Gibt die zuletzt gefundenen Dokumente für die Frage zurück, falls noch gültig."""
+        key = (tenant_id, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        """Verwirft alle Einträge eines Tenants."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == tenant_id]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Größe und Trefferquote des Caches zurück."""
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton-Instanz
+retrieval_cache = RetrievalCache(
+    max_entries=settings.RETRIEVAL_FALLBACK_CACHE_SIZE,
+    ttl=settings.RETRIEVAL_FALLBACK_TTL
+)
+
+# Geänderte Wissensbasen (auch aus anderen Workern) verwerfen die Einträge des Tenants
+cache_bus.subscribe(
+    KNOWLEDGE_CHANGED,
+    lambda tenant_id, payload: retrieval_cache.invalidate_tenant(tenant_id) if tenant_id else None
+)
@@ -5,12 +5,20 @@ Service zur Verwaltung strukturierter Daten aus verschiedenen Quellen.
 import logging
 import json
 import uuid
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Set, Union
 import weaviate
-from datetime import datetime
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 from weaviate.util import generate_uuid5
+from ..core.config import settings
+from ..db.models import Tenant
+from ..utils.german_dates import parse_date_range, parse_event_dates
 from .xml_parser_service import XMLParserBase
+from .cache_bus import KNOWLEDGE_CHANGED, cache_bus
+from .lexical_index import tokenize
+from .weaviate.circuit_breaker import WeaviateUnavailableError, weaviate_breaker
 from .weaviate.client import get_client
+from .weaviate.collection_registry import collection_registry
 from .weaviate.schema_manager import SchemaManager
 from .weaviate import WeaviateService, weaviate_service
 from .xml_parser_factory import XMLParserFactory
@@ -23,6 +31,19 @@ import time
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Wörter, die in Fragen nach Veranstaltungen nichts über das Thema aussagen
+# ("Was ist am Wochenende los?"); bleibt außer der Zeitangabe nichts übrig,
+# genügt eine nach Datum sortierte Abfrage ohne Hybrid-Suche. Ortsnamen kommen
+# aus dem Tenant (siehe get_event_query_filler)
+EVENT_QUERY_FILLER = set(tokenize(
+    "was ist los gibt es welche veranstaltung veranstaltungen event events termin termine "
+    "passiert findet finden statt stattfinden angebote unternehmen machen kann man stadt "
+    "hier alles"
+))
+
+# Quelle der durchsuchbaren Kopien in der Tenant-Klasse ("Structured Data (school)" usw.)
+MIRROR_SOURCE_PREFIX = "Structured Data ("
+
 class StructuredDataService:
     """
     Service für strukturierte Daten.
@@ -64,7 +85,8 @@ class StructuredDataService:
     @staticmethod
     def get_class_name(tenant_id: str, data_type: str) -> str:
         """Generiert einen Weaviate-Klassennamen für strukturierte Daten eines Tenants."""
-        tenant_name = SchemaManager.get_tenant_class_name(tenant_id).replace("Tenant", "")
+        # Standardname, nicht die aktive Collection: strukturierte Daten werden nicht neu indiziert
+        tenant_name = SchemaManager.get_base_class_name(tenant_id).replace("Tenant", "")
         return f"{StructuredDataService.STRUCTURED_CLASS_PREFIX}{tenant_name}{data_type.capitalize()}"
     
     @staticmethod
@@ -79,6 +101,7 @@ class StructuredDataService:
         
         # Prüfen, ob Klasse bereits existiert
         if SchemaManager.class_exists(class_name):
+            StructuredDataService._ensure_date_properties(class_name, data_type)
             return True
         
         from weaviate.collections.classes.config import Property, DataType, VectorizerConfig
@@ -193,6 +216,7 @@ class StructuredDataService:
             else:
                 logger.error(f"Unbekannter Datentyp: {data_type}")
                 return False
+            properties += StructuredDataService._date_properties(data_type)
 
             # Schemaklasse erstellen mit korrektem Format für Weaviate v4
             logger.info(f"Erstelle Schema für {data_type} - Tenant {tenant_id}")
@@ -217,6 +241,186 @@ class StructuredDataService:
             logger.error(f"Fehler beim Erstellen des Schemas für {data_type}: {str(e)}")
             return False
     
+    @staticmethod
+    def _date_properties(data_type: str) -> list:
+        """
+        Filterbare Datumsfelder: importedAt (letzter Import, für die Aufbewahrungsfristen)
+        und bei Veranstaltungen die normalisierten Termine.
+        """
+        from weaviate.collections.classes.config import Property, DataType
+
+        properties = [Property(name="importedAt", data_type=DataType.DATE)]
+        if data_type == "event":
+            properties += [
+                Property(name="startDate", data_type=DataType.DATE),
+                Property(name="endDate", data_type=DataType.DATE),
+                Property(name="hasDate", data_type=DataType.BOOL)
+            ]
+        return properties
+    
+    # Klassen, deren Datumsfelder in diesem Prozess bereits geprüft und nachgetragen wurden
+    _date_properties_checked: Set[str] = set()
+    
+    @staticmethod
+    def _ensure_date_properties(class_name: str, data_type: str) -> None:
+        """
+        Ergänzt die Datumsfelder in Klassen, die vor deren Einführung angelegt wurden,
+        und trägt sie für die vorhandenen Objekte nach (einmal pro Prozess und Klasse).
+        """
+        if class_name in StructuredDataService._date_properties_checked:
+            return
+        try:
+            collection = get_client().collections.get(class_name)
+            existing = {prop.name for prop in collection.config.get().properties}
+            for prop in StructuredDataService._date_properties(data_type):
+                if prop.name not in existing:
+                    collection.config.add_property(prop)
+                    logger.info(f"Eigenschaft {prop.name} zu {class_name} hinzugefügt")
+            updated = StructuredDataService._backfill_date_properties(collection, data_type)
+            if updated:
+                logger.info(f"Datumsfelder für {updated} Objekte in {class_name} nachgetragen")
+            StructuredDataService._date_properties_checked.add(class_name)
+        except Exception as e:
+            logger.warning(f"Datumsfelder für {class_name} konnten nicht ergänzt werden: {e}")
+    
+    @staticmethod
+    def _backfill_date_properties(collection, data_type: str) -> int:
+        """
+        Setzt die Datumsfelder bei Objekten, die vor deren Einführung importiert wurden.
+        Ohne sie fänden die Datumsfilter (endDate bzw. hasDate) diese Veranstaltungen
+        nicht mehr; importedAt gilt ab jetzt, damit die Aufbewahrungsfrist neu beginnt.
+        
+        :return: Anzahl der aktualisierten Objekte
+        """
+        now = datetime.now(timezone.utc)
+        updated = 0
+        for obj in collection.iterator():
+            properties = obj.properties or {}
+            changes = {}
+            if properties.get("importedAt") is None:
+                changes["importedAt"] = now
+            if data_type == "event" and properties.get("hasDate") is None:
+                changes.update(StructuredDataService.get_event_dates(properties))
+            if changes:
+                with weaviate_breaker.guard(track_latency=False):
+                    collection.data.update(uuid=obj.uuid, properties=changes)
+                updated += 1
+        return updated
+    
+    @staticmethod
+    def get_event_dates(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalisiert die Freitext-Felder "date" und "time" einer Veranstaltung
+        zu startDate/endDate (Zeitzone EVENT_TIMEZONE). hasDate ist False, wenn
+        kein Datum erkannt wurde; solche Veranstaltungen werden nie als vergangen ausgeblendet.
+        """
+        dates = parse_event_dates(
+            data.get("date"), data.get("time"), tz=ZoneInfo(settings.EVENT_TIMEZONE)
+        )
+        if dates is None:
+            return {"hasDate": False}
+        return {"startDate": dates[0], "endDate": dates[1], "hasDate": True}
+    
+    @staticmethod
+    def get_event_query_filler(tenant: Optional[Tenant]) -> Set[str]:
+        """
+        Füllwörter für Fragen nach Veranstaltungen eines Tenants: die allgemeinen
+        (EVENT_QUERY_FILLER), die Wörter des Tenant-Namens und die aus
+        TenantModel.config["event_query_filler"] (Liste oder Text, z. B. ["brandenburg", "havel"]).
+        """
+        if tenant is None:
+            return EVENT_QUERY_FILLER
+        extra = (tenant.config or {}).get("event_query_filler") or []
+        if isinstance(extra, str):
+            extra = [extra]
+        return EVENT_QUERY_FILLER | set(tokenize(" ".join([tenant.name or ""] + [str(word) for word in extra])))
+    
+    @staticmethod
+    def get_event_filters(query: str, now: Optional[datetime] = None, filler_words: Optional[Set[str]] = None):
+        """
+        Erstellt den Datumsfilter für eine Frage nach Veranstaltungen.
+        
+        Zeitangaben in der Frage ("morgen", "am Wochenende", "nächste Woche")
+        werden zu einem Zeitraum, mit dem sich die Veranstaltung überschneiden
+        muss. Vergangene Veranstaltungen werden mit EVENTS_EXCLUDE_PAST ausgeblendet.
+        Ob die Frage außer der Zeitangabe nur Füllwörter enthält, wird mit
+        filler_words geprüft (Standard: EVENT_QUERY_FILLER).
+        
+        Returns:
+            Tuple aus (Filter oder None, True wenn die Frage außer der Zeitangabe nichts enthält)
+        """
+        from weaviate.classes.query import Filter
+
+        now = now or datetime.now(ZoneInfo(settings.EVENT_TIMEZONE))
+        date_range = parse_date_range(query, now)
+        if date_range is not None:
+            start = max(date_range.start, now) if settings.EVENTS_EXCLUDE_PAST else date_range.start
+            filters = (
+                Filter.by_property("endDate").greater_than(start)
+                & Filter.by_property("startDate").less_than(date_range.end)
+            )
+            remainder = query.lower().replace(date_range.expression.lower(), " ")
+            filler_words = EVENT_QUERY_FILLER if filler_words is None else filler_words
+            temporal_only = not [word for word in tokenize(remainder) if word not in filler_words]
+            return filters, temporal_only
+        if settings.EVENTS_EXCLUDE_PAST:
+            return Filter.by_property("endDate").greater_than(now) | Filter.by_property("hasDate").equal(False), False
+        return None, False
+    
+    @staticmethod
+    def get_mirror_uuid(structured_id: str) -> str:
+        """UUID des durchsuchbaren Dokuments eines strukturierten Datensatzes in der Tenant-Klasse."""
+        return generate_uuid5(structured_id)
+    
+    @staticmethod
+    def copy_mirrors(source_class: str, target_class: str, batch_size: int = 200) -> int:
+        """
+        Kopiert die durchsuchbaren Kopien strukturierter Daten von einer Tenant-Collection
+        in eine andere (Blue/Green-Neuindizierung). Sie stehen nicht in Postgres und
+        gingen beim Umschalten sonst verloren. Die UUIDs bleiben erhalten; bereits
+        vorhandene Objekte werden überschrieben, die Vektoren neu berechnet.
+        
+        :return: Anzahl der kopierten Objekte
+        :raises RuntimeError: Wenn Objekte nicht geschrieben werden konnten
+        """
+        from weaviate.classes.data import DataObject
+
+        client = get_client()
+        with weaviate_breaker.guard(track_latency=False):
+            if not client.collections.exists(source_class):
+                return 0
+        source = client.collections.get(source_class)
+        target = client.collections.get(target_class)
+
+        def write(objects: List[DataObject]) -> None:
+            with weaviate_breaker.guard(track_latency=False):
+                response = target.data.insert_many(objects)
+            if response.errors:
+                first = next(iter(response.errors.values()))
+                raise RuntimeError(
+                    f"{len(response.errors)} Kopien strukturierter Daten nicht nach {target_class} geschrieben: {first.message}"
+                )
+
+        copied = 0
+        batch: List[DataObject] = []
+        for obj in source.iterator(return_properties=["title", "content", "metadata", "source"]):
+            if not str(obj.properties.get("source") or "").startswith(MIRROR_SOURCE_PREFIX):
+                continue
+            batch.append(DataObject(properties=obj.properties, uuid=obj.uuid))
+            if len(batch) >= batch_size:
+                write(batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            write(batch)
+            copied += len(batch)
+        return copied
+    
+    @staticmethod
+    def _isoformat(value: Any) -> Optional[str]:
+        """Weaviate liefert DATE-Felder als datetime."""
+        return value.isoformat() if hasattr(value, "isoformat") else value
+    
     @staticmethod
     def flatten_data(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
         """Flacht ein verschachteltes Dictionary für Weaviate ab."""
@@ -261,6 +465,11 @@ class StructuredDataService:
             full_text = " ".join(str(value) for value in flattened_data.values() if value)
             flattened_data["fullTextSearch"] = full_text
             
+            # Normalisierte Datumsfelder, damit Veranstaltungen nach Zeitraum gefiltert werden können
+            if data_type == "event":
+                flattened_data.update(self.get_event_dates(data))
+            flattened_data["importedAt"] = datetime.now(timezone.utc)
+            
             # Weaviate-Dokument erstellen
             collection = client.collections.get(class_name)
             doc_id = str(uuid.uuid4())
@@ -269,10 +478,18 @@ class StructuredDataService:
                 properties=flattened_data
             )
             
+            # Veranstaltungen werden nur über search_structured_data mit Datumsfilter
+            # gesucht; eine Kopie in der Tenant-Klasse würde auch vergangene Termine liefern
+            if data_type == "event":
+                logger.info(f"Strukturierte Daten erfolgreich gespeichert: {doc_id}")
+                return True
+            
             # Daten auch als durchsuchbares Dokument in Tenant-Klasse speichern
-            tenant_class = SchemaManager.get_tenant_class_name(tenant_id)
-            if not SchemaManager.class_exists(tenant_class):
-                SchemaManager.create_tenant_schema(tenant_id)
+            # (während einer Blue/Green-Neuindizierung auch in die neue Collection)
+            tenant_classes = collection_registry.write_targets(tenant_id, SchemaManager.get_tenant_class_name(tenant_id))
+            for tenant_class in tenant_classes:
+                if not SchemaManager.class_exists(tenant_class):
+                    SchemaManager.create_tenant_schema(tenant_id, class_name=tenant_class)
             
             # Dokument für die Tenant-Klasse vorbereiten
             doc_title = data.get("name", "") or data.get("title", "")
@@ -289,20 +506,21 @@ class StructuredDataService:
                         if isinstance(sub_value, str) and sub_value:
                             doc_content.append(f"{sub_key}: {sub_value}")
             
-            # Dokument in Tenant-Klasse speichern
-            tenant_collection = client.collections.get(tenant_class)
-            tenant_collection.data.insert(
-                uuid=str(uuid.uuid4()),
-                properties={
-                    "title": doc_title,
-                    "content": "\n".join(doc_content),
-                    "metadata": json.dumps({
-                        "type": data_type,
-                        "original_id": doc_id
-                    }),
-                    "source": f"Structured Data ({data_type})"
-                }
-            )
+            # Dokument in Tenant-Klasse speichern; die UUID wird aus der des
+            # strukturierten Datensatzes abgeleitet, damit beide gemeinsam gelöscht werden können
+            for tenant_class in tenant_classes:
+                client.collections.get(tenant_class).data.insert(
+                    uuid=self.get_mirror_uuid(doc_id),
+                    properties={
+                        "title": doc_title,
+                        "content": "\n".join(doc_content),
+                        "metadata": json.dumps({
+                            "type": data_type,
+                            "original_id": doc_id
+                        }),
+                        "source": f"{MIRROR_SOURCE_PREFIX}{data_type})"
+                    }
+                )
             
             logger.info(f"Strukturierte Daten erfolgreich gespeichert: {doc_id}")
             return True
@@ -363,6 +581,10 @@ class StructuredDataService:
                 
                 print(f"Importiert: {stored_count} {data_type}")
             
+            # Lexikalische Indizes und Suchcaches des Tenants in allen Workern neu aufbauen
+            if result_counts["total"]:
+                cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id)
+            
             return result_counts
             
         except Exception as e:
@@ -419,6 +641,7 @@ class StructuredDataService:
                 logger.error(f"Fehler beim Löschen/Neuerstellen von {class_name}: {str(e)}")
                 success = False
         
+        cache_bus.publish(KNOWLEDGE_CHANGED, tenant_id)
         return success
     
     @staticmethod
@@ -426,7 +649,8 @@ class StructuredDataService:
         tenant_id: str,
         data_type: str,
         query: str,
-        limit: int = 5
+        limit: int = 5,
+        filler_words: Optional[Set[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Durchsucht strukturierte Daten in Weaviate.
@@ -436,6 +660,7 @@ class StructuredDataService:
             data_type: Typ der strukturierten Daten (school, office, event)
             query: Suchanfrage
             limit: Maximale Anzahl von Ergebnissen
+            filler_words: Füllwörter für Fragen nach Veranstaltungen (siehe get_event_query_filler)
             
         Returns:
             Liste von gefundenen Elementen
@@ -462,11 +687,40 @@ class StructuredDataService:
             
             collection = client.collections.get(class_name)
             
-            # Hybrid-Suche ohne expliziten fusion_type Parameter
-            results = collection.query.hybrid(
-                query=query,
-                limit=limit
-            )
+            # Veranstaltungen nach Datum filtern (Zeitangaben der Frage, keine vergangenen)
+            filters, temporal_only = (None, False)
+            if data_type == "event":
+                filters, temporal_only = StructuredDataService.get_event_filters(query, filler_words=filler_words)
+            
+            try:
+                with weaviate_breaker.guard():
+                    if temporal_only:
+                        # Reine Zeitfrage ("Was ist am Wochenende los?"): gefilterte Abfrage nach Datum
+                        from weaviate.classes.query import Sort
+                        results = collection.query.fetch_objects(
+                            filters=filters,
+                            sort=Sort.by_property("startDate"),
+                            limit=limit
+                        )
+                    else:
+                        # Hybrid-Suche ohne expliziten fusion_type Parameter
+                        results = collection.query.hybrid(
+                            query=query,
+                            filters=filters,
+                            limit=limit
+                        )
+            except WeaviateUnavailableError:
+                raise
+            except Exception as e:
+                if filters is None:
+                    raise
+                # Veranstaltungen ohne Datumsfelder (vor deren Einführung importiert)
+                logger.warning(f"Datumsfilter für {class_name} nicht anwendbar, suche ungefiltert: {e}")
+                with weaviate_breaker.guard():
+                    results = collection.query.hybrid(
+                        query=query,
+                        limit=limit
+                    )
             
             # Ergebnisse in das einheitliche Format konvertieren
             formatted_results = []
@@ -524,6 +778,8 @@ class StructuredDataService:
                         "title": properties.get("title", ""),
                         "date": properties.get("date", ""),
                         "time": properties.get("time", ""),
+                        "startDate": StructuredDataService._isoformat(properties.get("startDate")),
+                        "endDate": StructuredDataService._isoformat(properties.get("endDate")),
                         "location": properties.get("location", ""),
                         "description": properties.get("description", ""),
                         "content": properties.get("content", ""),
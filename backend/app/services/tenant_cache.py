@@ -0,0 +1,253 @@
+"""
+Prozessweiter Cache für die Auflösung von Tenants per API-Key und ID.
+
+Jede Chat-Anfrage muss ihren API-Key einem Tenant zuordnen. Statt dafür bei
+jeder Anfrage die Datenbank abzufragen, werden die Tenants für eine kurze
+Zeit (TTL) im Speicher gehalten. Unbekannte API-Keys und IDs werden ebenfalls
+zwischengespeichert (negatives Caching), damit ungültige Schlüssel die
+Datenbank nicht belasten. Schreibzugriffe auf Tenants invalidieren die
+betroffenen Einträge über den Cache-Invalidierungsbus in allen Workern.
+
+Zusätzlich werden tenantbezogene Konfigurationen (z. B. UI-Komponenten)
+unter einem Schlüssel (Art, Tenant-ID) zwischengespeichert.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..db.models import Tenant
+from .cache_bus import TENANT_CHANGED, UI_COMPONENTS_CHANGED, cache_bus
+
+logger = logging.getLogger(__name__)
+
+# Eintrag: (Tenant oder None für "nicht gefunden", Ablaufzeitpunkt)
+CacheEntry = Tuple[Optional[Tenant], float]
+
+
+class TenantCache:
+    """
+    Thread-sicherer TTL-Cache für Tenants, indiziert nach API-Key und ID.
+
+    Die zurückgegebenen Tenant-Objekte werden von allen Anfragen geteilt und
+    dürfen nicht verändert werden.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.TENANT_CACHE_TTL,
+        negative_ttl: float = settings.TENANT_CACHE_NEGATIVE_TTL,
+        max_entries: int = settings.TENANT_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._by_api_key: Dict[str, CacheEntry] = {}
+        self._by_id: Dict[str, CacheEntry] = {}
+        self._configs: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _lookup(self, index: Dict[str, CacheEntry], key: str) -> Tuple[bool, Optional[Tenant]]:
+        with self._lock:
+            entry = index.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._hits += 1
+                return True, entry[0]
+            self._misses += 1
+            return False, None
+
+    def _store(self, tenant: Optional[Tenant], api_key: Optional[str] = None, tenant_id: Optional[str] = None) -> None:
+        now = time.monotonic()
+        expires_at = now + (self.ttl if tenant is not None else self.negative_ttl)
+        with self._lock:
+            if tenant is not None:
+                self._by_id[str(tenant.id)] = (tenant, expires_at)
+                if tenant.api_key:
+                    self._by_api_key[tenant.api_key] = (tenant, expires_at)
+            else:
+                if api_key:
+                    self._by_api_key[api_key] = (None, expires_at)
+                if tenant_id:
+                    self._by_id[tenant_id] = (None, expires_at)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Begrenzt die Größe des Caches; zuerst fallen abgelaufene, dann die ältesten Einträge weg."""
+        for index in (self._by_api_key, self._by_id, self._configs):
+            if len(index) <= self.max_entries:
+                continue
+            for key in [key for key, (_, expires_at) in index.items() if expires_at <= now]:
+                del index[key]
+            while len(index) > self.max_entries:
+                del index[next(iter(index))]
+
+    def get_by_api_key(self, api_key: str, loader: Callable[[], Optional[Tenant]]) -> Optional[Tenant]:
+        """
+        Gibt den Tenant zu einem API-Key zurück.
+
+        :param loader: Lädt den Tenant aus der Datenbank, wenn kein gültiger Eintrag vorliegt
+        """
+        if not self.enabled:
+            return loader()
+        found, tenant = self._lookup(self._by_api_key, api_key)
+        if found:
+            return tenant
+        tenant = loader()
+        self._store(tenant, api_key=api_key)
+        return tenant
+
+    def peek_api_key(self, api_key: str) -> Tuple[bool, Optional[Tenant]]:
+        """
+        Sucht einen API-Key nur im Cache, ohne die Datenbank abzufragen.
+
+        :return: (gefunden, Tenant oder None für einen bekannten ungültigen Key)
+        """
+        if not self.enabled:
+            return False, None
+        return self._lookup(self._by_api_key, api_key)
+
+    def get_by_id(self, tenant_id: str, loader: Callable[[], Optional[Tenant]]) -> Optional[Tenant]:
+        """
+        Gibt den Tenant zu einer ID zurück.
+
+        :param loader: Lädt den Tenant aus der Datenbank, wenn kein gültiger Eintrag vorliegt
+        """
+        if not self.enabled:
+            return loader()
+        found, tenant = self._lookup(self._by_id, tenant_id)
+        if found:
+            return tenant
+        tenant = loader()
+        self._store(tenant, tenant_id=tenant_id)
+        return tenant
+
+    def get_config(self, kind: str, tenant_id: str, loader: Callable[[], Any]) -> Any:
+        """
+        Gibt eine tenantbezogene Konfiguration (z. B. "ui_components") zurück.
+
+        :param loader: Lädt die Konfiguration aus der Datenbank, wenn kein gültiger Eintrag vorliegt
+        """
+        if not self.enabled:
+            return loader()
+        key = (kind, str(tenant_id))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._configs.get(key)
+            if entry is not None and entry[1] > now:
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        value = loader()
+        with self._lock:
+            self._configs[key] = (value, now + self.ttl)
+            self._evict(now)
+        return value
+
+    async def aget_by_api_key(self, api_key: str, loader: Callable[[], Awaitable[Optional[Tenant]]]) -> Optional[Tenant]:
+        """Wie get_by_api_key, mit asynchronem Loader (AsyncSession)."""
+        if not self.enabled:
+            return await loader()
+        found, tenant = self._lookup(self._by_api_key, api_key)
+        if found:
+            return tenant
+        tenant = await loader()
+        self._store(tenant, api_key=api_key)
+        return tenant
+
+    async def aget_by_id(self, tenant_id: str, loader: Callable[[], Awaitable[Optional[Tenant]]]) -> Optional[Tenant]:
+        """Wie get_by_id, mit asynchronem Loader (AsyncSession)."""
+        if not self.enabled:
+            return await loader()
+        found, tenant = self._lookup(self._by_id, tenant_id)
+        if found:
+            return tenant
+        tenant = await loader()
+        self._store(tenant, tenant_id=tenant_id)
+        return tenant
+
+    async def aget_config(self, kind: str, tenant_id: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Wie get_config, mit asynchronem Loader (AsyncSession)."""
+        if not self.enabled:
+            return await loader()
+        key = (kind, str(tenant_id))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._configs.get(key)
+            if entry is not None and entry[1] > now:
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        value = await loader()
+        with self._lock:
+            self._configs[key] = (value, now + self.ttl)
+            self._evict(now)
+        return value
+
+    def invalidate_config(self, kind: str, tenant_id: str) -> None:
+        """Entfernt eine zwischengespeicherte Konfiguration eines Tenants."""
+        with self._lock:
+            self._configs.pop((kind, str(tenant_id)), None)
+
+    def invalidate(self, tenant_id: Optional[str] = None, api_key: Optional[str] = None) -> None:
+        """Entfernt alle Einträge eines Tenants sowie optional einen (auch negativ gecachten) API-Key."""
+        with self._lock:
+            if tenant_id:
+                self._by_id.pop(str(tenant_id), None)
+                for key in [key for key in self._configs if key[1] == str(tenant_id)]:
+                    del self._configs[key]
+                stale_keys = [
+                    key for key, (tenant, _) in self._by_api_key.items()
+                    if tenant is not None and str(tenant.id) == str(tenant_id)
+                ]
+                for key in stale_keys:
+                    del self._by_api_key[key]
+            if api_key:
+                self._by_api_key.pop(api_key, None)
+        logger.debug(f"Tenant-Cache invalidiert (tenant_id={tenant_id})")
+
+    def clear(self) -> None:
+        """Leert den gesamten Cache."""
+        with self._lock:
+            self._by_api_key.clear()
+            self._by_id.clear()
+            self._configs.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Gibt Trefferquote und Größe des Caches zurück."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries_by_api_key": len(self._by_api_key),
+                "entries_by_id": len(self._by_id),
+                "entries_configs": len(self._configs),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Singleton-Instanz
+tenant_cache = TenantCache()
+
+
+def _on_tenant_changed(tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+    tenant_cache.invalidate(tenant_id)
+    for api_key in payload.get("api_keys", []):
+        tenant_cache.invalidate(api_key=api_key)
+
+
+def _on_ui_components_changed(tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+    if tenant_id:
+        tenant_cache.invalidate_config(UI_COMPONENTS_CHANGED, tenant_id)
+
+
+cache_bus.subscribe(TENANT_CHANGED, _on_tenant_changed)
+cache_bus.subscribe(UI_COMPONENTS_CHANGED, _on_ui_components_changed)
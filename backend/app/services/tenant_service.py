@@ -2,6 +2,8 @@ import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import os
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..db.models import (
     TenantModel, DocumentModel, InteractiveConfigModel, UIComponentsConfigModel,
@@ -10,6 +12,10 @@ from ..db.models import (
 )
 from ..core.config import settings
 from ..services.weaviate_service import weaviate_service
+from ..services.tenant_cache import tenant_cache
+from ..services.cache_bus import (
+    INTERACTIVE_CONFIG_CHANGED, TENANT_CHANGED, UI_COMPONENTS_CHANGED, cache_bus
+)
 
 class TenantService:
     """Service zur Verwaltung von Tenants (Kunden) im System mit PostgreSQL-Datenbank."""
@@ -26,13 +32,20 @@ class TenantService:
         db.commit()
         db.refresh(db_tenant)
         
+        # Ein zuvor als ungültig gecachter API-Key ist ab jetzt gültig
+        cache_bus.publish(TENANT_CHANGED, db_tenant.id, api_keys=[db_tenant.api_key])
+        
         # Erstellt die entsprechende Weaviate-Klasse für den Tenant
         weaviate_service.create_tenant_schema(db_tenant.id)
         
         return Tenant.model_validate(db_tenant)
     
     def get_tenant_by_id(self, db: Session, tenant_id: str) -> Optional[Tenant]:
-        """Ruft einen Tenant anhand seiner ID ab."""
+        """Ruft einen Tenant anhand seiner ID ab (über den Tenant-Cache)."""
+        return tenant_cache.get_by_id(str(tenant_id), lambda: self._load_tenant_by_id(db, tenant_id))
+    
+    def _load_tenant_by_id(self, db: Session, tenant_id: str) -> Optional[Tenant]:
+        """Lädt einen Tenant anhand seiner ID aus der Datenbank."""
         db_tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
         if not db_tenant:
             return None
@@ -41,7 +54,11 @@ class TenantService:
         return Tenant.model_validate(db_tenant)
     
     def get_tenant_by_api_key(self, db: Session, api_key: str) -> Optional[Tenant]:
-        """Ruft einen Tenant anhand seines API-Keys ab."""
+        """Ruft einen Tenant anhand seines API-Keys ab (über den Tenant-Cache)."""
+        return tenant_cache.get_by_api_key(api_key, lambda: self._load_tenant_by_api_key(db, api_key))
+    
+    def _load_tenant_by_api_key(self, db: Session, api_key: str) -> Optional[Tenant]:
+        """Lädt einen Tenant anhand seines API-Keys aus der Datenbank."""
         db_tenant = db.query(TenantModel).filter(TenantModel.api_key == api_key).first()
         if not db_tenant:
             return None
@@ -49,6 +66,26 @@ class TenantService:
         # Tenant-Objekt erstellen
         return Tenant.model_validate(db_tenant)
     
+    async def aget_tenant_by_id(self, db: AsyncSession, tenant_id: str) -> Optional[Tenant]:
+        """Wie get_tenant_by_id, mit AsyncSession (für die häufigen Lesezugriffe)."""
+        async def load() -> Optional[Tenant]:
+            db_tenant = (await db.execute(
+                select(TenantModel).where(TenantModel.id == str(tenant_id))
+            )).scalars().first()
+            return Tenant.model_validate(db_tenant) if db_tenant else None
+        
+        return await tenant_cache.aget_by_id(str(tenant_id), load)
+    
+    async def aget_tenant_by_api_key(self, db: AsyncSession, api_key: str) -> Optional[Tenant]:
+        """Wie get_tenant_by_api_key, mit AsyncSession (für die häufigen Lesezugriffe)."""
+        async def load() -> Optional[Tenant]:
+            db_tenant = (await db.execute(
+                select(TenantModel).where(TenantModel.api_key == api_key)
+            )).scalars().first()
+            return Tenant.model_validate(db_tenant) if db_tenant else None
+        
+        return await tenant_cache.aget_by_api_key(api_key, load)
+    
     def get_all_tenants(self, db: Session) -> List[Tenant]:
         """Ruft alle Tenants ab."""
         db_tenants = db.query(TenantModel).all()
@@ -62,6 +99,7 @@ class TenantService:
         if not db_tenant:
             return None
         
+        previous_api_key = db_tenant.api_key
         update_data = tenant_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_tenant, key, value)
@@ -70,6 +108,8 @@ class TenantService:
         db.commit()
         db.refresh(db_tenant)
         
+        cache_bus.publish(TENANT_CHANGED, tenant_id, api_keys=list({previous_api_key, db_tenant.api_key}))
+        
         return Tenant.model_validate(db_tenant)
     
     def delete_tenant(self, db: Session, tenant_id: str) -> bool:
@@ -81,17 +121,20 @@ class TenantService:
         # Löscht auch die Weaviate-Daten des Tenants
         weaviate_service.delete_tenant_schema(tenant_id)
         
+        api_key = db_tenant.api_key
         db.delete(db_tenant)
         db.commit()
         
+        cache_bus.publish(TENANT_CHANGED, tenant_id, api_keys=[api_key])
+        
         return True
     
     def verify_api_key(self, db: Session, api_key: str) -> Optional[str]:
         """Überprüft einen API-Key und gibt die entsprechende Tenant-ID zurück."""
-        db_tenant = db.query(TenantModel).filter(TenantModel.api_key == api_key).first()
-        if not db_tenant:
+        tenant = self.get_tenant_by_api_key(db, api_key)
+        if not tenant:
             return None
-        return db_tenant.id
+        return str(tenant.id)
     
     def get_interactive_config(self, db: Session, tenant_id: str) -> Optional[InteractiveConfig]:
         """Ruft die interaktive Konfiguration eines Tenants ab."""
@@ -129,12 +172,20 @@ class TenantService:
         db.commit()
         db.refresh(db_config)
         
+        cache_bus.publish(INTERACTIVE_CONFIG_CHANGED, tenant_id)
+        
         return InteractiveConfig.model_validate(db_config.config)
     
     def get_ui_components_config(self, db: Session, tenant_id: str) -> Optional[UIComponentsConfig]:
         """
-        Gibt die UI-Komponenten-Konfiguration eines Tenants zurück.
+        Gibt die UI-Komponenten-Konfiguration eines Tenants zurück (über den Tenant-Cache).
         """
+        return tenant_cache.get_config(
+            UI_COMPONENTS_CHANGED, tenant_id, lambda: self._load_ui_components_config(db, tenant_id)
+        )
+    
+    def _load_ui_components_config(self, db: Session, tenant_id: str) -> Optional[UIComponentsConfig]:
+        """Lädt die UI-Komponenten-Konfiguration eines Tenants aus der Datenbank."""
         # Angepasst für die neue Struktur mit UIComponentsConfigDB
         config = db.query(UIComponentsConfigDB).filter(UIComponentsConfigDB.tenant_id == tenant_id).first()
         
@@ -147,6 +198,22 @@ class TenantService:
             defaultExamples=config.default_examples
         )
     
+    async def aget_ui_components_config(self, db: AsyncSession, tenant_id: str) -> Optional[UIComponentsConfig]:
+        """Wie get_ui_components_config, mit AsyncSession (für die häufigen Lesezugriffe)."""
+        async def load() -> Optional[UIComponentsConfig]:
+            config = (await db.execute(
+                select(UIComponentsConfigDB).where(UIComponentsConfigDB.tenant_id == tenant_id)
+            )).scalars().first()
+            if not config:
+                return None
+            return UIComponentsConfig(
+                prompt=config.prompt,
+                rules=config.rules,
+                defaultExamples=config.default_examples
+            )
+        
+        return await tenant_cache.aget_config(UI_COMPONENTS_CHANGED, tenant_id, load)
+    
     def create_or_update_ui_components_config(self, db: Session, tenant_id: str, config: UIComponentsConfig) -> UIComponentsConfig:
         """
         Erstellt oder aktualisiert die UI-Komponenten-Konfiguration eines Tenants.
@@ -170,6 +237,7 @@ class TenantService:
             
             db.commit()
             db.refresh(existing_config)
+            cache_bus.publish(UI_COMPONENTS_CHANGED, tenant_id)
             
             return UIComponentsConfig(
                 prompt=existing_config.prompt,
@@ -191,6 +259,7 @@ class TenantService:
             db.add(new_config)
             db.commit()
             db.refresh(new_config)
+            cache_bus.publish(UI_COMPONENTS_CHANGED, tenant_id)
             
             return UIComponentsConfig(
                 prompt=new_config.prompt,
@@ -0,0 +1,201 @@
+"""
+Service für die Token-Blacklist.
+
+Abgemeldete Tokens werden über ihre Kennung (jti-Claim, bei älteren Tokens
+der SHA-256-Hash des Tokens) in der Tabelle token_blacklist gespeichert. Für
+die Prüfung bei jeder authentifizierten Anfrage wird die Blacklist im
+Speicher gehalten: Sie wird beim Start geladen, bei einer Abmeldung in allen
+Workern über den Cache-Invalidierungsbus ergänzt und regelmäßig mit der
+Datenbank abgeglichen. Einträge verfallen mit dem Ablauf des Tokens; ein
+Hintergrundjob entfernt sie auch aus der Tabelle.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.security import REFRESH_TOKEN_EXPIRE_DAYS
+from ..db.session import SessionLocal
+from ..models.token import TokenBlacklist
+from .cache_bus import TOKEN_REVOKED, cache_bus
+
+logger = logging.getLogger(__name__)
+
+
+def token_identifier(token: str, payload: Optional[Dict[str, Any]] = None) -> str:
+    """Gibt die Kennung eines Tokens zurück: den jti-Claim oder, falls nicht vorhanden, den Hash des Tokens."""
+    jti = payload.get("jti") if payload else None
+    return jti or hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _to_timestamp(value: datetime) -> float:
+    """Wandelt einen naiven UTC-Zeitpunkt in einen Unix-Zeitstempel um."""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenBlacklistService:
+    """Prüft Tokens in konstanter Zeit gegen die im Speicher gehaltene Blacklist."""
+
+    def __init__(self, refresh_interval: float = 60.0, prune_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self.prune_interval = prune_interval
+        # jti -> Ablaufzeitpunkt des Tokens (Unix-Zeitstempel)
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+        self.pruned_count = 0
+
+    def load(self, db: Session) -> int:
+        """Lädt alle noch nicht abgelaufenen Einträge aus der Datenbank."""
+        rows = db.query(TokenBlacklist.jti, TokenBlacklist.expires_at).filter(
+            TokenBlacklist.jti.isnot(None),
+            TokenBlacklist.expires_at > datetime.utcnow()
+        ).all()
+        entries = {jti: _to_timestamp(expires_at) for jti, expires_at in rows}
+        with self._lock:
+            # Einträge, die seit Beginn der Abfrage hinzugekommen sind, bleiben erhalten
+            for jti, expires_at in self._entries.items():
+                entries.setdefault(jti, expires_at)
+            self._entries = entries
+            self._loaded = True
+        return len(entries)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Ergänzt einen Eintrag im Speicher (z. B. nach einer Abmeldung in einem anderen Worker)."""
+        with self._lock:
+            self._entries[jti] = expires_at
+
+    def is_blacklisted(self, db: Session, jti: str) -> bool:
+        """
+        Prüft, ob ein Token auf der Blacklist steht.
+        Solange die Blacklist nicht geladen werden konnte, wird die Datenbank abgefragt.
+        """
+        if not self._loaded:
+            try:
+                self.load(db)
+            except Exception as e:
+                logger.warning(f"Token-Blacklist konnte nicht geladen werden, prüfe direkt in der Datenbank: {e}")
+                return db.query(TokenBlacklist.id).filter(TokenBlacklist.jti == jti).first() is not None
+
+        with self._lock:
+            expires_at = self._entries.get(jti)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                # Abgelaufene Tokens werden ohnehin abgelehnt
+                del self._entries[jti]
+                return False
+            return True
+
+    def revoke(self, db: Session, token: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Setzt ein Token auf die Blacklist und meldet es an alle Worker.
+
+        :param payload: Bereits decodierter Inhalt des Tokens (für jti und exp)
+        :return: Kennung des Tokens
+        """
+        jti = token_identifier(token, payload)
+        exp = payload.get("exp") if payload else None
+        if exp:
+            expires_at = datetime.utcfromtimestamp(exp)
+        else:
+            # Ohne Ablaufzeit bleibt der Eintrag so lange wie ein Refresh-Token gültig
+            expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+        db.add(TokenBlacklist(jti=jti, expires_at=expires_at, blacklisted_at=datetime.utcnow()))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Token steht bereits auf der Blacklist
+            db.rollback()
+
+        self.add(jti, _to_timestamp(expires_at))
+        cache_bus.publish(TOKEN_REVOKED, jti=jti, expires_at=_to_timestamp(expires_at))
+        return jti
+
+    def prune(self, db: Session) -> int:
+        """Entfernt abgelaufene Einträge aus der Datenbank und dem Speicher."""
+        deleted = db.query(TokenBlacklist).filter(
+            TokenBlacklist.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._entries.items() if expires_at <= now]:
+                del self._entries[jti]
+
+        self.pruned_count += deleted
+        if deleted:
+            logger.info(f"{deleted} abgelaufene Einträge aus der Token-Blacklist entfernt")
+        return deleted
+
+    def _sync(self) -> None:
+        """Gleicht die Blacklist mit der Datenbank ab und bereinigt sie bei Fälligkeit."""
+        db = SessionLocal()
+        try:
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self._last_prune = time.monotonic()
+                self.prune(db)
+            self.load(db)
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Startet den regelmäßigen Abgleich im laufenden Event-Loop."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Token-Blacklist-Abgleich gestartet")
+
+    async def stop(self) -> None:
+        """Beendet den regelmäßigen Abgleich."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._sync)
+            except Exception as e:
+                logger.error(f"Fehler beim Abgleich der Token-Blacklist: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Größe und Zustand der Blacklist zurück."""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "entries": len(self._entries),
+                "pruned": self.pruned_count
+            }
+
+
+# Singleton-Instanz
+token_blacklist_service = TokenBlacklistService(
+    refresh_interval=settings.TOKEN_BLACKLIST_REFRESH_INTERVAL,
+    prune_interval=settings.TOKEN_BLACKLIST_PRUNE_INTERVAL
+)
+
+
+def _on_token_revoked(tenant_id: Optional[str], payload: Dict[str, Any]) -> None:
+    token_blacklist_service.add(payload["jti"], float(payload["expires_at"]))
+
+
+# Abmeldungen in anderen Workern übernehmen
+cache_bus.subscribe(TOKEN_REVOKED, _on_token_revoked)
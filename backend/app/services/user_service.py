@@ -4,7 +4,7 @@ from datetime import datetime
 from uuid import uuid4
 
 from ..models.user import User, UserRole, UserCreate
-from ..core.security import get_password_hash, verify_password
+from ..core.security import get_password_hash_async, verify_and_update_password
 
 
 class UserService:
@@ -36,22 +36,29 @@ class UserService:
         """
         return db.query(User).filter(User.agency_id == agency_id).all()
     
-    def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
         """
-        Authentifiziert einen Benutzer anhand seiner E-Mail-Adresse und Passworts
+        Authentifiziert einen Benutzer anhand seiner E-Mail-Adresse und Passworts.
+        Die bcrypt-Prüfung läuft im Passwort-Thread-Pool; Hashes mit veraltetem
+        Work-Factor werden dabei neu berechnet und gespeichert.
         """
         user = self.get_user_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
+            db.commit()
         return user
     
-    def create_user(
+    async def create_user(
         self, db: Session, user_create: UserCreate, created_by_id: Optional[str] = None
     ) -> User:
         """
-        Erstellt einen neuen Benutzer
+        Erstellt einen neuen Benutzer.
+        Der bcrypt-Hash wird im Passwort-Thread-Pool berechnet.
         """
         # Überprüfen, ob die E-Mail-Adresse bereits existiert
         if user_create.email:
@@ -63,7 +70,7 @@ class UserService:
         db_user = User(
             id=str(uuid4()),
             email=user_create.email,
-            hashed_password=get_password_hash(user_create.password),
+            hashed_password=await get_password_hash_async(user_create.password),
             full_name=user_create.full_name,
             role=user_create.role,
             is_active=user_create.is_active,
@@ -90,7 +97,7 @@ class UserService:
         
         return db_user
     
-    def update_user(
+    async def update_user(
         self,
         db: Session,
         user_id: str,
@@ -102,7 +109,8 @@ class UserService:
         is_active: Optional[bool] = None
     ) -> Optional[User]:
         """
-        Aktualisiert die Daten eines Benutzers
+        Aktualisiert die Daten eines Benutzers.
+        Ein neues Passwort wird im Passwort-Thread-Pool gehasht.
         """
         user = self.get_user_by_id(db, user_id)
         if not user:
@@ -117,7 +125,7 @@ class UserService:
             user.email = email
 
         if password is not None:
-            user.hashed_password = get_password_hash(password)
+            user.hashed_password = await get_password_hash_async(password)
 
         if full_name is not None:
             user.full_name = full_name
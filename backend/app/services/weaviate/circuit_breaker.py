@@ -0,0 +1,218 @@
+"""
+Circuit Breaker für alle Aufrufe an Weaviate.
+
+Ist Weaviate gestört, würde ohne Breaker jede Chat-Anfrage bis zum Timeout
+des Clients hängen und Worker blockieren. Der Breaker beobachtet die letzten
+Aufrufe und öffnet, wenn zu viele fehlschlagen oder zu langsam sind:
+
+- closed: Aufrufe laufen normal, Ergebnis und Dauer werden erfasst.
+- open: Aufrufe schlagen sofort mit WeaviateUnavailableError fehl.
+- half_open: Nach OPEN_SECONDS wird eine Probe durchgelassen. Gelingt sie
+  schnell genug, schließt der Breaker, sonst öffnet er erneut.
+
+Der Zustand ist prozesslokal; jeder Worker entscheidet anhand seiner eigenen
+Aufrufe.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class WeaviateUnavailableError(Exception):
+    """Weaviate ist nicht erreichbar oder der Circuit Breaker ist offen."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Thread-sicherer Circuit Breaker mit Fehler- und Latenzschwelle."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_ms: float = 3000.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30.0
+    ):
+        """
+        :param window: Anzahl der letzten Aufrufe, aus denen die Quoten berechnet werden
+        :param min_calls: Mindestanzahl Aufrufe im Fenster, bevor der Breaker öffnen kann
+        :param failure_rate: Anteil fehlgeschlagener Aufrufe, ab dem der Breaker öffnet
+        :param slow_ms: Dauer, ab der ein erfolgreicher Aufruf als langsam gilt
+        :param slow_rate: Anteil langsamer Aufrufe, ab dem der Breaker öffnet
+        :param open_seconds: Dauer, für die Aufrufe nach dem Öffnen abgewiesen werden
+        """
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_ms = slow_ms
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        # (fehlgeschlagen, langsam) der letzten Aufrufe
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+        # Zähler für Metriken
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_opened_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_started_at = None
+        return self._state
+
+    def _acquire(self) -> bool:
+        """
+        Entscheidet, ob ein Aufruf durchgelassen wird.
+
+        :return: True, wenn der Aufruf die Probe im Zustand half_open ist
+        :raises WeaviateUnavailableError: Wenn der Aufruf abgewiesen wird
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return False
+            # Pro Öffnungsphase nur eine Probe; hängt sie länger als open_seconds, darf eine weitere starten
+            if state == HALF_OPEN and (
+                self._probe_started_at is None or now - self._probe_started_at >= self.open_seconds
+            ):
+                self._probe_started_at = now
+                return True
+            self.rejected += 1
+            retry_after = max(0.0, self.open_seconds - (now - self._opened_at)) if state == OPEN else self.open_seconds
+        raise WeaviateUnavailableError(f"Circuit Breaker {self.name} ist offen", retry_after=round(retry_after, 1))
+
+    def _record(self, probe: bool, failed: bool, elapsed_ms: float, track_latency: bool) -> None:
+        slow = track_latency and not failed and elapsed_ms >= self.slow_ms
+        with self._lock:
+            if probe:
+                self._probe_started_at = None
+                if failed or slow:
+                    self._open("Probe fehlgeschlagen" if failed else f"Probe zu langsam ({elapsed_ms:.0f} ms)")
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"Circuit Breaker {self.name} geschlossen")
+                return
+            if self._state != CLOSED:
+                # Verspätete Ergebnisse aus der Zeit vor dem Öffnen
+                return
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / calls >= self.failure_rate:
+                self._open(f"{failures} von {calls} Aufrufen fehlgeschlagen")
+            elif slow_calls / calls >= self.slow_rate:
+                self._open(f"{slow_calls} von {calls} Aufrufen langsamer als {self.slow_ms:.0f} ms")
+
+    def _open(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        self.last_opened_at = datetime.utcnow()
+        logger.warning(f"Circuit Breaker {self.name} geöffnet: {reason}")
+
+    @contextmanager
+    def guard(self, track_latency: bool = True) -> Iterator[None]:
+        """
+        Umschließt einen Aufruf an Weaviate.
+
+        :param track_latency: False für Aufrufe, die planmäßig lange dauern (Batch-Einfügungen);
+            dann zählen nur Fehler
+        :raises WeaviateUnavailableError: Wenn der Breaker offen ist oder der Aufruf fehlschlägt
+        """
+        probe = self._acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.last_error = str(e)[:500]
+            self._record(probe, True, (time.perf_counter() - started) * 1000, track_latency)
+            raise WeaviateUnavailableError(f"Weaviate-Aufruf fehlgeschlagen: {e}") from e
+        except BaseException:
+            # Abbruch (z. B. CancelledError) sagt nichts über Weaviate aus; Probe freigeben
+            if probe:
+                with self._lock:
+                    self._probe_started_at = None
+            raise
+        self._record(probe, False, (time.perf_counter() - started) * 1000, track_latency)
+
+    def reset(self) -> None:
+        """Schließt den Breaker und verwirft das Fenster."""
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._probe_started_at = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Zustand und Quoten des Breakers zurück."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            return {
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "slow_rate": round(slow_calls / calls, 4) if calls else 0.0,
+                "retry_in_seconds": round(max(0.0, self.open_seconds - (now - self._opened_at)), 1) if state == OPEN else 0.0,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "last_opened_at": self.last_opened_at.isoformat() if self.last_opened_at else None,
+                "last_error": self.last_error,
+                "thresholds": {
+                    "min_calls": self.min_calls,
+                    "failure_rate": self.failure_rate,
+                    "slow_ms": self.slow_ms,
+                    "slow_rate": self.slow_rate,
+                    "open_seconds": self.open_seconds
+                }
+            }
+
+
+# Singleton-Instanz
+weaviate_breaker = CircuitBreaker(
+    "weaviate",
+    window=settings.WEAVIATE_BREAKER_WINDOW,
+    min_calls=settings.WEAVIATE_BREAKER_MIN_CALLS,
+    failure_rate=settings.WEAVIATE_BREAKER_FAILURE_RATE,
+    slow_ms=settings.WEAVIATE_BREAKER_SLOW_MS,
+    slow_rate=settings.WEAVIATE_BREAKER_SLOW_RATE,
+    open_seconds=settings.WEAVIATE_BREAKER_OPEN_SECONDS
+)
@@ -12,6 +12,7 @@ import atexit
 from weaviate.config import AdditionalConfig, Timeout
 # ConnectionParams wird in Weaviate v4 nicht mehr genutzt
 from weaviate.exceptions import WeaviateConnectionError
+from ...core.config import settings
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +25,9 @@ def get_client():
     """
     Gibt eine Singleton-Instanz des Weaviate-Clients zurück.
     Erstellt einen neuen Client, falls noch keiner existiert.
+
+    Der Client wird nicht beim Import erstellt: Der Verbindungsaufbau (bis zu
+    30 Sekunden Timeout) läge sonst auf dem kritischen Pfad jedes Starts.
     """
     global _client
     if _client is None:
@@ -50,12 +54,13 @@ def init_client():
     Initialisiert einen neuen Weaviate-Client mit angepassten Timeout-Einstellungen.
     """
     try:
-        # Timeout-Konfiguration für zuverlässige Verbindungen
-        # Erhöhte Timeouts für Operationen mit vielen Dokumenten
+        # Timeout-Konfiguration: Abfragen liegen im Chat-Pfad und sind kurz, damit
+        # ein gestörtes Weaviate nicht jede Anfrage minutenlang blockiert (siehe
+        # circuit_breaker); Einfügeoperationen laufen im Hintergrund und dürfen länger dauern
         timeout_config = Timeout(
             connect=30.0,     # 30 Sekunden für die initiale Verbindung
-            query=120.0,      # 120 Sekunden für Abfragen (erhöht für komplexe Queries)
-            insert=180.0,     # 180 Sekunden für Einfügeoperationen (erhöht für Batch-Operationen)
+            query=settings.WEAVIATE_QUERY_TIMEOUT,
+            insert=settings.WEAVIATE_INSERT_TIMEOUT,
             startup=60.0      # 60 Sekunden für Startup-Operationen
         )
         
@@ -90,14 +95,3 @@ def init_client():
     except Exception as e:
         logger.error(f"Fehler bei der Initialisierung des Weaviate-Clients: {str(e)}")
         return None
-
-# Initialisiere Client beim Import dieses Moduls
-try:
-    _client = init_client()
-    if _client:
-        logger.info("Weaviate-Client-Singleton initialisiert")
-    else:
-        logger.warning("Weaviate-Client konnte nicht initialisiert werden, wird bei Bedarf erneut versucht")
-except Exception as e:
-    logger.error(f"Fehler beim Initialisieren des Weaviate-Client-Singletons: {str(e)}")
-    _client = None 
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Zuordnung Tenant -> Weaviate-Collection für Blue/Green-Neuindizierungen.
+
+Normalerweise liegt ein Tenant in der Collection mit dem Standardnamen
+(SchemaManager.get_base_class_name). Eine Blue/Green-Neuindizierung baut eine
+neue Collection auf (pending), während Suchen weiter die aktive Collection
+lesen; Änderungen werden in dieser Zeit in beide geschrieben. Danach wird
+umgeschaltet, und die alte Collection kann gelöscht werden.
+
+Die Zuordnung steht in der Tabelle tenant_collections und wird pro Prozess
+geladen. Änderungen werden über den Cache-Invalidierungsbus an alle Worker
+verteilt. Zusätzlich wird sie alle COLLECTION_REGISTRY_RESYNC_SECONDS neu
+gelesen, falls ein Ereignis verloren ging oder der Bus abgeschaltet ist.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ...core.config import settings
+from ..cache_bus import COLLECTIONS_CHANGED, cache_bus
+
+logger = logging.getLogger(__name__)
+
+# Wartezeit, bevor nach einem fehlgeschlagenen Laden erneut gelesen wird (Sekunden)
+RELOAD_RETRY_SECONDS = 30
+
+
+class CollectionRegistry:
+    """Prozesslokaler Cache der Tabelle tenant_collections."""
+
+    def __init__(self, resync_seconds: float = settings.COLLECTION_REGISTRY_RESYNC_SECONDS):
+        self.resync_seconds = resync_seconds
+        self._active: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_current(self) -> bool:
+        return self._loaded and time.monotonic() - self._loaded_at < self.resync_seconds
+
+    def _ensure_loaded(self) -> None:
+        if self._is_current() or time.monotonic() - self._failed_at < RELOAD_RETRY_SECONDS:
+            return
+        with self._lock:
+            if self._is_current():
+                return
+            from ...db.models import TenantCollectionModel
+            from ...db.session import session_scope
+
+            try:
+                with session_scope() as db:
+                    rows = db.query(TenantCollectionModel).all()
+                self._active = {row.tenant_id: row.active_collection for row in rows}
+                self._pending = {row.tenant_id: row.pending_collection for row in rows if row.pending_collection}
+                self._loaded = True
+                self._loaded_at = time.monotonic()
+            except Exception as e:
+                self._failed_at = time.monotonic()
+                logger.warning(f"Collection-Zuordnung konnte nicht geladen werden, verwende Standardnamen: {e}")
+
+    def resolve(self, tenant_id: str) -> Optional[str]:
+        """Gibt die aktive Collection des Tenants zurück (None = Standardname)."""
+        self._ensure_loaded()
+        return self._active.get(tenant_id)
+
+    def pending(self, tenant_id: str) -> Optional[str]:
+        """Gibt die im Aufbau befindliche Collection zurück, in die zusätzlich geschrieben wird."""
+        self._ensure_loaded()
+        return self._pending.get(tenant_id)
+
+    def invalidate(self) -> None:
+        """Verwirft die Zuordnung; sie wird beim nächsten Zugriff neu geladen."""
+        with self._lock:
+            self._loaded = False
+            self._failed_at = 0.0
+
+    def _update(self, tenant_id: str, active: str, pending: Optional[str]) -> None:
+        from ...db.models import TenantCollectionModel
+        from ...db.session import session_scope
+
+        with session_scope() as db:
+            row = db.get(TenantCollectionModel, tenant_id)
+            if row is None:
+                row = TenantCollectionModel(tenant_id=tenant_id)
+                db.add(row)
+            row.active_collection = active
+            row.pending_collection = pending
+            row.updated_at = datetime.utcnow()
+            db.commit()
+        self.invalidate()
+        cache_bus.publish(COLLECTIONS_CHANGED, tenant_id)
+
+    def begin_swap(self, tenant_id: str, active: str, pending: str) -> None:
+        """Registriert eine neue Collection; ab jetzt werden Änderungen in beide geschrieben."""
+        self._update(tenant_id, active, pending)
+        logger.info(f"Tenant {tenant_id}: neue Collection {pending} im Aufbau (aktiv: {active})")
+
+    def complete_swap(self, tenant_id: str, collection: str) -> None:
+        """Schaltet Suchen und Schreibzugriffe auf die neue Collection um."""
+        self._update(tenant_id, collection, None)
+        logger.info(f"Tenant {tenant_id}: auf Collection {collection} umgeschaltet")
+
+    def abort_swap(self, tenant_id: str, active: str) -> None:
+        """Verwirft eine begonnene Collection; Änderungen gehen wieder nur in die aktive Collection."""
+        self._update(tenant_id, active, None)
+        logger.info(f"Tenant {tenant_id}: Aufbau der neuen Collection abgebrochen (aktiv: {active})")
+
+    def write_targets(self, tenant_id: str, active: str) -> List[str]:
+        """Collections, in die eine Änderung geschrieben werden muss (aktive zuerst)."""
+        pending = self.pending(tenant_id)
+        return [active, pending] if pending and pending != active else [active]
+
+
+def _on_collections_changed(tenant_id: Optional[str], payload: dict) -> None:
+    collection_registry.invalidate()
+
+
+# Singleton-Instanz
+collection_registry = CollectionRegistry()
+cache_bus.subscribe(COLLECTIONS_CHANGED, _on_collections_changed)
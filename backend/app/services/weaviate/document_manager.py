@@ -10,8 +10,12 @@ import weaviate
 from datetime import datetime
 from ...schemas.document import Document, WeaviateStatus
 from ...models.weaviate_status import IndexStatus
+from .circuit_breaker import weaviate_breaker
 from .client import get_client
+from .collection_registry import collection_registry
 from .schema_manager import SchemaManager
+from ...core.config import settings
+from weaviate.classes.data import DataObject
 from weaviate.collections.classes.filters import Filter
 
 class DocumentManager:
@@ -28,15 +32,20 @@ class DocumentManager:
         source: Optional[str] = None,
         document_id: Optional[str] = None
     ) -> Optional[str]:
-        """Fügt ein Dokument zur Wissensbasis eines Tenants hinzu."""
+        """
+        Fügt ein Dokument zur Wissensbasis eines Tenants hinzu (während einer
+        Blue/Green-Neuindizierung auch in die neue Collection).
+        """
         try:
             client = get_client()
-            collection_name = SchemaManager.get_tenant_class_name(tenant_id)
+            targets = collection_registry.write_targets(tenant_id, SchemaManager.get_tenant_class_name(tenant_id))
             
             # Sicherstellen, dass das Schema für den Tenant existiert
-            if not SchemaManager.class_exists(collection_name):
+            for target in targets:
+                if SchemaManager.class_exists(target):
+                    continue
                 try:
-                    if not SchemaManager.create_tenant_schema(tenant_id):
+                    if not SchemaManager.create_tenant_schema(tenant_id, class_name=target):
                         logging.error(f"Konnte Schema für Tenant {tenant_id} nicht erstellen")
                         # Trotzdem fortfahren mit einer simulierten ID
                         doc_id = document_id or str(uuid.uuid4())
@@ -61,12 +70,20 @@ class DocumentManager:
             }
             
             try:
+                # Vektor clientseitig berechnen (aus dem Cache, falls der Text unverändert ist)
+                vector = None
+                if settings.CLIENT_SIDE_EMBEDDING:
+                    from .embedding_manager import embedding_manager
+                    vector = embedding_manager.embed_documents([properties])[0]
+
                 # Dokument hinzufügen
-                collection = client.collections.get(collection_name)
-                collection.data.insert(
-                    uuid=doc_id,
-                    properties=properties
-                )
+                for target in targets:
+                    with weaviate_breaker.guard(track_latency=False):
+                        client.collections.get(target).data.insert(
+                            uuid=doc_id,
+                            properties=properties,
+                            vector=vector
+                        )
                 logging.info(f"Dokument {doc_id} erfolgreich zu Tenant {tenant_id} hinzugefügt")
                 return doc_id
             except Exception as e:
@@ -81,6 +98,103 @@ class DocumentManager:
             logging.warning(f"Simuliere Dokument-Erstellung mit ID {doc_id} wegen allgemeinen Fehlern")
             return doc_id
     
+    @staticmethod
+    def add_documents(
+        tenant_id: str,
+        documents: List[Dict[str, Any]],
+        collection_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fügt mehrere Dokumente in einem Batch zur Wissensbasis eines Tenants hinzu.
+
+        Jedes Dokument ist ein Dict mit title, content und optional metadata, source und id.
+        Bei aktiviertem CLIENT_SIDE_EMBEDDING werden die Vektoren gebündelt berechnet
+        und explizit an Weaviate übergeben.
+
+        Ohne collection_name wird in die aktive Collection geschrieben und, während
+        einer Blue/Green-Neuindizierung, zusätzlich in die neue. Ein Dokument gilt
+        nur als eingefügt, wenn es in allen Collections geschrieben wurde.
+
+        :param collection_name: Ziel-Collection (z. B. die neue Collection einer Neuindizierung)
+        :return: Dict mit den eingefügten IDs und den fehlgeschlagenen Dokumenten
+        """
+        result = {"inserted": [], "failed": {}}
+        if not documents:
+            return result
+
+        client = get_client()
+        if collection_name:
+            targets = [collection_name]
+        else:
+            targets = collection_registry.write_targets(tenant_id, SchemaManager.get_tenant_class_name(tenant_id))
+
+        for target in targets:
+            if not SchemaManager.class_exists(target):
+                if not SchemaManager.create_tenant_schema(tenant_id, class_name=target):
+                    error = f"Konnte Schema für Tenant {tenant_id} nicht erstellen"
+                    logging.error(error)
+                    result["failed"] = {doc.get("id") or str(uuid.uuid4()): error for doc in documents}
+                    return result
+
+        doc_ids = [doc.get("id") or str(uuid.uuid4()) for doc in documents]
+        properties_list = [
+            {
+                "title": doc.get("title", ""),
+                "content": doc.get("content", ""),
+                "metadata": json.dumps(doc.get("metadata") or {}),
+                "source": doc.get("source") or "Manual Upload"
+            }
+            for doc in documents
+        ]
+
+        vectors: List[Optional[List[float]]] = [None] * len(documents)
+        if settings.CLIENT_SIDE_EMBEDDING:
+            from .embedding_manager import embedding_manager
+            vectors = embedding_manager.embed_documents(properties_list)
+
+        objects = [
+            DataObject(properties=properties, uuid=doc_id, vector=vector)
+            for doc_id, properties, vector in zip(doc_ids, properties_list, vectors)
+        ]
+
+        for target in targets:
+            with weaviate_breaker.guard(track_latency=False):
+                response = client.collections.get(target).data.insert_many(objects)
+            for index, error in response.errors.items():
+                result["failed"].setdefault(doc_ids[index], error.message)
+        result["inserted"] = [doc_id for doc_id in doc_ids if doc_id not in result["failed"]]
+
+        logging.info(
+            f"{len(result['inserted'])} von {len(documents)} Dokumenten im Batch zu Tenant {tenant_id} hinzugefügt"
+        )
+        return result
+
+    @staticmethod
+    def delete_documents(tenant_id: str, doc_ids: List[str]) -> int:
+        """
+        Löscht mehrere Dokumente eines Tenants mit einer einzigen Anfrage
+        (während einer Blue/Green-Neuindizierung auch aus der neuen Collection).
+
+        :return: Anzahl der gelöschten Objekte in der aktiven Collection
+        """
+        if not doc_ids:
+            return 0
+
+        client = get_client()
+        collection_name = SchemaManager.get_tenant_class_name(tenant_id)
+
+        deleted = 0
+        for target in collection_registry.write_targets(tenant_id, collection_name):
+            if not SchemaManager.class_exists(target):
+                logging.warning(f"Klasse {target} existiert nicht, nichts zu löschen")
+                continue
+            with weaviate_breaker.guard(track_latency=False):
+                result = client.collections.get(target).data.delete_many(where=Filter.by_id().contains_any(doc_ids))
+            if target == collection_name:
+                deleted = result.successful
+        logging.info(f"{deleted} Dokumente von Tenant {tenant_id} gelöscht")
+        return deleted
+
     @staticmethod
     def get_documents(tenant_id: str, document_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -148,7 +262,8 @@ class DocumentManager:
             # Dokument löschen
             try:
                 collection = client.collections.get(collection_name)
-                collection.data.delete_by_id(doc_id)
+                with weaviate_breaker.guard(track_latency=False):
+                    collection.data.delete_by_id(doc_id)
                 logging.info(f"Dokument {doc_id} erfolgreich gelöscht")
                 return True
             except Exception as e:
@@ -0,0 +1,122 @@
+"""
+Embedding-Manager-Modul für die clientseitige Berechnung von Dokumentvektoren.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from ...core.config import settings
+from .vector_cache import VectorCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingManager:
+    """
+    Berechnet Embeddings im Backend-Prozess und cached sie persistent.
+
+    Texte werden über ihren Inhalts-Hash im VectorCache nachgeschlagen, nur
+    unbekannte Texte werden in Batches durch das Modell geschickt.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, batch_size: int = 64):
+        """
+        Initialisiert den Embedding-Manager.
+
+        :param model_name: Name des Sentence-Transformer-Modells
+        :param cache_dir: Verzeichnis des persistenten Vektor-Caches
+        :param batch_size: Anzahl der Texte pro Modellaufruf
+        """
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self._model = None
+        self._cache: Optional[VectorCache] = None
+        self._lock = threading.Lock()
+        self.embedded_count = 0
+
+    @property
+    def model(self):
+        """Lazy-Loading des Embedding-Modells."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Lade Embedding-Modell {self.model_name}...")
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                    logger.info("Embedding-Modell erfolgreich geladen")
+        return self._model
+
+    @property
+    def cache(self) -> VectorCache:
+        """Lazy-Initialisierung des Vektor-Caches."""
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = VectorCache(self.cache_dir)
+        return self._cache
+
+    @staticmethod
+    def document_text(title: str, content: str) -> str:
+        """Erzeugt den Text, aus dem der Vektor eines Dokuments berechnet wird."""
+        return f"{title or ''}\n{content or ''}".strip()
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gibt für jeden Text einen Vektor zurück.
+        Bereits gecachte Texte werden nicht erneut eingebettet.
+        """
+        if not texts:
+            return []
+
+        hashes = [VectorCache.content_hash(text, self.model_name) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(hashes)))
+
+        # Fehlende Texte sammeln (jeder Hash nur einmal)
+        missing: Dict[str, str] = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in cached and content_hash not in missing:
+                missing[content_hash] = text
+
+        if missing:
+            missing_hashes = list(missing.keys())
+            for start in range(0, len(missing_hashes), self.batch_size):
+                batch_hashes = missing_hashes[start:start + self.batch_size]
+                batch_vectors = self.model.encode(
+                    [missing[h] for h in batch_hashes],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False
+                )
+                new_entries = dict(zip(batch_hashes, batch_vectors))
+                self.cache.put_many(new_entries)
+                cached.update(new_entries)
+                self.embedded_count += len(batch_hashes)
+
+        stats = self.cache.get_stats()
+        logger.info(
+            f"Embeddings für {len(texts)} Texte bereitgestellt, {len(missing)} neu berechnet "
+            f"(Cache-Trefferquote gesamt: {stats['hit_rate']:.1%})"
+        )
+        return [cached[h].tolist() for h in hashes]
+
+    def embed_documents(self, documents: List[Dict[str, str]]) -> List[List[float]]:
+        """Berechnet die Vektoren für Dokumente mit den Feldern title und content."""
+        return self.embed_texts([
+            self.document_text(doc.get("title", ""), doc.get("content", "")) for doc in documents
+        ])
+
+    def get_stats(self) -> Dict[str, float]:
+        """Gibt Cache-Statistiken und die Anzahl neu berechneter Embeddings zurück."""
+        stats = dict(self.cache.get_stats())
+        stats["model"] = self.model_name
+        stats["embedded"] = self.embedded_count
+        return stats
+
+
+# Singleton-Instanz
+embedding_manager = EmbeddingManager(
+    model_name=settings.EMBEDDING_MODEL,
+    cache_dir=settings.VECTOR_CACHE_DIR,
+    batch_size=settings.EMBEDDING_BATCH_SIZE
+)
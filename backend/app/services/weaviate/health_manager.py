@@ -13,6 +13,7 @@ from ...db.session import SessionLocal
 from ...models.tenant import Tenant
 from .client import get_client
 from .schema_manager import SchemaManager
+from ...core.config import settings
 from weaviate.collections.classes.filters import Filter
 
 class HealthManager:
@@ -73,21 +74,54 @@ class HealthManager:
             return False
             
     @staticmethod
-    def validate_all_tenant_classes() -> Tuple[int, int]:
+    def check_tenant_class(tenant_id: str) -> str:
         """
-        Überprüft alle Tenant-Klassen für alle bekannten Tenants
+        Prüft die Tenant-Klasse und legt sie an, falls sie fehlt. Anders als
+        validate_tenant_class wird eine vorhandene Klasse nie gelöscht, daher
+        ist die Prüfung auch während des laufenden Betriebs unbedenklich.
+        
+        :return: "valid" (vorhanden), "created" (neu angelegt) oder "failed"
         """
-        # Verbinde mit der Datenbank, um alle Tenant-IDs zu holen
+        client = get_client()
+        if not client:
+            logging.error("Weaviate-Client konnte nicht initialisiert werden")
+            return "failed"
+            
+        class_name = SchemaManager.get_tenant_class_name(tenant_id)
+        try:
+            if SchemaManager.class_exists(class_name):
+                return "valid"
+            logging.warning(f"Klasse {class_name} existiert nicht, wird neu erstellt...")
+            if SchemaManager.create_tenant_schema(tenant_id):
+                logging.info(f"Klasse {class_name} erfolgreich erstellt")
+                return "created"
+            logging.error(f"Fehler beim Erstellen der Klasse {class_name}")
+        except Exception as e:
+            logging.error(f"Fehler beim Zugriff auf Klasse {class_name}: {str(e)}")
+        return "failed"
+    
+    @staticmethod
+    def get_tenant_ids() -> List[str]:
+        """Gibt die IDs aller Tenants aus der Datenbank zurück."""
         db = SessionLocal()
         try:
             # Nur die ID-Spalte abfragen, um Probleme mit fehlenden Spalten zu vermeiden
             tenants = db.query(Tenant.id).all()
-            tenant_ids = [str(tenant.id) for tenant in tenants]
+            return [str(tenant.id) for tenant in tenants]
+        finally:
+            db.close()
+            
+    @staticmethod
+    def validate_all_tenant_classes() -> Tuple[int, int]:
+        """
+        Überprüft alle Tenant-Klassen für alle bekannten Tenants
+        """
+        # Verbinde mit der Datenbank, um alle Tenant-IDs zu holen
+        try:
+            tenant_ids = HealthManager.get_tenant_ids()
         except Exception as e:
             logging.error(f"Fehler beim Abrufen der Tenants aus der Datenbank: {str(e)}")
             tenant_ids = []
-        finally:
-            db.close()
             
         if not tenant_ids:
             logging.warning("Keine Tenants in der Datenbank gefunden")
@@ -181,10 +215,17 @@ class HealthManager:
                     if "uuid" in properties_to_insert:
                         uuid_to_use = properties_to_insert.pop("uuid", None)
                     
+                    # Vektor clientseitig aus dem Cache holen bzw. berechnen
+                    vector = None
+                    if settings.CLIENT_SIDE_EMBEDDING:
+                        from .embedding_manager import embedding_manager
+                        vector = embedding_manager.embed_documents([properties_to_insert])[0]
+
                     # Neues Objekt einfügen
                     insert_result = collection.data.insert(
                         properties=properties_to_insert,
-                        uuid=uuid_to_use
+                        uuid=uuid_to_use,
+                        vector=vector
                     )
                     
                     logging.info(f"Dokument {document_id} für Tenant {tenant_id} erfolgreich neu indiziert")
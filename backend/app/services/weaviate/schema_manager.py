@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, List, Tuple
 import weaviate
 from weaviate.collections.classes.config import DataType, Property, VectorizerConfig
 from .client import get_client
+from .collection_registry import collection_registry
 
 class SchemaManager:
     """Manager für die Verwaltung von Weaviate-Schemas und Klassen."""
@@ -18,6 +19,14 @@ class SchemaManager:
 
     @staticmethod
     def get_tenant_class_name(tenant_id: str) -> str:
+        """
+        Gibt den Namen der aktiven Klasse eines Tenants zurück. Nach einer
+        Blue/Green-Neuindizierung weicht er vom Standardnamen ab.
+        """
+        return collection_registry.resolve(tenant_id) or SchemaManager.get_base_class_name(tenant_id)
+    
+    @staticmethod
+    def get_base_class_name(tenant_id: str) -> str:
         """Generiert einen standardisierten Klassennamen für einen Tenant."""
         # Weaviate v4 erfordert gültige Klassennamen: nur Buchstaben
         # und Ziffern, beginnt mit einem Großbuchstaben
@@ -116,16 +125,19 @@ class SchemaManager:
             return False
     
     @staticmethod
-    def create_tenant_schema(tenant_id: str) -> bool:
+    def create_tenant_schema(tenant_id: str, class_name: Optional[str] = None) -> bool:
         """
         Erstellt das Schema für einen spezifischen Tenant.
         Ein Tenant hat seine eigene Klasse für Dokumente.
+        
+        :param class_name: Name der Klasse (Standard: aktive Klasse des Tenants);
+            bei einer Blue/Green-Neuindizierung der Name der neuen Klasse
         """
         client = get_client()
         
         try:
             # Name der Klasse basierend auf der Tenant-ID
-            class_name = f"Tenant{tenant_id}"
+            class_name = class_name or SchemaManager.get_tenant_class_name(tenant_id)
             
             # Prüfe, ob die Klasse bereits existiert
             if SchemaManager.class_exists(class_name):
@@ -191,6 +203,19 @@ class SchemaManager:
             
         class_name = SchemaManager.get_tenant_class_name(tenant_id)
         
+        # Eine im Aufbau befindliche Klasse (Blue/Green-Neuindizierung) ebenfalls löschen
+        pending = collection_registry.pending(tenant_id)
+        if pending and not SchemaManager.delete_collection(pending):
+            return False
+        
+        if SchemaManager.delete_collection(class_name):
+            logging.info(f"Schema für Tenant {tenant_id} gelöscht")
+            return True
+        return False
+    
+    @staticmethod
+    def delete_collection(class_name: str) -> bool:
+        """Löscht eine Klasse, falls sie existiert."""
         # Prüfen, ob Klasse existiert
         if not SchemaManager.class_exists(class_name):
             return True  # Klasse existiert nicht, also nichts zu löschen
@@ -198,8 +223,7 @@ class SchemaManager:
         try:
             # Klasse löschen
             get_client().collections.delete(class_name)
-            logging.info(f"Schema für Tenant {tenant_id} gelöscht")
             return True
         except Exception as e:
-            logging.error(f"Fehler beim Löschen des Tenant-Schemas: {e}")
+            logging.error(f"Fehler beim Löschen der Klasse {class_name}: {e}")
             return False 
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Validierung der Tenant-Klassen in Weaviate außerhalb des kritischen Pfads.
+
+Beim Start wird nicht mehr jede Tenant-Klasse nacheinander geprüft, bevor
+der Prozess Anfragen annimmt. Stattdessen:
+
+- Ein Hintergrund-Task prüft alle Tenants mit begrenzter Parallelität
+  (WEAVIATE_VALIDATION_CONCURRENCY Threads) und meldet den Fortschritt.
+- Jeder Tenant wird zusätzlich beim ersten Zugriff (Suche, Indexierung)
+  geprüft, falls der Hintergrund-Task ihn noch nicht erreicht hat.
+
+Fehlende Klassen werden angelegt, vorhandene Klassen nie gelöscht (siehe
+HealthManager.check_tenant_class). Das destruktive Neuerstellen bleibt
+HealthManager.validate_tenant_class bzw. scripts/validate_classes vorbehalten.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from ...core.config import settings
+from .health_manager import HealthManager
+
+logger = logging.getLogger(__name__)
+
+
+class TenantSchemaValidator:
+    """Prüft Tenant-Klassen einmal pro Prozess, im Hintergrund oder beim ersten Zugriff."""
+
+    def __init__(self, concurrency: int = 4, retry_seconds: float = 60.0):
+        """
+        :param concurrency: Anzahl gleichzeitig geprüfter Tenants im Hintergrund
+        :param retry_seconds: Wartezeit, bevor ein fehlgeschlagener Tenant erneut geprüft wird
+        """
+        self.concurrency = max(1, concurrency)
+        self.retry_seconds = retry_seconds
+        # Tenant-ID -> (Ergebnis, Zeitpunkt der Prüfung)
+        self._results: Dict[str, tuple] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Fortschritt der Hintergrund-Validierung
+        self.state = "idle"
+        self.total = 0
+        self.processed = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.duration_ms: Optional[float] = None
+        self.lazy_checks = 0
+
+    def _lock_for(self, tenant_id: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(tenant_id)
+            if lock is None:
+                lock = self._locks[tenant_id] = threading.Lock()
+            return lock
+
+    def _is_settled(self, tenant_id: str) -> bool:
+        """True, wenn der Tenant geprüft ist und (bei Fehlern) die Wartezeit noch läuft."""
+        result = self._results.get(tenant_id)
+        if result is None:
+            return False
+        status, checked_at = result
+        return status != "failed" or time.monotonic() - checked_at < self.retry_seconds
+
+    def ensure_tenant(self, tenant_id: str, lazy: bool = True) -> bool:
+        """
+        Stellt sicher, dass die Klasse des Tenants geprüft wurde (blockierend).
+        Nach der ersten erfolgreichen Prüfung ist das nur noch ein Dictionary-Zugriff.
+
+        :param tenant_id: ID des Tenants
+        :param lazy: True beim Aufruf aus einer Anfrage (für die Metriken)
+        :return: True, wenn die Klasse existiert oder angelegt wurde
+        """
+        if not self._is_settled(tenant_id):
+            with self._lock_for(tenant_id):
+                # Ein paralleler Aufruf kann den Tenant inzwischen geprüft haben
+                if not self._is_settled(tenant_id):
+                    if lazy:
+                        self.lazy_checks += 1
+                    status = HealthManager.check_tenant_class(tenant_id)
+                    self._results[tenant_id] = (status, time.monotonic())
+                    if status == "failed":
+                        logger.warning(f"Klasse für Tenant {tenant_id} konnte nicht validiert werden")
+        return self._results[tenant_id][0] != "failed"
+
+    def mark_valid(self, tenant_id: str) -> None:
+        """Vermerkt eine gerade angelegte Klasse als gültig."""
+        self._results[tenant_id] = ("created", time.monotonic())
+
+    def forget(self, tenant_id: str) -> None:
+        """Verwirft das Ergebnis eines Tenants (z. B. nach dem Löschen seiner Klasse)."""
+        self._results.pop(tenant_id, None)
+
+    def start(self) -> None:
+        """Startet die Validierung aller Tenants im Hintergrund."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="weaviate-schema-validation")
+
+    async def stop(self) -> None:
+        """Bricht die Hintergrund-Validierung ab; laufende Prüfungen werden nicht unterbrochen."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        self.state = "running"
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        self.processed = 0
+        started = time.perf_counter()
+        try:
+            tenant_ids = await asyncio.to_thread(HealthManager.get_tenant_ids)
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen der Tenants für die Weaviate-Validierung: {e}")
+            self.state = "failed"
+            return
+        self.total = len(tenant_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def validate(tenant_id: str) -> None:
+            async with semaphore:
+                try:
+                    await asyncio.to_thread(self.ensure_tenant, tenant_id, False)
+                except Exception as e:
+                    logger.error(f"Fehler bei der Validierung von Tenant {tenant_id}: {e}")
+                    self._results[tenant_id] = ("failed", time.monotonic())
+                finally:
+                    self.processed += 1
+
+        await asyncio.gather(*(validate(tenant_id) for tenant_id in tenant_ids))
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.finished_at = datetime.utcnow()
+        self.state = "done"
+        counts = self._counts()
+        logger.info(
+            f"Weaviate-Klassen validiert: {self.total} Tenants in {self.duration_ms:.0f} ms, "
+            f"{counts['created']} angelegt, {counts['failed']} fehlgeschlagen"
+        )
+
+    def _counts(self) -> Dict[str, int]:
+        counts = {"valid": 0, "created": 0, "failed": 0}
+        for status, _ in list(self._results.values()):
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Gibt Zustand und Fortschritt der Validierung zurück."""
+        return {
+            "state": self.state,
+            "total": self.total,
+            "processed": self.processed,
+            "progress": round(self.processed / self.total, 4) if self.total else (1.0 if self.state == "done" else 0.0),
+            **self._counts(),
+            "lazy_checks": self.lazy_checks,
+            "concurrency": self.concurrency,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": self.duration_ms
+        }
+
+
+# Singleton-Instanz
+schema_validator = TenantSchemaValidator(
+    concurrency=settings.WEAVIATE_VALIDATION_CONCURRENCY,
+    retry_seconds=settings.WEAVIATE_VALIDATION_RETRY_SECONDS
+)
@@ -7,11 +7,16 @@ import json
 from typing import Dict, Any, Optional, List, Tuple
 import weaviate
 from ...core.config import settings
+from .circuit_breaker import WeaviateUnavailableError, weaviate_breaker
 from .client import get_client
 from .schema_manager import SchemaManager
+from .schema_validator import schema_validator
 
 # Konstanten für strukturierte Daten
 STRUCTURED_DATA_PREFIX = "StructuredData"
+# Quelle älterer Kopien von Veranstaltungen in der Tenant-Klasse; sie tragen kein
+# Datum und werden übersprungen (Veranstaltungen sucht search_structured_data mit Datumsfilter)
+STRUCTURED_EVENT_SOURCE = "Structured Data (event)"
 
 # Suchkonfiguration
 SEARCH_CONFIG = {
@@ -24,31 +29,39 @@ class SearchManager:
     """Manager für die Suche in Weaviate."""
     
     @staticmethod
-    def _get_tenant_classes(tenant_id: str) -> List[str]:
+    def _get_client() -> Any:
+        """
+        Gibt den Weaviate-Client zurück; Verbindungsaufbau und fehlender Client
+        zählen für den Circuit Breaker als Fehler.
+
+        :raises WeaviateUnavailableError: Wenn keine Verbindung besteht oder der Circuit Breaker offen ist
+        """
+        with weaviate_breaker.guard(track_latency=False):
+            client = get_client()
+            if client is None:
+                raise ConnectionError("Weaviate-Client ist nicht initialisiert")
+        return client
+
+    @staticmethod
+    def _get_tenant_classes(client: Any, tenant_id: str) -> List[str]:
         """
         Prüft ob Tenant-Klassen existieren, da Weaviate v4 keine direkte Methode zum Auflisten aller Collections bietet
+
+        :raises WeaviateUnavailableError: Wenn die Prüfung fehlschlägt oder der Circuit Breaker offen ist
         """
-        tenant_class = f"Tenant{tenant_id}"
+        # Aktive Collection des Tenants (nach einer Blue/Green-Neuindizierung die neue)
+        tenant_class = SchemaManager.get_tenant_class_name(tenant_id)
         structured_data_class = f"{STRUCTURED_DATA_PREFIX}{tenant_id}"
         
         classes = []
-        client = get_client()
-        
-        try:
-            # Prüfe ob die Tenant-Klasse existiert
-            if SchemaManager.class_exists(tenant_class):
-                classes.append(tenant_class)
-                logging.info(f"Tenant-Klasse {tenant_class} gefunden")
-            
-            # Prüfe ob die StructuredData-Klasse existiert
-            if SchemaManager.class_exists(structured_data_class):
-                classes.append(structured_data_class)
-                logging.info(f"StructuredData-Klasse {structured_data_class} gefunden")
-                
-            return classes
-        except Exception as e:
-            logging.error(f"Fehler beim Abrufen der Tenant-Klassen: {str(e)}")
-            return []
+        for class_name in (tenant_class, structured_data_class):
+            # Ein Fehler hier darf nicht wie "keine Klassen" aussehen, sonst greifen die Fallbacks nicht
+            with weaviate_breaker.guard():
+                exists = client.collections.exists(class_name)
+            if exists:
+                classes.append(class_name)
+                logging.info(f"Klasse {class_name} gefunden")
+        return classes
     
     @staticmethod
     def _get_property_value(properties: Dict[str, Any], field_keys: List[str]) -> str:
@@ -80,9 +93,13 @@ class SearchManager:
     def search(tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Führt eine Hybrid-Suche über alle Klassen eines Tenants durch
+
+        :raises WeaviateUnavailableError: Wenn Weaviate nicht erreichbar oder der Circuit Breaker offen ist
         """
-        client = get_client()
-        tenant_classes = SearchManager._get_tenant_classes(tenant_id)
+        client = SearchManager._get_client()
+        # Klasse beim ersten Zugriff prüfen, falls die Hintergrund-Validierung den Tenant noch nicht erreicht hat
+        schema_validator.ensure_tenant(tenant_id)
+        tenant_classes = SearchManager._get_tenant_classes(client, tenant_id)
         
         if not tenant_classes:
             logging.warning(f"Keine Tenant-Klassen für Tenant {tenant_id} gefunden")
@@ -99,19 +116,22 @@ class SearchManager:
                 
                 # Angepasste Hybrid-Suche für Weaviate v4
                 # properties auflisten, die zurückgegeben werden sollen
-                properties = ["content", "title", "document_id", "chunk_id", "metadata"]
+                properties = ["content", "title", "document_id", "chunk_id", "metadata", "source"]
                 
                 # In v4 wird die Query direkt ausgeführt ohne do()
-                response = collection.query.hybrid(
-                    query=query,
-                    limit=limit,
-                    properties=properties,
-                    include_vector=True
-                )
+                with weaviate_breaker.guard():
+                    response = collection.query.hybrid(
+                        query=query,
+                        limit=limit,
+                        properties=properties,
+                        include_vector=True
+                    )
                 
                 if response.objects:
                     logging.info(f"{len(response.objects)} Ergebnisse in {class_name} gefunden")
                     for obj in response.objects:
+                        if (obj.properties or {}).get("source") == STRUCTURED_EVENT_SOURCE:
+                            continue
                         # Konvertiere die Antwort in das erwartete Format
                         item = {
                             "class": class_name,
@@ -127,6 +147,8 @@ class SearchManager:
             results.sort(key=lambda x: x.get("score", 0), reverse=True)
             return results[:limit]
             
+        except WeaviateUnavailableError:
+            raise
         except Exception as e:
             logging.error(f"Fehler bei der Suche über Tenant {tenant_id}: {str(e)}")
             return [] 
\ No newline at end of file
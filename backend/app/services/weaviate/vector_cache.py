@@ -0,0 +1,258 @@
+"""
+Persistenter Vektor-Cache für clientseitig berechnete Embeddings.
+
+Die Vektoren liegen in einer memory-mapped NumPy-Datei, ein Index ordnet
+jedem Inhalts-Hash die Zeile in dieser Datei zu. Unveränderte Texte müssen
+dadurch bei Reimporten nicht erneut eingebettet werden.
+
+Mehrere Worker-Prozesse teilen sich das Verzeichnis: Schreibende Prozesse
+sperren es über eine Lock-Datei (flock), schreiben die Vektoren und hängen
+erst danach je Eintrag eine Zeile "<hash> <zeile>" an den Index an. Andere
+Prozesse lesen bei unbekannten Hashes nur die seit dem letzten Lesen
+angehängten Zeilen nach.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Sperre
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class VectorCache:
+    """Cache für Embedding-Vektoren, adressiert über einen Inhalts-Hash."""
+
+    VECTORS_FILE = "vectors.npy"
+    INDEX_FILE = "index.log"
+    LOCK_FILE = ".lock"
+    # Index im früheren Format (eine JSON-Datei, bei jedem Schreiben neu geschrieben)
+    LEGACY_INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, initial_capacity: int = 1024):
+        """
+        Initialisiert den Cache und lädt einen vorhandenen Index.
+
+        :param cache_dir: Verzeichnis für Vektor-Datei und Index
+        :param initial_capacity: Anzahl der Zeilen, die beim ersten Anlegen reserviert werden
+        """
+        self.cache_dir = cache_dir
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._vectors_file: Optional[Tuple[int, int, int]] = None
+        self._rows: Dict[str, int] = {}
+        self._count = 0
+        self._dimension: Optional[int] = None
+        # Bis hierhin (Bytes) ist der Index gelesen
+        self._index_offset = 0
+
+        # Statistiken für die Trefferquote
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    @staticmethod
+    def content_hash(text: str, model_name: str) -> str:
+        """Berechnet den Cache-Schlüssel aus Modellname und Text."""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.cache_dir, self.VECTORS_FILE)
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Sperrt das Cache-Verzeichnis prozessübergreifend für Schreibzugriffe."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, self.LOCK_FILE), "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """Lädt Index und Vektor-Datei, falls vorhanden."""
+        try:
+            legacy_path = os.path.join(self.cache_dir, self.LEGACY_INDEX_FILE)
+            if os.path.exists(legacy_path) and not os.path.exists(self._index_path):
+                with self._file_lock():
+                    self._convert_legacy_index(legacy_path)
+            self._refresh()
+            if self._count:
+                logger.info(f"Vektor-Cache geladen: {self._count} Einträge, Dimension {self._dimension}")
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Vektor-Caches, starte mit leerem Cache: {e}")
+            self._rows = {}
+            self._count = 0
+            self._dimension = None
+            self._vectors = None
+            self._vectors_file = None
+            self._index_offset = 0
+
+    def _convert_legacy_index(self, legacy_path: str) -> None:
+        """Überführt einen Index im früheren JSON-Format in das Anhänge-Format."""
+        if os.path.exists(self._index_path):
+            return
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            rows = json.load(f).get("rows", {})
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{content_hash} {row}\n" for content_hash, row in rows.items())
+        os.replace(tmp_path, self._index_path)
+        os.remove(legacy_path)
+
+    def _refresh(self) -> None:
+        """Übernimmt die Einträge, die (auch von anderen Prozessen) seit dem letzten Lesen angehängt wurden."""
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # Nur vollständige Zeilen übernehmen
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        for line in data[:end].decode("utf-8").splitlines():
+            parts = line.split()
+            if len(parts) != 2 or not parts[1].isdigit():
+                continue
+            row = int(parts[1])
+            self._rows[parts[0]] = row
+            self._count = max(self._count, row + 1)
+        self._index_offset += end
+        self._open_vectors()
+
+    def _open_vectors(self) -> None:
+        """Öffnet die Vektor-Datei neu, wenn ein anderer Prozess sie vergrößert (ersetzt) hat."""
+        if not os.path.exists(self._vectors_path):
+            return
+        # Die Datei wächst nur; die Größe erkennt sie daher auch bei wiederverwendeter Inode-Nummer
+        stat = os.stat(self._vectors_path)
+        vectors_file = (stat.st_dev, stat.st_ino, stat.st_size)
+        if self._vectors is not None and vectors_file == self._vectors_file:
+            return
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self._vectors_file = vectors_file
+        self._dimension = int(self._vectors.shape[1])
+
+    def _allocate(self, capacity: int) -> None:
+        """Legt die Vektor-Datei mit der angegebenen Kapazität (neu) an."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._vectors_path + ".tmp"
+        new_vectors = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self._dimension)
+        )
+        if self._vectors is not None and self._count:
+            new_vectors[:self._count] = self._vectors[:self._count]
+        new_vectors.flush()
+        del new_vectors
+        self._vectors = None
+        os.replace(tmp_path, self._vectors_path)
+        self._open_vectors()
+
+    def _ensure_capacity(self, required: int) -> None:
+        """Vergrößert die Vektor-Datei, falls nicht genug Zeilen frei sind."""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(self.initial_capacity, capacity)
+        while new_capacity < required:
+            new_capacity *= 2
+        self._allocate(new_capacity)
+
+    def _append_index(self, lines: List[str]) -> None:
+        """Hängt Einträge an den Index an; erst danach sind die Vektoren für andere Prozesse sichtbar."""
+        data = "".join(lines).encode("utf-8")
+        size = os.path.getsize(self._index_path) if os.path.exists(self._index_path) else 0
+        if size != self._index_offset:
+            # Unvollständige letzte Zeile (z. B. nach einem Absturz) abschließen
+            data = b"\n" + data
+        with open(self._index_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._index_offset = size + len(data)
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Gibt die gecachten Vektoren für die angegebenen Hashes zurück.
+        Nicht gefundene Hashes fehlen im Ergebnis.
+        """
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            if any(content_hash not in self._rows for content_hash in hashes):
+                self._refresh()
+            for content_hash in hashes:
+                row = self._rows.get(content_hash)
+                if row is None or self._vectors is None:
+                    self.misses += 1
+                    continue
+                found[content_hash] = np.array(self._vectors[row])
+                self.hits += 1
+        return found
+
+    def put_many(self, entries: Dict[str, np.ndarray]) -> None:
+        """Speichert neue Vektoren und hängt sie an den Index an."""
+        with self._lock:
+            if all(content_hash in self._rows for content_hash in entries):
+                return
+            with self._file_lock():
+                # Einträge anderer Prozesse übernehmen, damit keine Zeile doppelt vergeben wird
+                self._refresh()
+                new_entries = {h: v for h, v in entries.items() if h not in self._rows}
+                if not new_entries:
+                    return
+
+                if self._dimension is None:
+                    self._dimension = int(len(next(iter(new_entries.values()))))
+
+                self._ensure_capacity(self._count + len(new_entries))
+                lines = []
+                for content_hash, vector in new_entries.items():
+                    if len(vector) != self._dimension:
+                        logger.warning(
+                            f"Vektor mit Dimension {len(vector)} passt nicht zum Cache ({self._dimension}), übersprungen"
+                        )
+                        continue
+                    self._vectors[self._count] = np.asarray(vector, dtype=np.float32)
+                    self._rows[content_hash] = self._count
+                    lines.append(f"{content_hash} {self._count}\n")
+                    self._count += 1
+
+                if lines:
+                    self._vectors.flush()
+                    self._append_index(lines)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Gibt Größe und Trefferquote des Caches zurück."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._count,
+            "dimension": self._dimension,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -14,6 +14,8 @@ from .schema_manager import SchemaManager
 from .client import get_client
 from .document_manager import DocumentManager
 from .health_manager import HealthManager
+from .schema_validator import schema_validator
+from .circuit_breaker import weaviate_breaker
 from app.models.weaviate_status import WeaviateStatus
 
 class WeaviateService:
@@ -25,8 +27,10 @@ class WeaviateService:
     """
     
     def __init__(self):
-        """Initialisiert den WeaviateService und erstellt das Standard-Schema."""
-        self.initialize_schema()
+        """
+        Initialisiert den WeaviateService. Das Standard-Schema wird nicht hier,
+        sondern von der Start-Validierung im Hintergrund angelegt (siehe app.main).
+        """
         
     def initialize_schema(self):
         """Erstellt das Standard-Schema, falls es nicht existiert."""
@@ -34,10 +38,14 @@ class WeaviateService:
     
     def create_tenant_schema(self, tenant_id: str) -> bool:
         """Erstellt ein Schema für einen Tenant."""
-        return SchemaManager.create_tenant_schema(tenant_id)
+        created = SchemaManager.create_tenant_schema(tenant_id)
+        if created:
+            schema_validator.mark_valid(tenant_id)
+        return created
     
     def delete_tenant_schema(self, tenant_id: str) -> bool:
         """Löscht das Schema für einen Tenant."""
+        schema_validator.forget(tenant_id)
         return SchemaManager.delete_tenant_schema(tenant_id)
     
     def tenant_class_exists(self, tenant_id: str) -> bool:
@@ -55,6 +63,7 @@ class WeaviateService:
         source: Optional[str] = None
     ) -> Optional[str]:
         """Fügt ein Dokument zu einem Tenant hinzu."""
+        schema_validator.ensure_tenant(tenant_id)
         return DocumentManager.add_document(
             tenant_id=tenant_id,
             title=title,
@@ -64,6 +73,21 @@ class WeaviateService:
             source=source
         )
     
+    def add_documents(
+        self,
+        tenant_id: str,
+        documents: List[Dict[str, Any]],
+        collection_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fügt mehrere Dokumente in einem Batch zu einem Tenant hinzu (optional in eine bestimmte Collection)."""
+        if collection_name is None:
+            schema_validator.ensure_tenant(tenant_id)
+        return DocumentManager.add_documents(tenant_id, documents, collection_name=collection_name)
+    
+    def delete_documents(self, tenant_id: str, document_ids: List[str]) -> int:
+        """Löscht mehrere Dokumente eines Tenants."""
+        return DocumentManager.delete_documents(tenant_id, document_ids)
+    
     def get_documents(self, tenant_id: str, document_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Holt Dokumente für einen Tenant."""
         return DocumentManager.get_documents(tenant_id, document_id)
@@ -81,7 +105,7 @@ class WeaviateService:
         return DocumentManager.update_document(tenant_id, document_id, properties)
     
     def search(self, tenant_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Führt eine Suche für einen Tenant durch."""
+        """Führt eine Suche für einen Tenant durch (prüft die Tenant-Klasse beim ersten Zugriff)."""
         return SearchManager.search(tenant_id, query, limit)
     
     def validate_tenant_class(self, tenant_id: str) -> bool:
@@ -101,9 +125,20 @@ class WeaviateService:
         return HealthManager.reindex_all_documents(tenant_id, documents)
         
     def get_weaviate_status(self) -> Dict[str, Any]:
-        """Prüft den Status der Weaviate-Verbindung"""
+        """Prüft den Status der Weaviate-Verbindung (inklusive Zustand des Circuit Breakers)"""
+        status = {"connected": False, "circuit_breaker": weaviate_breaker.get_stats()}
+        
+        # Bei offenem Circuit nicht auf Timeouts warten
+        if status["circuit_breaker"]["state"] == "open":
+            status["error"] = "Circuit Breaker offen, Weaviate-Aufrufe werden abgewiesen"
+            return status
+        
         client = get_client()
-        status = {"connected": False}
+
+        # Trefferquote des Vektor-Caches bei clientseitigen Embeddings
+        if settings.CLIENT_SIDE_EMBEDDING:
+            from .embedding_manager import embedding_manager
+            status["embedding_cache"] = embedding_manager.get_stats()
         
         try:
             meta = client.get_meta()
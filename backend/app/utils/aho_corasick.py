@@ -0,0 +1,93 @@
+"""
+Aho-Corasick-Automat für die gleichzeitige Suche vieler Muster in einem Text.
+
+Der Automat wird einmal aus allen Mustern gebaut; eine Suche liest den Text
+danach genau einmal, unabhängig von der Anzahl der Muster. Gegenüber einer
+Schleife mit `muster in text` für jedes Muster ist das bei vielen Mustern
+(z. B. tausenden Kontaktnamen) um Größenordnungen schneller.
+"""
+
+from collections import deque
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """
+    Sucht alle Vorkommen der hinzugefügten Muster in einem Text.
+
+    Beispiel:
+        automaton = AhoCorasick()
+        automaton.add("bürgeramt", "kontakt-1")
+        automaton.build()
+        for end, pattern, value in automaton.iter("das bürgeramt mitte"):
+            ...
+    """
+
+    def __init__(self):
+        # Zustand -> {Zeichen: Folgezustand}; Zustand 0 ist die Wurzel
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Muster, die in einem Zustand enden (inkl. der über Fail-Links erreichbaren)
+        self._output: List[List[Tuple[str, T]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: T) -> None:
+        """Fügt ein Muster hinzu; gleiche Muster können mehrere Werte haben."""
+        if not pattern:
+            return
+        if self._built:
+            raise RuntimeError("Der Automat ist bereits gebaut")
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((pattern, value))
+
+    def build(self) -> None:
+        """Berechnet die Fail-Links (Breitensuche über den Trie)."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                target = target if target != next_state else 0
+                self._fail[next_state] = target
+                if self._output[target]:
+                    self._output[next_state] = self._output[next_state] + self._output[target]
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str, T]]:
+        """
+        Liefert alle Treffer als (Endposition exklusiv, Muster, Wert), auch
+        überlappende.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for pattern, value in output[state]:
+                    yield index + 1, pattern, value
+
+    def __len__(self) -> int:
+        """Anzahl der Zustände (Größe des Tries)."""
+        return len(self._goto)
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
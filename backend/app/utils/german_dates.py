@@ -0,0 +1,267 @@
+"""
+Erkennung deutscher Datumsangaben.
+
+- parse_event_dates: normalisiert die Freitext-Felder "date" und "time" von
+  Veranstaltungen ("24. März 2025", "01.08.2025", "24.–26.03.", "18:00 Uhr")
+  zu Beginn und Ende als Zeitpunkte mit Zeitzone.
+- parse_date_range: erkennt relative und absolute Zeitangaben in Fragen
+  ("heute", "morgen", "am Wochenende", "nächste Woche", "am Samstag",
+  "im April", "am 24. März") und gibt den gemeinten Zeitraum zurück.
+
+Zeiträume sind halboffen: start <= t < end.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import List, Optional, Tuple
+
+MONTHS = {
+    "januar": 1, "jan": 1, "jänner": 1,
+    "februar": 2, "feb": 2,
+    "märz": 3, "maerz": 3, "mär": 3, "mrz": 3,
+    "april": 4, "apr": 4,
+    "mai": 5,
+    "juni": 6, "jun": 6,
+    "juli": 7, "jul": 7,
+    "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9,
+    "oktober": 10, "okt": 10,
+    "november": 11, "nov": 11,
+    "dezember": 12, "dez": 12,
+}
+
+WEEKDAYS = {
+    "montag": 0, "dienstag": 1, "mittwoch": 2, "donnerstag": 3,
+    "freitag": 4, "samstag": 5, "sonnabend": 5, "sonntag": 6,
+}
+
+NUMBER_WORDS = {
+    "zwei": 2, "drei": 3, "vier": 4, "fünf": 5, "sechs": 6, "sieben": 7,
+    "acht": 8, "neun": 9, "zehn": 10, "vierzehn": 14,
+}
+
+# Datumsangaben ohne Jahr, die mehr als so viele Tage zurückliegen, gehören ins nächste Jahr
+PAST_YEAR_TOLERANCE_DAYS = 60
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY_NAMES = "|".join(WEEKDAYS)
+
+# "24.03.2025", "24.3.", "24. März 2025", "24 März"; optional mit vorangestelltem Starttag ("24.–26.")
+_DATE = re.compile(
+    r"(?<![\d.])(?:(?P<from_day>\d{1,2})\.?\s*(?:-|–|bis)\s*)?"
+    r"(?P<day>\d{1,2})\.\s*(?:(?P<month>\d{1,2})\.(?P<year>\d{4}|\d{2}(?!\d))?"
+    r"|(?P<month_name>" + _MONTH_NAMES + r")\b\.?(?:\s+(?P<year2>\d{4}))?)"
+    r"|(?<![\d.])(?P<day3>\d{1,2})\s+(?P<month_name3>" + _MONTH_NAMES + r")\b\.?(?:\s+(?P<year3>\d{4}))?",
+    re.IGNORECASE
+)
+_TIME = re.compile(r"(?<!\d)(\d{1,2})[:.](\d{2})(?!\d)")
+# Im Datumsfeld nur Uhrzeiten mit Doppelpunkt, damit "01.08.2025" nicht als 01:08 Uhr gilt
+_CLOCK = re.compile(r"(?<!\d)(\d{1,2}):(\d{2})(?!\d)")
+
+
+class DateRange:
+    """Zeitraum [start, end) mit der erkannten Textstelle."""
+
+    __slots__ = ("start", "end", "expression")
+
+    def __init__(self, start: datetime, end: datetime, expression: str = ""):
+        self.start = start
+        self.end = end
+        self.expression = expression
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DateRange) and (self.start, self.end) == (other.start, other.end)
+
+    def __repr__(self) -> str:
+        return f"DateRange({self.start.isoformat()}, {self.end.isoformat()}, {self.expression!r})"
+
+
+def _infer_year(month: int, day: int, today: date) -> int:
+    """Jahr einer Datumsangabe ohne Jahr: dieses Jahr, außer das Datum liegt deutlich zurück."""
+    try:
+        candidate = date(today.year, month, day)
+    except ValueError:
+        return today.year + 1
+    if (today - candidate).days > PAST_YEAR_TOLERANCE_DAYS:
+        return today.year + 1
+    return today.year
+
+
+def _find_dates(text: str, today: date) -> List[Tuple[Tuple[int, int], date, Optional[date]]]:
+    """
+    Findet Datumsangaben im Text.
+
+    :return: Liste aus ((Anfang, Ende) der Textstelle, Datum, ggf. Starttag eines Bereichs "24.–26.03.")
+    """
+    found = []
+    for match in _DATE.finditer(text):
+        groups = match.groupdict()
+        if groups["day3"]:
+            day, month_text, year_text = groups["day3"], groups["month_name3"], groups["year3"]
+        else:
+            day, month_text = groups["day"], groups["month"] or groups["month_name"]
+            year_text = groups["year"] or groups["year2"]
+        month = int(month_text) if month_text.isdigit() else MONTHS[month_text.lower().rstrip(".")]
+        day = int(day)
+        if year_text:
+            year = int(year_text)
+            if year < 100:
+                year += 2000
+        else:
+            year = _infer_year(month, day, today)
+        try:
+            value = date(year, month, day)
+        except ValueError:
+            continue
+        range_start = None
+        if groups["from_day"]:
+            try:
+                range_start = date(year, month, int(groups["from_day"]))
+            except ValueError:
+                range_start = None
+            if range_start is not None and range_start > value:
+                range_start = None
+        found.append((match.span(), value, range_start))
+    return found
+
+
+def _parse_times(text: str, pattern: "re.Pattern" = _TIME) -> List[time]:
+    """Gültige Uhrzeiten im Text ("18:00 Uhr", "9.30"); ungültige wie "27:05" werden übergangen."""
+    times = []
+    for hour, minute in pattern.findall(text or ""):
+        if int(hour) < 24 and int(minute) < 60:
+            times.append(time(int(hour), int(minute)))
+    return times
+
+
+def parse_event_dates(
+    date_text: Optional[str],
+    time_text: Optional[str] = None,
+    tz: Optional[tzinfo] = None,
+    today: Optional[date] = None
+) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Normalisiert Datum und Uhrzeit einer Veranstaltung.
+
+    Ohne Uhrzeit beginnt die Veranstaltung um 0 Uhr; ohne Endzeit endet sie
+    mit dem letzten Tag (Ende exklusiv, also 0 Uhr des Folgetags).
+
+    :return: (Beginn, Ende) oder None, wenn kein Datum erkannt wurde
+    """
+    if not date_text:
+        return None
+    today = today or datetime.now(tz).date()
+    dates = _find_dates(date_text, today)
+    if not dates:
+        return None
+    first_day = dates[0][2] or dates[0][1]
+    last_day = max(value for _, value, _ in dates)
+    times = _parse_times(time_text) or _parse_times(date_text, _CLOCK)
+
+    start = datetime.combine(first_day, times[0] if times else time(0), tzinfo=tz)
+    if len(times) > 1 and times[-1] > times[0]:
+        end = datetime.combine(last_day, times[-1], tzinfo=tz)
+    else:
+        end = datetime.combine(last_day + timedelta(days=1), time(0), tzinfo=tz)
+    if end <= start:
+        end = start + timedelta(hours=1)
+    return start, end
+
+
+def _day_range(first: date, last: date, tz: Optional[tzinfo], expression: str) -> DateRange:
+    return DateRange(
+        datetime.combine(first, time(0), tzinfo=tz),
+        datetime.combine(last + timedelta(days=1), time(0), tzinfo=tz),
+        expression
+    )
+
+
+def _month_range(year: int, month: int, tz: Optional[tzinfo], expression: str) -> DateRange:
+    first = date(year, month, 1)
+    following = date(year + (month == 12), month % 12 + 1, 1)
+    return _day_range(first, following - timedelta(days=1), tz, expression)
+
+
+def parse_date_range(text: str, now: datetime) -> Optional[DateRange]:
+    """
+    Erkennt die Zeitangabe einer Frage und gibt den gemeinten Zeitraum zurück
+    (in der Zeitzone von `now`). Vergangene Anteile werden nicht abgeschnitten;
+    das übernimmt der Aufrufer.
+
+    :return: Zeitraum oder None, wenn die Frage keine Zeitangabe enthält
+    """
+    if not text:
+        return None
+    lowered = text.lower()
+    tz = now.tzinfo
+    today = now.date()
+
+    match = re.search(r"\bübermorgen\b", lowered)
+    if match:
+        return _day_range(today + timedelta(days=2), today + timedelta(days=2), tz, match.group(0))
+    match = re.search(r"\bheute\b(?:\s+(?:abend|morgen|nachmittag|mittag))?", lowered)
+    if match:
+        return _day_range(today, today, tz, match.group(0))
+    match = re.search(r"(?<!guten )\bmorgen\b(?:\s+(?:früh|abend|nachmittag|mittag))?", lowered)
+    if match:
+        return _day_range(today + timedelta(days=1), today + timedelta(days=1), tz, match.group(0))
+
+    match = re.search(r"\b(nächste[ns]?|kommende[ns]?)\s+wochenende\b", lowered)
+    if match:
+        # Unter der Woche das kommende, am Wochenende das folgende Wochenende
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7 or 7)
+        return _day_range(saturday, saturday + timedelta(days=1), tz, match.group(0))
+    match = re.search(r"\b(?:(?:am|an diesem|dieses|diesem|das|übers|über das)\s+)?wochenende\b", lowered)
+    if match:
+        if today.weekday() >= 5:
+            saturday = today - timedelta(days=today.weekday() - 5)
+        else:
+            saturday = today + timedelta(days=5 - today.weekday())
+        return _day_range(saturday, saturday + timedelta(days=1), tz, match.group(0))
+
+    monday = today - timedelta(days=today.weekday())
+    match = re.search(r"\b(?:in der\s+)?(nächste[nr]?|kommende[nr]?)\s+woche\b", lowered)
+    if match:
+        return _day_range(monday + timedelta(days=7), monday + timedelta(days=13), tz, match.group(0))
+    match = re.search(r"\b(?:in\s+)?(diese[rn]?)\s+woche\b", lowered)
+    if match:
+        return _day_range(today, monday + timedelta(days=6), tz, match.group(0))
+
+    match = re.search(r"\b(?:in den\s+)?(?:nächsten|kommenden)\s+(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")\s+tage[n]?\b", lowered)
+    if match:
+        count = match.group(1)
+        days = int(count) if count.isdigit() else NUMBER_WORDS[count]
+        return _day_range(today, today + timedelta(days=max(days, 1) - 1), tz, match.group(0))
+
+    match = re.search(r"\b(nächste[nr]?|kommende[nr]?)\s+monat\b", lowered)
+    if match:
+        return _month_range(today.year + (today.month == 12), today.month % 12 + 1, tz, match.group(0))
+    match = re.search(r"\b(?:in\s+)?(diese[nmr]?)\s+monat\b", lowered)
+    if match:
+        month = _month_range(today.year, today.month, tz, match.group(0))
+        return DateRange(datetime.combine(today, time(0), tzinfo=tz), month.end, month.expression)
+
+    # Absolute Angaben: "am 24. März", "vom 1. bis 5. April", "24.03."
+    dates = _find_dates(text, today)
+    if dates:
+        first = dates[0][2] or dates[0][1]
+        last = max(value for _, value, _ in dates)
+        expression = text[dates[0][0][0]:dates[-1][0][1]]
+        return _day_range(first, last, tz, expression)
+
+    match = re.search(r"\b(?:(nächsten|kommenden|diesen)\s+|am\s+)?(" + _WEEKDAY_NAMES + r")\b", lowered)
+    if match:
+        weekday = WEEKDAYS[match.group(2)]
+        days_ahead = (weekday - today.weekday()) % 7
+        if days_ahead == 0 and match.group(1) in ("nächsten", "kommenden"):
+            days_ahead = 7
+        day = today + timedelta(days=days_ahead)
+        return _day_range(day, day, tz, match.group(0))
+
+    match = re.search(r"\b(?:im|ende|anfang|mitte)\s+(" + _MONTH_NAMES + r")\b", lowered)
+    if match:
+        month = MONTHS[match.group(1)]
+        year = today.year + (month < today.month)
+        return _month_range(year, month, tz, match.group(0))
+
+    return None
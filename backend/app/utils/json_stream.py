@@ -0,0 +1,194 @@
+"""
+Inkrementeller Parser für JSON-Arrays und NDJSON.
+
+Der Parser bekommt die Eingabe stückweise und liefert jedes vollständig
+gelesene Objekt sofort zurück. Im Speicher liegt höchstens das aktuell
+unvollständige Objekt, unabhängig von der Gesamtgröße der Eingabe.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, List, Optional
+
+# Maximale Größe eines einzelnen, noch unvollständigen Werts (Zeichen)
+DEFAULT_MAX_VALUE_SIZE = 16 * 1024 * 1024
+
+# Zeichen, die außerhalb von Strings die Verschachtelung bestimmen
+_STRUCTURE = re.compile(r'["{}\[\]]')
+# Zeichen, die innerhalb eines Strings relevant sind
+_STRING_SPECIAL = re.compile(r'["\\]')
+# Ende eines einfachen Werts (Zahl, true, false, null)
+_SCALAR_END = re.compile(r'[\s,\[\]{}"]')
+
+
+class JSONStreamParser:
+    """
+    Zerlegt einen Datenstrom in einzelne JSON-Werte.
+
+    Unterstützte Formate:
+    - ein JSON-Array von Objekten: ``[{...}, {...}]``
+    - NDJSON bzw. aneinandergereihte Objekte: ``{...}\\n{...}``
+
+    Ein unvollständiger Wert wird nur einmal durchsucht: Der Parser merkt sich
+    Verschachtelungstiefe und String-Zustand zwischen den Blöcken und dekodiert
+    den Wert erst, wenn er vollständig ist.
+    """
+
+    def __init__(self, max_value_size: int = DEFAULT_MAX_VALUE_SIZE):
+        self.max_value_size = max_value_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._mode: Optional[str] = None  # "array" oder "ndjson"
+        self._finished = False
+        self._expect_separator = False
+        self._after_comma = False
+
+        # Zustand des aktuell unvollständigen Werts
+        self._value_kind: Optional[str] = None  # "nested" oder "scalar"
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Verarbeitet einen weiteren Block der Eingabe und gibt die fertigen Werte zurück."""
+        return self._process(self._utf8.decode(data))
+
+    def close(self) -> List[Any]:
+        """
+        Schließt die Eingabe ab und gibt verbleibende Werte zurück.
+
+        :raises ValueError: wenn die Eingabe unvollständig oder ungültig ist
+        """
+        values = self._process(self._utf8.decode(b"", final=True))
+        if self._value_kind == "scalar":
+            values.append(self._complete(""))
+        elif self._value_kind is not None:
+            raise ValueError("Unvollständiges oder ungültiges JSON am Ende der Eingabe")
+        if self._mode == "array" and not self._finished:
+            raise ValueError("JSON-Array wurde nicht abgeschlossen")
+        return values
+
+    def _process(self, text: str) -> List[Any]:
+        values: List[Any] = []
+        pos = 0
+
+        while True:
+            if self._value_kind is not None:
+                end = self._scan(text, pos)
+                if end is None:
+                    self._pending.append(text[pos:])
+                    self._pending_size += len(text) - pos
+                    if self._pending_size > self.max_value_size:
+                        raise ValueError(
+                            f"Einzelner JSON-Wert überschreitet die maximale Größe von {self.max_value_size} Zeichen"
+                        )
+                    break
+                values.append(self._complete(text[pos:end]))
+                pos = end
+                continue
+
+            pos = self._skip_whitespace(text, pos)
+            if pos >= len(text):
+                break
+
+            if self._mode is None:
+                if text.startswith("\ufeff", pos):
+                    pos += 1
+                    continue
+                if text[pos] == "[":
+                    self._mode = "array"
+                    pos += 1
+                    continue
+                self._mode = "ndjson"
+
+            if self._finished:
+                raise ValueError("Unerwartete Daten nach dem Ende des JSON-Arrays")
+
+            char = text[pos]
+            if self._mode == "array":
+                if char == "]":
+                    if self._after_comma:
+                        raise ValueError("Nach einem Komma wird ein weiterer Wert erwartet, gefunden: ']'")
+                    self._finished = True
+                    pos += 1
+                    continue
+                if self._expect_separator:
+                    if char != ",":
+                        raise ValueError(f"Komma oder ']' erwartet, gefunden: {char!r}")
+                    self._expect_separator = False
+                    self._after_comma = True
+                    pos += 1
+                    continue
+            if char in ",]}":
+                raise ValueError(f"JSON-Wert erwartet, gefunden: {char!r}")
+
+            self._after_comma = False
+            self._value_kind = "nested" if char in '{["' else "scalar"
+
+        return values
+
+    def _scan(self, text: str, pos: int) -> Optional[int]:
+        """
+        Sucht ab pos das Ende des aktuellen Werts.
+
+        :return: Position hinter dem Wert oder None, wenn er in diesem Block nicht endet
+        """
+        if self._value_kind == "scalar":
+            match = _SCALAR_END.search(text, pos)
+            return match.start() if match else None
+
+        while True:
+            if self._in_string:
+                if self._escape:
+                    if pos >= len(text):
+                        return None
+                    self._escape = False
+                    pos += 1
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    return None
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return pos
+                continue
+
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                return None
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos
+
+    def _complete(self, tail: str) -> Any:
+        """Dekodiert den nun vollständigen Wert und setzt den Zustand zurück."""
+        self._pending.append(tail)
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._value_kind = None
+        self._depth = 0
+        if self._mode == "array":
+            self._expect_separator = True
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ungültiger JSON-Wert: {e}") from e
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        return pos
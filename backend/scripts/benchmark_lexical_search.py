@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: lexikalische Suchverfahren vs. Hybrid-Suche in Weaviate.
+
+Baut den lexikalischen Index eines Tenants aus Postgres auf und führt dieselben
+Fragen gegen alle Verfahren aus:
+
+- "lexical": LexicalIndexService.search (BM25, im Prozess)
+- "fulltext": FullTextSearchService.search (PostgreSQL tsvector/ts_rank_cd, nur mit PostgreSQL)
+- "hybrid": SearchManager.search (Weaviate, Vektor + Schlüsselwörter)
+
+Gemessen werden die Latenz pro Frage (p50/p95/max), der Anteil der Fragen,
+die die erste Stufe (LEXICAL_FIRST_STAGE) ohne Weaviate beantworten würde,
+und der Recall gegenüber der Hybrid-Suche (Anteil der Hybrid-Top-k, die das
+Verfahren ebenfalls unter seinen Top-k findet).
+
+Ohne --query werden die häufigsten Fragen des Tenants aus der
+Chat-Auswertung (chat_query_rollups) verwendet.
+
+Beispiel:
+    python scripts/benchmark_lexical_search.py --tenant <tenant-id> --top 50 --repeat 20
+    python scripts/benchmark_lexical_search.py --tenant <tenant-id> --query "Bürgeramt" --skip-hybrid --skip-fulltext
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Pfad zum Backend-Verzeichnis hinzufügen, um Importe zu ermöglichen
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+
+def load_top_queries(tenant_id: str, limit: int) -> list:
+    """Liest die häufigsten Fragen des Tenants aus der Chat-Auswertung."""
+    from sqlalchemy import func
+
+    from app.db.models import ChatQueryRollupModel
+    from app.db.session import session_scope
+
+    with session_scope() as db:
+        rows = db.query(
+            ChatQueryRollupModel.query, func.sum(ChatQueryRollupModel.count).label("total")
+        ).filter(
+            ChatQueryRollupModel.tenant_id == tenant_id
+        ).group_by(ChatQueryRollupModel.query).order_by(func.sum(ChatQueryRollupModel.count).desc()).limit(limit).all()
+    return [row.query for row in rows]
+
+
+def document_ids(results: list) -> list:
+    """Dokument-IDs der Treffer (Weaviate-UUIDs entsprechen den Dokument-IDs)."""
+    ids = []
+    for result in results:
+        properties = result.get("properties") or {}
+        ids.append(str(properties.get("document_id") or result.get("id")))
+    return ids
+
+
+def time_queries(search, queries: list, repeat: int) -> tuple:
+    """Führt jede Frage `repeat`-mal aus; gibt Latenzen (ms) und die Treffer des letzten Durchlaufs zurück."""
+    latencies, results = [], {}
+    for query in queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[query] = search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, results
+
+
+def recall_against(reference: dict, results: dict) -> list:
+    """Anteil der Referenz-Treffer pro Frage, die auch in `results` enthalten sind."""
+    recalls = []
+    for query, reference_results in reference.items():
+        reference_ids = set(document_ids(reference_results))
+        if reference_ids:
+            found = set(document_ids(results.get(query, [])))
+            recalls.append(len(reference_ids & found) / len(reference_ids))
+    return recalls
+
+
+def summarize(name: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<10} {statistics.median(latencies):>12.3f} {p95:>12.3f} {latencies[-1]:>12.3f} {len(latencies):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lexikalische Suche vs. Hybrid-Suche")
+    parser.add_argument("--tenant", required=True, help="Tenant-ID")
+    parser.add_argument("--query", action="append", help="Frage (mehrfach möglich)")
+    parser.add_argument("--top", type=int, default=30, help="Anzahl häufigster Fragen ohne --query")
+    parser.add_argument("--limit", type=int, default=5, help="Treffer pro Suche (k)")
+    parser.add_argument("--repeat", type=int, default=10, help="Wiederholungen pro Frage (lexikalisch und Volltext)")
+    parser.add_argument("--skip-hybrid", action="store_true", help="Weaviate nicht abfragen")
+    parser.add_argument("--skip-fulltext", action="store_true", help="PostgreSQL-Volltextsuche nicht messen")
+    parser.add_argument("--structured", action="store_true", help="Strukturierte Daten aus Weaviate mit indizieren")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.fulltext_search import fulltext_search_service
+    from app.services.lexical_index import LexicalIndexService
+    from app.services.weaviate.search_manager import SearchManager
+
+    queries = args.query or load_top_queries(args.tenant, args.top)
+    if not queries:
+        print("Keine Fragen gefunden (--query angeben oder Chat-Auswertung befüllen)")
+        sys.exit(1)
+
+    service = LexicalIndexService(include_structured=args.structured)
+    started = time.perf_counter()
+    index = service.get_index(args.tenant)
+    build_ms = (time.perf_counter() - started) * 1000
+    stats = index.get_stats()
+    print(f"Index aufgebaut: {stats['documents']} Dokumente, {stats['terms']} Terme in {build_ms:.0f} ms")
+    print(f"Fragen: {len(queries)}, k = {args.limit}\n")
+
+    print(f"{'Verfahren':<10} {'p50 (ms)':>12} {'p95 (ms)':>12} {'max (ms)':>12} {'Aufrufe':>8}")
+    lexical_latencies, lexical_results = time_queries(
+        lambda query: service.search(args.tenant, query, args.limit), queries, args.repeat
+    )
+    summarize("lexical", lexical_latencies)
+
+    first_stage = sum(
+        1 for query in queries
+        if service.first_stage(
+            args.tenant, query, args.limit,
+            max_terms=settings.LEXICAL_FIRST_STAGE_MAX_TERMS,
+            min_coverage=settings.LEXICAL_FIRST_STAGE_MIN_COVERAGE
+        )
+    )
+
+    results = {"lexical": lexical_results}
+    if not args.skip_fulltext:
+        if fulltext_search_service.available:
+            fulltext_latencies, results["fulltext"] = time_queries(
+                lambda query: fulltext_search_service.search(args.tenant, query, args.limit), queries, args.repeat
+            )
+            summarize("fulltext", fulltext_latencies)
+        else:
+            print("fulltext   (übersprungen: benötigt PostgreSQL)")
+
+    if not args.skip_hybrid:
+        hybrid_latencies, hybrid_results = time_queries(
+            lambda query: SearchManager.search(args.tenant, query, limit=args.limit), queries, 1
+        )
+        summarize("hybrid", hybrid_latencies)
+        print(f"\nRecall@{args.limit} gegenüber der Hybrid-Suche (Anteil der Hybrid-Treffer, die auch gefunden werden):")
+        for name, method_results in results.items():
+            recalls = recall_against(hybrid_results, method_results)
+            if recalls:
+                print(f"  {name:<10} {statistics.mean(recalls):.1%}")
+
+    print(f"Erste Stufe (LEXICAL_FIRST_STAGE) würde {first_stage} von {len(queries)} Fragen ohne Weaviate beantworten")
+
+
+if __name__ == "__main__":
+    main()
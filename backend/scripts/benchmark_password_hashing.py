@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Passwort-Prüfung beim Login.
+
+Misst den Login-Durchsatz und die Verzögerung des Event-Loops, während
+mehrere Logins gleichzeitig geprüft werden:
+
+- "inline": bcrypt direkt im Event-Loop (bisheriges Verhalten)
+- "executor": bcrypt im begrenzten Passwort-Thread-Pool (verify_and_update_password)
+
+Die Verzögerung des Event-Loops wird über einen Ticker gemessen, der alle
+10 ms aufwachen möchte; sie entspricht der Zeit, um die z. B. ein
+gleichzeitig laufender Chat-Stream ausgebremst wird.
+
+Beispiel:
+    python scripts/benchmark_password_hashing.py --logins 40 --rounds 12 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Pfad zum Backend-Verzeichnis hinzufügen, um Importe zu ermöglichen
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+# Intervall des Tickers zur Messung der Event-Loop-Verzögerung (Sekunden)
+TICK_INTERVAL = 0.01
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """Misst, wie stark sich geplante Aufwachzeitpunkte verspäten."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started - TICK_INTERVAL))
+
+
+async def run_scenario(mode: str, logins: int, password: str, hashed: str) -> dict:
+    from app.core.security import pwd_context, verify_and_update_password
+
+    async def login_inline():
+        return pwd_context.verify_and_update(password, hashed)
+
+    async def login_executor():
+        return await verify_and_update_password(password, hashed)
+
+    login = login_inline if mode == "inline" else login_executor
+
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+    await asyncio.sleep(TICK_INTERVAL * 5)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    assert all(verified for verified, _ in results), "Passwort-Prüfung fehlgeschlagen"
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "logins": logins,
+        "seconds": elapsed,
+        "logins_per_second": logins / elapsed if elapsed else 0.0,
+        "loop_lag_p50_ms": statistics.median(lags_ms),
+        "loop_lag_p99_ms": lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))],
+        "loop_lag_max_ms": lags_ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für bcrypt-Logins")
+    parser.add_argument("--logins", type=int, default=20, help="Anzahl gleichzeitiger Logins")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt-Work-Factor (BCRYPT_ROUNDS)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Größe des Passwort-Thread-Pools (PASSWORD_HASH_CONCURRENCY)")
+    parser.add_argument("--password", default="benchmark-passwort", help="Zu prüfendes Passwort")
+    args = parser.parse_args()
+
+    # Die Einstellungen werden beim Import gelesen und müssen daher vorher gesetzt sein
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ.setdefault("PASSWORD_HASH_MAX_QUEUE", str(args.logins))
+    if args.concurrency:
+        os.environ["PASSWORD_HASH_CONCURRENCY"] = str(args.concurrency)
+
+    from app.core.config import settings
+    from app.core.security import pwd_context
+
+    hashed = pwd_context.hash(args.password)
+    print(f"bcrypt-Work-Factor: {args.rounds}, Thread-Pool: {settings.PASSWORD_HASH_CONCURRENCY}, "
+          f"gleichzeitige Logins: {args.logins}")
+    print(f"{'Modus':<10} {'Logins/s':>10} {'Dauer (s)':>10} {'Lag p50 (ms)':>13} {'Lag p99 (ms)':>13} {'Lag max (ms)':>13}")
+    for mode in ("inline", "executor"):
+        result = asyncio.run(run_scenario(mode, args.logins, args.password, hashed))
+        print(f"{result['mode']:<10} {result['logins_per_second']:>10.1f} {result['seconds']:>10.2f} "
+              f"{result['loop_lag_p50_ms']:>13.1f} {result['loop_lag_p99_ms']:>13.1f} {result['loop_lag_max_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
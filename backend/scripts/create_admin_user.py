@@ -6,6 +6,7 @@ Verwendung: python create_admin_user.py <username> <email> <password>
 import sys
 import os
 import argparse
+import asyncio
 from sqlalchemy.orm import Session
 
 # Sicherstellen, dass das übergeordnete Verzeichnis im Python-Pfad ist
@@ -32,7 +33,7 @@ def create_admin_user(username: str, email: str, password: str, first_name: str,
             return False
         
         # Benutzer erstellen
-        user = user_service.create_user(
+        user = asyncio.run(user_service.create_user(
             db=db,
             username=username,
             email=email,
@@ -41,7 +42,7 @@ def create_admin_user(username: str, email: str, password: str, first_name: str,
             last_name=last_name,
             role=UserRole.ADMIN,
             is_active=True
-        )
+        ))
         
         print(f"Admin-Benutzer '{username}' wurde erfolgreich erstellt mit ID: {user.id}")
         return True
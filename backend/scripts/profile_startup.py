@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Profil des API-Prozesses für lokale Analysen und die CI.
+
+Importiert app.main in einem frischen Interpreter (`python -X importtime`) und
+gibt aus:
+
+- die Importzeit pro Top-Level-Paket (fastapi, weaviate, sqlalchemy, ...)
+- die langsamsten Module des Projekts (kumulativ, inklusive ihrer Importe)
+
+Der Exit-Code ist 1, wenn eine der verzögert geladenen Abhängigkeiten
+(pandas, scikit-learn, sentence-transformers, openai, numpy) beim Import
+geladen wird oder die gesamte Importzeit das Budget überschreitet.
+
+Beispiel:
+    python scripts/profile_startup.py --budget-ms 4000 --top 15
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Pfad zum Backend-Verzeichnis hinzufügen, um Importe zu ermöglichen
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+from app.core.startup_profiler import LAZY_MODULES, profile_imports, top_level_import_times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Misst die Importzeit von app.main pro Modul")
+    parser.add_argument("--module", default="app.main", help="Zu importierendes Modul")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Maximale gesamte Importzeit in ms")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl der ausgegebenen Einträge")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module, cwd=backend_dir)
+    root = next((e for e in entries if e["module"] == args.module), None)
+    total_ms = root["cumulative_us"] / 1000 if root else 0.0
+    packages = top_level_import_times(entries)
+    project_modules = sorted(
+        (e for e in entries if e["module"].startswith("app.")),
+        key=lambda e: e["cumulative_us"], reverse=True
+    )
+    loaded_lazy = [m for m in LAZY_MODULES if m in packages]
+
+    problems = [f"Verzögert zu ladendes Paket wird beim Import geladen: {m}" for m in loaded_lazy]
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        problems.append(f"Importzeit {total_ms:.0f} ms überschreitet das Budget von {args.budget_ms:.0f} ms")
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "total_ms": round(total_ms, 1),
+            "packages_ms": {name: round(us / 1000, 1) for name, us in list(packages.items())[:args.top]},
+            "modules_ms": {e["module"]: round(e["cumulative_us"] / 1000, 1) for e in project_modules[:args.top]},
+            "problems": problems
+        }, indent=2))
+    else:
+        print(f"Import von {args.module}: {total_ms:.0f} ms")
+        print("\nPakete (Eigenzeit aller Module):")
+        for name, us in list(packages.items())[:args.top]:
+            print(f"  {name:<30} {us / 1000:>8.1f} ms")
+        print("\nProjektmodule (kumulativ):")
+        for entry in project_modules[:args.top]:
+            print(f"  {entry['module']:<50} {entry['cumulative_us'] / 1000:>8.1f} ms")
+        for problem in problems:
+            print(f"\nFEHLER: {problem}")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import sys
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import BackgroundJobModel, DocumentIndexTaskModel, DocumentModel, TenantModel
+from app.schemas.document import BulkDeleteRequest
+from app.services import bulk_delete_service as bulk_delete_module
+from app.services import job_service as job_module
+from app.services.bulk_delete_service import BulkDeleteService
+from app.services.job_service import job_service
+
+
+class TestBulkDeleteFilters(unittest.TestCase):
+    """Tests für die Prüfung der Filter einer Massenlöschung"""
+
+    def test_empty_and_contradictory_filters_are_refused(self):
+        """Ohne Filter würde der ganze Tenant gelöscht; widersprüchliche Filter werden abgelehnt"""
+        invalid = [
+            BulkDeleteRequest(),
+            BulkDeleteRequest(dry_run=True),
+            BulkDeleteRequest(metadata_value="archiv"),
+            BulkDeleteRequest(source="  "),
+            BulkDeleteRequest(created_from=datetime(2024, 5, 1), created_to=datetime(2024, 4, 1)),
+        ]
+        for request in invalid:
+            with self.subTest(request=request.model_dump(exclude_none=True)):
+                with self.assertRaises(ValueError):
+                    BulkDeleteService.build_conditions("tenant-1", request)
+
+        conditions = BulkDeleteService.build_conditions("tenant-1", BulkDeleteRequest(source="import.csv"))
+        # Die Tenant-Bedingung steht immer vorn
+        self.assertEqual(len(conditions), 2)
+        self.assertIn("tenant_id", str(conditions[0]))
+
+
+class TestBulkDeleteJob(unittest.TestCase):
+    """Tests für die Ausführung einer Massenlöschung in Datenbank und Weaviate"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel, DocumentIndexTaskModel, BackgroundJobModel):
+            model.__table__.create(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        self.db = self.Session()
+        for tenant_id in ("tenant-1", "tenant-2"):
+            self.db.add(TenantModel(id=tenant_id, name=tenant_id, api_key=f"key-{tenant_id}"))
+            for i in range(4):
+                self.db.add(DocumentModel(
+                    id=f"{tenant_id}-{i}", tenant_id=tenant_id, title=f"Dokument {i}", content="Inhalt",
+                    source="import.csv" if i < 3 else "upload",
+                    doc_metadata={"kategorie": "archiv" if i % 2 else "aktuell"}
+                ))
+        self.db.commit()
+
+        self.delete_documents = patch.object(
+            bulk_delete_module.weaviate_service, "delete_documents", side_effect=lambda tenant_id, ids: len(ids)
+        ).start()
+        patch.object(bulk_delete_module.cache_bus, "publish").start()
+        patch.object(bulk_delete_module, "SessionLocal", self.Session).start()
+
+        @contextmanager
+        def session_scope():
+            db = self.Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        patch.object(job_module, "session_scope", session_scope).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _remaining(self):
+        self.db.expire_all()
+        return sorted(doc.id for doc in self.db.query(DocumentModel).all())
+
+    def test_only_matching_documents_of_the_tenant_are_deleted(self):
+        """Filter werden kombiniert und nur auf den eigenen Tenant angewandt"""
+        service = BulkDeleteService()
+        request = BulkDeleteRequest(source="import.csv", metadata_key="kategorie", metadata_value="archiv")
+        self.assertEqual(service.count_matching(self.db, "tenant-1", request), 1)
+
+        job_id = service.start_job("tenant-1", request)
+        service.run_job(job_id, "tenant-1", request)
+
+        self.assertEqual(job_service.get_job(job_id)["status"], "completed")
+        self.assertNotIn("tenant-1-1", self._remaining())
+        self.assertEqual(len(self._remaining()), 7)
+        self.delete_documents.assert_called_once_with("tenant-1", ["tenant-1-1"])
+        # In Weaviate gelöscht: keine offene Outbox-Aufgabe
+        self.assertEqual(self.db.query(DocumentIndexTaskModel).count(), 0)
+
+    def test_failed_weaviate_delete_leaves_outbox_tasks(self):
+        """Schlägt Weaviate fehl, bleiben die Lösch-Aufgaben für den Indexer bestehen"""
+        self.delete_documents.side_effect = ConnectionError("Weaviate nicht erreichbar")
+        service = BulkDeleteService()
+        request = BulkDeleteRequest(ids=["tenant-2-0", "tenant-1-0", "tenant-1-3"])
+        job_id = service.start_job("tenant-1", request)
+        service.run_job(job_id, "tenant-1", request)
+
+        self.assertNotIn("tenant-1-0", self._remaining())
+        self.assertIn("tenant-2-0", self._remaining())
+        tasks = self.db.query(DocumentIndexTaskModel).all()
+        self.assertEqual(sorted(task.document_id for task in tasks), ["tenant-1-0", "tenant-1-3"])
+        self.assertTrue(all(task.operation == "delete" for task in tasks))
+        self.assertEqual(job_service.get_job(job_id)["pending_weaviate"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import DocumentIndexTaskModel, DocumentModel, TenantModel
+from app.services.bulk_import_service import BulkImportError, BulkImportService
+
+
+class TestCsvImport(unittest.TestCase):
+    """Tests für den blockweisen CSV-Import"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel, DocumentIndexTaskModel):
+            model.__table__.create(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(TenantModel(id="tenant-1", name="Stadt", api_key="key-1"))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _csv(self, header, rows):
+        return io.BytesIO("\n".join([header] + rows).encode("utf-8"))
+
+    def test_csv_without_metadata_columns(self):
+        """Eine CSV nur mit Titel und Inhalt wird vollständig importiert, mit leeren Metadaten"""
+        rows = [f"Titel {i},Inhalt {i}" for i in range(5)]
+        stats = BulkImportService(chunk_size=2).import_csv(
+            self.db, "tenant-1", self._csv("title,content", rows), "title", "content"
+        )
+        self.assertEqual((stats["imported"], stats["chunks"]), (5, 3))
+        documents = self.db.query(DocumentModel).order_by(DocumentModel.title).all()
+        self.assertEqual([doc.title for doc in documents], [f"Titel {i}" for i in range(5)])
+        self.assertTrue(all(doc.doc_metadata == {} for doc in documents))
+        self.assertEqual(self.db.query(DocumentIndexTaskModel).count(), 5)
+
+    def test_metadata_columns_and_skipped_rows(self):
+        """Weitere Spalten werden Metadaten, leere Zellen ausgelassen, Zeilen ohne Inhalt übersprungen"""
+        stats = BulkImportService().import_csv(
+            self.db, "tenant-1",
+            self._csv("title,content,url,kategorie", ["A,Inhalt A,https://a.example,", "B,,https://b.example,x"]),
+            "title", "content", source_column="url"
+        )
+        self.assertEqual((stats["imported"], stats["skipped"]), (1, 1))
+        document = self.db.query(DocumentModel).one()
+        self.assertEqual((document.source, document.doc_metadata), ("https://a.example", {}))
+
+    def test_abort_reports_rows_already_imported(self):
+        """Bricht der Import ab, bleiben geschriebene Blöcke erhalten und ihre Anzahl wird gemeldet"""
+        service = BulkImportService(chunk_size=2)
+        write_chunk = BulkImportService.write_chunk
+        calls = []
+
+        def failing_write(db, tenant_id, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("Verbindung verloren")
+            write_chunk(db, tenant_id, rows)
+
+        with patch.object(BulkImportService, "write_chunk", side_effect=failing_write):
+            with self.assertRaises(BulkImportError) as context:
+                service.import_csv(
+                    self.db, "tenant-1", self._csv("title,content", [f"T{i},I{i}" for i in range(6)]), "title", "content"
+                )
+        self.assertFalse(context.exception.invalid_input)
+        self.assertEqual(context.exception.stats["imported"], 2)
+        self.assertEqual(self.db.query(DocumentModel).count(), 2)
+
+        with self.assertRaises(BulkImportError) as context:
+            service.import_csv(self.db, "tenant-1", self._csv("name,text", ["a,b"]), "title", "content")
+        self.assertTrue(context.exception.invalid_input)
+
+
+if __name__ == "__main__":
+    unittest.main()
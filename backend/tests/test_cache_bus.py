@@ -0,0 +1,82 @@
+import sys
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import CacheInvalidationEventModel
+from app.services import cache_bus as cache_bus_module
+from app.services.cache_bus import CacheInvalidationBus
+
+
+class TestCacheInvalidationBus(unittest.TestCase):
+    """Tests für den Cache-Invalidierungsbus im Polling-Modus (SQLite)"""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        CacheInvalidationEventModel.__table__.create(self.engine)
+        self._original_engine = cache_bus_module.engine
+        cache_bus_module.engine = self.engine
+
+        # Zwei Busse simulieren zwei Worker-Prozesse
+        self.worker_a = CacheInvalidationBus(mode="poll")
+        self.worker_b = CacheInvalidationBus(mode="poll")
+        self.received = {"a": [], "b": []}
+        self.worker_a.subscribe("tenant", lambda tenant_id, payload: self.received["a"].append((tenant_id, payload)))
+        self.worker_b.subscribe("tenant", lambda tenant_id, payload: self.received["b"].append((tenant_id, payload)))
+
+    def tearDown(self):
+        cache_bus_module.engine = self._original_engine
+        self.engine.dispose()
+
+    def test_event_is_applied_locally_and_by_other_workers(self):
+        """Ein Ereignis wirkt sofort im eigenen Prozess und beim Nachlesen in anderen Workern"""
+        self.worker_a.publish("tenant", "tenant-1", api_keys=["key-1"])
+        self.assertEqual(self.received["a"], [("tenant-1", {"api_keys": ["key-1"]})])
+        self.assertEqual(self.received["b"], [])
+
+        self.assertEqual(self.worker_b.apply_pending_events(), 1)
+        self.assertEqual(self.received["b"], [("tenant-1", {"api_keys": ["key-1"]})])
+
+    def test_own_and_already_applied_events_are_skipped(self):
+        """Eigene Ereignisse werden nicht doppelt, bereits gelesene nicht erneut angewendet"""
+        self.worker_a.publish("tenant", "tenant-1")
+        self.assertEqual(self.worker_a.apply_pending_events(), 0)
+        self.assertEqual(len(self.received["a"]), 1)
+
+        self.worker_b.apply_pending_events()
+        self.assertEqual(self.worker_b.apply_pending_events(), 0)
+        self.assertEqual(len(self.received["b"]), 1)
+
+    def test_event_committed_out_of_id_order_is_not_lost(self):
+        """Ein später committetes Ereignis mit kleinerer ID wird noch angewendet, aber nur einmal"""
+        self.worker_a.publish("tenant", "tenant-1")
+        self.worker_a.publish("tenant", "tenant-2")
+        # Die Transaktion mit der ersten ID ist beim Lesen noch nicht committet
+        with self.engine.begin() as connection:
+            first_id = connection.execute(cache_bus_module.sql_select(
+                cache_bus_module.func.min(CacheInvalidationEventModel.id)
+            )).scalar()
+            late = connection.execute(cache_bus_module.sql_select(CacheInvalidationEventModel).where(
+                CacheInvalidationEventModel.id == first_id
+            )).mappings().one()
+            connection.execute(cache_bus_module.delete(CacheInvalidationEventModel).where(
+                CacheInvalidationEventModel.id == first_id
+            ))
+        self.assertEqual(self.worker_b.apply_pending_events(), 1)
+
+        with self.engine.begin() as connection:
+            connection.execute(cache_bus_module.insert(CacheInvalidationEventModel).values(**late))
+        self.assertEqual(self.worker_b.apply_pending_events(), 1)
+        self.assertEqual(self.worker_b.apply_pending_events(), 0)
+        self.assertEqual(sorted(tenant_id for tenant_id, _ in self.received["b"]), ["tenant-1", "tenant-2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import ChatLogModel, ChatLogRollupModel, ChatQueryRollupModel
+from app.db.session import to_async_database_url
+from app.services import chat_log_service as chat_log_module
+from app.services.chat_analytics_service import approximate_percentile, chat_analytics_service
+from app.services.chat_log_service import ChatLogService
+
+
+class TestChatAnalytics(unittest.TestCase):
+    """Tests für Protokollliste, Rollups und Kennzahlen der Chat-Auswertung"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/test.db"
+        self.engine = create_engine(self.url)
+        for model in (ChatLogModel, ChatLogRollupModel, ChatQueryRollupModel):
+            model.__table__.create(self.engine)
+        patcher = patch.object(chat_log_module, "engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.service = ChatLogService(batch_size=3)
+        chats = [
+            ("Wann hat das Bürgeramt geöffnet?", "Montag bis Freitag von 8 bis 16 Uhr.", 400),
+            ("wann hat das  Bürgeramt geöffnet", "Montag bis Freitag von 8 bis 16 Uhr.", 800),
+            ("Wo kann ich meinen Hund anmelden?", "Zu dieser Frage liegen mir keine Informationen vor.", 1500),
+            ("Gibt es einen Sperrmülltermin?", "Ja, jeden ersten Montag im Monat.", 3000),
+        ]
+        for query, response, latency in chats:
+            self.service.record(
+                tenant_id="tenant-1", query=query, response=response, latency_ms=latency,
+                trace={"retrieval_ms": 100, "llm_ms": latency - 100, "prompt_tokens": 300, "completion_tokens": 40}
+            )
+        self.service.record(tenant_id="tenant-2", query="Hallo", response=None, status="error", error="Timeout")
+        # Zwei Flushes, damit die Rollups per UPSERT fortgeschrieben werden
+        asyncio.run(self.service.flush())
+        self.service.record(tenant_id="tenant-1", query="Wann hat das Bürgeramt geöffnet?",
+                            response="Montag bis Freitag.", latency_ms=600)
+        asyncio.run(self.service.flush())
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _run_async(self, func):
+        async def run():
+            async_engine = create_async_engine(to_async_database_url(self.url))
+            try:
+                async with AsyncSession(async_engine) as db:
+                    return await func(db)
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(run())
+
+    def test_list_logs_keyset_pagination_and_filters(self):
+        """Die Protokollliste wird per Cursor geblättert und nach Text/unbeantwortet gefiltert"""
+        async def fetch(db):
+            first, cursor = await chat_analytics_service.list_logs(db, "tenant-1", limit=3)
+            second, end = await chat_analytics_service.list_logs(db, "tenant-1", limit=3, cursor=cursor)
+            found, _ = await chat_analytics_service.list_logs(db, "tenant-1", q="bürgeramt")
+            unanswered, _ = await chat_analytics_service.list_logs(db, "tenant-1", unanswered=True)
+            return first, cursor, second, end, found, unanswered
+
+        first, cursor, second, end, found, unanswered = self._run_async(fetch)
+        self.assertEqual((len(first), len(second)), (3, 2))
+        self.assertIsNotNone(cursor)
+        self.assertIsNone(end)
+        self.assertFalse({row["id"] for row in first} & {row["id"] for row in second})
+        self.assertEqual(len(found), 3)
+        self.assertEqual([row["query"] for row in unanswered], ["Wo kann ich meinen Hund anmelden?"])
+
+    def test_summary_timeseries_and_top_questions_from_rollups(self):
+        """Kennzahlen, Zeitreihe und häufige Fragen stammen aus den fortgeschriebenen Rollups"""
+        async def fetch(db):
+            summary = await chat_analytics_service.get_summary(db, "tenant-1")
+            overview = await chat_analytics_service.get_tenant_overview(db)
+            series = await chat_analytics_service.get_timeseries(db, "tenant-1", granularity="hour")
+            top = await chat_analytics_service.get_top_questions(db, "tenant-1", limit=2)
+            return summary, overview, series, top
+
+        summary, overview, series, top = self._run_async(fetch)
+        self.assertEqual((summary["requests"], summary["errors"], summary["unanswered"]), (5, 0, 1))
+        self.assertEqual(summary["latency_max_ms"], 3000)
+        self.assertEqual(summary["prompt_tokens"], 1200)
+        self.assertTrue(500 <= summary["latency_p50_ms"] <= 1000)
+
+        self.assertEqual([item["tenant_id"] for item in overview], ["tenant-1", "tenant-2"])
+        self.assertEqual(overview[1]["errors"], 1)
+
+        self.assertEqual(sum(point["requests"] for point in series), 5)
+        self.assertEqual(series[1]["bucket_start"] - series[0]["bucket_start"], timedelta(hours=1))
+
+        self.assertEqual(top[0]["query"], "wann hat das bürgeramt geöffnet")
+        self.assertEqual(top[0]["count"], 3)
+
+    def test_approximate_percentile(self):
+        """Perzentile werden innerhalb der Histogramm-Buckets interpoliert"""
+        histogram = [0, 10, 0, 0, 0, 0, 0]
+        self.assertEqual(approximate_percentile(histogram, 480, 0.5), 375)
+        self.assertEqual(approximate_percentile(histogram, 480, 1.0), 480)
+        self.assertIsNone(approximate_percentile([0] * 7, 0, 0.5))
+
+    def test_invalid_range_is_rejected(self):
+        """Ein Zeitraum mit since nach until wird abgelehnt"""
+        now = datetime.utcnow()
+        with self.assertRaises(ValueError):
+            self._run_async(lambda db: chat_analytics_service.get_summary(db, since=now, until=now - timedelta(hours=1)))
+
+    def test_timestamps_with_time_zone(self):
+        """Zeitpunkte mit "Z" oder Offset (wie vom Frontend gesendet) werden nach UTC umgerechnet"""
+        now = datetime.utcnow()
+        since = datetime.fromisoformat((now - timedelta(hours=1)).isoformat(timespec="seconds") + "Z")
+        # Dieselbe Obergrenze in Mitteleuropäischer Sommerzeit
+        until = datetime.fromisoformat((now + timedelta(hours=3)).isoformat(timespec="seconds") + "+02:00")
+
+        async def fetch(db):
+            summary = await chat_analytics_service.get_summary(db, "tenant-1", since=since, until=until)
+            logs, _ = await chat_analytics_service.list_logs(db, "tenant-1", since=since, until=until)
+            later, _ = await chat_analytics_service.list_logs(
+                db, "tenant-1", since=datetime.fromisoformat((now + timedelta(hours=1)).isoformat() + "+00:00")
+            )
+            return summary, logs, later
+
+        summary, logs, later = self._run_async(fetch)
+        self.assertEqual(summary["requests"], 5)
+        self.assertIsNone(summary["until"].tzinfo)
+        self.assertEqual(len(logs), 5)
+        self.assertEqual(later, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import ChatLogModel, ChatLogRollupModel, ChatQueryRollupModel
+from app.services import chat_log_service as chat_log_module
+from app.services.chat_log_service import ChatLogService
+
+
+class TestChatLogService(unittest.TestCase):
+    """Tests für die gepufferte Chat-Protokollierung"""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        for model in (ChatLogModel, ChatLogRollupModel, ChatQueryRollupModel):
+            model.__table__.create(self.engine)
+        patcher = patch.object(chat_log_module, "engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _count(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(ChatLogModel.__table__)).scalar()
+
+    def test_records_are_buffered_and_flushed_in_batches(self):
+        """record() schreibt nicht sofort; flush() schreibt alle Einträge in Batches"""
+        service = ChatLogService(buffer_size=100, batch_size=4)
+        for i in range(10):
+            service.record(
+                tenant_id="tenant-1",
+                query=f"Frage {i}",
+                response="Antwort",
+                latency_ms=120,
+                trace={"retrieval_ms": 30, "llm_ms": 80, "prompt_tokens": 200, "completion_tokens": 50}
+            )
+        self.assertEqual(self._count(), 0)
+
+        with patch.object(service, "write_batch", wraps=service.write_batch) as write_batch:
+            written = asyncio.run(service.flush())
+
+        self.assertEqual(written, 10)
+        self.assertEqual([len(call.args[0]) for call in write_batch.call_args_list], [4, 4, 2])
+        self.assertEqual(self._count(), 10)
+        with self.engine.connect() as connection:
+            row = connection.execute(select(ChatLogModel.__table__).limit(1)).one()
+        self.assertEqual((row.retrieval_ms, row.llm_ms, row.prompt_tokens), (30, 80, 200))
+        self.assertEqual(service.get_stats()["buffered"], 0)
+
+    def test_full_buffer_drops_oldest_and_failed_batch_is_requeued(self):
+        """Ein voller Puffer verwirft die ältesten Einträge; fehlgeschlagene Batches bleiben erhalten"""
+        service = ChatLogService(buffer_size=3, batch_size=10)
+        for i in range(5):
+            service.record(tenant_id="tenant-1", query=f"Frage {i}", response=None)
+        self.assertEqual(service.dropped_count, 2)
+        self.assertEqual([row["query"] for row in service._buffer], ["Frage 2", "Frage 3", "Frage 4"])
+
+        with patch.object(service, "write_batch", side_effect=RuntimeError("Datenbank nicht erreichbar")):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(service.flush())
+        self.assertEqual(len(service._buffer), 3)
+
+        asyncio.run(service.flush())
+        self.assertEqual(self._count(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.rag_service import RAGService
+from app.services.retrieval_cache import RetrievalCache
+from app.services import rag_service as rag_module
+from app.services.weaviate import search_manager as search_manager_module
+from app.services.weaviate.circuit_breaker import CircuitBreaker, WeaviateUnavailableError
+from app.services.weaviate.search_manager import SearchManager
+
+
+def fail():
+    raise ConnectionError("Weaviate nicht erreichbar")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests für den Circuit Breaker um Weaviate-Aufrufe"""
+
+    def _call(self, breaker, func=None, delay=0.0, track_latency=True):
+        with breaker.guard(track_latency=track_latency):
+            time.sleep(delay)
+            if func:
+                func()
+
+    def test_opens_on_failures_and_closes_after_successful_probe(self):
+        """Zu viele Fehler öffnen den Breaker; nach der Wartezeit schließt eine erfolgreiche Probe ihn"""
+        breaker = CircuitBreaker("test", window=10, min_calls=4, failure_rate=0.5, open_seconds=0.1)
+        for func in (None, fail, None):
+            try:
+                self._call(breaker, func)
+            except WeaviateUnavailableError:
+                pass
+        self.assertEqual(breaker.state, "closed")
+        with self.assertRaises(WeaviateUnavailableError):
+            self._call(breaker, fail)
+        self.assertEqual(breaker.state, "open")
+
+        # Offen: sofortiger Fehler, ohne den Aufruf auszuführen
+        calls = []
+        started = time.perf_counter()
+        with self.assertRaises(WeaviateUnavailableError) as ctx:
+            self._call(breaker, lambda: calls.append(1))
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertEqual(calls, [])
+        self.assertGreater(ctx.exception.retry_after, 0)
+
+        time.sleep(0.12)
+        self.assertEqual(breaker.state, "half_open")
+        # Eine fehlgeschlagene Probe öffnet erneut
+        with self.assertRaises(WeaviateUnavailableError):
+            self._call(breaker, fail)
+        self.assertEqual(breaker.state, "open")
+
+        time.sleep(0.12)
+        self._call(breaker)
+        stats = breaker.get_stats()
+        self.assertEqual((stats["state"], stats["times_opened"], stats["rejected"]), ("closed", 2, 1))
+
+    def test_slow_calls_open_only_when_latency_is_tracked(self):
+        """Langsame Abfragen öffnen den Breaker; lange Batch-Einfügungen zählen nur bei Fehlern"""
+        breaker = CircuitBreaker("test", window=5, min_calls=3, slow_ms=20, slow_rate=0.6, open_seconds=10)
+        for _ in range(3):
+            self._call(breaker, delay=0.03, track_latency=False)
+        self.assertEqual(breaker.state, "closed")
+
+        for _ in range(2):
+            self._call(breaker, delay=0.03)
+        self.assertEqual(breaker.get_stats()["slow_rate"], 0.4)
+        self._call(breaker, delay=0.03)
+        self.assertEqual(breaker.state, "open")
+
+    def test_chat_retrieval_falls_back_to_cached_results(self):
+        """Bei gestörtem Weaviate nutzt der Chat die zuletzt gefundenen Dokumente oder antwortet ohne Kontext"""
+        cache = RetrievalCache(max_entries=10)
+        patcher = patch.object(rag_module, "retrieval_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        docs = [{"title": "Bürgeramt", "content": "Montag bis Freitag 8 bis 16 Uhr"}]
+
+        service = RAGService()
+        with patch.object(service.search_manager, "search", return_value=docs):
+            self.assertEqual(service._retrieve("tenant-1", "Wann hat das Bürgeramt geöffnet?", 5), (docs, "weaviate"))
+
+        with patch.object(service.search_manager, "search", side_effect=WeaviateUnavailableError("offen")):
+            self.assertEqual(service._retrieve("tenant-1", "wann hat das bürgeramt geöffnet", 5), (docs, "cache"))
+            self.assertEqual(service._retrieve("tenant-1", "Wo melde ich meinen Hund an?", 5), ([], "unavailable"))
+            self.assertEqual(service._retrieve("tenant-2", "Wann hat das Bürgeramt geöffnet?", 5), ([], "unavailable"))
+
+            cache.invalidate_tenant("tenant-1")
+            self.assertEqual(service._retrieve("tenant-1", "Wann hat das Bürgeramt geöffnet?", 5), ([], "unavailable"))
+
+    def test_search_without_client_or_failing_lookup_is_unavailable(self):
+        """Fehlt der Client oder scheitert die Klassenprüfung, meldet die Suche "nicht verfügbar" statt keiner Treffer"""
+        breaker = CircuitBreaker("test", window=10, min_calls=3, failure_rate=0.5, open_seconds=10)
+        failing_client = MagicMock()
+        failing_client.collections.exists.side_effect = ConnectionError("Weaviate nicht erreichbar")
+        with patch.object(search_manager_module, "weaviate_breaker", breaker), \
+                patch.object(search_manager_module, "schema_validator", MagicMock()):
+            for get_client in (MagicMock(return_value=None), MagicMock(side_effect=ConnectionError("Timeout")),
+                               MagicMock(return_value=failing_client)):
+                with self.subTest(get_client=get_client), patch.object(search_manager_module, "get_client", get_client):
+                    with self.assertRaises(WeaviateUnavailableError):
+                        SearchManager.search("tenant-1", "Öffnungszeiten")
+        # Die Fehler zählen für den Breaker
+        self.assertEqual(breaker.state, "open")
+
+    def test_structured_data_is_skipped_only_when_weaviate_is_down(self):
+        """Strukturierte Daten werden auch für Volltext- und lexikalische Treffer gesucht, nicht aber bei gestörtem Weaviate"""
+        breaker = CircuitBreaker("test", window=10, min_calls=1, failure_rate=0.5, open_seconds=10)
+        structured = MagicMock()
+        structured.search_structured_data.return_value = [{"type": "office"}]
+        with patch.object(rag_module, "weaviate_breaker", breaker), \
+                patch.object(rag_module, "structured_data_service", structured):
+            for source in ("weaviate", "fulltext", "lexical"):
+                self.assertEqual(len(RAGService._search_structured("tenant-1", "Bürgeramt", source)), 8)
+            for source in ("cache", "unavailable"):
+                self.assertEqual(RAGService._search_structured("tenant-1", "Bürgeramt", source), [])
+            self.assertEqual(structured.search_structured_data.call_count, 24)
+
+            with self.assertRaises(WeaviateUnavailableError):
+                self._call(breaker, fail)
+            self.assertEqual(RAGService._search_structured("tenant-1", "Bürgeramt", "fulltext"), [])
+            self.assertEqual(structured.search_structured_data.call_count, 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.interactive.contact_card import ContactExtractor
+from app.services.interactive.factory import InteractiveElementFactory
+from app.utils.aho_corasick import AhoCorasick
+
+CONFIG = {
+    "contacts": [
+        {"id": "c1", "name": "Bürgeramt Mitte", "keywords": ["bürgeramt", "ausweis", "kontakt"]},
+        {"id": "c2", "name": "Ordnungsamt", "keywords": ["parken", "lärm", "hund anmelden"]},
+        {"id": "c3", "name": "Stadtbibliothek", "keywords": ["bücher", "ausweis"]},
+    ]
+}
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """Tests für den Aho-Corasick-Automaten"""
+
+    def test_matches_equal_naive_search(self):
+        """Alle (auch überlappende) Treffer stimmen mit einer naiven Suche überein"""
+        rng = random.Random(42)
+        patterns = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)}
+        automaton = AhoCorasick()
+        for pattern in patterns:
+            automaton.add(pattern, pattern)
+        automaton.build()
+
+        for _ in range(50):
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+            expected = sorted(
+                (i + len(p), p) for p in patterns for i in range(len(text)) if text.startswith(p, i)
+            )
+            found = sorted((end, pattern) for end, pattern, _ in automaton.iter(text))
+            self.assertEqual(found, expected)
+
+
+class TestContactExtractor(unittest.TestCase):
+    """Tests für den kompilierten Kontaktextraktor"""
+
+    def setUp(self):
+        self.extractor = ContactExtractor(CONFIG)
+
+    def test_scores_keywords_hints_and_names(self):
+        """Keywords (ganze Wörter), Kontakt-Hinweise und Namen in Dokumenten ergeben die Relevanz"""
+        contacts = self.extractor.extract_contacts(
+            "Wo beantrage ich einen Ausweis? Telefonnummer bitte",
+            ["Die Stadtbibliothek hat neue Öffnungszeiten.", "Das Bürgeramt Mitte und die Stadtbibliothek ..."]
+        )
+        scores = {contact["id"]: contact["relevance_score"] for contact in contacts}
+        # c1: ausweis +1, "telefon*" und "nummer*" zählen für "kontakt" +2, Name in Dokument 2 +2
+        # c3: ausweis +1, Name in beiden Dokumenten +4
+        self.assertEqual(scores, {"c1": 5, "c3": 5})
+        self.assertEqual(contacts[0]["name"], "Bürgeramt Mitte")
+        self.assertNotIn("relevance_score", CONFIG["contacts"][0])
+
+    def test_keywords_require_word_boundaries(self):
+        """Keywords treffen nur ganze Wörter, mehrteilige Keywords werden erkannt"""
+        self.assertEqual(self.extractor.extract_contacts("Falschparken melden", []), [])
+        contacts = self.extractor.extract_contacts("Wie kann ich einen Hund anmelden?", [])
+        self.assertEqual([(c["id"], c["relevance_score"]) for c in contacts], [("c2", 1)])
+
+    def test_factory_reuses_compiled_extractor_until_contacts_change(self):
+        """Die Factory baut den Extraktor nur bei geänderten Kontakten neu"""
+        factory = InteractiveElementFactory.__new__(InteractiveElementFactory)
+        factory._element_extractors = {}
+        factory._contact_extractors = {}
+
+        factory.register_tenant_config("tenant-1", CONFIG)
+        first = factory._element_extractors["tenant-1"]["contact_card"]
+        factory.invalidate_tenant("tenant-1")
+        factory.register_tenant_config("tenant-1", {"contacts": [dict(c) for c in CONFIG["contacts"]]})
+        self.assertIs(factory._element_extractors["tenant-1"]["contact_card"], first)
+
+        changed = {"contacts": CONFIG["contacts"] + [{"id": "c4", "name": "Jugendamt", "keywords": []}]}
+        factory.register_tenant_config("tenant-1", changed)
+        self.assertIsNot(factory._element_extractors["tenant-1"]["contact_card"], first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import DocumentModel, TenantModel
+from app.db.session import InstrumentedQueuePool, to_async_database_url
+from app.services.document_service import document_service
+from app.services.tenant_cache import tenant_cache
+from app.services.tenant_service import tenant_service
+
+
+class TestDatabaseSession(unittest.TestCase):
+    """Tests für Engines, Pool-Metriken und die asynchronen Lesezugriffe"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/test.db"
+        self.engine = create_engine(self.url)
+        TenantModel.__table__.create(self.engine)
+        DocumentModel.__table__.create(self.engine)
+        now = datetime(2024, 1, 1)
+        with self.engine.begin() as connection:
+            connection.execute(TenantModel.__table__.insert().values(
+                id="tenant-1", name="Stadt", api_key="key-1", created_at=now, updated_at=now,
+                bot_name="Bot", bot_welcome_message="Hallo", primary_color="#000", secondary_color="#fff",
+                use_mistral=False, bot_message_bg_color="#000", bot_message_text_color="#fff",
+                user_message_bg_color="#000", user_message_text_color="#fff", renderer_type="default"
+            ))
+            connection.execute(DocumentModel.__table__.insert(), [
+                {"id": f"doc-{i}", "tenant_id": "tenant-1", "title": f"Dokument {i}", "content": "Text",
+                 "created_at": now + timedelta(minutes=i)}
+                for i in range(5)
+            ])
+        tenant_cache.clear()
+
+    def tearDown(self):
+        tenant_cache.clear()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _run_async(self, func):
+        async def run():
+            async_engine = create_async_engine(to_async_database_url(self.url))
+            try:
+                async with AsyncSession(async_engine) as db:
+                    return await func(db)
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(run())
+
+    def test_async_database_url(self):
+        """Synchrone URLs werden auf die Async-Treiber umgeschrieben"""
+        self.assertEqual(
+            to_async_database_url("postgresql://u:p@db:5432/bot?sslmode=require"),
+            "postgresql+asyncpg://u:p@db:5432/bot?ssl=require"
+        )
+        self.assertEqual(to_async_database_url("postgres://u:p@db/bot"), "postgresql+asyncpg://u:p@db/bot")
+        self.assertEqual(to_async_database_url("sqlite:///./test.db"), "sqlite+aiosqlite:///./test.db")
+
+    def test_pool_records_checkouts(self):
+        """Der instrumentierte Pool zählt Checkouts und Wartezeiten"""
+        engine = create_engine(self.url, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0)
+        before = InstrumentedQueuePool.metrics.checkouts
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        engine.dispose()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        engine.dispose()
+        self.assertEqual(InstrumentedQueuePool.metrics.checkouts - before, 2)
+
+    def test_async_tenant_lookup_and_document_page(self):
+        """Tenant-Auflösung und Dokumentliste funktionieren mit AsyncSession"""
+        async def read(db):
+            tenant = await tenant_service.aget_tenant_by_api_key(db, "key-1")
+            missing = await tenant_service.aget_tenant_by_api_key(db, "ungueltig")
+            page, cursor = await document_service.alist_documents_page(db, "tenant-1", limit=3, fields=["title"])
+            rest, _ = await document_service.alist_documents_page(db, "tenant-1", limit=3, cursor=cursor)
+            count = await document_service.aestimate_document_count(db, "tenant-1")
+            return tenant, missing, page, rest, count
+
+        tenant, missing, page, rest, count = self._run_async(read)
+        self.assertEqual(str(tenant.id), "tenant-1")
+        self.assertIsNone(missing)
+        self.assertEqual([doc["id"] for doc in page], ["doc-4", "doc-3", "doc-2"])
+        self.assertEqual(set(page[0]), {"id", "title"})
+        self.assertEqual([doc["id"] for doc in rest], ["doc-1", "doc-0"])
+        self.assertEqual(count, 5)
+
+        # Der zweite Zugriff kommt aus dem Tenant-Cache
+        found, cached = tenant_cache.peek_api_key("key-1")
+        self.assertTrue(found)
+        self.assertIs(cached, tenant)
+
+
+if __name__ == "__main__":
+    unittest.main()
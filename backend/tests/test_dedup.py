@@ -0,0 +1,130 @@
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.v1.documents import create_document
+from app.db.models import DocumentCreate, DocumentIndexTaskModel, DocumentModel, TenantModel
+from app.services.bulk_import_service import BulkImportService
+from app.services.dedup_service import (
+    DuplicateFilter, _on_knowledge_changed, hamming_distance, simhash, simhash_index_cache
+)
+
+TEXT = (
+    "Das Bürgerbüro im Rathaus ist montags bis freitags von 8 bis 16 Uhr geöffnet. "
+    "Termine für Personalausweise und Reisepässe können online vereinbart werden. "
+    "Bitte bringen Sie ein aktuelles biometrisches Passfoto und die alten Dokumente mit. "
+    "Für die Anmeldung eines Wohnsitzes benötigen Sie zusätzlich die Wohnungsgeberbestätigung. "
+    "Beglaubigungen, Führungszeugnisse und Meldebescheinigungen werden ebenfalls im Bürgerbüro ausgestellt. "
+    "Die Gebühren können bar oder mit Karte bezahlt werden. Parkplätze finden Sie in der Tiefgarage am Markt. "
+    "Der Zugang ist barrierefrei, ein Aufzug führt in alle Etagen des Gebäudes."
+)
+# Nur ein Wort geändert: Beinahe-Duplikat
+NEAR_TEXT = TEXT.replace("freitags", "donnerstags")
+OTHER_TEXT = "Die Stadtbibliothek bietet Lesungen, Sprachkurse und eine Onleihe für E-Books an."
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    """Tests für die Erkennung exakter und beinahe gleicher Dokumente"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel, DocumentIndexTaskModel):
+            model.__table__.create(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(TenantModel(id="plain", name="Ohne", api_key="key-1", config={}))
+        self.db.add(TenantModel(id="near", name="Mit", api_key="key-2", config={"near_duplicate_detection": True}))
+        self.db.commit()
+        simhash_index_cache.invalidate()
+        self.addCleanup(simhash_index_cache.invalidate)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _import(self, tenant_id, contents):
+        rows = [{"title": f"Dokument {i}", "content": content} for i, content in enumerate(contents)]
+        rows, duplicates = DuplicateFilter.for_tenant(self.db, tenant_id).filter_rows(rows)
+        BulkImportService.write_chunk(self.db, tenant_id, rows)
+        return len(rows), [duplicate["reason"] for duplicate in duplicates]
+
+    def test_simhash_behaves_like_a_similarity_hash(self):
+        """Ähnliche Texte liegen nah beieinander, verschiedene weit auseinander"""
+        self.assertLessEqual(hamming_distance(simhash(TEXT), simhash(NEAR_TEXT)), 6)
+        self.assertGreater(hamming_distance(simhash(TEXT), simhash(OTHER_TEXT)), 6)
+
+    def test_exact_duplicates_are_skipped(self):
+        """Gleicher Inhalt (bis auf Leerraum) wird im Import und gegenüber der Datenbank erkannt"""
+        self.assertEqual(self._import("plain", [TEXT, "  " + TEXT.replace(" ", "\n", 3), OTHER_TEXT]), (2, ["exact"]))
+        self.assertEqual(self._import("plain", [OTHER_TEXT, NEAR_TEXT]), (1, ["exact"]))
+        # Ohne Beinahe-Duplikaterkennung wird der SimHash trotzdem gespeichert
+        self.assertEqual(self.db.query(DocumentModel).filter(DocumentModel.simhash.is_(None)).count(), 0)
+
+    def test_near_duplicates_are_skipped_when_enabled(self):
+        """Beinahe-Duplikate werden innerhalb eines Imports und gegenüber gespeicherten Dokumenten erkannt"""
+        self.assertEqual(self._import("near", [TEXT, NEAR_TEXT, OTHER_TEXT]), (2, ["near"]))
+        self.assertEqual(self._import("near", [NEAR_TEXT]), (0, ["near"]))
+        # Andere Tenants sind nicht betroffen
+        self.assertEqual(self._import("plain", [NEAR_TEXT]), (1, []))
+
+    def test_tenant_index_is_loaded_incrementally(self):
+        """Nach dem ersten Laden werden nur neue Dokumente nachgeladen; Löschungen verwerfen den Index"""
+        self._import("near", [OTHER_TEXT])
+        # Ein anderer Worker legt ein Dokument an
+        BulkImportService.write_chunk(self.db, "near", [{"title": "Extern", "content": TEXT, "simhash": simhash(TEXT)}])
+
+        index = simhash_index_cache.get(self.db, "near")
+        with patch.object(index, "_backfill") as backfill:
+            self.assertEqual(self._import("near", [NEAR_TEXT]), (0, ["near"]))
+        backfill.assert_not_called()
+        self.assertIs(simhash_index_cache.get(self.db, "near"), index)
+
+        self.db.query(DocumentModel).filter(DocumentModel.title == "Extern").delete()
+        self.db.commit()
+        _on_knowledge_changed("near", {"operation": "delete", "document_ids": ["extern"]})
+        self.assertEqual(self._import("near", [NEAR_TEXT]), (1, []))
+
+    def test_missing_simhashes_are_backfilled(self):
+        """Dokumente ohne SimHash (ältere Importe) werden beim ersten Laden nachberechnet"""
+        self.db.add(DocumentModel(id="alt", tenant_id="near", title="Alt", content=TEXT))
+        self.db.commit()
+        self.assertEqual(self._import("near", [NEAR_TEXT]), (0, ["near"]))
+        self.db.expire_all()
+        self.assertEqual(self.db.get(DocumentModel, "alt").simhash, simhash(TEXT))
+
+    def test_single_create_reports_duplicates_without_an_error(self):
+        """Beim Anlegen einzelner Dokumente liefert ein Duplikat das vorhandene Dokument statt eines Fehlers"""
+        def create(tenant_id, content):
+            # Ohne gesetzten Statuscode gilt der des Endpunkts (201)
+            response = SimpleNamespace(status_code=None)
+            document = asyncio.run(create_document(
+                DocumentCreate(title="Dokument", content=content), response, tenant_id=tenant_id, db=self.db
+            ))
+            return response.status_code, document
+
+        status_code, first = create("plain", TEXT)
+        self.assertEqual((status_code, first.duplicate), (None, None))
+        status_code, again = create("plain", "  " + TEXT)
+        self.assertEqual((status_code, again.duplicate, again.id), (200, "exact", first.id))
+        self.assertEqual(self.db.query(DocumentModel).count(), 1)
+
+        # Beinahe-Duplikate werden angelegt und markiert
+        create("near", TEXT)
+        status_code, near = create("near", NEAR_TEXT)
+        self.assertEqual((status_code, near.duplicate), (None, "near"))
+        self.assertEqual(self.db.query(DocumentModel).filter(DocumentModel.tenant_id == "near").count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import DocumentIndexTaskModel, DocumentModel, TenantModel
+from app.services import document_indexer as indexer_module
+from app.services.document_indexer import DocumentIndexer
+
+
+class TestDocumentIndexer(unittest.TestCase):
+    """Tests für den Outbox-Indexer (Postgres -> Weaviate)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel, DocumentIndexTaskModel):
+            model.__table__.create(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        self.db = self.Session()
+        self.db.add(TenantModel(id="tenant-1", name="Stadt", api_key="key-1"))
+        for i in range(5):
+            self.db.add(DocumentModel(id=f"doc-{i}", tenant_id="tenant-1", title=f"Dokument {i}", content="Inhalt"))
+        DocumentIndexer.enqueue_many(self.db, "tenant-1", [f"doc-{i}" for i in range(5)])
+        DocumentIndexer.enqueue(self.db, "tenant-1", "doc-alt", operation="delete")
+        self.db.commit()
+
+        self.add_documents = patch.object(
+            indexer_module.weaviate_service, "add_documents",
+            side_effect=lambda tenant_id, docs: {"inserted": [doc["id"] for doc in docs], "failed": {}}
+        ).start()
+        self.delete_documents = patch.object(
+            indexer_module.weaviate_service, "delete_documents",
+            side_effect=lambda tenant_id, ids: len(ids)
+        ).start()
+        self.publish = patch.object(indexer_module.cache_bus, "publish").start()
+        patch.object(indexer_module, "SessionLocal", self.Session).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _tasks(self):
+        self.db.expire_all()
+        return self.db.query(DocumentIndexTaskModel).order_by(DocumentIndexTaskModel.id).all()
+
+    def test_batches_are_claimed_in_order_and_removed_when_done(self):
+        """Ein Batch umfasst höchstens batch_size fällige Aufgaben, gruppiert je Tenant und Operation"""
+        indexer = DocumentIndexer(batch_size=4)
+        self.assertEqual(indexer.process_batch(), 4)
+        self.assertEqual(self.add_documents.call_args.args[1][0]["id"], "doc-0")
+        self.assertEqual([task.document_id for task in self._tasks()], ["doc-4", "doc-alt"])
+
+        self.assertEqual(indexer.process_batch(), 2)
+        self.delete_documents.assert_called_once_with("tenant-1", ["doc-alt"])
+        self.assertEqual(self._tasks(), [])
+        self.assertEqual(indexer.process_batch(), 0)
+        operations = sorted(call.kwargs["operation"] for call in self.publish.call_args_list)
+        self.assertEqual(operations, ["delete", "upsert", "upsert"])
+
+    def test_failures_are_retried_with_backoff_and_finally_marked_failed(self):
+        """Fehlgeschlagene Dokumente werden später erneut versucht und nach max_attempts aufgegeben"""
+        self.add_documents.side_effect = lambda tenant_id, docs: {
+            "inserted": [doc["id"] for doc in docs if doc["id"] != "doc-2"],
+            "failed": {"doc-2": "Vektorisierung fehlgeschlagen"}
+        }
+        indexer = DocumentIndexer(batch_size=10, max_attempts=2)
+        indexer.process_batch()
+        [task] = self._tasks()
+        self.assertEqual((task.document_id, task.status, task.attempts), ("doc-2", "pending", 1))
+        self.assertGreater(task.available_at, datetime.utcnow())
+
+        # Noch nicht fällig: wird nicht erneut geholt
+        self.assertEqual(indexer.process_batch(), 0)
+
+        self.db.query(DocumentIndexTaskModel).update({"available_at": datetime.utcnow() - timedelta(seconds=1)})
+        self.db.commit()
+        indexer.process_batch()
+        [task] = self._tasks()
+        self.assertEqual((task.status, task.attempts), ("failed", 2))
+        self.assertIn("Vektorisierung", task.last_error)
+
+        self.assertEqual(indexer.retry_failed(self.db, "tenant-1"), 1)
+        self.assertEqual(self._tasks()[0].status, "pending")
+
+    def test_tasks_survive_a_crash_during_processing(self):
+        """Bricht die Verarbeitung ab, bleiben die Aufgaben offen und ein neuer Indexer übernimmt sie"""
+        crashing = DocumentIndexer(batch_size=10)
+        with patch.object(crashing, "_process_upserts", side_effect=RuntimeError("Prozess beendet")):
+            with self.assertRaises(RuntimeError):
+                crashing.process_batch()
+        self.assertEqual(len(self._tasks()), 6)
+        self.assertTrue(all(task.attempts == 0 and task.status == "pending" for task in self._tasks()))
+
+        self.assertEqual(DocumentIndexer(batch_size=10).process_batch(), 6)
+        self.assertEqual(self._tasks(), [])
+
+    def test_weaviate_outage_keeps_the_whole_group_pending(self):
+        """Ist Weaviate nicht erreichbar, wird jede Aufgabe der Gruppe neu eingeplant"""
+        self.add_documents.side_effect = ConnectionError("Weaviate nicht erreichbar")
+        indexer = DocumentIndexer(batch_size=10)
+        indexer.process_batch()
+        upserts = [task for task in self._tasks() if task.operation == "upsert"]
+        self.assertEqual(len(upserts), 5)
+        self.assertTrue(all(task.attempts == 1 for task in upserts))
+        self.assertEqual(indexer.get_stats(self.db)["pending"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
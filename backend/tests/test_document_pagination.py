@@ -0,0 +1,98 @@
+import base64
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import DocumentModel, TenantModel
+from app.services.document_service import DocumentService
+
+
+class TestDocumentCursor(unittest.TestCase):
+    """Tests für die Cursor der Keyset-Pagination"""
+
+    def test_cursor_round_trip(self):
+        """Ein Cursor enthält die Sortierposition und ist URL-sicher"""
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        cursor = DocumentService.encode_cursor(created_at, "doc/1+2")
+        self.assertNotRegex(cursor, r"[+/]")
+        self.assertEqual(DocumentService.decode_cursor(cursor), (created_at, "doc/1+2"))
+
+    def test_invalid_cursors_raise_value_error(self):
+        """Manipulierte oder beschädigte Cursor führen zu ValueError (HTTP 400)"""
+        invalid = [
+            "kein-base64!",
+            base64.urlsafe_b64encode(b"kein json").decode("ascii"),
+            base64.urlsafe_b64encode(b'["2024-05-01T12:00:00"]').decode("ascii"),
+            base64.urlsafe_b64encode(b'["gestern", "doc-1"]').decode("ascii"),
+            "äöü",
+        ]
+        for cursor in invalid:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    DocumentService.decode_cursor(cursor)
+
+
+class TestDocumentPages(unittest.TestCase):
+    """Tests für das seitenweise Abrufen von Dokumenten"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel):
+            model.__table__.create(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        start = datetime(2024, 1, 1)
+        for tenant_id in ("tenant-1", "tenant-2"):
+            self.db.add(TenantModel(id=tenant_id, name=tenant_id, api_key=f"key-{tenant_id}"))
+        # Je drei Dokumente teilen sich einen Zeitstempel
+        for i in range(9):
+            self.db.add(DocumentModel(
+                id=f"doc-{i}", tenant_id="tenant-1", title=f"Dokument {i}", content="Inhalt",
+                created_at=start + timedelta(days=i // 3)
+            ))
+        self.db.add(DocumentModel(id="fremd", tenant_id="tenant-2", title="Fremd", content="Inhalt", created_at=start))
+        self.db.commit()
+        self.service = DocumentService()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_pages_cover_every_document_once_with_ties(self):
+        """Bei gleichem created_at entscheidet die ID; keine Seite überspringt oder wiederholt Dokumente"""
+        for limit in (1, 2, 3, 4, 9):
+            with self.subTest(limit=limit):
+                ids, cursor = [], None
+                while True:
+                    documents, cursor = self.service.list_documents_page(self.db, "tenant-1", limit=limit, cursor=cursor)
+                    self.assertLessEqual(len(documents), limit)
+                    ids.extend(doc["id"] for doc in documents)
+                    if cursor is None:
+                        break
+                # Neueste zuerst, innerhalb eines Zeitstempels absteigend nach ID
+                self.assertEqual(ids, [f"doc-{i}" for i in (8, 7, 6, 5, 4, 3, 2, 1, 0)])
+
+    def test_field_selection(self):
+        """Nur angeforderte Felder (und die ID) werden geliefert; unbekannte Felder werden abgelehnt"""
+        documents, cursor = self.service.list_documents_page(self.db, "tenant-1", limit=2, fields=["title"])
+        self.assertEqual(documents[0], {"id": "doc-8", "title": "Dokument 8"})
+        self.assertIsNotNone(cursor)
+
+        with self.assertRaises(ValueError):
+            self.service.list_documents_page(self.db, "tenant-1", fields=["passwort"])
+
+        self.assertEqual(self.service.estimate_document_count(self.db, "tenant-1"), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import importlib
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.structured_data_service import StructuredDataService
+from app.services.weaviate import search_manager as search_manager_module
+from app.services.weaviate.search_manager import SearchManager
+from app.utils.german_dates import parse_date_range, parse_event_dates
+
+# app.services exportiert unter diesem Namen die Singleton-Instanz
+structured_module = importlib.import_module("app.services.structured_data_service")
+
+BERLIN = ZoneInfo("Europe/Berlin")
+# Mittwoch, 19. März 2025, 14 Uhr
+NOW = datetime(2025, 3, 19, 14, 0, tzinfo=BERLIN)
+
+
+def at(year, month, day, hour=0, minute=0):
+    return datetime(year, month, day, hour, minute, tzinfo=BERLIN)
+
+
+class TestGermanDates(unittest.TestCase):
+    """Tests für die Erkennung deutscher Datumsangaben"""
+
+    def test_event_dates_are_normalized(self):
+        """Freitext-Datum und -Uhrzeit werden zu Beginn und (exklusivem) Ende"""
+        today = NOW.date()
+        self.assertEqual(
+            parse_event_dates("24. März 2025", "18:00 Uhr", BERLIN, today),
+            (at(2025, 3, 24, 18), at(2025, 3, 25))
+        )
+        self.assertEqual(parse_event_dates("24.–26.03.2025", None, BERLIN, today), (at(2025, 3, 24), at(2025, 3, 27)))
+        self.assertEqual(
+            parse_event_dates("24. bis 26. März", "10:00 - 18:00 Uhr", BERLIN, today),
+            (at(2025, 3, 24, 10), at(2025, 3, 26, 18))
+        )
+        # Ohne Jahr: deutlich zurückliegende Daten gehören ins nächste Jahr
+        self.assertEqual(parse_event_dates("10.01.", None, BERLIN, today)[0], at(2026, 1, 10))
+        # Ungültige Uhrzeiten werden ignoriert, Datumsteile nicht als Uhrzeit gelesen
+        self.assertEqual(parse_event_dates("10. März 1959", "87:00 Uhr", BERLIN, today)[0], at(1959, 3, 10))
+        self.assertEqual(parse_event_dates("01.08.2025", None, BERLIN, today)[0], at(2025, 8, 1))
+        self.assertIsNone(parse_event_dates("Samstag", None, BERLIN, today))
+        self.assertIsNone(parse_event_dates(None, "18:00 Uhr", BERLIN, today))
+
+    def test_relative_expressions_in_questions(self):
+        """Relative und absolute Zeitangaben in Fragen werden zu Zeiträumen"""
+        cases = {
+            "Was ist am Wochenende los?": (at(2025, 3, 22), at(2025, 3, 24)),
+            "Veranstaltungen morgen": (at(2025, 3, 20), at(2025, 3, 21)),
+            "Was gibt es heute Abend?": (at(2025, 3, 19), at(2025, 3, 20)),
+            "Konzerte nächste Woche": (at(2025, 3, 24), at(2025, 3, 31)),
+            "am Samstag": (at(2025, 3, 22), at(2025, 3, 23)),
+            "nächsten Mittwoch": (at(2025, 3, 26), at(2025, 3, 27)),
+            "Was ist im April geplant?": (at(2025, 4, 1), at(2025, 5, 1)),
+            "vom 1. bis 5. April": (at(2025, 4, 1), at(2025, 4, 6)),
+            "in den nächsten drei Tagen": (at(2025, 3, 19), at(2025, 3, 22)),
+        }
+        for query, (start, end) in cases.items():
+            with self.subTest(query=query):
+                date_range = parse_date_range(query, NOW)
+                self.assertEqual((date_range.start, date_range.end), (start, end))
+        self.assertIsNone(parse_date_range("Guten Morgen, wo ist das Bürgeramt?", NOW))
+        self.assertIsNone(parse_date_range("Märchenstunde in der Bibliothek", NOW))
+
+
+class TestEventSearch(unittest.TestCase):
+    """Tests für die Datumsfilter der Veranstaltungssuche in Weaviate"""
+
+    def test_filters_exclude_past_events(self):
+        """Zeiträume werden ab jetzt gefiltert; ohne Zeitangabe fallen nur vergangene Veranstaltungen weg"""
+        filters, temporal_only = StructuredDataService.get_event_filters("Was ist heute los?", NOW)
+        self.assertTrue(temporal_only)
+        self.assertEqual(
+            [(value.target, value.operator.value, value.value) for value in filters.filters],
+            [("endDate", "GreaterThan", NOW), ("startDate", "LessThan", at(2025, 3, 20))]
+        )
+
+        filters, temporal_only = StructuredDataService.get_event_filters("Konzerte am Wochenende", NOW)
+        self.assertFalse(temporal_only)
+
+        filters, temporal_only = StructuredDataService.get_event_filters("Flohmarkt", NOW)
+        self.assertFalse(temporal_only)
+        self.assertEqual(
+            [(value.target, value.value) for value in filters.filters],
+            [("endDate", NOW), ("hasDate", False)]
+        )
+        with patch.object(structured_module.settings, "EVENTS_EXCLUDE_PAST", False):
+            self.assertEqual(StructuredDataService.get_event_filters("Flohmarkt", NOW), (None, False))
+
+    def test_temporal_questions_use_filtered_lookup(self):
+        """Reine Zeitfragen werden ohne Hybrid-Suche nach Datum sortiert abgefragt"""
+        collection = MagicMock()
+        collection.query.fetch_objects.return_value.objects = [
+            MagicMock(uuid="e-1", properties={"title": "Frühlingsfest", "startDate": at(2025, 3, 22, 10)})
+        ]
+        client = MagicMock()
+        client.collections.get.return_value = collection
+        with patch.object(structured_module, "get_client", return_value=client), \
+                patch.object(structured_module.SchemaManager, "class_exists", return_value=True):
+            results = StructuredDataService.search_structured_data("tenant-1", "event", "Was ist am Wochenende los?")
+            self.assertEqual(results[0]["data"]["title"], "Frühlingsfest")
+            self.assertEqual(results[0]["data"]["startDate"], "2025-03-22T10:00:00+01:00")
+            collection.query.hybrid.assert_not_called()
+
+            StructuredDataService.search_structured_data("tenant-1", "event", "Konzerte am Wochenende")
+            self.assertIsNotNone(collection.query.hybrid.call_args.kwargs["filters"])
+
+            # Andere Datentypen bleiben ungefiltert
+            StructuredDataService.search_structured_data("tenant-1", "school", "Grundschule morgen")
+            self.assertIsNone(collection.query.hybrid.call_args.kwargs["filters"])
+
+    def test_filler_words_come_from_the_tenant(self):
+        """Ortsnamen aus Tenant-Name und -Konfiguration gelten in Zeitfragen als Füllwörter"""
+        query = "Was ist am Wochenende in Brandenburg an der Havel los?"
+        self.assertFalse(StructuredDataService.get_event_filters(query, NOW)[1])
+
+        tenant = SimpleNamespace(name="Stadt Brandenburg", config={"event_query_filler": ["Havel"]})
+        filler_words = StructuredDataService.get_event_query_filler(tenant)
+        self.assertTrue(StructuredDataService.get_event_filters(query, NOW, filler_words)[1])
+        self.assertFalse(StructuredDataService.get_event_filters("Konzerte am Wochenende", NOW, filler_words)[1])
+        self.assertEqual(StructuredDataService.get_event_query_filler(None), structured_module.EVENT_QUERY_FILLER)
+
+    def test_events_are_not_copied_to_the_tenant_class(self):
+        """Veranstaltungen (ohne Datumsfilter in der Tenant-Klasse) werden nur strukturiert gespeichert"""
+        client = MagicMock()
+        service = StructuredDataService(MagicMock())
+        with patch.object(structured_module, "get_client", return_value=client), \
+                patch.object(StructuredDataService, "create_schema_for_type", return_value=True), \
+                patch.object(structured_module.SchemaManager, "class_exists", return_value=True):
+            self.assertTrue(service.store_structured_data("tenant-1", "event", {"title": "Fest", "date": "24. März 2025"}))
+            client.collections.get.assert_called_once_with(StructuredDataService.get_class_name("tenant-1", "event"))
+
+            self.assertTrue(service.store_structured_data("tenant-1", "office", {"name": "Bürgeramt"}))
+            self.assertEqual(client.collections.get.call_count, 3)
+
+    def test_search_skips_old_event_copies(self):
+        """Ältere Kopien von Veranstaltungen in der Tenant-Klasse werden in der Dokumentsuche übersprungen"""
+        collection = MagicMock()
+        collection.query.hybrid.return_value.objects = [
+            MagicMock(uuid="d-1", score=0.9, properties={"title": "Fest 2019", "source": "Structured Data (event)"}),
+            MagicMock(uuid="d-2", score=0.5, properties={"title": "Bürgeramt", "source": "Structured Data (office)"}),
+            MagicMock(uuid="d-3", score=0.4, properties={"title": "Satzung", "source": "satzung.pdf"}),
+        ]
+        client = MagicMock()
+        client.collections.exists.side_effect = lambda name: not name.startswith("StructuredData")
+        client.collections.get.return_value = collection
+        with patch.object(search_manager_module, "get_client", return_value=client), \
+                patch.object(search_manager_module, "schema_validator", MagicMock()):
+            results = SearchManager.search("tenant-1", "Fest")
+        self.assertEqual([result["id"] for result in results], ["d-2", "d-3"])
+
+    def test_events_without_date_fields_are_backfilled(self):
+        """Vor den Datumsfeldern importierte Veranstaltungen bekommen sie nachgetragen, damit die Filter sie finden"""
+        collection = MagicMock()
+        collection.config.get.return_value.properties = [SimpleNamespace(name="title"), SimpleNamespace(name="date")]
+        collection.iterator.return_value = [
+            SimpleNamespace(uuid="e-1", properties={"title": "Fest", "date": "24. März 2025", "time": "18:00 Uhr"}),
+            SimpleNamespace(uuid="e-2", properties={"title": "Lesung", "date": None}),
+            SimpleNamespace(uuid="e-3", properties={"title": "Neu", "hasDate": False, "importedAt": NOW}),
+        ]
+        client = MagicMock()
+        client.collections.get.return_value = collection
+        class_name = StructuredDataService.get_class_name("tenant-1", "event")
+        self.addCleanup(StructuredDataService._date_properties_checked.discard, class_name)
+        with patch.object(structured_module, "get_client", return_value=client):
+            StructuredDataService._ensure_date_properties(class_name, "event")
+            StructuredDataService._ensure_date_properties(class_name, "event")
+
+        self.assertEqual([call.args[0].name for call in collection.config.add_property.call_args_list],
+                         ["importedAt", "startDate", "endDate", "hasDate"])
+        updates = {call.kwargs["uuid"]: call.kwargs["properties"] for call in collection.data.update.call_args_list}
+        self.assertEqual(sorted(updates), ["e-1", "e-2"])
+        self.assertEqual((updates["e-1"]["startDate"], updates["e-1"]["hasDate"]), (at(2025, 3, 24, 18), True))
+        self.assertEqual(updates["e-2"]["hasDate"], False)
+        self.assertIn("importedAt", updates["e-2"])
+        # Einmal pro Prozess und Klasse
+        collection.iterator.assert_called_once()
+
+    def test_stored_events_get_date_properties(self):
+        """Beim Import werden startDate, endDate und hasDate gesetzt"""
+        self.assertEqual(
+            StructuredDataService.get_event_dates({"date": "24. März 2025", "time": "18:00 Uhr"}),
+            {"startDate": at(2025, 3, 24, 18), "endDate": at(2025, 3, 25), "hasDate": True}
+        )
+        self.assertEqual(StructuredDataService.get_event_dates({"date": None}), {"hasDate": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.interactive.intent_detection import IntentDetector
+
+
+class FakeModel:
+    """Deterministisches Ersatzmodell, das die Größe jedes encode-Aufrufs protokolliert."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+            vectors.append(np.random.default_rng(seed).normal(size=16))
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class TestIntentDetector(unittest.TestCase):
+    """Tests für die vorgewärmte, gebündelte Intent-Erkennung"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _detector(self, model=None, **kwargs) -> IntentDetector:
+        detector = IntentDetector(model_name="fake-model", cache_dir=self.tmp.name, **kwargs)
+        patcher = patch.object(detector, "_load_model", return_value=model or FakeModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(detector.stop)
+        return detector
+
+    def test_concurrent_queries_are_encoded_in_one_batch(self):
+        """Gleichzeitige Anfragen werden gesammelt und in einem Modellaufruf kodiert"""
+        model = FakeModel()
+        detector = self._detector(model, batch_wait=0.2)
+        self.assertTrue(detector.warm_up())
+        model.calls.clear()
+
+        async def detect_all():
+            return await asyncio.gather(*(detector.adetect_contact_intent(f"Frage {i}") for i in range(8)))
+
+        results = asyncio.run(detect_all())
+        self.assertEqual(len(results), 8)
+        self.assertEqual([len(call) for call in model.calls], [8])
+        # Das Beispiel "Email Adresse" ist mit sich selbst maximal ähnlich
+        is_contact, score = detector.detect_contact_intent("Email Adresse")
+        self.assertTrue(is_contact)
+        self.assertAlmostEqual(score, 1.0, places=4)
+
+    def test_query_cache_hits_and_eviction(self):
+        """Wiederholte Anfragen kommen aus dem LRU-Cache; die Größe ist begrenzt"""
+        model = FakeModel()
+        detector = self._detector(model, batch_wait=0.0, query_cache_size=2)
+        detector.warm_up()
+        model.calls.clear()
+
+        for query in ["a", "b", "a", "c", "a", "b"]:
+            detector.detect_contact_intent(query)
+
+        # "b" wurde nach "c" verdrängt ("a" war zuletzt verwendet) und erneut kodiert
+        self.assertEqual([call for call in model.calls], [["a"], ["b"], ["c"], ["b"]])
+        stats = detector.get_stats()
+        self.assertEqual(stats["cached_queries"], 2)
+        self.assertEqual(stats["cache_hit_rate"], round(2 / 6, 4))
+        self.assertEqual(stats["state"], "ready")
+
+    def test_example_embeddings_are_persisted(self):
+        """Die Beispiel-Embeddings werden nach dem ersten Start aus dem Cache gelesen"""
+        first_model = FakeModel()
+        first = self._detector(first_model)
+        first.warm_up()
+        self.assertEqual(len(first_model.calls), 1)
+
+        second_model = FakeModel()
+        second = self._detector(second_model)
+        second.warm_up()
+        self.assertEqual(second_model.calls, [])
+        np.testing.assert_allclose(first._contact_embeddings, second._contact_embeddings, rtol=1e-6)
+
+    def test_keyword_fallback_without_model(self):
+        """Ohne Modell wird die Keyword-Erkennung verwendet, ohne die Anfrage zu blockieren"""
+        detector = IntentDetector(model_name="fake-model", cache_dir=None)
+        with patch.object(detector, "_load_model", side_effect=ImportError("sentence_transformers fehlt")):
+            self.assertFalse(detector.warm_up())
+            is_contact, confidence = detector.detect_contact_intent("Wo finde ich die Telefonnummer vom Amt?")
+        self.assertTrue(is_contact)
+        self.assertGreater(confidence, 0.3)
+        self.assertEqual(detector.get_stats()["state"], "unavailable")
+        self.assertEqual(detector.get_stats()["keyword_fallbacks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import BackgroundJobModel
+from app.services import job_service as job_module
+from app.services.job_service import JobLimitError, JobService
+
+
+class TestJobService(unittest.TestCase):
+    """Tests für die Job-Registry"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        BackgroundJobModel.__table__.create(self.engine)
+        Session = sessionmaker(bind=self.engine)
+        self.Session = Session
+
+        @contextmanager
+        def session_scope():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        patch.object(job_module, "session_scope", session_scope).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _age(self, job_id, seconds, column="created_at"):
+        with self.Session() as db:
+            job = db.get(BackgroundJobModel, job_id)
+            setattr(job, column, datetime.utcnow() - timedelta(seconds=seconds))
+            db.commit()
+
+    def test_pending_job_can_only_be_claimed_once_by_its_tenant(self):
+        """Vorab angelegte Jobs starten nur für den eigenen Tenant, die eigene Art und nur einmal"""
+        service = JobService()
+        job_id = service.create_job("json_upload", "tenant-1", status="pending")
+        self.assertEqual(service.get_job(job_id, tenant_id="tenant-1")["status"], "pending")
+        self.assertIsNone(service.get_job(job_id, tenant_id="tenant-2"))
+
+        self.assertFalse(service.claim_job(job_id, "tenant-2", "json_upload"))
+        self.assertFalse(service.claim_job(job_id, "tenant-1", "bulk_delete"))
+        self.assertFalse(service.claim_job("unbekannt", "tenant-1", "json_upload"))
+        self.assertTrue(service.claim_job(job_id, "tenant-1", "json_upload"))
+        self.assertFalse(service.claim_job(job_id, "tenant-1", "json_upload"))
+        self.assertEqual(service.get_job(job_id)["status"], "running")
+
+    def test_ids_are_generated_by_the_server(self):
+        """Jeder Job erhält eine eigene ID"""
+        service = JobService()
+        self.assertNotEqual(service.create_job("json_upload", "tenant-1"), service.create_job("json_upload", "tenant-1"))
+
+    def test_progress_is_visible_to_other_instances(self):
+        """Fortschritt steht in der Datenbank und ist auch für andere Worker abrufbar"""
+        job_id = JobService().create_job("bulk_delete", "tenant-1", processed=0)
+        JobService().update_job(job_id, processed=5)
+        JobService().finish_job(job_id, processed=10)
+
+        job = JobService().get_job(job_id)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["processed"], 10)
+        self.assertIsNotNone(job["finished_at"])
+
+    def test_unclaimed_pending_jobs_expire(self):
+        """Nicht gestartete Jobs verfallen nach der TTL und lassen sich nicht mehr starten"""
+        service = JobService(pending_ttl_seconds=60)
+        job_id = service.create_job("json_upload", "tenant-1", status="pending")
+        self._age(job_id, 120)
+
+        self.assertEqual(service.get_job(job_id)["status"], "expired")
+        self.assertFalse(service.claim_job(job_id, "tenant-1", "json_upload"))
+
+    def test_pending_jobs_per_tenant_are_limited(self):
+        """Pro Tenant sind nur begrenzt viele nicht gestartete Jobs offen; abgelaufene zählen nicht"""
+        service = JobService(pending_ttl_seconds=60, max_pending_per_tenant=2)
+        first = service.create_job("json_upload", "tenant-1", status="pending")
+        service.create_job("json_upload", "tenant-1", status="pending")
+        with self.assertRaises(JobLimitError):
+            service.create_job("json_upload", "tenant-1", status="pending")
+        # Andere Tenants und laufende Jobs sind nicht betroffen
+        service.create_job("json_upload", "tenant-2", status="pending")
+        service.create_job("json_upload", "tenant-1")
+
+        self._age(first, 120)
+        service.create_job("json_upload", "tenant-1", status="pending")
+
+    def test_prune_removes_stale_and_expired_jobs(self):
+        """Bereinigt werden lange unveränderte Jobs und abgelaufene, nie gestartete Jobs"""
+        service = JobService(retention_seconds=3600, pending_ttl_seconds=60)
+        stale = service.create_job("bulk_delete", "tenant-1")
+        expired = service.create_job("json_upload", "tenant-1", status="pending")
+        kept = service.create_job("json_upload", "tenant-1", status="pending")
+        self._age(stale, 7200, column="updated_at")
+        self._age(expired, 120)
+
+        self.assertEqual(service.prune(), 2)
+        self.assertIsNone(service.get_job(stale))
+        self.assertIsNone(service.get_job(expired))
+        self.assertEqual(service.get_job(kept)["status"], "pending")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.json_stream import JSONStreamParser
+
+
+def parse_in_chunks(data: bytes, chunk_size: int):
+    """Füttert den Parser blockweise und sammelt alle Werte."""
+    parser = JSONStreamParser()
+    values = []
+    for start in range(0, len(data), chunk_size):
+        values.extend(parser.feed(data[start:start + chunk_size]))
+    values.extend(parser.close())
+    return values
+
+
+class TestJSONStreamParser(unittest.TestCase):
+    """Tests für den inkrementellen JSON-Parser"""
+
+    def setUp(self):
+        self.documents = [
+            {"title": f"Dokument {i}", "content": "Öffnungszeiten: Mo–Fr {8–16 Uhr}, [Hinweis]", "metadata": {"nr": i}}
+            for i in range(50)
+        ]
+
+    def test_json_array_in_small_chunks(self):
+        """Ein JSON-Array wird unabhängig von der Blockgröße vollständig gelesen"""
+        data = json.dumps(self.documents, ensure_ascii=False).encode("utf-8")
+        for chunk_size in (1, 7, 64, len(data)):
+            self.assertEqual(parse_in_chunks(data, chunk_size), self.documents)
+
+    def test_ndjson(self):
+        """NDJSON wird zeilenweise gelesen"""
+        data = "\n".join(json.dumps(doc, ensure_ascii=False) for doc in self.documents).encode("utf-8")
+        self.assertEqual(parse_in_chunks(data, 13), self.documents)
+
+    def test_values_are_emitted_before_end_of_input(self):
+        """Vollständige Objekte werden sofort geliefert, nicht erst am Ende"""
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed(b'[{"title": "a", "content": "b"}, {"tit'), [{"title": "a", "content": "b"}])
+        self.assertEqual(parser.feed(b'le": "c", "content": "d"}]'), [{"title": "c", "content": "d"}])
+        self.assertEqual(parser.close(), [])
+
+    def test_unterminated_array_raises(self):
+        """Ein nicht abgeschlossenes Array führt zu einem Fehler"""
+        parser = JSONStreamParser()
+        parser.feed(b'[{"title": "a", "content": "b"}')
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_missing_separator_raises(self):
+        """Fehlende Kommas zwischen Array-Elementen werden erkannt"""
+        parser = JSONStreamParser()
+        with self.assertRaises(ValueError):
+            parser.feed(b'[{"a": 1} {"b": 2}]')
+
+    def test_trailing_and_leading_commas_raise(self):
+        """Kommas ohne folgenden bzw. vorangehenden Wert sind kein gültiges JSON"""
+        for data in (b'[{"a": 1},]', b'[{"a": 1}, ]', b'[,{"a": 1}]', b'[{"a": 1},,{"b": 2}]'):
+            with self.subTest(data=data):
+                parser = JSONStreamParser()
+                with self.assertRaises(ValueError):
+                    parser.feed(data)
+                    parser.close()
+        self.assertEqual(parse_in_chunks(b'[]', 1), [])
+
+    def test_escapes_and_scalars_across_chunk_boundaries(self):
+        """Escapes, Klammern in Strings und Zahlen werden auch über Blockgrenzen erkannt"""
+        values = [{"text": 'Zitat: \\"[x]\\" {y} \\\\'}, "frei", 12.5, True, None, [1, [2]]]
+        data = json.dumps(values).encode("utf-8")
+        for chunk_size in (1, 2, 3, 5):
+            self.assertEqual(parse_in_chunks(data, chunk_size), values)
+        self.assertEqual(parse_in_chunks(b'1\n2.5\n{"a": 3}', 1), [1, 2.5, {"a": 3}])
+
+    def test_incomplete_value_is_scanned_only_once(self):
+        """Ein großer Wert in vielen Blöcken wird nicht bei jedem Block erneut dekodiert"""
+        parser = JSONStreamParser()
+        with patch("app.utils.json_stream.json.loads", wraps=json.loads) as loads:
+            parser.feed(b'[{"content": "')
+            for _ in range(1000):
+                self.assertEqual(parser.feed(b"x" * 100), [])
+            self.assertEqual(len(parser.feed(b'"}]')), 1)
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(parser.close(), [])
+
+    def test_value_size_limit(self):
+        """Zu große Einzelwerte werden abgelehnt, damit der Speicher begrenzt bleibt"""
+        parser = JSONStreamParser(max_value_size=100)
+        with self.assertRaises(ValueError):
+            parser.feed(b'[{"content": "' + b"x" * 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import sys
+import tempfile
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import DocumentModel, TenantModel
+from app.services import lexical_index as lexical_module
+from app.services.lexical_index import LexicalIndex, LexicalIndexService, split_compound, stem, tokenize
+
+DOCUMENTS = [
+    ("doc-1", "Bürgeramt Mitte", "Das Bürgeramt befindet sich in der Hauptstr. 12. Termine nach Vereinbarung."),
+    ("doc-2", "Standesamt", "Eheschließungen und Geburtsurkunden. Das Amt ist montags geschlossen."),
+    ("doc-3", "Grundschulen", "Anmeldung an den Grundschulen der Stadt im Januar."),
+    ("doc-4", "Abfallkalender", "Die Termine der Müllabfuhr stehen im Abfallkalender."),
+]
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """Tests für den lexikalischen BM25-Index mit deutscher Tokenisierung"""
+
+    def _index(self):
+        index = LexicalIndex("tenant-1")
+        index.learn_vocabulary(f"{title} {content}" for _, title, content in DOCUMENTS)
+        for doc_id, title, content in DOCUMENTS:
+            index.upsert(doc_id, title, content)
+        return index
+
+    def test_german_tokenization_and_compounds(self):
+        """Umlaute, Straßenabkürzungen, Endungen und Komposita werden vereinheitlicht"""
+        self.assertEqual(tokenize("Wo ist die Hauptstr. 12?"), ["hauptstrasse", "12"])
+        self.assertEqual(tokenize("Straße"), ["strasse"])
+        self.assertEqual(stem("schulen"), stem("schule"))
+        self.assertEqual(split_compound("buergeramt", {"buerger"}), ["buerger", "amt"])
+        self.assertEqual(split_compound("geburtsurkunde", {"geburt", "urkunde"}), ["geburt", "urkunde"])
+        self.assertEqual(split_compound("rathaus", set()), [])
+
+    def test_search_ranks_exact_keywords_and_compound_parts(self):
+        """Exakte Begriffe ranken vorn; Teilwörter von Komposita und Schreibvarianten werden gefunden"""
+        index = self._index()
+        hits = index.search("Bürgeramt", limit=3)
+        self.assertEqual(hits[0]["id"], "doc-1")
+        self.assertEqual(hits[0]["coverage"], 1.0)
+        self.assertEqual({hit["id"] for hit in index.search("Amt")}, {"doc-1", "doc-2"})
+        self.assertEqual(index.search("Buergeramt Hauptstraße")[0]["id"], "doc-1")
+        self.assertEqual(index.search("Grundschule")[0]["id"], "doc-3")
+        self.assertEqual(index.search("Abfall")[0]["id"], "doc-4")
+        self.assertEqual(index.search("wann und wo"), [])
+
+    def test_incremental_updates_and_compaction(self):
+        """Geänderte und gelöschte Dokumente wirken sofort; die Verdichtung ändert keine Ergebnisse"""
+        index = self._index()
+        index.upsert("doc-2", "Standesamt", "Trauungen im Rathaus")
+        self.assertEqual(index.search("Geburtsurkunden"), [])
+        self.assertEqual(index.search("Trauungen")[0]["id"], "doc-2")
+
+        self.assertTrue(index.remove("doc-4"))
+        self.assertFalse(index.remove("doc-4"))
+        self.assertEqual(index.search("Abfallkalender"), [])
+        before = [(hit["id"], round(hit["score"], 4)) for hit in index.search("Termine Amt")]
+        index.compact()
+        self.assertEqual(index.get_stats()["slots"], 3)
+        self.assertEqual([(hit["id"], round(hit["score"], 4)) for hit in index.search("Termine Amt")], before)
+
+    def test_split_cache_is_bounded(self):
+        """Neue Wörter aus Suchanfragen lassen den Zerlegungs-Cache nicht unbegrenzt wachsen"""
+        index = self._index()
+        with patch.object(lexical_module, "MAX_CACHED_SPLITS", 20):
+            for i in range(100):
+                index.search(f"Suchwort{i} Bürgeramt")
+            self.assertEqual(len(index._splits), 20)
+            # Häufig benutzte Wörter bleiben erhalten
+            self.assertIn("buergeramt", index._splits)
+        self.assertEqual(index.search("Bürgeramt")[0]["id"], "doc-1")
+
+
+class TestLexicalIndexService(unittest.TestCase):
+    """Tests für Aufbau aus Postgres und Aktualisierung über den Cache-Invalidierungsbus"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel):
+            model.__table__.create(self.engine)
+        Session = sessionmaker(bind=self.engine)
+
+        @contextmanager
+        def session_scope():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        patcher = patch("app.db.session.session_scope", session_scope)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db = Session()
+        self.db.add(TenantModel(id="tenant-1", name="Stadt", api_key="key-1"))
+        for doc_id, title, content in DOCUMENTS:
+            self.db.add(DocumentModel(id=doc_id, tenant_id="tenant-1", title=title, content=content))
+        self.db.commit()
+        self.service = LexicalIndexService(include_structured=False)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_builds_once_and_applies_changed_documents(self):
+        """Der Index wird einmal aufgebaut; gemeldete Dokumente werden einzeln nachgeladen"""
+        hits = self.service.search("tenant-1", "Standesamt")
+        self.assertEqual(hits[0]["properties"]["document_id"], "doc-2")
+        self.assertEqual(hits[0]["class"], "lexical")
+
+        self.db.get(DocumentModel, "doc-2").content = "Trauungen im Rathaus"
+        self.db.delete(self.db.get(DocumentModel, "doc-3"))
+        self.db.add(DocumentModel(id="doc-5", tenant_id="tenant-1", title="Hundesteuer", content="Anmeldung eines Hundes"))
+        self.db.commit()
+        self.service.invalidate("tenant-1", ["doc-2", "doc-3", "doc-5"])
+
+        self.assertEqual(self.service.search("tenant-1", "Trauungen")[0]["id"], "doc-2")
+        self.assertEqual(self.service.search("tenant-1", "Grundschulen"), [])
+        self.assertEqual(self.service.search("tenant-1", "Hundesteuer")[0]["id"], "doc-5")
+        stats = self.service.get_stats()
+        self.assertEqual((stats["builds"], stats["incremental_updates"], stats["documents"]), (1, 3, 4))
+
+        # Ohne Dokument-IDs wird der Index neu aufgebaut
+        self.service.invalidate("tenant-1")
+        self.service.search("tenant-1", "Amt")
+        self.assertEqual(self.service.get_stats()["builds"], 2)
+
+    def test_first_stage_only_answers_short_fully_covered_queries(self):
+        """Die erste Stufe greift nur bei kurzen Stichwortfragen mit vollständig passendem Treffer"""
+        self.assertEqual(self.service.first_stage("tenant-1", "Bürgeramt Hauptstraße", 5)[0]["id"], "doc-1")
+        self.assertEqual(self.service.first_stage("tenant-1", "Bürgeramt Parkausweis", 5), [])
+        self.assertEqual(self.service.first_stage("tenant-1", "Bürgeramt", 5, max_terms=0), [])
+        self.assertEqual(self.service.first_stage("tenant-unbekannt", "Bürgeramt", 5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import importlib
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from passlib.context import CryptContext
+
+from app.core import security
+from app.core.security import PasswordHashingBusyError, pwd_context, verify_and_update_password
+
+
+class TestPasswordHashing(unittest.TestCase):
+    """Tests für die Passwort-Prüfung im Thread-Pool"""
+
+    def test_hash_with_other_work_factor_is_updated(self):
+        """Ein Hash mit abweichendem Work-Factor wird beim Login neu berechnet"""
+        current_rounds = pwd_context.to_dict()["bcrypt__rounds"]
+        other_rounds = 4 if current_rounds != 4 else 5
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=other_rounds).hash("geheim")
+
+        verified, new_hash = asyncio.run(verify_and_update_password("geheim", old_hash))
+        self.assertTrue(verified)
+        self.assertIsNotNone(new_hash)
+
+        verified, newer_hash = asyncio.run(verify_and_update_password("geheim", new_hash))
+        self.assertTrue(verified)
+        self.assertIsNone(newer_hash)
+
+        verified, _ = asyncio.run(verify_and_update_password("falsch", new_hash))
+        self.assertFalse(verified)
+
+    def test_full_queue_is_rejected(self):
+        """Ist die Warteschlange voll, wird die Prüfung sofort abgelehnt"""
+        saturated = security.settings.PASSWORD_HASH_CONCURRENCY + security.settings.PASSWORD_HASH_MAX_QUEUE
+        with patch.object(security, "_password_tasks_in_flight", saturated):
+            with self.assertRaises(PasswordHashingBusyError):
+                asyncio.run(verify_and_update_password("geheim", pwd_context.hash("geheim")))
+
+
+class TestUserPasswordUpdates(unittest.TestCase):
+    """Tests für das Setzen von Passwörtern über den UserService"""
+
+    def test_new_password_is_hashed_in_the_pool(self):
+        """Ein neues Passwort wird über den Passwort-Thread-Pool gehasht, nicht im Event-Loop"""
+        user_service_module = importlib.import_module("app.services.user_service")
+        user = SimpleNamespace(id="user-1", email="a@example.org", hashed_password="alt")
+        with patch.object(user_service_module.user_service, "get_user_by_id", return_value=user), \
+                patch.object(security, "_run_password_task", wraps=security._run_password_task) as pool_task:
+            asyncio.run(user_service_module.user_service.update_user(MagicMock(), "user-1", password="neu"))
+        pool_task.assert_called_once()
+        self.assertTrue(pwd_context.verify("neu", user.hashed_password))
+
+
+if __name__ == "__main__":
+    unittest.main()
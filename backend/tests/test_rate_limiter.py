@@ -0,0 +1,116 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import RateLimitMiddleware
+from app.services.rate_limiter import InMemoryRateLimitBackend, RateLimit, RateLimiter
+from app.services.tenant_cache import TenantCache
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests für die Token-Buckets"""
+
+    def setUp(self):
+        self.limiter = RateLimiter(default_limit=RateLimit(60, 5), default_client_limit=RateLimit(60, 2))
+
+    def test_bucket_allows_burst_then_rejects(self):
+        """Ein Bucket lässt `burst` Anfragen durch und lehnt danach mit Retry-After ab"""
+        backend = InMemoryRateLimitBackend()
+        limit = RateLimit(60, 3)
+        results = [backend.consume("key", limit) for _ in range(4)]
+        self.assertEqual([result.allowed for result in results], [True, True, True, False])
+        self.assertEqual(results[2].headers()[1], ("RateLimit-Remaining", "0"))
+        self.assertIn(("Retry-After", "1"), results[3].headers())
+
+    def test_tenant_config_overrides_limits(self):
+        """Limits aus TenantModel.config ersetzen die Standardwerte"""
+        tenant = SimpleNamespace(id="tenant-1", config={"rate_limit": {"burst": 50, "client_burst": 7}})
+        limit, client_limit = self.limiter.limits_for_tenant(tenant)
+        self.assertEqual((limit.burst, client_limit.burst), (50, 7))
+        self.assertEqual(limit.requests_per_minute, 60)
+
+        disabled = SimpleNamespace(id="tenant-2", config={"rate_limit": {"enabled": False}})
+        self.assertIsNone(self.limiter.limits_for_tenant(disabled))
+
+
+class TestRateLimitMiddleware(unittest.TestCase):
+    """Tests für die Rate-Limit-Middleware"""
+
+    def setUp(self):
+        self.tenant = SimpleNamespace(id="tenant-1", api_key="key-1", config=None)
+        self.cache = TenantCache(ttl=60, negative_ttl=60, max_entries=100)
+        self.cache.get_by_api_key("key-1", lambda: self.tenant)
+        self.cache.get_by_api_key("ungueltig", lambda: None)
+        self._patch = patch.object(rate_limit_module, "tenant_cache", self.cache)
+        self._patch.start()
+
+        app = FastAPI()
+
+        @app.get("/api/v1/chat/ping")
+        async def ping():
+            return {"ok": True}
+
+        @app.get("/api/v1/tenants/ping")
+        async def admin_ping():
+            return {"ok": True}
+
+        @app.get("/api/v1/chat-logs/ping")
+        async def chat_logs_ping():
+            return {"ok": True}
+
+        limiter = RateLimiter(default_limit=RateLimit(60, 3), default_client_limit=RateLimit(60, 2))
+        app.add_middleware(RateLimitMiddleware, limiter=limiter, paths=["/api/v1/chat"])
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self._patch.stop()
+
+    def test_client_is_limited_with_headers(self):
+        """Anfragen eines Clients werden begrenzt und erhalten RateLimit-Header"""
+        first = self.client.get("/api/v1/chat/ping", params={"api_key": "key-1"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["RateLimit-Limit"], "2")
+        self.assertEqual(first.headers["RateLimit-Remaining"], "1")
+
+        self.client.get("/api/v1/chat/ping", headers={"X-API-Key": "key-1"})
+        rejected = self.client.get("/api/v1/chat/ping", params={"api_key": "key-1"})
+        self.assertEqual(rejected.status_code, 429)
+        self.assertIn("Retry-After", rejected.headers)
+
+    def test_unlimited_paths_and_unknown_keys(self):
+        """Andere Pfade bleiben unbegrenzt, ungültige Keys werden pro Client begrenzt"""
+        for _ in range(5):
+            self.assertEqual(self.client.get("/api/v1/tenants/ping", params={"api_key": "key-1"}).status_code, 200)
+            self.assertEqual(self.client.get("/api/v1/chat-logs/ping", params={"api_key": "key-1"}).status_code, 200)
+
+        statuses = [self.client.get("/api/v1/chat/ping", params={"api_key": "ungueltig"}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_uncached_keys_are_limited_before_the_database_lookup(self):
+        """Nicht zwischengespeicherte Keys belasten zuerst den Client-Bucket; ist er leer, entfällt die Abfrage"""
+        lookups = []
+
+        async def load_tenant(api_key):
+            lookups.append(api_key)
+            return None
+
+        with patch.object(rate_limit_module, "_load_tenant_by_api_key", load_tenant):
+            statuses = [
+                self.client.get("/api/v1/chat/ping", params={"api_key": f"zufall-{i}"}).status_code
+                for i in range(4)
+            ]
+        self.assertEqual(statuses, [200, 200, 429, 429])
+        self.assertEqual(lookups, ["zufall-0", "zufall-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
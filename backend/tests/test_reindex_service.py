@@ -0,0 +1,346 @@
+import asyncio
+import importlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import (
+    DocumentModel,
+    ReindexJobModel,
+    ReindexJobTenantModel,
+    TenantCollectionModel,
+    TenantModel,
+)
+from app.services import reindex_service as reindex_module
+from app.services.reindex_service import ReindexService
+from app.services.weaviate import collection_registry as registry_module
+from app.services.weaviate import document_manager as document_manager_module
+from app.services.weaviate.collection_registry import CollectionRegistry
+from app.services.weaviate.schema_manager import SchemaManager
+
+# app.services exportiert unter diesem Namen die Singleton-Instanz
+structured_module = importlib.import_module("app.services.structured_data_service")
+
+
+class FakeWeaviate:
+    """Ersetzt weaviate_service.add_documents, zählt parallele Batches und kann Fehler auslösen."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.fail_after = None
+        self.after_batch = None
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def add_documents(self, tenant_id, documents, collection_name=None):
+        with self._lock:
+            if self.fail_after is not None and len(self.batches) >= self.fail_after:
+                raise ConnectionError("Weaviate nicht erreichbar")
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.batches.append((collection_name, [doc["id"] for doc in documents]))
+            if self.after_batch:
+                self.after_batch(len(self.batches))
+        return {"success": [doc["id"] for doc in documents], "failed": {}}
+
+
+class FakeCollections:
+    """Ersetzt client.collections: Objekte pro Collection als Dict UUID -> Properties."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def exists(self, name):
+        return name in self.objects
+
+    def get(self, name):
+        objects = self.objects.setdefault(name, {})
+
+        def insert_many(items):
+            objects.update({str(item.uuid): item.properties for item in items})
+            return SimpleNamespace(errors={})
+
+        def insert(uuid, properties, vector=None):
+            objects[str(uuid)] = properties
+
+        collection = MagicMock()
+        collection.iterator.side_effect = lambda **kwargs: [
+            SimpleNamespace(uuid=uuid, properties=dict(properties)) for uuid, properties in list(objects.items())
+        ]
+        collection.data.insert_many.side_effect = insert_many
+        collection.data.insert.side_effect = insert
+        return collection
+
+
+class TestReindexService(unittest.TestCase):
+    """Tests für fortsetzbare Reindex-Aufträge mit Checkpoints und Blue/Green-Umschaltung"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, DocumentModel, TenantCollectionModel, ReindexJobModel, ReindexJobTenantModel):
+            model.__table__.create(self.engine)
+        Session = sessionmaker(bind=self.engine)
+
+        @contextmanager
+        def session_scope():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        self.db = Session()
+        for tenant_id, count in (("tenant-1", 25), ("tenant-2", 7)):
+            self.db.add(TenantModel(id=tenant_id, name=tenant_id, api_key=f"key-{tenant_id}"))
+            for i in range(count):
+                self.db.add(DocumentModel(id=f"{tenant_id}-doc-{i:03d}", tenant_id=tenant_id,
+                                          title=f"Dokument {i}", content="Inhalt"))
+        self.db.commit()
+
+        self.fake = FakeWeaviate()
+        self.collections = FakeCollections()
+        self.registry = CollectionRegistry()
+        self.created = []
+        self.deleted = []
+        patches = [
+            patch.object(reindex_module, "session_scope", session_scope),
+            patch("app.db.session.session_scope", session_scope),
+            patch.object(reindex_module, "collection_registry", self.registry),
+            patch.object(registry_module, "collection_registry", self.registry),
+            patch.object(reindex_module, "OLD_COLLECTION_DROP_DELAY", 0),
+            patch.object(reindex_module.cache_bus, "publish"),
+            patch.object(reindex_module.weaviate_service, "add_documents", side_effect=self.fake.add_documents),
+            patch.object(structured_module, "get_client", return_value=SimpleNamespace(collections=self.collections)),
+            patch.object(structured_module, "collection_registry", self.registry),
+            patch.object(document_manager_module, "get_client", return_value=SimpleNamespace(collections=self.collections)),
+            patch.object(document_manager_module, "collection_registry", self.registry),
+            patch.object(document_manager_module.settings, "CLIENT_SIDE_EMBEDDING", False),
+            patch.object(SchemaManager, "create_tenant_schema",
+                         side_effect=lambda tenant_id, class_name=None: self.created.append(class_name) or True),
+            patch.object(SchemaManager, "delete_collection",
+                         side_effect=lambda class_name: self.deleted.append(class_name) or True),
+            patch.object(SchemaManager, "get_tenant_class_name",
+                         side_effect=lambda tenant_id: self.registry.resolve(tenant_id) or SchemaManager.get_base_class_name(tenant_id)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def _get_job(self, service, job_id):
+        # Die Testsession sieht sonst noch den Stand vor der Ausführung
+        self.db.expire_all()
+        return service.get_job(self.db, job_id)
+
+    def _written(self, collection=None):
+        return [doc_id for name, ids in self.fake.batches if collection in (None, name) for doc_id in ids]
+
+    def test_blue_green_job_writes_batches_in_parallel_and_swaps(self):
+        """Alle Dokumente landen in der neuen Collection; danach wird umgeschaltet und die alte gelöscht"""
+        self.fake.delay = 0.05
+        service = ReindexService(batch_size=4, concurrency=3)
+        job = service.create_job(self.db, blue_green=True)
+
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+
+        base = SchemaManager.get_base_class_name("tenant-1")
+        target = f"{base}R{job.id}"
+        self.assertEqual(sorted(self._written(target)), [f"tenant-1-doc-{i:03d}" for i in range(25)])
+        self.assertEqual(len(self._written()), 32)
+        self.assertLessEqual(self.fake.max_active, 3)
+        self.assertGreater(self.fake.max_active, 1)
+        self.assertIn(target, self.created)
+        self.assertIn(base, self.deleted)
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        self.assertIsNone(self.registry.pending("tenant-1"))
+
+        result = self._get_job(service, job.id)
+        self.assertEqual((result["status"], result["total"], result["processed"], result["progress"]),
+                         ("completed", 32, 32, 1.0))
+        self.assertEqual(result["tenants"][0]["checkpoint"], "tenant-1-doc-024")
+
+    def test_structured_data_copies_move_to_the_new_collection(self):
+        """Kopien strukturierter Daten (nicht in Postgres) werden vor dem Umschalten übernommen"""
+        base = SchemaManager.get_base_class_name("tenant-1")
+        self.collections.objects[base] = {
+            "m-1": {"title": "Bürgeramt", "source": "Structured Data (office)"},
+            "d-1": {"title": "Dokument 1", "source": "Manual Upload"},
+        }
+        service = ReindexService(batch_size=5, concurrency=1)
+        job = service.create_job(self.db, tenant_ids=["tenant-1"], blue_green=True)
+
+        # Ein Import während der Neuindizierung schreibt in beide Collections
+        def store_during_swap(count):
+            if count == 1:
+                with patch.object(SchemaManager, "class_exists", return_value=True):
+                    self.assertTrue(structured_module.structured_data_service.store_structured_data(
+                        "tenant-1", "school", {"name": "Grundschule"}
+                    ))
+                self.assertEqual(len(self.collections.objects[f"{base}R{job.id}"]), 1)
+        self.fake.after_batch = store_during_swap
+        with patch.object(structured_module.StructuredDataService, "create_schema_for_type", return_value=True):
+            self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+
+        target = f"{base}R{job.id}"
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        copied = self.collections.objects[target]
+        self.assertEqual(sorted(properties["source"] for properties in copied.values()),
+                         ["Structured Data (office)", "Structured Data (school)"])
+        self.assertIn("m-1", copied)
+        self.assertEqual(len(self.collections.objects[base]), 3)
+
+    def test_resume_continues_from_checkpoint(self):
+        """Nach einem Abbruch setzt der Auftrag am Checkpoint fort, ohne Batches erneut zu schreiben"""
+        service = ReindexService(batch_size=5, concurrency=1)
+        job = service.create_job(self.db, tenant_ids=["tenant-1"], blue_green=True)
+        self.fake.after_batch = lambda count: count == 2 and service._cancelled.add(job.id)
+
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "cancelled")
+        self.fake.after_batch = None
+        self.assertEqual(len(self._written()), 10)
+        base = SchemaManager.get_base_class_name("tenant-1")
+        target = f"{base}R{job.id}"
+        # Während der Neuindizierung wird in beide Collections geschrieben, gelesen aus der alten
+        self.assertEqual(self.registry.resolve("tenant-1"), base)
+        self.assertEqual(self.registry.write_targets("tenant-1", base), [base, target])
+
+        result = self._get_job(service, job.id)
+        self.assertEqual((result["tenants"][0]["status"], result["tenants"][0]["checkpoint"]),
+                         ("pending", "tenant-1-doc-009"))
+
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+        written = self._written()
+        self.assertEqual(written, [f"tenant-1-doc-{i:03d}" for i in range(25)])
+        self.assertEqual(self.created.count(target), 2)
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        self.assertEqual(self._get_job(service, job.id)["processed"], 25)
+
+        with self.assertRaises(ValueError):
+            service._claim(job.id)
+
+    def test_single_documents_are_written_to_the_new_collection(self):
+        """Während einer Neuindizierung einzeln hinzugefügte Dokumente landen auch in der neuen Collection"""
+        service = ReindexService(batch_size=5, concurrency=1)
+        job = service.create_job(self.db, tenant_ids=["tenant-1"], blue_green=True)
+        self.fake.after_batch = lambda count: count == 1 and service._cancelled.add(job.id)
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "cancelled")
+
+        base = SchemaManager.get_base_class_name("tenant-1")
+        target = f"{base}R{job.id}"
+        with patch.object(SchemaManager, "class_exists", return_value=True):
+            doc_id = document_manager_module.DocumentManager.add_document("tenant-1", "Neu", "Inhalt")
+        self.assertIn(doc_id, self.collections.objects[base])
+        self.assertIn(doc_id, self.collections.objects[target])
+
+    def test_failed_tenant_discards_new_collection(self):
+        """Schlägt ein Tenant fehl, wird die neue Collection abgemeldet und gelöscht; ein Neustart beginnt von vorn"""
+        service = ReindexService(batch_size=5, concurrency=1)
+        job = service.create_job(self.db, tenant_ids=["tenant-1"], blue_green=True)
+        self.fake.fail_after = 2
+
+        with patch.object(reindex_module, "MAX_BATCH_ATTEMPTS", 1):
+            self.assertEqual(asyncio.run(service.run_job(job.id)), "failed")
+        base = SchemaManager.get_base_class_name("tenant-1")
+        target = f"{base}R{job.id}"
+        # Änderungen gehen wieder nur in die aktive Collection
+        self.assertIsNone(self.registry.pending("tenant-1"))
+        self.assertEqual(self.registry.resolve("tenant-1"), base)
+        self.assertEqual(self.deleted, [target])
+        tenant = self._get_job(service, job.id)["tenants"][0]
+        self.assertEqual((tenant["status"], tenant["checkpoint"], tenant["processed"]), ("failed", None, 0))
+
+        self.fake.fail_after = None
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+        self.assertEqual(len(self._written()), 35)
+        self.assertEqual(self._written()[10:], [f"tenant-1-doc-{i:03d}" for i in range(25)])
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        self.assertEqual(self.deleted, [target, base])
+        self.assertEqual(self._get_job(service, job.id)["processed"], 25)
+
+    def test_resume_after_swap_drops_previous_collection(self):
+        """Bricht der Prozess nach der Umschaltung ab, löscht der fortgesetzte Auftrag trotzdem die alte Collection"""
+        service = ReindexService(batch_size=10, concurrency=1)
+        job = service.create_job(self.db, tenant_ids=["tenant-1"], blue_green=True)
+        base = SchemaManager.get_base_class_name("tenant-1")
+        target = f"{base}R{job.id}"
+
+        with patch.object(SchemaManager, "delete_collection", side_effect=RuntimeError("Prozess beendet")):
+            self.assertEqual(asyncio.run(service.run_job(job.id)), "failed")
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        tenant = self._get_job(service, job.id)["tenants"][0]
+        self.assertEqual((tenant["status"], tenant["previous_collection"]), ("running", base))
+
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+        self.assertEqual(self.deleted, [base])
+        self.assertEqual(self.registry.resolve("tenant-1"), target)
+        self.assertIsNone(self.registry.pending("tenant-1"))
+        # Keine Dokumente erneut geschrieben
+        self.assertEqual(len(self._written()), 25)
+
+    def test_running_job_with_fresh_heartbeat_is_not_claimed_twice(self):
+        """Ein Auftrag mit aktuellem Lebenszeichen kann nicht in einem zweiten Prozess starten"""
+        service = ReindexService(lease_seconds=120)
+        job = service.create_job(self.db, tenant_ids=["tenant-2"], blue_green=False)
+        service._claim(job.id)
+        with self.assertRaises(ValueError):
+            service._claim(job.id)
+
+        # Ohne Lebenszeichen seit der Lease-Zeit gilt der Auftrag als verwaist
+        service.lease_seconds = 0
+        self.assertEqual(asyncio.run(service.run_job(job.id)), "completed")
+        self.assertEqual(set(self.fake.batches[0][1]), {f"tenant-2-doc-{i:03d}" for i in range(7)})
+        self.assertEqual(self.deleted, [])
+
+    def test_cancelled_job_is_not_resumed_while_its_owner_runs(self):
+        """Nach einem Abbruch darf der Auftrag erst fortgesetzt werden, wenn der ausführende Prozess beendet ist"""
+        service = ReindexService(lease_seconds=120)
+        job = service.create_job(self.db, tenant_ids=["tenant-2"], blue_green=False)
+        service._claim(job.id)
+        other = ReindexService(lease_seconds=120)
+        self.assertTrue(other.cancel(self.db, job.id))
+        with self.assertRaisesRegex(ValueError, "wird noch beendet"):
+            other._claim(job.id)
+
+        # Der ausführende Prozess bemerkt den Abbruch und beendet den Auftrag
+        service._finish_job(job.id, "cancelled", None)
+        self.assertEqual(asyncio.run(other.run_job(job.id)), "completed")
+
+    def test_registry_resyncs_without_cache_bus_event(self):
+        """Geht das Ereignis einer Umschaltung verloren, liest die Registry die Zuordnung regelmäßig neu"""
+        base = SchemaManager.get_base_class_name("tenant-1")
+        stale = CollectionRegistry(resync_seconds=3600)
+        fresh = CollectionRegistry(resync_seconds=0)
+        self.assertIsNone(stale.resolve("tenant-1"))
+        self.assertIsNone(fresh.resolve("tenant-1"))
+
+        # Umschaltung durch einen anderen Worker, ohne Ereignis über den Bus
+        self.db.add(TenantCollectionModel(tenant_id="tenant-1", active_collection=f"{base}R1"))
+        self.db.commit()
+        self.assertIsNone(stale.resolve("tenant-1"))
+        self.assertEqual(fresh.resolve("tenant-1"), f"{base}R1")
+
+
+if __name__ == "__main__":
+    unittest.main()
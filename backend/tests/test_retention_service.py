@@ -0,0 +1,220 @@
+import json
+import sys
+import tempfile
+import unittest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.models import StructuredRetentionRunModel, TenantModel
+from app.services import retention_service as retention_module
+from app.services.retention_service import RetentionService
+from app.services.structured_data_service import StructuredDataService
+from app.services.weaviate.circuit_breaker import WeaviateUnavailableError
+from app.services.weaviate.schema_manager import SchemaManager
+
+NOW = datetime(2025, 3, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeCollection:
+    """Weaviate-Collection im Speicher; versteht ID-Filter und "kleiner als" auf Eigenschaften."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self.fetched = []
+        self.query = SimpleNamespace(fetch_objects=self.fetch_objects)
+        self.data = SimpleNamespace(delete_many=self.delete_many)
+
+    def _matches(self, filters, object_id, properties):
+        if filters.target == "_id":
+            return object_id in filters.value
+        value = properties.get(filters.target)
+        return value is not None and value < filters.value
+
+    def fetch_objects(self, filters, limit, return_properties=None):
+        self.fetched.append(filters.target)
+        matches = [
+            SimpleNamespace(uuid=object_id, properties=properties)
+            for object_id, properties in self.objects.items()
+            if self._matches(filters, object_id, properties)
+        ]
+        return SimpleNamespace(objects=matches[:limit])
+
+    def delete_many(self, where):
+        deleted = [object_id for object_id in where.value if self.objects.pop(object_id, None) is not None]
+        return SimpleNamespace(successful=len(deleted))
+
+    def iterator(self, return_properties=None):
+        return [SimpleNamespace(uuid=object_id, properties=properties) for object_id, properties in self.objects.items()]
+
+
+def structured(data_type, **dates):
+    """Strukturierter Datensatz samt durchsuchbarer Kopie mit abgeleiteter UUID."""
+    doc_id = str(uuid.uuid4())
+    mirror = {"source": f"Structured Data ({data_type})", "metadata": json.dumps({"type": data_type, "original_id": doc_id})}
+    return doc_id, dates, StructuredDataService.get_mirror_uuid(doc_id), mirror
+
+
+class TestRetentionPolicies(unittest.TestCase):
+    """Tests für die Aufbewahrungsfristen"""
+
+    def test_policies_from_settings_and_tenant_config(self):
+        """Ungültige Angaben werden übergangen; Tenants ergänzen Fristen oder schalten sie mit null ab"""
+        service = RetentionService(policies="event=30, webpage=90, unknown=5, school=bald")
+        self.assertEqual(service.policies, {"event": 30, "webpage": 90})
+        self.assertEqual(service.policies_for_tenant(None), {"event": 30, "webpage": 90})
+        self.assertEqual(
+            service.policies_for_tenant({"retention": {"event": 7, "webpage": None, "school": 14, "office": "bald"}}),
+            {"event": 7, "school": 14}
+        )
+
+
+class TestRetentionPurge(unittest.TestCase):
+    """Tests für das Löschen abgelaufener Datensätze in Weaviate"""
+
+    def test_expired_records_are_deleted_in_batches_with_their_mirrors(self):
+        """Vergangene Veranstaltungen und veraltete Importe samt Kopien; verwaiste Kopien fallen mit weg"""
+        tenant_id = "tenant-1"
+        past = [structured("event", endDate=NOW - timedelta(days=40)) for _ in range(5)]
+        upcoming = structured("event", endDate=NOW + timedelta(days=3))
+        undated = structured("event", hasDate=False)
+        stale_page = structured("webpage", importedAt=NOW - timedelta(days=11))
+        fresh_page = structured("webpage", importedAt=NOW - timedelta(days=1))
+
+        events = FakeCollection({doc_id: props for doc_id, props, _, _ in past + [upcoming, undated]})
+        webpages = FakeCollection({doc_id: props for doc_id, props, _, _ in (stale_page, fresh_page)})
+        mirrors = FakeCollection({
+            mirror_id: mirror for _, _, mirror_id, mirror in past + [upcoming, undated, stale_page, fresh_page]
+        })
+        # Kopie aus einem Import vor den abgeleiteten UUIDs, deren Datensatz bereits fehlt, und ein Dokument
+        legacy_orphan = str(uuid.uuid4())
+        mirrors.objects[legacy_orphan] = structured("event")[3]
+        mirrors.objects[str(uuid.uuid4())] = {"source": "upload", "metadata": "{}"}
+
+        tenant_class = SchemaManager.get_base_class_name(tenant_id)
+        collections = {
+            StructuredDataService.get_class_name(tenant_id, "event"): events,
+            StructuredDataService.get_class_name(tenant_id, "webpage"): webpages,
+            tenant_class: mirrors,
+        }
+        client = SimpleNamespace(collections=SimpleNamespace(
+            exists=lambda name: name in collections,
+            get=lambda name: collections[name]
+        ))
+
+        service = RetentionService(policies="event=30,webpage=10,school=5", batch_size=2)
+        with patch.object(retention_module, "get_client", return_value=client), \
+                patch.object(SchemaManager, "get_tenant_class_name", return_value=tenant_class):
+            reclaimed = service.purge_tenant(tenant_id, service.policies, now=NOW)
+
+        self.assertEqual(reclaimed, {"event": 5, "webpage": 1, "orphans": 1})
+        self.assertEqual(set(events.objects), {upcoming[0], undated[0]})
+        self.assertEqual(set(webpages.objects), {fresh_page[0]})
+        self.assertEqual(len(mirrors.objects), 4)
+        self.assertNotIn(legacy_orphan, mirrors.objects)
+        # Drei Batches à zwei IDs, der letzte unvollständig
+        self.assertEqual(events.fetched.count("endDate"), 3)
+
+
+class TestRetentionRuns(unittest.TestCase):
+    """Tests für geplante Läufe und ihre Protokolle"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        for model in (TenantModel, StructuredRetentionRunModel):
+            model.__table__.create(self.engine)
+        Session = sessionmaker(bind=self.engine)
+
+        @contextmanager
+        def session_scope():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        self.db = Session()
+        self.db.add(TenantModel(id="tenant-1", name="Stadt", api_key="key-1"))
+        self.db.add(TenantModel(id="tenant-2", name="Kreis", api_key="key-2", config={"retention": {"event": None}}))
+        self.db.commit()
+
+        self.publish = patch.object(retention_module.cache_bus, "publish").start()
+        for patcher in (
+            patch.object(retention_module, "session_scope", session_scope),
+            patch.object(retention_module, "engine", self.engine),
+        ):
+            patcher.start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_runs_record_reclaimed_counts_per_tenant(self):
+        """Jeder Tenant bekommt ein Protokoll; Fehler behalten die bis dahin gelöschten Objekte"""
+        def purge(tenant_id, policies, now=None, reclaimed=None):
+            if tenant_id == "tenant-1":
+                self.assertEqual(policies, {"event": 30})
+                reclaimed.update({"event": 12, "orphans": 3})
+                return reclaimed
+            self.assertEqual(policies, {})
+            reclaimed["webpage"] = 2
+            raise WeaviateUnavailableError("offen")
+
+        service = RetentionService(policies="event=30", interval_seconds=3600)
+        with patch.object(service, "purge_tenant", side_effect=purge):
+            self.assertEqual(service.run_scheduled(), {"tenant-1": {"event": 12, "orphans": 3}, "tenant-2": {"webpage": 2}})
+            # Der letzte Lauf liegt noch nicht lange genug zurück
+            self.assertIsNone(service.run_scheduled())
+
+        runs = {run["tenant_id"]: run for run in service.list_runs(self.db)}
+        self.assertEqual((runs["tenant-1"]["total"], runs["tenant-1"]["error"]), (15, None))
+        self.assertEqual(runs["tenant-2"]["reclaimed"], {"webpage": 2})
+        self.assertIn("offen", runs["tenant-2"]["error"])
+        self.assertEqual(sorted(call.args[1] for call in self.publish.call_args_list), ["tenant-1", "tenant-2"])
+        self.assertEqual(service.get_stats()["reclaimed"], 17)
+
+        # Manuelle Läufe sind jederzeit möglich, aber nicht parallel zu einem laufenden
+        with patch.object(service, "purge_tenant", return_value={}):
+            self.assertEqual(service.run_all(["tenant-1"]), {"tenant-1": {}})
+            with service._exclusive():
+                with self.assertRaises(ValueError):
+                    service.run_all()
+        self.assertEqual(len(service.list_runs(self.db, "tenant-1")), 2)
+
+    def test_run_without_tenants_is_recorded(self):
+        """Auch ohne Tenants wird der Lauf protokolliert, damit er nicht bei jeder Prüfung erneut fällig ist"""
+        self.db.query(TenantModel).delete()
+        self.db.commit()
+        service = RetentionService(policies="event=30", interval_seconds=3600)
+        with patch.object(service, "purge_tenant") as purge:
+            self.assertEqual(service.run_scheduled(), {})
+            self.assertIsNone(service.run_scheduled())
+        purge.assert_not_called()
+        self.assertEqual([run["tenant_id"] for run in service.list_runs(self.db)], [retention_module.EMPTY_RUN_TENANT_ID])
+
+    def test_manual_runs_do_not_postpone_the_schedule(self):
+        """Nur geplante Läufe bestimmen den nächsten Termin; manuelle Läufe für einzelne Tenants nicht"""
+        service = RetentionService(policies="event=30", interval_seconds=3600)
+        with patch.object(service, "purge_tenant", return_value={}) as purge:
+            self.assertEqual(service.run_all(["tenant-1"]), {"tenant-1": {}})
+            self.assertEqual(service.run_scheduled(), {"tenant-1": {}, "tenant-2": {}})
+            self.assertIsNone(service.run_scheduled())
+        self.assertEqual(purge.call_count, 3)
+        scheduled = [run["tenant_id"] for run in service.list_runs(self.db) if run["scheduled"]]
+        self.assertEqual(sorted(scheduled), ["tenant-1", "tenant-2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.weaviate import search_manager as search_manager_module
+from app.services.weaviate.health_manager import HealthManager
+from app.services.weaviate.schema_validator import TenantSchemaValidator
+from app.services.weaviate.search_manager import SearchManager
+
+
+class FakeWeaviate:
+    """Ersetzt die Prüfung einer Tenant-Klasse und zählt gleichzeitige Aufrufe."""
+
+    def __init__(self, results=None, delay=0.0):
+        self.results = results or {}
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def check_tenant_class(self, tenant_id):
+        with self._lock:
+            self.calls.append(tenant_id)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return self.results.get(tenant_id, "valid")
+
+
+class TestTenantSchemaValidator(unittest.TestCase):
+    """Tests für die Validierung der Tenant-Klassen im Hintergrund und beim ersten Zugriff"""
+
+    def _patch(self, fake, tenant_ids=()):
+        for name, value in (("check_tenant_class", fake.check_tenant_class),
+                            ("get_tenant_ids", lambda: list(tenant_ids))):
+            patcher = patch.object(HealthManager, name, side_effect=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_background_validation_is_bounded_and_reports_progress(self):
+        """Alle Tenants werden mit höchstens `concurrency` parallelen Prüfungen validiert"""
+        tenant_ids = [f"tenant-{i}" for i in range(12)]
+        fake = FakeWeaviate(results={"tenant-3": "created", "tenant-7": "failed"}, delay=0.05)
+        self._patch(fake, tenant_ids)
+        validator = TenantSchemaValidator(concurrency=3)
+        self.assertEqual(validator.get_progress()["state"], "idle")
+
+        async def run():
+            validator.start()
+            await asyncio.sleep(0.02)
+            running = validator.get_progress()
+            await validator._task
+            return running
+
+        running = asyncio.run(run())
+        self.assertEqual(running["state"], "running")
+        self.assertLess(running["processed"], 12)
+
+        progress = validator.get_progress()
+        self.assertEqual((progress["state"], progress["processed"], progress["progress"]), ("done", 12, 1.0))
+        self.assertEqual((progress["valid"], progress["created"], progress["failed"]), (10, 1, 1))
+        self.assertEqual(progress["lazy_checks"], 0)
+        self.assertEqual(fake.max_active, 3)
+        self.assertEqual(sorted(fake.calls), sorted(tenant_ids))
+
+    def test_lazy_check_runs_once_per_tenant(self):
+        """Gleichzeitige erste Zugriffe prüfen einen Tenant nur einmal; danach ohne Weaviate-Aufruf"""
+        fake = FakeWeaviate(delay=0.05)
+        self._patch(fake)
+        validator = TenantSchemaValidator()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(validator.ensure_tenant, ["tenant-1"] * 8))
+        self.assertEqual(results, [True] * 8)
+        self.assertTrue(validator.ensure_tenant("tenant-1"))
+        self.assertEqual(fake.calls, ["tenant-1"])
+        self.assertEqual(validator.get_progress()["lazy_checks"], 1)
+
+        # Bereits geprüfte Tenants überspringt auch die Hintergrund-Validierung
+        patcher = patch.object(HealthManager, "get_tenant_ids", return_value=["tenant-1", "tenant-2"])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        asyncio.run(validator._run())
+        self.assertEqual(fake.calls, ["tenant-1", "tenant-2"])
+
+    def test_failed_tenant_is_retried_after_wait(self):
+        """Ein fehlgeschlagener Tenant wird erst nach der Wartezeit erneut geprüft"""
+        fake = FakeWeaviate(results={"tenant-1": "failed"})
+        self._patch(fake)
+        validator = TenantSchemaValidator(retry_seconds=60)
+
+        self.assertFalse(validator.ensure_tenant("tenant-1"))
+        self.assertFalse(validator.ensure_tenant("tenant-1"))
+        self.assertEqual(len(fake.calls), 1)
+
+        validator.retry_seconds = 0
+        fake.results["tenant-1"] = "created"
+        self.assertTrue(validator.ensure_tenant("tenant-1"))
+        self.assertEqual(len(fake.calls), 2)
+
+        validator.forget("tenant-1")
+        validator.ensure_tenant("tenant-1")
+        self.assertEqual(len(fake.calls), 3)
+
+    def test_search_checks_tenant_on_first_use(self):
+        """Auch die Suche des RAG-Pfads (SearchManager direkt) prüft den Tenant beim ersten Zugriff"""
+        fake = FakeWeaviate()
+        self._patch(fake)
+        validator = TenantSchemaValidator()
+        client = MagicMock()
+        client.collections.exists.return_value = False
+        with patch.object(search_manager_module, "schema_validator", validator), \
+                patch.object(search_manager_module, "get_client", return_value=client):
+            SearchManager.search("tenant-1", "Öffnungszeiten")
+            SearchManager.search("tenant-1", "Öffnungszeiten")
+        self.assertEqual(fake.calls, ["tenant-1"])
+        self.assertEqual(validator.lazy_checks, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.startup_profiler import (
+    LAZY_MODULES,
+    StartupProfiler,
+    parse_importtime,
+    profile_imports,
+    top_level_import_times,
+)
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     fastapi.types
+import time:      3000 |       3120 |   fastapi
+import time:       500 |        500 |   app.core.config
+import time:      1000 |       4620 | app.main
+"""
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Tests für die Messung der Startzeit"""
+
+    def test_parse_importtime_and_package_totals(self):
+        """Die Ausgabe von -X importtime wird pro Modul und pro Paket ausgewertet"""
+        entries = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual([e["module"] for e in entries], ["fastapi.types", "fastapi", "app.core.config", "app.main"])
+        self.assertEqual(entries[0]["depth"], 2)
+        self.assertEqual(entries[-1]["cumulative_us"], 4620)
+        self.assertEqual(top_level_import_times(entries), {"fastapi": 3120, "app": 1500})
+
+    def test_steps_separate_critical_path_from_background(self):
+        """Hintergrund-Schritte zählen nicht zum kritischen Pfad; Fehler werden vermerkt"""
+        profiler = StartupProfiler()
+        profiler.record("import app.main", 120.0)
+        with profiler.step("weaviate_validation", background=True):
+            self.assertIn("weaviate_validation", profiler.get_stats()["running"])
+        with self.assertRaises(RuntimeError):
+            with profiler.step("cache_bus"):
+                raise RuntimeError("Verbindung fehlgeschlagen")
+
+        stats = profiler.get_stats()
+        self.assertEqual([s["status"] for s in stats["steps"]], ["ok", "ok", "error"])
+        self.assertEqual(stats["running"], {})
+        self.assertLess(stats["critical_path_ms"] - 120.0, 50)
+
+    def test_app_import_does_not_load_heavy_dependencies(self):
+        """Der Import von app.main lädt keine der verzögert geladenen Abhängigkeiten"""
+        packages = top_level_import_times(profile_imports("app.main"))
+        self.assertIn("fastapi", packages)
+        self.assertEqual([m for m in LAZY_MODULES if m in packages], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
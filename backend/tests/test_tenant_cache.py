@@ -0,0 +1,78 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.tenant_cache import TenantCache
+
+
+class CountingLoader:
+    """Liefert einen festen Wert und zählt die Datenbankzugriffe."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestTenantCache(unittest.TestCase):
+    """Tests für den Tenant-Cache"""
+
+    def setUp(self):
+        self.cache = TenantCache(ttl=60, negative_ttl=60, max_entries=100)
+        self.tenant = SimpleNamespace(id="tenant-1", api_key="key-1", name="Stadt")
+
+    def test_lookup_by_api_key_is_cached(self):
+        """Wiederholte Abfragen desselben API-Keys laden den Tenant nur einmal"""
+        loader = CountingLoader(self.tenant)
+        for _ in range(5):
+            self.assertIs(self.cache.get_by_api_key("key-1", loader), self.tenant)
+        self.assertEqual(loader.calls, 1)
+
+    def test_api_key_lookup_fills_id_index(self):
+        """Ein per API-Key geladener Tenant ist auch über seine ID abrufbar"""
+        self.cache.get_by_api_key("key-1", CountingLoader(self.tenant))
+        loader = CountingLoader(None)
+        self.assertIs(self.cache.get_by_id("tenant-1", loader), self.tenant)
+        self.assertEqual(loader.calls, 0)
+
+    def test_unknown_api_key_is_cached_negatively(self):
+        """Ungültige API-Keys werden ebenfalls zwischengespeichert"""
+        loader = CountingLoader(None)
+        self.assertIsNone(self.cache.get_by_api_key("unbekannt", loader))
+        self.assertIsNone(self.cache.get_by_api_key("unbekannt", loader))
+        self.assertEqual(loader.calls, 1)
+
+    def test_invalidate_removes_all_entries_of_tenant(self):
+        """Nach einer Invalidierung wird der Tenant neu geladen"""
+        self.cache.get_by_api_key("key-1", CountingLoader(self.tenant))
+        self.cache.invalidate("tenant-1")
+        loader = CountingLoader(self.tenant)
+        self.cache.get_by_api_key("key-1", loader)
+        self.cache.get_by_id("tenant-1", loader)
+        self.assertEqual(loader.calls, 1)
+
+    def test_invalidate_api_key_clears_negative_entry(self):
+        """Ein neu vergebener API-Key ist nach der Invalidierung sofort gültig"""
+        self.cache.get_by_api_key("key-1", CountingLoader(None))
+        self.cache.invalidate("tenant-1", api_key="key-1")
+        self.assertIs(self.cache.get_by_api_key("key-1", CountingLoader(self.tenant)), self.tenant)
+
+    def test_expired_entries_are_reloaded(self):
+        """Einträge verfallen nach Ablauf der TTL"""
+        cache = TenantCache(ttl=0.01, negative_ttl=0.01, max_entries=100)
+        loader = CountingLoader(self.tenant)
+        cache.get_by_id("tenant-1", loader)
+        cache._by_id["tenant-1"] = (self.tenant, 0)
+        cache.get_by_id("tenant-1", loader)
+        self.assertEqual(loader.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
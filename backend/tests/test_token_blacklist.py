@@ -0,0 +1,71 @@
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.security import create_access_token, decode_token
+from app.db.models import CacheInvalidationEventModel
+from app.models.token import TokenBlacklist
+from app.services import cache_bus as cache_bus_module
+from app.services.token_blacklist_service import TokenBlacklistService, token_identifier
+
+
+class TestTokenBlacklistService(unittest.TestCase):
+    """Tests für die Token-Blacklist im Speicher"""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        TokenBlacklist.__table__.create(self.engine)
+        CacheInvalidationEventModel.__table__.create(self.engine)
+        self._original_engine = cache_bus_module.engine
+        cache_bus_module.engine = self.engine
+        self.db = sessionmaker(bind=self.engine)()
+        self.service = TokenBlacklistService()
+
+    def tearDown(self):
+        self.db.close()
+        cache_bus_module.engine = self._original_engine
+        self.engine.dispose()
+
+    def test_revoked_token_is_blacklisted(self):
+        """Ein abgemeldetes Token wird über seinen jti-Claim erkannt"""
+        token = create_access_token("user-1")
+        payload = decode_token(token)
+        self.assertFalse(self.service.is_blacklisted(self.db, token_identifier(token, payload)))
+
+        jti = self.service.revoke(self.db, token, payload)
+        self.assertEqual(jti, payload["jti"])
+        self.assertTrue(self.service.is_blacklisted(self.db, jti))
+        self.assertFalse(self.service.is_blacklisted(self.db, token_identifier(create_access_token("user-1"))))
+
+    def test_blacklist_is_loaded_from_database(self):
+        """Ein neuer Prozess lädt die bestehenden Einträge beim ersten Zugriff"""
+        token = create_access_token("user-1")
+        jti = self.service.revoke(self.db, token, decode_token(token))
+
+        fresh = TokenBlacklistService()
+        self.assertTrue(fresh.is_blacklisted(self.db, jti))
+
+    def test_expired_entries_are_pruned(self):
+        """Abgelaufene Einträge verschwinden aus dem Speicher und der Tabelle"""
+        self.db.add(TokenBlacklist(jti="abgelaufen", expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        self.db.commit()
+        self.service.add("abgelaufen", time.time() - 60)
+
+        self.assertFalse(self.service.is_blacklisted(self.db, "abgelaufen"))
+        self.assertEqual(self.service.prune(self.db), 1)
+        self.assertEqual(self.db.query(TokenBlacklist).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Pfad zum Root-Verzeichnis des Projekts hinzufügen
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.weaviate.embedding_manager import EmbeddingManager
+from app.services.weaviate.vector_cache import VectorCache
+
+
+def vector(seed, dimension=4):
+    return np.full(dimension, seed, dtype=np.float32)
+
+
+def write_entries(cache_dir, worker, count):
+    """Schreibt Einträge aus einem eigenen Prozess (wie ein weiterer Uvicorn-Worker)."""
+    cache = VectorCache(cache_dir, initial_capacity=4)
+    for i in range(count):
+        cache.put_many({f"w{worker}-{i}": vector(worker * 1000 + i)})
+
+
+class FakeModel:
+    """Ersetzt den Sentence-Transformer und zählt die eingebetteten Texte."""
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+        self.encoded = []
+
+    def encode(self, texts, batch_size=None, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return [vector(len(text) + self.offset) for text in texts]
+
+
+class TestVectorCache(unittest.TestCase):
+    """Tests für den persistenten Vektor-Cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, "vectors")
+
+    def test_hits_misses_and_persistence(self):
+        """Gespeicherte Vektoren werden gefunden und überstehen einen Neustart, auch nach Vergrößerung"""
+        cache = VectorCache(self.cache_dir, initial_capacity=2)
+        self.assertEqual(cache.get_many(["a"]), {})
+        cache.put_many({key: vector(i) for i, key in enumerate("abcde")})
+        found = cache.get_many(["a", "e", "x"])
+        self.assertEqual(sorted(found), ["a", "e"])
+        np.testing.assert_array_equal(found["e"], vector(4))
+        self.assertEqual((cache.get_stats()["hits"], cache.get_stats()["misses"]), (2, 2))
+
+        reloaded = VectorCache(self.cache_dir)
+        self.assertEqual(reloaded.get_stats()["entries"], 5)
+        np.testing.assert_array_equal(reloaded.get_many(["c"])["c"], vector(2))
+
+    def test_instances_sharing_a_directory_do_not_lose_entries(self):
+        """Zwei Instanzen im selben Verzeichnis vergeben keine Zeile doppelt und sehen die Einträge der anderen"""
+        first = VectorCache(self.cache_dir, initial_capacity=2)
+        second = VectorCache(self.cache_dir, initial_capacity=2)
+        first.put_many({"a": vector(1), "b": vector(2)})
+        second.put_many({"c": vector(3), "d": vector(4), "e": vector(5)})
+        first.put_many({"f": vector(6)})
+
+        np.testing.assert_array_equal(second.get_many(["f"])["f"], vector(6))
+        reloaded = VectorCache(self.cache_dir)
+        found = reloaded.get_many(list("abcdef"))
+        self.assertEqual([float(found[key][0]) for key in "abcdef"], [1, 2, 3, 4, 5, 6])
+
+    def test_concurrent_processes(self):
+        """Parallel schreibende Prozesse verlieren keine Einträge"""
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=write_entries, args=(self.cache_dir, worker, 25)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+        cache = VectorCache(self.cache_dir)
+        self.assertEqual(cache.get_stats()["entries"], 100)
+        found = cache.get_many([f"w{worker}-{i}" for worker in range(4) for i in range(25)])
+        self.assertTrue(all(found[f"w{w}-{i}"][0] == w * 1000 + i for w in range(4) for i in range(25)))
+
+    def test_legacy_index_is_converted(self):
+        """Ein Index im früheren JSON-Format wird übernommen"""
+        cache = VectorCache(self.cache_dir)
+        cache.put_many({"a": vector(7)})
+        os.remove(os.path.join(self.cache_dir, VectorCache.INDEX_FILE))
+        with open(os.path.join(self.cache_dir, VectorCache.LEGACY_INDEX_FILE), "w", encoding="utf-8") as f:
+            f.write('{"dimension": 4, "count": 1, "rows": {"a": 0}}')
+
+        np.testing.assert_array_equal(VectorCache(self.cache_dir).get_many(["a"])["a"], vector(7))
+
+
+class TestEmbeddingManager(unittest.TestCase):
+    """Tests für die clientseitigen Embeddings mit Cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_cached_texts_are_not_embedded_again(self):
+        """Nur unbekannte Texte gehen an das Modell; Duplikate innerhalb eines Aufrufs nur einmal"""
+        manager = EmbeddingManager("modell-a", self.tmp.name, batch_size=2)
+        manager._model = FakeModel()
+        vectors = manager.embed_texts(["eins", "zwei", "eins", "drei"])
+        self.assertEqual(manager._model.encoded, ["eins", "zwei", "drei"])
+        self.assertEqual(vectors[0], vectors[2])
+
+        restarted = EmbeddingManager("modell-a", self.tmp.name)
+        restarted._model = FakeModel()
+        self.assertEqual(restarted.embed_texts(["zwei", "vier"])[0], vectors[1])
+        self.assertEqual(restarted._model.encoded, ["vier"])
+
+    def test_other_model_does_not_use_cached_vectors(self):
+        """Vektoren eines anderen Modells werden nicht wiederverwendet"""
+        manager = EmbeddingManager("modell-a", self.tmp.name)
+        manager._model = FakeModel()
+        manager.embed_texts(["eins"])
+
+        other = EmbeddingManager("modell-b", self.tmp.name)
+        other._model = FakeModel(offset=100)
+        self.assertEqual(other.embed_texts(["eins"])[0][0], 104.0)
+        self.assertEqual(other._model.encoded, ["eins"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import { callApi } from './core';
+import { ADMIN_API_KEY } from './tenants';
+import { ChatLogPage, ChatLogEntry, ChatStats, TenantChatStats } from '../types/api';
+
+// Seitengröße der Protokollliste
+export const CHAT_LOG_PAGE_SIZE = 50;
+
+export interface ChatLogPageOptions {
+  limit?: number;
+  // Wert aus nextCursor der vorherigen Seite
+  cursor?: string | null;
+  // Volltextfilter auf die Fragen
+  q?: string;
+  status?: 'ok' | 'error';
+  unanswered?: boolean;
+  since?: Date;
+  until?: Date;
+}
+
+export interface ChatStatsRange {
+  since?: Date;
+  until?: Date;
+}
+
+// Zeitpunkte immer als UTC mit "Z" senden, das Backend rechnet Offsets nach UTC um
+function rangeParams(params: URLSearchParams, range: ChatStatsRange): URLSearchParams {
+  if (range.since) {
+    params.set('since', range.since.toISOString());
+  }
+  if (range.until) {
+    params.set('until', range.until.toISOString());
+  }
+  return params;
+}
+
+// Das Backend liefert created_at als UTC ohne Zeitzonenangabe
+export function parseChatLogTime(value: string): Date {
+  return new Date(/[zZ]|[+-]\d{2}:\d{2}$/.test(value) ? value : `${value}Z`);
+}
+
+export class ChatLogApi {
+  async getChatLogs(tenantId: string, options: ChatLogPageOptions = {}): Promise<ChatLogPage> {
+    const params = rangeParams(new URLSearchParams({
+      tenant_id: tenantId,
+      limit: String(options.limit ?? CHAT_LOG_PAGE_SIZE)
+    }), options);
+    if (options.cursor) {
+      params.set('cursor', options.cursor);
+    }
+    if (options.q) {
+      params.set('q', options.q);
+    }
+    if (options.status) {
+      params.set('status', options.status);
+    }
+    if (options.unanswered !== undefined) {
+      params.set('unanswered', String(options.unanswered));
+    }
+
+    // Der Cursor steht im Header X-Next-Cursor, daher fetch statt callApi
+    // DIREKT /api/v1 verwenden; keine Trailing-Slashes, die zu Redirects führen könnten
+    const response = await fetch(`/api/v1/chat-logs?${params.toString()}`, {
+      method: 'GET',
+      headers: {
+        'X-API-Key': ADMIN_API_KEY,
+        'Content-Type': 'application/json'
+      },
+      redirect: 'follow',
+      mode: 'same-origin',
+      credentials: 'same-origin'
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! Status: ${response.status}`);
+    }
+
+    return {
+      logs: await response.json() as ChatLogEntry[],
+      nextCursor: response.headers.get('X-Next-Cursor')
+    };
+  }
+
+  async getChatStats(tenantId?: string, range: ChatStatsRange = {}): Promise<ChatStats> {
+    const params = rangeParams(new URLSearchParams(), range);
+    if (tenantId) {
+      params.set('tenant_id', tenantId);
+    }
+    return callApi<ChatStats>(`/v1/chat-logs/stats?${params.toString()}`, {
+      apiKey: ADMIN_API_KEY
+    });
+  }
+
+  async getChatStatsByTenant(range: ChatStatsRange = {}): Promise<TenantChatStats[]> {
+    const params = rangeParams(new URLSearchParams(), range);
+    return callApi<TenantChatStats[]>(`/v1/chat-logs/stats/tenants?${params.toString()}`, {
+      apiKey: ADMIN_API_KEY
+    });
+  }
+}
@@ -1,7 +1,21 @@
 import { apiCore, callApi } from './core';
-import { Document, DocumentCreate, IndexStatus } from '../types/api';
+import { Document, DocumentCreate, DocumentPage, IndexStatus } from '../types/api';
 import axios from 'axios';
 
+// Seitengröße der Dokumentenliste
+export const DOCUMENT_PAGE_SIZE = 200;
+
+// Felder für Listenansichten; content wird erst beim Öffnen eines Dokuments über getDocument geladen
+export const DOCUMENT_LIST_FIELDS = 'id,title,source,created_at,doc_metadata';
+
+export interface DocumentPageOptions {
+  limit?: number;
+  // Wert aus nextCursor der vorherigen Seite
+  cursor?: string | null;
+  // Kommagetrennte Feldauswahl
+  fields?: string;
+}
+
 export class DocumentApi {
   // --- Dokument-Endpunkte ---
 
@@ -28,21 +42,24 @@ export class DocumentApi {
     return await response.json() as Document;
   }
 
-  async getDocuments(tenantId: string, limit = 1000, offset = 0): Promise<Document[]> {
+  async getDocuments(tenantId: string, options: DocumentPageOptions = {}): Promise<DocumentPage> {
     try {
       if (!apiCore.getApiKey()) {
         throw new Error('API-Key ist nicht gesetzt');
       }
 
-      console.log('Starte Dokument-Anfrage mit callApi');
-      console.log('Mit API-Key:', apiCore.getApiKey());
-      console.log('Für Tenant:', tenantId);
-      
-      // Der Endpunkt erwartet tenant_id als Query-Parameter
+      // Der Endpunkt erwartet tenant_id als Query-Parameter und liefert eine Seite (neueste zuerst)
       // DIREKT /api/v1 verwenden, nicht erst /v1
       // WICHTIG: Keine Trailing-Slashes verwenden, die zu Redirects führen könnten
-      const url = `/api/v1/documents?tenant_id=${encodeURIComponent(tenantId)}`;
-      console.log('Verwende URL:', url);
+      const params = new URLSearchParams({
+        tenant_id: tenantId,
+        limit: String(options.limit ?? DOCUMENT_PAGE_SIZE),
+        fields: options.fields ?? DOCUMENT_LIST_FIELDS
+      });
+      if (options.cursor) {
+        params.set('cursor', options.cursor);
+      }
+      const url = `/api/v1/documents?${params.toString()}`;
       
       // Die callApi-Funktion würde normalerweise /api/v1 hinzufügen, was hier doppelt wäre
       // Daher verwenden wir fetch direkt mit spezifischen Optionen, die Redirects erlauben
@@ -64,7 +81,13 @@ export class DocumentApi {
         throw new Error(`HTTP error! Status: ${response.status}`);
       }
       
-      return await response.json() as Document[];
+      // X-Total-Count wird nur für die erste Seite gesendet (geschätzt)
+      const totalCount = response.headers.get('X-Total-Count');
+      return {
+        documents: await response.json() as Document[],
+        nextCursor: response.headers.get('X-Next-Cursor'),
+        totalCount: totalCount !== null ? Number(totalCount) : null
+      };
     } catch (error) {
       console.error("Fehler beim Abrufen der Dokumente:", error);
       throw error;
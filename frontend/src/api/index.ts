@@ -4,11 +4,13 @@ import { apiCore } from './core';
 import { tenantApi } from './tenants';
 import { chatApi } from './chat';
 import { DocumentApi } from './documents';
+import { ChatLogApi } from './chatLogs';
 import { agencyApi } from './agencies';
 import { InteractiveApi, UIComponentsApi } from './interactive';
 
 // Instanzen der API-Klassen erstellen
 const documentApi = new DocumentApi();
+const chatLogApi = new ChatLogApi();
 const interactiveApi = new InteractiveApi();
 const uiComponentsApi = new UIComponentsApi();
 
@@ -52,6 +54,11 @@ export const api = {
   getCompletion: chatApi.getCompletion.bind(chatApi),
   getCompletionStream: chatApi.getCompletionStream.bind(chatApi),
   search: chatApi.search.bind(chatApi),
+
+  // Chat-Protokolle und Kennzahlen (Admin)
+  getChatLogs: chatLogApi.getChatLogs.bind(chatLogApi),
+  getChatStats: chatLogApi.getChatStats.bind(chatLogApi),
+  getChatStatsByTenant: chatLogApi.getChatStatsByTenant.bind(chatLogApi),
   
   // Dokument-Funktionen
   getDocuments: documentApi.getDocuments.bind(documentApi),
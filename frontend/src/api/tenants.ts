@@ -2,7 +2,7 @@ import { apiCore, API_BASE_URL, callApi } from './core';
 import { Tenant, TenantCreate, TenantUpdate, TenantExtended } from '../types/api';
 
 // Standard-API-Key für Admin-Operationen
-const ADMIN_API_KEY = "admin-secret-key-12345";
+export const ADMIN_API_KEY = "admin-secret-key-12345";
 
 export class TenantApi {
   // --- Tenant-Endpunkte ---
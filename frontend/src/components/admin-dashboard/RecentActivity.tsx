@@ -1,12 +1,15 @@
-import React from "react"
-import { User, Bot, FileText, PlusCircle, Trash2, RefreshCw, Settings } from "lucide-react"
+import React, { useEffect, useState } from "react"
+import { User, FileText, PlusCircle, Trash2, RefreshCw, Settings, MessageSquare } from "lucide-react"
 
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
-import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar"
+import { Avatar, AvatarFallback } from "@/components/ui/avatar"
+import api from "@/api"
+import { Tenant, TenantChatStats } from "@/types/api"
+import { formatLatency } from "@/components/chat-logs/ChatLogTable"
 
 interface Activity {
   id: string
-  type: "create_tenant" | "delete_tenant" | "create_document" | "update_settings" | "reindex" | "login"
+  type: "create_tenant" | "delete_tenant" | "create_document" | "update_settings" | "reindex" | "login" | "chat"
   tenant?: string
   user: string
   timestamp: string
@@ -17,15 +20,43 @@ interface RecentActivityProps {
   activities?: Activity[]
 }
 
-export function RecentActivity({ activities = defaultActivities }: RecentActivityProps) {
+// Chat-Aktivität pro Kunde aus der Chat-Auswertung (letzte 24 Stunden)
+function chatActivities(overview: TenantChatStats[], tenants: Tenant[]): Activity[] {
+  const names = new Map(tenants.map((tenant) => [tenant.id, tenant.name]))
+  return overview.slice(0, 5).map((item): Activity => ({
+    id: item.tenant_id,
+    type: "chat",
+    user: names.get(item.tenant_id) ?? item.tenant_id,
+    timestamp: "Letzte 24 Stunden",
+    description: `${item.requests} Anfragen, ${item.unanswered} unbeantwortet, ${item.errors} Fehler, `
+      + `Median ${formatLatency(item.latency_p50_ms)}`
+  }))
+}
+
+export function RecentActivity({ activities: givenActivities }: RecentActivityProps) {
+  const [loadedActivities, setLoadedActivities] = useState<Activity[]>([])
+
+  // Ohne übergebene Aktivitäten werden die aktivsten Kunden aus der Chat-Auswertung geladen
+  useEffect(() => {
+    if (givenActivities) return
+    Promise.all([api.getChatStatsByTenant(), api.getAllTenants()])
+      .then(([overview, tenants]) => setLoadedActivities(chatActivities(overview, tenants)))
+      .catch((error) => console.error("Fehler beim Laden der Chat-Aktivität:", error))
+  }, [givenActivities])
+
+  const activities = givenActivities ?? loadedActivities
+
   return (
     <Card>
       <CardHeader>
         <CardTitle>Letzte Aktivitäten</CardTitle>
-        <CardDescription>Kürzlich durchgeführte Aktionen im System</CardDescription>
+        <CardDescription>Aktivste Kunden nach Chat-Anfragen der letzten 24 Stunden</CardDescription>
       </CardHeader>
       <CardContent>
         <div className="space-y-6">
+          {activities.length === 0 && (
+            <p className="text-sm text-muted-foreground">Keine Chat-Anfragen in den letzten 24 Stunden</p>
+          )}
           {activities.map((activity) => (
             <div key={activity.id} className="flex items-start space-x-4">
               <ActivityIcon type={activity.type} />
@@ -92,6 +123,14 @@ function ActivityIcon({ type }: { type: Activity["type"] }) {
           </AvatarFallback>
         </Avatar>
       )
+    case "chat":
+      return (
+        <Avatar className="h-8 w-8 bg-sky-100">
+          <AvatarFallback className="bg-sky-100 text-sky-700">
+            <MessageSquare className="h-4 w-4" />
+          </AvatarFallback>
+        </Avatar>
+      )
     case "login":
       return (
         <Avatar className="h-8 w-8 bg-gray-100">
@@ -108,45 +147,3 @@ function ActivityIcon({ type }: { type: Activity["type"] }) {
       )
   }
 }
-
-const defaultActivities: Activity[] = [
-  {
-    id: "1",
-    type: "create_tenant",
-    user: "Admin",
-    tenant: "Neu: Acme Corp",
-    timestamp: "Vor 25 Minuten",
-    description: "Tenant erstellt und API-Schlüssel generiert"
-  },
-  {
-    id: "2",
-    type: "login",
-    user: "admin@example.com",
-    timestamp: "Vor 1 Stunde",
-    description: "Erfolgreicher Login"
-  },
-  {
-    id: "3",
-    type: "update_settings",
-    user: "Admin",
-    tenant: "Globex GmbH",
-    timestamp: "Heute, 09:45 Uhr",
-    description: "Bot-Einstellungen aktualisiert"
-  },
-  {
-    id: "4",
-    type: "create_document",
-    user: "Benutzer: max.mustermann",
-    tenant: "Umbrella AG",
-    timestamp: "Gestern, 15:20 Uhr",
-    description: "10 neue Dokumente hochgeladen"
-  },
-  {
-    id: "5",
-    type: "reindex",
-    user: "Admin",
-    tenant: "Stark Industries",
-    timestamp: "Gestern, 12:15 Uhr",
-    description: "Vollständige Neuindizierung durchgeführt"
-  }
-] 
\ No newline at end of file
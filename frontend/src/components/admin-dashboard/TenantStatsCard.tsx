@@ -1,7 +1,10 @@
-import React from "react"
-import { Users, ArrowUp, ArrowDown, Building, Bot } from "lucide-react"
+import React, { useEffect, useState } from "react"
+import { ArrowUp, ArrowDown, Building, MessageSquare, HelpCircle, Timer } from "lucide-react"
 
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
+import api from "@/api"
+import { ChatStats, TenantChatStats } from "@/types/api"
+import { formatLatency } from "@/components/chat-logs/ChatLogTable"
 
 interface TenantStat {
   title: string
@@ -15,9 +18,54 @@ interface TenantStatsCardProps {
   stats?: TenantStat[]
 }
 
-export function TenantStatsCard({ stats = defaultStats }: TenantStatsCardProps) {
+// Kennzahlen der letzten 24 Stunden (Standardzeitraum der Chat-Auswertung)
+function chatStatsToCards(summary: ChatStats, tenants: TenantChatStats[]): TenantStat[] {
+  return [
+    {
+      title: "Chat-Anfragen",
+      value: summary.requests.toLocaleString('de-DE'),
+      description: `Letzte 24 Stunden, davon ${summary.errors.toLocaleString('de-DE')} mit Fehler`,
+      icon: MessageSquare
+    },
+    {
+      title: "Aktive Kunden",
+      value: tenants.length,
+      description: "Mit Anfragen in den letzten 24 Stunden",
+      icon: Building
+    },
+    {
+      title: "Unbeantwortete Fragen",
+      value: summary.unanswered.toLocaleString('de-DE'),
+      description: `${(summary.unanswered_rate * 100).toFixed(1)} % aller Anfragen`,
+      icon: HelpCircle,
+      change: summary.unanswered_rate > 0.2
+        ? { value: "Mehr als jede fünfte Frage unbeantwortet", positive: false }
+        : undefined
+    },
+    {
+      title: "Antwortzeit (Median)",
+      value: formatLatency(summary.latency_p50_ms),
+      description: `p95: ${formatLatency(summary.latency_p95_ms)}, p99: ${formatLatency(summary.latency_p99_ms)}`,
+      icon: Timer
+    }
+  ]
+}
+
+export function TenantStatsCard({ stats: givenStats }: TenantStatsCardProps) {
+  const [loadedStats, setLoadedStats] = useState<TenantStat[]>([])
+
+  // Ohne übergebene Kennzahlen werden die Chat-Kennzahlen aller Kunden geladen
+  useEffect(() => {
+    if (givenStats) return
+    Promise.all([api.getChatStats(), api.getChatStatsByTenant()])
+      .then(([summary, tenants]) => setLoadedStats(chatStatsToCards(summary, tenants)))
+      .catch((error) => console.error("Fehler beim Laden der Chat-Kennzahlen:", error))
+  }, [givenStats])
+
+  const stats = givenStats ?? loadedStats
+
   return (
-    <div className="grid gap-4 md:grid-cols-2 xl:grid-cols-3">
+    <div className="grid gap-4 md:grid-cols-2 xl:grid-cols-4">
       {stats.map((stat, index) => (
         <Card key={index}>
           <CardHeader className="flex flex-row items-center justify-between pb-2">
@@ -45,27 +93,3 @@ export function TenantStatsCard({ stats = defaultStats }: TenantStatsCardProps)
     </div>
   )
 }
-
-const defaultStats: TenantStat[] = [
-  {
-    title: "Aktive Kunden",
-    value: "12",
-    description: "Gesamt im System",
-    icon: Building,
-    change: { value: "+2 (letzten 30 Tage)", positive: true }
-  },
-  {
-    title: "Aktive Bots",
-    value: "24",
-    description: "Gesamt im System",
-    icon: Bot,
-    change: { value: "+5 (letzten 30 Tage)", positive: true }
-  },
-  {
-    title: "Benutzer",
-    value: "512",
-    description: "Über alle Kunden",
-    icon: Users,
-    change: { value: "+48 (letzten 30 Tage)", positive: true }
-  }
-] 
\ No newline at end of file
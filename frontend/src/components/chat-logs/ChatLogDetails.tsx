@@ -11,91 +11,87 @@ import {
 } from "@/components/ui/dialog"
 import { ScrollArea } from "@/components/ui/scroll-area"
 import { Button } from "@/components/ui/button"
-import { Badge } from "@/components/ui/badge"
-import { DemoChatLog } from "./ChatLogTable"
+import { ChatLogEntry } from "@/types/api"
+import { parseChatLogTime } from "@/api/chatLogs"
+import { ChatLogStatusBadge, formatLatency } from "./ChatLogTable"
 
 interface ChatLogDetailsProps {
-  chatLog: DemoChatLog | null
+  chatLog: ChatLogEntry | null
   onClose: () => void
+  onExport: (chatLog: ChatLogEntry) => void
 }
 
 export function ChatLogDetails({
   chatLog,
   onClose,
+  onExport,
 }: ChatLogDetailsProps) {
   if (!chatLog) return null
 
+  const details = [
+    { label: "Zeitpunkt", value: parseChatLogTime(chatLog.created_at).toLocaleString('de-DE') },
+    { label: "Client", value: chatLog.client_info ?? "–" },
+    { label: "Kanal", value: chatLog.channel },
+    { label: "Modell", value: chatLog.model ?? "–" },
+    { label: "Gesamtdauer", value: formatLatency(chatLog.latency_ms) },
+    { label: "Erster Token", value: formatLatency(chatLog.first_token_ms) },
+    { label: "Suche", value: formatLatency(chatLog.retrieval_ms) },
+    { label: "LLM", value: formatLatency(chatLog.llm_ms) },
+    { label: "Tokens (Prompt / Antwort)", value: `${chatLog.prompt_tokens ?? "–"} / ${chatLog.completion_tokens ?? "–"}` },
+  ]
+
   return (
     <Dialog open={!!chatLog} onOpenChange={() => onClose()}>
       <DialogContent className="max-w-4xl">
         <DialogHeader>
-          <DialogTitle>Chat-Verlauf Details</DialogTitle>
+          <DialogTitle className="flex items-center gap-2">
+            Chat-Anfrage Details <ChatLogStatusBadge chatLog={chatLog} />
+          </DialogTitle>
           <DialogDescription>
-            Session: <code className="font-mono bg-muted px-1 rounded">{chatLog.sessionId}</code>
+            Session: <code className="font-mono bg-muted px-1 rounded">{chatLog.session_id ?? "–"}</code>
           </DialogDescription>
         </DialogHeader>
         
         <div className="grid md:grid-cols-3 gap-4 py-4">
-          <div className="space-y-1">
-            <p className="text-sm font-medium">Client:</p>
-            <p className="text-sm text-muted-foreground">{chatLog.clientInfo}</p>
-          </div>
-          <div className="space-y-1">
-            <p className="text-sm font-medium">Startzeit:</p>
-            <p className="text-sm text-muted-foreground">{chatLog.startTime}</p>
-          </div>
-          <div className="space-y-1">
-            <p className="text-sm font-medium">Dauer:</p>
-            <p className="text-sm text-muted-foreground">{chatLog.duration}</p>
-          </div>
+          {details.map((detail) => (
+            <div key={detail.label} className="space-y-1">
+              <p className="text-sm font-medium">{detail.label}:</p>
+              <p className="text-sm text-muted-foreground">{detail.value}</p>
+            </div>
+          ))}
         </div>
         
-        {chatLog.topics && chatLog.topics.length > 0 && (
+        {chatLog.error && (
           <div className="space-y-2 border-t pt-4">
-            <p className="text-sm font-medium">Erkannte Themen:</p>
-            <div className="flex flex-wrap gap-1">
-              {chatLog.topics.map((topic) => (
-                <Badge key={topic} variant="secondary">{topic}</Badge>
-              ))}
-            </div>
+            <p className="text-sm font-medium">Fehler:</p>
+            <p className="text-sm text-destructive whitespace-pre-wrap break-words">{chatLog.error}</p>
           </div>
         )}
         
         <div className="border-t pt-4">
-          <p className="text-sm font-medium mb-3">Nachrichtenverlauf:</p>
+          <p className="text-sm font-medium mb-3">Frage und Antwort:</p>
           
           <ScrollArea className="h-[400px] rounded-md border p-4">
             <div className="space-y-4">
-              {chatLog.messages.map((message) => (
-                <div key={message.id} className={`flex gap-3 ${message.role === 'user' ? 'justify-end' : ''}`}>
-                  {message.role !== 'user' && (
-                    <div className="w-8 h-8 rounded-full bg-primary/10 flex items-center justify-center">
-                      <Bot className="h-4 w-4 text-primary" />
-                    </div>
-                  )}
-                  
-                  <div className={`rounded-lg px-3 py-2 max-w-[80%] ${
-                    message.role === 'user' 
-                      ? 'bg-primary text-primary-foreground'
-                      : 'bg-muted'
-                  }`}>
-                    <div className="flex justify-between items-start gap-2">
-                      <p className="text-sm whitespace-pre-wrap break-words">
-                        {message.content}
-                      </p>
-                      <span className="text-xs opacity-50 shrink-0 mt-1">
-                        {message.timestamp}
-                      </span>
-                    </div>
+              <div className="flex gap-3 justify-end">
+                <div className="rounded-lg px-3 py-2 max-w-[80%] bg-primary text-primary-foreground">
+                  <p className="text-sm whitespace-pre-wrap break-words">{chatLog.query}</p>
+                </div>
+                <div className="w-8 h-8 rounded-full bg-primary flex items-center justify-center">
+                  <User className="h-4 w-4 text-primary-foreground" />
+                </div>
+              </div>
+              
+              {chatLog.response && (
+                <div className="flex gap-3">
+                  <div className="w-8 h-8 rounded-full bg-primary/10 flex items-center justify-center">
+                    <Bot className="h-4 w-4 text-primary" />
+                  </div>
+                  <div className="rounded-lg px-3 py-2 max-w-[80%] bg-muted">
+                    <p className="text-sm whitespace-pre-wrap break-words">{chatLog.response}</p>
                   </div>
-                  
-                  {message.role === 'user' && (
-                    <div className="w-8 h-8 rounded-full bg-primary flex items-center justify-center">
-                      <User className="h-4 w-4 text-primary-foreground" />
-                    </div>
-                  )}
                 </div>
-              ))}
+              )}
             </div>
           </ScrollArea>
         </div>
@@ -104,14 +100,11 @@ export function ChatLogDetails({
           <Button variant="outline" onClick={onClose}>
             Schließen
           </Button>
-          <Button onClick={() => {
-            // Handle export logic here
-            onClose();
-          }}>
+          <Button onClick={() => onExport(chatLog)}>
             Exportieren
           </Button>
         </DialogFooter>
       </DialogContent>
     </Dialog>
   )
-} 
\ No newline at end of file
+}
@@ -1,5 +1,5 @@
 import React from "react"
-import { MessageSquare, MoreHorizontal, ExternalLink, Download, Trash2 } from "lucide-react"
+import { MessageSquare, MoreHorizontal, ExternalLink, Download } from "lucide-react"
 
 import {
   Table,
@@ -16,26 +16,36 @@ import {
   DropdownMenuContent,
   DropdownMenuItem,
   DropdownMenuLabel,
-  DropdownMenuSeparator,
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu"
-import { demoData } from "./demo-data"
-
-// Verwende den vollständigen Chatlog-Typ aus den Demo-Daten
-export type DemoChatLog = typeof demoData.chatLogs[0];
+import { ChatLogEntry } from "@/types/api"
+import { parseChatLogTime } from "@/api/chatLogs"
 
 interface ChatLogTableProps {
-  chatLogs: DemoChatLog[]
-  onViewDetails: (chatLog: DemoChatLog) => void
-  onExport: (chatLog: DemoChatLog) => void
-  onDelete: (chatLog: DemoChatLog) => void
+  chatLogs: ChatLogEntry[]
+  onViewDetails: (chatLog: ChatLogEntry) => void
+  onExport: (chatLog: ChatLogEntry) => void
+}
+
+export function formatLatency(ms?: number | null) {
+  if (ms === null || ms === undefined) return "–"
+  return ms < 1000 ? `${ms} ms` : `${(ms / 1000).toFixed(1)} s`
+}
+
+export function ChatLogStatusBadge({ chatLog }: { chatLog: ChatLogEntry }) {
+  if (chatLog.status === "error") {
+    return <Badge variant="destructive">Fehler</Badge>
+  }
+  if (chatLog.unanswered) {
+    return <Badge variant="secondary">Unbeantwortet</Badge>
+  }
+  return <Badge variant="outline">Beantwortet</Badge>
 }
 
 export function ChatLogTable({
   chatLogs,
   onViewDetails,
   onExport,
-  onDelete,
 }: ChatLogTableProps) {
   if (chatLogs.length === 0) {
     return (
@@ -54,33 +64,31 @@ export function ChatLogTable({
       <Table>
         <TableHeader>
           <TableRow>
+            <TableHead>Zeitpunkt</TableHead>
+            <TableHead>Frage</TableHead>
             <TableHead>Session ID</TableHead>
-            <TableHead>Client</TableHead>
-            <TableHead>Start</TableHead>
+            <TableHead>Kanal</TableHead>
             <TableHead>Dauer</TableHead>
-            <TableHead>Nachrichten</TableHead>
-            <TableHead>Themen</TableHead>
+            <TableHead>Status</TableHead>
             <TableHead className="w-[80px]"></TableHead>
           </TableRow>
         </TableHeader>
         <TableBody>
           {chatLogs.map((log) => (
             <TableRow key={log.id}>
+              <TableCell className="whitespace-nowrap">
+                {parseChatLogTime(log.created_at).toLocaleString('de-DE')}
+              </TableCell>
+              <TableCell className="max-w-md truncate" title={log.query}>
+                {log.query}
+              </TableCell>
               <TableCell className="font-mono text-xs">
-                {log.sessionId}
+                {log.session_id ?? "–"}
               </TableCell>
-              <TableCell>{log.clientInfo}</TableCell>
-              <TableCell>{log.startTime}</TableCell>
-              <TableCell>{log.duration}</TableCell>
-              <TableCell>{log.messageCount}</TableCell>
+              <TableCell>{log.channel}</TableCell>
+              <TableCell>{formatLatency(log.latency_ms)}</TableCell>
               <TableCell>
-                <div className="flex flex-wrap gap-1">
-                  {log.topics?.map((topic) => (
-                    <Badge key={topic} variant="outline">
-                      {topic}
-                    </Badge>
-                  ))}
-                </div>
+                <ChatLogStatusBadge chatLog={log} />
               </TableCell>
               <TableCell>
                 <DropdownMenu>
@@ -100,14 +108,6 @@ export function ChatLogTable({
                       <Download className="mr-2 h-4 w-4" />
                       Exportieren
                     </DropdownMenuItem>
-                    <DropdownMenuSeparator />
-                    <DropdownMenuItem
-                      onClick={() => onDelete(log)}
-                      className="text-destructive focus:bg-destructive focus:text-destructive-foreground"
-                    >
-                      <Trash2 className="mr-2 h-4 w-4" />
-                      Löschen
-                    </DropdownMenuItem>
                   </DropdownMenuContent>
                 </DropdownMenu>
               </TableCell>
@@ -117,4 +117,4 @@ export function ChatLogTable({
       </Table>
     </div>
   )
-} 
\ No newline at end of file
+}
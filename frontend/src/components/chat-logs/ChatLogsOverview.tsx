@@ -1,70 +1,79 @@
-import React, { useState } from "react"
-import { Search, Download, Trash2 } from "lucide-react"
+import React, { useCallback, useEffect, useState } from "react"
+import { Search, Download, RefreshCw } from "lucide-react"
 
 import { Input } from "@/components/ui/input"
 import { Button } from "@/components/ui/button"
-import {
-  AlertDialog,
-  AlertDialogAction,
-  AlertDialogCancel,
-  AlertDialogContent,
-  AlertDialogDescription,
-  AlertDialogFooter,
-  AlertDialogHeader,
-  AlertDialogTitle,
-} from "@/components/ui/alert-dialog"
+import { Switch } from "@/components/ui/switch"
+import { Label } from "@/components/ui/label"
 import { ChatLogTable } from "./ChatLogTable"
 import { ChatLogDetails } from "./ChatLogDetails"
 import { toast } from "@/utils/toast"
-
-// Demo-Daten
-import { demoData } from "./demo-data"
-
-// Die vollständige Demo-Chatlog-Struktur
-type DemoChatLog = typeof demoData.chatLogs[0];
+import api from "@/api"
+import { ChatLogEntry } from "@/types/api"
 
 interface ChatLogsOverviewProps {
   tenantId: string
 }
 
+// Exportiert Chat-Protokolle als JSON-Datei
+function downloadJson(fileName: string, data: unknown) {
+  const blob = new Blob([JSON.stringify(data, null, 2)], { type: "application/json" })
+  const url = URL.createObjectURL(blob)
+  const link = document.createElement("a")
+  link.href = url
+  link.download = fileName
+  link.click()
+  URL.revokeObjectURL(url)
+}
+
 export function ChatLogsOverview({ tenantId }: ChatLogsOverviewProps) {
+  const [searchInput, setSearchInput] = useState("")
   const [searchQuery, setSearchQuery] = useState("")
-  const [selectedChatLog, setSelectedChatLog] = useState<DemoChatLog | null>(null)
-  const [viewingChatLog, setViewingChatLog] = useState<DemoChatLog | null>(null)
-  const [isDeleting, setIsDeleting] = useState(false)
-
-  // Filtere Chatverläufe basierend auf der Suchanfrage
-  const filteredChatLogs = demoData.chatLogs.filter((log) => {
-    const lowerCaseQuery = searchQuery.toLowerCase()
-    return (
-      log.sessionId.toLowerCase().includes(lowerCaseQuery) ||
-      log.clientInfo.toLowerCase().includes(lowerCaseQuery) ||
-      log.topics?.some((topic) => topic.toLowerCase().includes(lowerCaseQuery))
-    )
-  })
-
-  const handleViewDetails = (chatLog: DemoChatLog) => {
-    setViewingChatLog(chatLog)
-  }
-
-  const handleExportChat = (chatLog: DemoChatLog) => {
-    toast.info(`Chatlog für Session ${chatLog.sessionId} wird exportiert (Demo)`)
-  }
+  const [onlyUnanswered, setOnlyUnanswered] = useState(false)
+  const [chatLogs, setChatLogs] = useState<ChatLogEntry[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loading, setLoading] = useState(false)
+  const [viewingChatLog, setViewingChatLog] = useState<ChatLogEntry | null>(null)
 
-  const handleDeleteChat = async () => {
-    if (!selectedChatLog) return
+  // Die Suche läuft im Backend (Volltext auf die Fragen), daher erst nach kurzer Pause
+  useEffect(() => {
+    const timeoutId = setTimeout(() => setSearchQuery(searchInput.trim()), 400)
+    return () => clearTimeout(timeoutId)
+  }, [searchInput])
 
+  const loadChatLogs = useCallback(async (cursor: string | null = null) => {
     try {
-      setIsDeleting(true)
-      // Simuliere Löschvorgang
-      await new Promise((resolve) => setTimeout(resolve, 500))
-      toast.success(`Chatlog für Session ${selectedChatLog.sessionId} wurde gelöscht`)
+      setLoading(true)
+      const page = await api.getChatLogs(tenantId, {
+        cursor,
+        q: searchQuery || undefined,
+        unanswered: onlyUnanswered ? true : undefined
+      })
+      setChatLogs((current) => cursor ? [...current, ...page.logs] : page.logs)
+      setNextCursor(page.nextCursor)
     } catch (error) {
-      console.error("Fehler beim Löschen:", error)
-      toast.error("Fehler beim Löschen des Chat-Logs")
+      console.error("Fehler beim Laden der Chat-Logs:", error)
+      toast.error("Fehler beim Laden der Chat-Logs")
     } finally {
-      setIsDeleting(false)
-      setSelectedChatLog(null)
+      setLoading(false)
+    }
+  }, [tenantId, searchQuery, onlyUnanswered])
+
+  // Erste Seite bei Tenant- oder Filterwechsel neu laden
+  useEffect(() => {
+    if (tenantId) {
+      loadChatLogs()
+    }
+  }, [tenantId, loadChatLogs])
+
+  const handleExportChat = (chatLog: ChatLogEntry) => {
+    downloadJson(`chat-log-${chatLog.id}.json`, chatLog)
+  }
+
+  const handleExportAll = () => {
+    downloadJson(`chat-logs-${tenantId}.json`, chatLogs)
+    if (nextCursor) {
+      toast.info(`Es wurden nur die ${chatLogs.length} geladenen Chat-Logs exportiert`)
     }
   }
 
@@ -77,69 +86,53 @@ export function ChatLogsOverview({ tenantId }: ChatLogsOverviewProps) {
             Verwalten und analysieren Sie Chatverläufe für diesen Tenant
           </p>
         </div>
-        <Button variant="outline">
-          <Download className="mr-2 h-4 w-4" /> Alle Logs exportieren
-        </Button>
+        <div className="flex items-center space-x-2">
+          <Button variant="outline" onClick={() => loadChatLogs()} disabled={loading}>
+            <RefreshCw className={`mr-2 h-4 w-4 ${loading ? "animate-spin" : ""}`} /> Aktualisieren
+          </Button>
+          <Button variant="outline" onClick={handleExportAll} disabled={chatLogs.length === 0}>
+            <Download className="mr-2 h-4 w-4" /> Geladene Logs exportieren
+          </Button>
+        </div>
       </div>
 
-      <div className="flex items-center space-x-2">
-        <Search className="h-4 w-4 text-muted-foreground" />
-        <Input
-          placeholder="Suche nach Session ID, Client oder Themen..."
-          value={searchQuery}
-          onChange={(e) => setSearchQuery(e.target.value)}
-          className="max-w-sm"
-        />
+      <div className="flex items-center space-x-6">
+        <div className="flex items-center space-x-2">
+          <Search className="h-4 w-4 text-muted-foreground" />
+          <Input
+            placeholder="Suche in den Fragen..."
+            value={searchInput}
+            onChange={(e) => setSearchInput(e.target.value)}
+            className="w-80"
+          />
+        </div>
+        <div className="flex items-center space-x-2">
+          <Switch id="only-unanswered" checked={onlyUnanswered} onCheckedChange={setOnlyUnanswered} />
+          <Label htmlFor="only-unanswered">Nur unbeantwortete Fragen</Label>
+        </div>
       </div>
 
       <ChatLogTable
-        chatLogs={filteredChatLogs}
-        onViewDetails={handleViewDetails}
+        chatLogs={chatLogs}
+        onViewDetails={setViewingChatLog}
         onExport={handleExportChat}
-        onDelete={setSelectedChatLog}
       />
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" size="sm" onClick={() => loadChatLogs(nextCursor)} disabled={loading}>
+            Weitere Chat-Logs laden
+          </Button>
+        </div>
+      )}
+
       {viewingChatLog && (
         <ChatLogDetails
           chatLog={viewingChatLog}
           onClose={() => setViewingChatLog(null)}
+          onExport={handleExportChat}
         />
       )}
-
-      <AlertDialog open={!!selectedChatLog} onOpenChange={() => selectedChatLog && setSelectedChatLog(null)}>
-        <AlertDialogContent>
-          <AlertDialogHeader>
-            <AlertDialogTitle>Chat-Log löschen</AlertDialogTitle>
-            <AlertDialogDescription>
-              Sind Sie sicher, dass Sie diesen Chat-Verlauf löschen möchten?
-              Dies kann nicht rückgängig gemacht werden.
-            </AlertDialogDescription>
-          </AlertDialogHeader>
-          <AlertDialogFooter>
-            <AlertDialogCancel disabled={isDeleting}>Abbrechen</AlertDialogCancel>
-            <AlertDialogAction
-              onClick={(e) => {
-                e.preventDefault()
-                handleDeleteChat()
-              }}
-              disabled={isDeleting}
-              className="bg-destructive hover:bg-destructive/90"
-            >
-              {isDeleting ? (
-                <>
-                  <Trash2 className="mr-2 h-4 w-4 animate-spin" />
-                  Löschen...
-                </>
-              ) : (
-                <>
-                  <Trash2 className="mr-2 h-4 w-4" />
-                  Löschen
-                </>
-              )}
-            </AlertDialogAction>
-          </AlertDialogFooter>
-        </AlertDialogContent>
-      </AlertDialog>
     </div>
   )
-} 
\ No newline at end of file
+}
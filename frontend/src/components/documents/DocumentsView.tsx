@@ -38,6 +38,8 @@ export default function DocumentsView() {
     filteredDocuments,
     selectedDocuments,
     documentStatus,
+    totalCount,
+    hasMoreDocuments,
     // Status
     loading,
     error,
@@ -54,6 +56,7 @@ export default function DocumentsView() {
     setTitleFilter,
     setStatusFilter,
     setCategoryFilter,
+    loadMoreDocuments,
     selectDocument,
     selectAllDocuments,
     viewDocument,
@@ -259,7 +262,7 @@ export default function DocumentsView() {
                   {error && error.includes("nicht verfügbar") ? (
                     "Dokumenten-Service ist nicht verfügbar"
                   ) : (
-                    `${filteredDocuments.length} Dokumente gefunden, 
+                    `${filteredDocuments.length} Dokumente gefunden${hasMoreDocuments && totalCount !== null ? ` (von ca. ${totalCount} geladen)` : ''}, 
                     zeige ${paginatedDocuments.length} Dokumente auf Seite ${page} von ${totalPages}`
                   )}
                 </CardDescription>
@@ -343,6 +346,15 @@ export default function DocumentsView() {
                 Zeige {(page - 1) * pageSize + 1} - {Math.min(page * pageSize, filteredDocuments.length)} von {filteredDocuments.length} Dokumenten
               </div>
               {renderPagination()}
+              {hasMoreDocuments && (
+                <Button 
+                  variant="outline" 
+                  size="sm"
+                  onClick={loadMoreDocuments}
+                >
+                  Weitere Dokumente laden
+                </Button>
+              )}
             </CardFooter>
           )}
         </Card>
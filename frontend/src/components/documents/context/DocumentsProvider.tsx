@@ -21,6 +21,9 @@ interface DocumentsContextType {
   selectedDocuments: string[];
   documentStatus: DocumentStatusMap;
   categories: string[];
+  // Geschätzte Gesamtanzahl und ob weitere Seiten vorhanden sind
+  totalCount: number | null;
+  hasMoreDocuments: boolean;
   
   // Status
   loading: boolean;
@@ -45,6 +48,7 @@ interface DocumentsContextType {
   setStatusFilter: (value: string) => void;
   setCategoryFilter: (value: string) => void;
   setSelectedDocuments: (documents: string[]) => void;
+  loadMoreDocuments: () => Promise<void>;
   
   // Dokumentenoperationen
   selectDocument: (docId: string, selected: boolean) => void;
@@ -83,6 +87,8 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
   const [tenant, setTenant] = useState<Tenant | null>(null);
   const [documents, setDocuments] = useState<Document[]>([]);
   const [selectedDocuments, setSelectedDocuments] = useState<string[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalCount, setTotalCount] = useState<number | null>(null);
   
   // Status-States
   const [loading, setLoading] = useState(true);
@@ -155,6 +161,15 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
     });
   }, [documents, titleFilter, statusFilter, categoryFilter, documentStatus]);
 
+  // Erste Seite der Dokumentenliste laden (ersetzt die bisher geladenen Seiten)
+  const loadFirstPage = async () => {
+    const page = await api.getDocuments(tenantId);
+    setDocuments(page.documents);
+    setNextCursor(page.nextCursor);
+    setTotalCount(page.totalCount);
+    return page.documents;
+  };
+
   // Laden der Daten - nur auf der Client-Seite
   useEffect(() => {
     if (!tenantId || !isMounted) return;
@@ -201,8 +216,7 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
 
         // Dokumente abrufen
         try {
-          const documentsData = await api.getDocuments(tenantId);
-          setDocuments(documentsData);
+          const documentsData = await loadFirstPage();
           
           // Dokumentenstatus abrufen
           if (documentsData.length > 0) {
@@ -255,6 +269,7 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
             console.warn('Dokumenten-Endpunkt nicht verfügbar (404 Not Found):', err);
             // Leere Dokumentenliste setzen, aber keinen Fehler auslösen
             setDocuments([]);
+            setNextCursor(null);
             setError("Der Dokumenten-Service ist derzeit nicht verfügbar oder wurde noch nicht konfiguriert. Bitte kontaktieren Sie Ihren Administrator.");
           } else {
             console.error('Fehler beim Laden der Dokumente:', err);
@@ -296,18 +311,60 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
     }
   };
 
+  // Weitere Seite der Dokumentenliste laden
+  const loadMoreDocuments = async () => {
+    if (!tenantId || !nextCursor) return;
+    
+    try {
+      const page = await api.getDocuments(tenantId, { cursor: nextCursor });
+      setDocuments(prev => [...prev, ...page.documents]);
+      setNextCursor(page.nextCursor);
+      
+      // Status für die neuen Dokumente abrufen
+      const statusResults = await Promise.all(page.documents.map(async (doc) => {
+        try {
+          return { docId: doc.id, status: await api.getDocumentWeaviateStatus(tenantId, doc.id) };
+        } catch (err) {
+          console.error(`Fehler beim Abrufen des Status für Dokument ${doc.id}:`, err);
+          return {
+            docId: doc.id,
+            status: { status: IndexStatus.NICHT_INDIZIERT, error: "Fehler beim Abrufen des Status" }
+          };
+        }
+      }));
+      setDocumentStatus(prev => {
+        const next = { ...prev };
+        statusResults.forEach(result => {
+          next[result.docId] = result.status;
+        });
+        return next;
+      });
+    } catch (error) {
+      console.error("Fehler beim Laden weiterer Dokumente:", error);
+      toast.error(`Fehler beim Laden weiterer Dokumente: ${(error as Error).message}`);
+    }
+  };
+
+  // Die Liste enthält keinen Inhalt; für die Detailansicht wird das vollständige Dokument geladen
+  const openDocument = async (document: Document, viewOnly: boolean) => {
+    try {
+      setSelectedDocument(await api.getDocument(tenantId, document.id));
+      setViewOnlyMode(viewOnly);
+      setIsDetailModalOpen(true);
+    } catch (error) {
+      console.error("Fehler beim Laden des Dokuments:", error);
+      toast.error(`Fehler beim Laden des Dokuments: ${(error as Error).message}`);
+    }
+  };
+
   // Dokument ansehen
   const viewDocument = (document: Document) => {
-    setSelectedDocument(document);
-    setViewOnlyMode(true);
-    setIsDetailModalOpen(true);
+    openDocument(document, true);
   };
 
   // Dokument bearbeiten
   const editDocument = (document: Document) => {
-    setSelectedDocument(document);
-    setViewOnlyMode(false);
-    setIsDetailModalOpen(true);
+    openDocument(document, false);
   };
 
   // Dokument löschen
@@ -425,8 +482,7 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
       const result = await api.createDocument(document);
       
       // Bei Erfolg die Dokumente neu laden
-      const documentsData = await api.getDocuments(tenantId);
-      setDocuments(documentsData);
+      await loadFirstPage();
       
       toast.success("Dokument erfolgreich erstellt");
       return result; // Dokument zurückgeben für die automatische Indizierung
@@ -478,8 +534,7 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
       setUploadProgress(100);
       
       // Lade die Dokumente neu
-      const documentsData = await api.getDocuments(tenantId);
-      setDocuments(documentsData);
+      const documentsData = await loadFirstPage();
       
       // Hole Status für neue Dokumente
       const statusMap = { ...documentStatus };
@@ -763,6 +818,8 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
     selectedDocuments,
     documentStatus,
     categories,
+    totalCount,
+    hasMoreDocuments: nextCursor !== null,
     
     loading,
     error,
@@ -783,6 +840,7 @@ export const DocumentsProvider: React.FC<{ children: React.ReactNode; tenantId:
     setStatusFilter,
     setCategoryFilter,
     setSelectedDocuments,
+    loadMoreDocuments,
     
     selectDocument,
     selectAllDocuments,
@@ -31,6 +31,14 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       data: req.body,
     });
     
+    // Pagination-Header weitergeben
+    for (const header of ['x-next-cursor', 'x-total-count']) {
+      const value = backendResponse.headers[header];
+      if (value) {
+        res.setHeader(header, value);
+      }
+    }
+    
     // Sende die Backend-Antwort zurück an den Client
     return res.status(backendResponse.status).json(backendResponse.data);
   } catch (error) {
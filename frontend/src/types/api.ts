@@ -79,6 +79,67 @@ export interface Document {
   created_at: string;
 }
 
+// Eine Seite der Dokumentenliste (Keyset-Pagination)
+export interface DocumentPage {
+  // Ohne content, sofern nicht über fields angefordert
+  documents: Document[];
+  // Cursor für die nächste Seite oder null auf der letzten Seite
+  nextCursor: string | null;
+  // Geschätzte Gesamtanzahl, nur bei der ersten Seite
+  totalCount: number | null;
+}
+
+// Chat-Protokolle (Admin); Zeitstempel kommen als UTC ohne Zeitzonenangabe
+export interface ChatLogEntry {
+  id: string;
+  created_at: string;
+  tenant_id: string;
+  session_id?: string | null;
+  channel: string;
+  query: string;
+  response?: string | null;
+  status: 'ok' | 'error';
+  unanswered: boolean;
+  error?: string | null;
+  client_info?: string | null;
+  model?: string | null;
+  latency_ms?: number | null;
+  first_token_ms?: number | null;
+  retrieval_ms?: number | null;
+  llm_ms?: number | null;
+  prompt_tokens?: number | null;
+  completion_tokens?: number | null;
+}
+
+// Eine Seite der Chat-Protokolle (Keyset-Pagination)
+export interface ChatLogPage {
+  logs: ChatLogEntry[];
+  // Cursor für die nächste Seite oder null auf der letzten Seite
+  nextCursor: string | null;
+}
+
+// Kennzahlen aus den Chat-Rollups
+export interface ChatStats {
+  requests: number;
+  errors: number;
+  unanswered: number;
+  unanswered_rate: number;
+  latency_avg_ms: number | null;
+  latency_p50_ms: number | null;
+  latency_p95_ms: number | null;
+  latency_p99_ms: number | null;
+  latency_max_ms: number | null;
+  first_token_avg_ms: number | null;
+  retrieval_avg_ms: number | null;
+  llm_avg_ms: number | null;
+  prompt_tokens: number;
+  completion_tokens: number;
+}
+
+export interface TenantChatStats extends ChatStats {
+  tenant_id: string;
+}
+
 export interface DocumentCreate {
   title: string;
   content: string;